@@ -16,6 +16,8 @@
         # e.g., 'influence_gen_base_models' (REPO-IGBM-002)
         # This dependency ensures that the models this module interacts with are loaded.
         'influence_gen_base_models', 
+        'influence_gen_external_integrations', # Pooled HTTP sessions and per-service HTTP policies
+        'influence_gen_services', # influence_gen.n8n_callback_ledger, used to deduplicate N8N callbacks
     ],
     'data': [
         'security/ir.model.access.csv', # If new models are defined here or for service access
@@ -1,6 +1,7 @@
 import json
 import logging
 import werkzeug
+from psycopg2.errors import DeadlockDetected, SerializationFailure
 
 from odoo import http
 from odoo.http import request
@@ -83,6 +84,9 @@ class AIIntegrationController(http.Controller):
             )
             return {'status': 'success'}
 
+        except (SerializationFailure, DeadlockDetected):
+            # Concurrent delivery for the same request: Odoo retries the request on these errors.
+            raise
         except Exception as e:
             _logger.exception(
                 "Error processing N8N callback for request ID '%s': %s",
@@ -3,6 +3,7 @@ import logging
 import requests
 from odoo import models, _
 from odoo.exceptions import UserError
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
 
 _logger = logging.getLogger(__name__)
 
@@ -80,7 +81,8 @@ class AIRequestService(models.AbstractModel):
 
             _logger.info(f"Initiating AI image generation request ID {request_record.id} to N8N. URL: {n8n_webhook_url}")
             
-            response = requests.post(n8n_webhook_url, json=payload, headers=headers, timeout=30)
+            http_policy = self.env['influence_gen.integration.settings'].get_http_policy('n8n_ai', timeout=30)
+            response = HttpSessionPool.request('POST', n8n_webhook_url, policy=http_policy, json=payload, headers=headers)
 
             if 200 <= response.status_code < 300:
                 _logger.info(f"Successfully initiated AI request {request_record.id} to N8N. Status: {response.status_code}")
@@ -2,80 +2,218 @@
 import base64
 import hashlib
 import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from psycopg2.errors import DeadlockDetected, SerializationFailure
 from odoo import models, _
 from odoo.exceptions import UserError
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
 
 _logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_TIMEOUT = 60
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_MAX_IMAGE_BYTES = 50 * 1024 * 1024
+# Filestore sub-directory receiving downloads before they are moved to their checksum path.
+DOWNLOAD_STAGING_DIR = 'ai_image_staging'
+
+
+def _stream_download(image_url, staging_dir, max_bytes, http_policy):
+    """
+    Streams an image to a temporary file in chunks, hashing it on the fly, so that
+    memory use stays at one chunk whatever the image size. Runs in worker threads:
+    must not touch the Odoo environment.
+    :return: dict with path, sha256 (GeneratedImage hash), sha1 (filestore checksum), size and mimetype
+    """
+    with HttpSessionPool.request('GET', image_url, policy=http_policy, stream=True) as response:
+        response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise ValueError(f"Image of {content_length} bytes exceeds the {max_bytes} bytes limit.")
+        sha256, sha1, size = hashlib.sha256(), hashlib.sha1(), 0
+        fd, path = tempfile.mkstemp(dir=staging_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as image_file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ValueError(f"Image exceeds the {max_bytes} bytes limit.")
+                    sha256.update(chunk)
+                    sha1.update(chunk)
+                    image_file.write(chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        mimetype = (response.headers.get('Content-Type') or '').split(';')[0].strip() or None
+    return {'path': path, 'sha256': sha256.hexdigest(), 'sha1': sha1.hexdigest(), 'size': size, 'mimetype': mimetype}
+
 
 class AIResultService(models.AbstractModel):
     _name = 'influence_gen.ai_result_service'
     _description = 'Service to process AI Image Generation Results from N8N'
 
-    def _download_and_store_image(self, image_url, request_record, image_metadata):
+    def _get_download_settings(self):
+        """Returns (max concurrent downloads, max image size in bytes) from system parameters."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        try:
+            workers = max(int(ICP.get_param('influence_gen.ai_image_download_workers', DEFAULT_DOWNLOAD_WORKERS)), 1)
+        except (TypeError, ValueError):
+            workers = DEFAULT_DOWNLOAD_WORKERS
+        try:
+            max_bytes = int(ICP.get_param('influence_gen.ai_image_max_download_bytes', DEFAULT_MAX_IMAGE_BYTES))
+        except (TypeError, ValueError):
+            max_bytes = DEFAULT_MAX_IMAGE_BYTES
+        return workers, max_bytes
+
+    def _get_retention_category(self, request_record):
+        # One of influence_gen.generated_image's retention categories (REQ-AIGS-011)
+        if request_record.campaign_id and request_record.intended_use == 'campaign_content':
+            return 'campaign_asset_standard'
+        return 'personal_generation'
+
+    def _create_generated_image(self, request_record, attachment, image_metadata, hash_value, file_size):
         """
-        Downloads an image from a URL and stores it as an ir.attachment,
-        then creates a influence_gen.generated_image record.
+        Creates the influence_gen.generated_image record for a stored attachment and links both.
+        The image belongs to the request through request_id (the request's generated_image_ids).
         """
         GeneratedImage = self.env['influence_gen.generated_image']
-        Attachment = self.env['ir.attachment']
-
-        try:
-            _logger.info(f"Downloading image for request {request_record.id} from {image_url}")
-            response = requests.get(image_url, stream=True, timeout=60)
-            response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
-
-            image_content = response.content
-            hash_value = hashlib.sha256(image_content).hexdigest()
-
-            # Determine retention_category (simplified logic for now)
-            retention_category = 'personal_generation'
-            if request_record.campaign_id and request_record.intended_use == 'campaign':
-                # Example: retention_category = f"campaign_{request_record.campaign_id.id}"
-                retention_category = 'campaign_asset' # Adjust as per actual logic in base models/requirements
-            elif request_record.intended_use:
-                 retention_category = request_record.intended_use
+        image_vals = {
+            'request_id': request_record.id,
+            'image_attachment_id': attachment.id,
+            'file_format': image_metadata.get('file_format'),
+            'file_size': file_size,
+            'width': image_metadata.get('width'),
+            'height': image_metadata.get('height'),
+            'hash_value': hash_value,
+            'retention_category': self._get_retention_category(request_record),
+        }
+        generated_image_record = GeneratedImage.sudo().create(image_vals)
+        _logger.info(f"Created GeneratedImage record {generated_image_record.id} for request {request_record.id}")
+
+        attachment.sudo().write({'res_id': generated_image_record.id})
+        _logger.info(f"Linked attachment {attachment.id} to GeneratedImage {generated_image_record.id}")
+        return generated_image_record
+
+    def _create_attachment_from_download(self, attachment_vals, download):
+        """
+        Creates an ir.attachment holding a downloaded file.
 
+        With file storage, the file is moved into the filestore under its SHA-1 checksum,
+        the way ir.attachment stores files, so the content is never loaded into memory nor
+        base64 encoded. ir.attachment.create drops store_fname/checksum/file_size from its
+        values, so the attachment is created empty and the three columns are set right after.
+        With database storage configured, the raw bytes are passed instead.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        if Attachment._storage() != 'file':
+            with open(download['path'], 'rb') as image_file:
+                raw = image_file.read()
+            os.unlink(download['path'])
+            return Attachment.create(dict(attachment_vals, raw=raw))
+
+        file_vals = self._store_downloaded_file(download)
+        attachment = Attachment.create(attachment_vals)
+        self.env.cr.execute(
+            'UPDATE ir_attachment SET store_fname = %s, checksum = %s, file_size = %s WHERE id = %s',
+            [file_vals['store_fname'], file_vals['checksum'], file_vals['file_size'], attachment.id])
+        attachment.invalidate_recordset(['store_fname', 'checksum', 'file_size', 'raw', 'datas'])
+        return attachment
+
+    def _store_downloaded_file(self, download):
+        """
+        Moves a downloaded file into the filestore under its SHA-1 checksum and returns
+        the store_fname, checksum and file_size referencing it.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+
+        checksum = download['sha1']
+        fname = f"{checksum[:2]}/{checksum}"
+        full_path = Attachment._full_path(fname)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if os.path.isfile(full_path):
+            # Same content already in the filestore (e.g. a retried callback).
+            os.unlink(download['path'])
+        else:
+            os.replace(download['path'], full_path)
+        # Like ir.attachment._file_write: the file is garbage collected if the transaction rolls back.
+        Attachment._mark_for_gc(fname)
+        return {'store_fname': fname, 'checksum': checksum, 'file_size': download['size']}
 
-            attachment_vals = {
-                'name': f"ai_gen_req_{request_record.id}_{image_metadata.get('file_format', 'bin')}",
-                'datas': base64.b64encode(image_content),
-                'res_model': GeneratedImage._name,
-                # res_id will be linked after GeneratedImage record is created
-                'mimetype': image_metadata.get('mimetype', 'application/octet-stream'),
-            }
-            attachment = Attachment.sudo().create(attachment_vals)
-            _logger.info(f"Created attachment {attachment.id} for request {request_record.id}")
-
-            image_vals = {
-                'request_id': request_record.id,
-                'storage_identifier': str(attachment.id),
-                'storage_type': 'ir.attachment',
-                'file_format': image_metadata.get('file_format'),
-                'file_size': image_metadata.get('file_size', len(image_content)),
-                'width': image_metadata.get('width'),
-                'height': image_metadata.get('height'),
-                'hash_value': hash_value,
-                'retention_category': retention_category,
-            }
-            generated_image_record = GeneratedImage.sudo().create(image_vals)
-            _logger.info(f"Created GeneratedImage record {generated_image_record.id} for request {request_record.id}")
+    def _download_images(self, image_urls):
+        """
+        Downloads images concurrently with a bounded thread pool. Worker threads only
+        perform HTTP and file I/O; all ORM work stays in the calling thread.
+        :param image_urls: list of str
+        :return: list, in input order, of download dicts or the exception raised for that URL
+        """
+        workers, max_bytes = self._get_download_settings()
+        # Pooled keep-alive connections to the image host, shared with the worker threads.
+        http_policy = self.env['influence_gen.integration.settings'].get_http_policy(
+            'ai_image_download', timeout=DOWNLOAD_TIMEOUT, pool_maxsize=max(workers, 1))
+        staging_dir = self.env['ir.attachment'].sudo()._full_path(DOWNLOAD_STAGING_DIR)
+        os.makedirs(staging_dir, exist_ok=True)
+
+        def download(image_url):
+            try:
+                return _stream_download(image_url, staging_dir, max_bytes, http_policy)
+            except Exception as e:
+                return e
 
-            attachment.sudo().write({'res_id': generated_image_record.id})
-            _logger.info(f"Linked attachment {attachment.id} to GeneratedImage {generated_image_record.id}")
+        if len(image_urls) == 1:
+            return [download(image_urls[0])]
+        with ThreadPoolExecutor(max_workers=min(workers, len(image_urls))) as executor:
+            return list(executor.map(download, image_urls))
 
-            return generated_image_record
+    def _download_and_store_images(self, request_record, image_specs):
+        """
+        Downloads several images concurrently and stores each of them as an ir.attachment
+        with its influence_gen.generated_image record.
+        :param image_specs: list of (image_url, image_metadata) tuples
+        :return: list, in input order, of generated image records or None for failed images
+        """
+        GeneratedImage = self.env['influence_gen.generated_image']
+        for image_url, _image_metadata in image_specs:
+            _logger.info(f"Downloading image for request {request_record.id} from {image_url}")
+        downloads = self._download_images([image_url for image_url, _image_metadata in image_specs])
+
+        generated_images = []
+        for (image_url, image_metadata), download in zip(image_specs, downloads):
+            if isinstance(download, requests.exceptions.HTTPError):
+                _logger.error(f"HTTP error downloading image for request {request_record.id}: {download}")
+                generated_images.append(None)
+                continue
+            if isinstance(download, Exception):
+                _logger.error(f"Error downloading image for request {request_record.id} from {image_url}: {download}")
+                generated_images.append(None)
+                continue
+            try:
+                attachment_vals = {
+                    'name': f"ai_gen_req_{request_record.id}_{image_metadata.get('file_format', 'bin')}",
+                    'res_model': GeneratedImage._name,
+                    # res_id will be linked after GeneratedImage record is created
+                    'mimetype': image_metadata.get('mimetype') or download['mimetype'] or 'application/octet-stream',
+                }
+                attachment = self._create_attachment_from_download(attachment_vals, download)
+                _logger.info(f"Created attachment {attachment.id} for request {request_record.id}")
+                generated_images.append(self._create_generated_image(
+                    request_record, attachment, image_metadata, download['sha256'], download['size']))
+            except Exception:
+                _logger.exception(f"Unexpected error storing image for request {request_record.id}:")
+                if os.path.exists(download['path']):
+                    os.unlink(download['path'])
+                generated_images.append(None)
+        return generated_images
 
-        except requests.exceptions.HTTPError as e:
-            _logger.error(f"HTTP error downloading image for request {request_record.id}: {e}")
-            return None
-        except requests.exceptions.RequestException as e:
-            _logger.error(f"Error downloading image for request {request_record.id}: {e}")
-            return None
-        except Exception as e:
-            _logger.exception(f"Unexpected error storing image for request {request_record.id}:")
-            return None
+    def _download_and_store_image(self, image_url, request_record, image_metadata):
+        """
+        Downloads an image from a URL and stores it as an ir.attachment,
+        then creates a influence_gen.generated_image record.
+        """
+        return self._download_and_store_images(request_record, [(image_url, image_metadata)])[0]
 
     def _handle_direct_image_data(self, image_data_b64, request_record, image_metadata):
         """Handles base64 encoded image data, stores it, and creates records."""
@@ -85,38 +223,18 @@ class AIResultService(models.AbstractModel):
             image_content = base64.b64decode(image_data_b64)
             hash_value = hashlib.sha256(image_content).hexdigest()
 
-            retention_category = 'personal_generation'
-            if request_record.campaign_id and request_record.intended_use == 'campaign':
-                retention_category = 'campaign_asset'
-            elif request_record.intended_use:
-                 retention_category = request_record.intended_use
-
             attachment_vals = {
                 'name': f"ai_gen_req_{request_record.id}_direct_{image_metadata.get('file_format', 'bin')}",
-                'datas': image_data_b64, # Already base64 encoded
+                'raw': image_content, # Already decoded, avoids a second base64 round-trip in ir.attachment
                 'res_model': GeneratedImage._name,
                 'mimetype': image_metadata.get('mimetype', 'application/octet-stream'),
             }
             attachment = Attachment.sudo().create(attachment_vals)
             _logger.info(f"Created attachment {attachment.id} for request {request_record.id} from direct data")
 
-            image_vals = {
-                'request_id': request_record.id,
-                'storage_identifier': str(attachment.id),
-                'storage_type': 'ir.attachment',
-                'file_format': image_metadata.get('file_format'),
-                'file_size': image_metadata.get('file_size', len(image_content)),
-                'width': image_metadata.get('width'),
-                'height': image_metadata.get('height'),
-                'hash_value': hash_value,
-                'retention_category': retention_category,
-            }
-            generated_image_record = GeneratedImage.sudo().create(image_vals)
-            _logger.info(f"Created GeneratedImage record {generated_image_record.id} for request {request_record.id} from direct data")
-
-            attachment.sudo().write({'res_id': generated_image_record.id})
-            _logger.info(f"Linked attachment {attachment.id} to GeneratedImage {generated_image_record.id} from direct data")
-            return generated_image_record
+            return self._create_generated_image(
+                request_record, attachment, image_metadata, hash_value,
+                image_metadata.get('file_size', len(image_content)))
 
         except base64.binascii.Error as e:
             _logger.error(f"Base64 decoding error for request {request_record.id}: {e}")
@@ -130,16 +248,13 @@ class AIResultService(models.AbstractModel):
         """Handles the successful generation payload from N8N."""
         _logger.info(f"Handling successful generation for request ID: {request_record.id}")
         
-        image_url = success_data.get('image_url')
-        image_data_b64 = success_data.get('image_data') # Base64 encoded image
-        
-        generated_image_record = None
+        # Multi-image payloads list their images under 'images'; single-image payloads
+        # carry image_url/image_data and the metadata at the top level.
+        image_entries = success_data.get('images') or [success_data]
+        url_specs = [(entry['image_url'], entry) for entry in image_entries if entry.get('image_url')]
+        direct_entries = [entry for entry in image_entries if not entry.get('image_url') and entry.get('image_data')]
 
-        if image_url:
-            generated_image_record = self._download_and_store_image(image_url, request_record, success_data)
-        elif image_data_b64:
-            generated_image_record = self._handle_direct_image_data(image_data_b64, request_record, success_data)
-        else:
+        if not url_specs and not direct_entries:
             _logger.error(f"No image_url or image_data found in success payload for request {request_record.id}")
             request_record.sudo().write({
                 'status': 'failed',
@@ -147,13 +262,21 @@ class AIResultService(models.AbstractModel):
             })
             return
 
-        if generated_image_record:
+        generated_images = self._download_and_store_images(request_record, url_specs) if url_specs else []
+        for entry in direct_entries:
+            generated_images.append(self._handle_direct_image_data(entry['image_data'], request_record, entry))
+        stored_images = [image for image in generated_images if image]
+        if len(stored_images) < len(generated_images):
+            _logger.warning(f"{len(generated_images) - len(stored_images)} of {len(generated_images)} images "
+                            f"could not be stored for request {request_record.id}.")
+
+        if stored_images:
+            # The images are linked to the request by their request_id (generated_image_ids).
             request_record.sudo().write({
                 'status': 'completed',
-                'generated_image_id': generated_image_record.id,
                 'error_details': False # Clear previous errors
             })
-            _logger.info(f"Request {request_record.id} marked as completed, linked to image {generated_image_record.id}")
+            _logger.info(f"Request {request_record.id} marked as completed with {len(stored_images)} image(s).")
         else:
             request_record.sudo().write({
                 'status': 'failed',
@@ -179,15 +302,25 @@ class AIResultService(models.AbstractModel):
             'error_details': full_error
         })
 
+    def _record_callback_result(self, ledger_entry_id, request_record, outcome):
+        """Stores the callback outcome in the ledger, for duplicate deliveries, and returns it."""
+        result = {'request_id': request_record.id, 'status': request_record.status, 'outcome': outcome}
+        if ledger_entry_id:
+            self.env['influence_gen.n8n_callback_ledger'].record_result(ledger_entry_id, result, state=outcome)
+        return result
+
     def process_n8n_callback(self, ai_generation_request_id_str, n8n_payload):
         """
         Processes the callback from N8N containing AI generation results.
         :param ai_generation_request_id_str: str, The ID of the AIImageGenerationRequest record.
-        :param n8n_payload: dict, The parsed JSON payload from N8N.
+        :param n8n_payload: dict, The parsed JSON payload from N8N, with its 'n8n_execution_id'.
+        :return: dict with request_id, status and outcome ('processed', 'ignored'), or None if the
+                 callback could not be processed. Duplicate deliveries return the first delivery's result.
         """
         _logger.info(f"Processing N8N callback for request ID string: {ai_generation_request_id_str}")
-        AIImageRequest = self.env['influence_gen.ai_image_request']
+        AIImageRequest = self.env['influence_gen.ai_image_generation_request']
         request_record = None
+        entry_id = False
 
         try:
             try:
@@ -213,16 +346,43 @@ class AIResultService(models.AbstractModel):
             status = n8n_payload.get('status')
             _logger.info(f"N8N callback status for request {request_record.id}: {status}")
 
-            if status == 'success':
-                success_data = n8n_payload.get('data', {})
-                self._handle_successful_generation(request_record, success_data)
-            elif status == 'failure':
-                error_data = n8n_payload.get('error_data', {})
-                self._handle_failed_generation(request_record, error_data)
+            # Retried deliveries of an N8N execution are answered from the callback ledger
+            # without downloading or storing anything again.
+            Ledger = self.env['influence_gen.n8n_callback_ledger']
+            execution_id = n8n_payload.get('n8n_execution_id')
+            if execution_id:
+                entry_id, cached_result = Ledger.claim(
+                    request_record.id, str(execution_id), 'success' if status == 'success' else 'error')
+                if cached_result is not None:
+                    return cached_result
             else:
-                _logger.warning(f"Unknown status '{status}' in N8N callback for request {request_record.id}")
-                self._handle_failed_generation(request_record, {'message': _(f"Unknown status '{status}' received from N8N.")})
-
+                _logger.warning(f"N8N callback for request {request_record.id} has no n8n_execution_id; it cannot be deduplicated.")
+            # Serialize the callbacks of a request: a late or concurrent callback sees the final status.
+            request_record.flush_recordset()
+            self.env.cr.execute(f'SELECT id FROM "{request_record._table}" WHERE id = %s FOR UPDATE', [request_record.id])
+            request_record.invalidate_recordset()
+            # A completed request is final; a success callback supersedes an earlier failure.
+            terminal_statuses = ('completed',) if status == 'success' else ('completed', 'failed')
+            if request_record.status in terminal_statuses:
+                _logger.warning(f"Ignoring N8N '{status}' callback for request {request_record.id} in status {request_record.status}.")
+                return self._record_callback_result(entry_id, request_record, 'ignored')
+
+            # Savepoint: on error, partial results are rolled back and the failure can still be recorded.
+            with self.env.cr.savepoint():
+                if status == 'success':
+                    success_data = n8n_payload.get('data', {})
+                    self._handle_successful_generation(request_record, success_data)
+                elif status == 'failure':
+                    error_data = n8n_payload.get('error_data', {})
+                    self._handle_failed_generation(request_record, error_data)
+                else:
+                    _logger.warning(f"Unknown status '{status}' in N8N callback for request {request_record.id}")
+                    self._handle_failed_generation(request_record, {'message': _(f"Unknown status '{status}' received from N8N.")})
+            return self._record_callback_result(entry_id, request_record, 'processed')
+
+        except (SerializationFailure, DeadlockDetected):
+            # Concurrent delivery for the same request: let the HTTP layer retry the whole callback.
+            raise
         except Exception as e:
             _logger.exception(f"Error processing N8N callback for request ID string {ai_generation_request_id_str}:")
             if request_record and request_record.exists():
@@ -233,4 +393,11 @@ class AIResultService(models.AbstractModel):
                     })
                 except Exception as write_e:
                     _logger.error(f"Failed to update request record {request_record.id} after callback processing error: {write_e}")
+            if entry_id:
+                # A retried delivery of this execution is processed again instead of answered as 'processing'.
+                try:
+                    self.env['influence_gen.n8n_callback_ledger'].record_result(
+                        entry_id, {'request_id': request_record.id, 'status': 'failed', 'outcome': 'failed'}, state='failed')
+                except Exception as ledger_e:
+                    _logger.error(f"Failed to record the failure of callback ledger entry {entry_id}: {ledger_e}")
             # Do not re-raise, as this is typically called from a controller that should return a 200 OK to N8N.
\ No newline at end of file
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import tempfile
+from unittest.mock import patch
+
+import requests
+
+from odoo.tests.common import TransactionCase, tagged
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
+
+from ..services.ai_result_service import DOWNLOAD_STAGING_DIR
+
+
+class FakeImageResponse:
+    """Streamed HTTP response of an image host, as returned by HttpSessionPool.request."""
+
+    def __init__(self, content, status_code=200, content_type='image/png'):
+        self.content = content
+        self.status_code = status_code
+        self.headers = {'Content-Length': str(len(content)), 'Content-Type': content_type}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+
+class AIResultServiceCase(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = cls.env['res.users'].create({'name': 'AI Test Influencer', 'login': 'ai_test_influencer'})
+        cls.influencer = cls.env['influence_gen.influencer_profile'].create({
+            'user_id': user.id,
+            'full_name': 'AI Test Influencer',
+            'email': 'ai_test_influencer@example.com',
+        })
+        cls.ai_model = cls.env['influence_gen.ai_image_model'].create({'name': 'Test Model'})
+
+    def _create_request(self):
+        return self.env['influence_gen.ai_image_generation_request'].create({
+            'user_id': self.influencer.user_id.id,
+            'influencer_profile_id': self.influencer.id,
+            'model_id': self.ai_model.id,
+            'prompt': 'A mountain lake at sunrise',
+            'status': 'processing_n8n',
+        })
+
+    def _patch_image_host(self, responses):
+        """Serves `responses` ({url: FakeImageResponse}) in place of the image host."""
+        def fake_request(method, url, policy=None, **kwargs):
+            return responses[url]
+        return patch.object(HttpSessionPool, 'request', side_effect=fake_request)
+
+
+@tagged('post_install', '-at_install')
+class TestAIResultServiceAttachments(TransactionCase):
+
+    def _make_download(self, content):
+        staging_dir = self.env['ir.attachment'].sudo()._full_path(DOWNLOAD_STAGING_DIR)
+        os.makedirs(staging_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=staging_dir, suffix='.part')
+        with os.fdopen(fd, 'wb') as image_file:
+            image_file.write(content)
+        return {
+            'path': path,
+            'sha256': hashlib.sha256(content).hexdigest(),
+            'sha1': hashlib.sha1(content).hexdigest(),
+            'size': len(content),
+            'mimetype': 'image/png',
+        }
+
+    def _create_attachment(self, content):
+        return self.env['influence_gen.ai_result_service']._create_attachment_from_download(
+            {'name': 'ai_gen_test.png', 'mimetype': 'image/png'}, self._make_download(content))
+
+    def test_downloaded_file_is_readable_from_attachment(self):
+        content = b'\x89PNG\r\n\x1a\n' + os.urandom(4096)
+        attachment = self._create_attachment(content)
+        attachment.invalidate_recordset()
+        self.assertEqual(attachment.raw, content)
+        self.assertEqual(attachment.file_size, len(content))
+        self.assertEqual(attachment.checksum, hashlib.sha1(content).hexdigest())
+
+    def test_same_content_downloaded_twice(self):
+        # A retried callback downloads the same image again: both attachments read it back.
+        content = os.urandom(2048)
+        first = self._create_attachment(content)
+        second = self._create_attachment(content)
+        self.assertEqual(first.store_fname, second.store_fname)
+        self.assertEqual(second.raw, content)
+
+    def test_database_storage(self):
+        self.env['ir.config_parameter'].sudo().set_param('ir_attachment.location', 'db')
+        content = os.urandom(1024)
+        attachment = self._create_attachment(content)
+        self.assertFalse(attachment.store_fname)
+        self.assertEqual(attachment.raw, content)
+
+
+@tagged('post_install', '-at_install')
+class TestAIResultServiceDownloads(AIResultServiceCase):
+
+    def test_download_and_store_images(self):
+        first, second = os.urandom(3000), os.urandom(5000)
+        ai_request = self._create_request()
+        responses = {
+            'https://images.example.com/1.png': FakeImageResponse(first),
+            'https://images.example.com/2.png': FakeImageResponse(second),
+            'https://images.example.com/3.png': FakeImageResponse(b'', status_code=404),
+        }
+        with self._patch_image_host(responses):
+            images = self.env['influence_gen.ai_result_service']._download_and_store_images(
+                ai_request, [(url, {'file_format': 'png', 'width': 512, 'height': 512}) for url in responses])
+
+        self.assertEqual(len(images), 3)
+        self.assertIsNone(images[2], "A failed download yields no image")
+        for image, content in zip(images[:2], (first, second)):
+            self.assertEqual(image.request_id, ai_request)
+            self.assertEqual(image.image_attachment_id.raw, content)
+            self.assertEqual(image.image_attachment_id.res_model, 'influence_gen.generated_image')
+            self.assertEqual(image.image_attachment_id.res_id, image.id)
+            self.assertEqual(image.hash_value, hashlib.sha256(content).hexdigest())
+            self.assertEqual(image.file_size, len(content))
+            self.assertEqual(image.retention_category, 'personal_generation')
+        self.assertEqual(ai_request.generated_image_ids, images[0] | images[1])
+
+    def test_successful_generation_completes_request(self):
+        content = os.urandom(2048)
+        ai_request = self._create_request()
+        with self._patch_image_host({'https://images.example.com/a.png': FakeImageResponse(content)}):
+            self.env['influence_gen.ai_result_service']._handle_successful_generation(
+                ai_request, {'image_url': 'https://images.example.com/a.png', 'file_format': 'png'})
+
+        self.assertEqual(ai_request.status, 'completed')
+        self.assertEqual(len(ai_request.generated_image_ids), 1)
+        self.assertEqual(ai_request.generated_image_ids.image_attachment_id.raw, content)
+
+    def test_failed_download_fails_request(self):
+        ai_request = self._create_request()
+        with self._patch_image_host({'https://images.example.com/a.png': FakeImageResponse(b'', status_code=500)}):
+            self.env['influence_gen.ai_result_service']._handle_successful_generation(
+                ai_request, {'image_url': 'https://images.example.com/a.png'})
+
+        self.assertEqual(ai_request.status, 'failed')
+        self.assertFalse(ai_request.generated_image_ids)
+
+
+@tagged('post_install', '-at_install')
+class TestAIResultServiceCallbacks(AIResultServiceCase):
+
+    def _success_payload(self, execution_id):
+        return {
+            'status': 'success',
+            'n8n_execution_id': execution_id,
+            'data': {'image_url': 'https://images.example.com/cb.png', 'file_format': 'png'},
+        }
+
+    def test_success_callback_stores_image(self):
+        ai_request = self._create_request()
+        with self._patch_image_host({'https://images.example.com/cb.png': FakeImageResponse(os.urandom(1024))}):
+            result = self.env['influence_gen.ai_result_service'].process_n8n_callback(
+                str(ai_request.id), self._success_payload('exec-1'))
+
+        self.assertEqual(result, {'request_id': ai_request.id, 'status': 'completed', 'outcome': 'processed'})
+        self.assertEqual(len(ai_request.generated_image_ids), 1)
+
+    def test_duplicate_callback_returns_cached_result(self):
+        ai_request = self._create_request()
+        service = self.env['influence_gen.ai_result_service']
+        with self._patch_image_host({'https://images.example.com/cb.png': FakeImageResponse(os.urandom(1024))}) as host:
+            first = service.process_n8n_callback(str(ai_request.id), self._success_payload('exec-1'))
+            second = service.process_n8n_callback(str(ai_request.id), self._success_payload('exec-1'))
+
+        self.assertEqual(second, first)
+        self.assertEqual(host.call_count, 1, "The duplicate delivery downloads nothing")
+        self.assertEqual(len(ai_request.generated_image_ids), 1)
+        entry = self.env['influence_gen.n8n_callback_ledger'].search([('request_id', '=', ai_request.id)])
+        self.assertEqual((entry.state, entry.duplicate_count), ('processed', 1))
+
+    def test_failed_callback_is_processed_again(self):
+        ai_request = self._create_request()
+        service = self.env['influence_gen.ai_result_service']
+        with patch.object(type(service), '_handle_successful_generation', side_effect=RuntimeError('storage down')):
+            self.assertIsNone(service.process_n8n_callback(str(ai_request.id), self._success_payload('exec-1')))
+        entry = self.env['influence_gen.n8n_callback_ledger'].search([('request_id', '=', ai_request.id)])
+        self.assertEqual(entry.state, 'failed')
+
+        with self._patch_image_host({'https://images.example.com/cb.png': FakeImageResponse(os.urandom(1024))}):
+            result = service.process_n8n_callback(str(ai_request.id), self._success_payload('exec-1'))
+
+        self.assertEqual(result['outcome'], 'processed')
+        self.assertEqual(ai_request.status, 'completed')
+        self.assertEqual(len(ai_request.generated_image_ids), 1)
@@ -2,8 +2,10 @@
 # Part of Odoo. See LICENSE file for full copyright and licensing details.
 
 import json
-from odoo import http
+from odoo import http, _
+from odoo.exceptions import AccessError
 from odoo.http import request
+from odoo.addons.influence_gen_services.services.dashboard_metrics_service import DashboardMetricsService
 import logging
 
 _logger = logging.getLogger(__name__)
@@ -31,35 +33,69 @@ class AdminDashboardController(http.Controller):
             _logger.error("Error fetching system health data: %s", e)
             return {'error': str(e)}
 
+    def _get_dashboard_metrics(self):
+        """
+        Platform-wide counters computed by one aggregate query in influence_gen_services
+        and cached for a short TTL shared by all admin sessions.
+        """
+        if not request.env.user.has_group('influence_gen_admin.group_influence_gen_platform_admin'):
+            raise AccessError(_("Access denied. You must be a Platform Administrator to view dashboard metrics."))
+        return DashboardMetricsService(request.env).get_admin_metrics()
+
+    def _format_campaign_performance(self, metrics):
+        campaigns_by_status = metrics['campaigns_by_status']
+        return {
+            'active_campaigns': metrics['active_campaigns'],
+            'active_campaigns_count': metrics['active_campaigns'],
+            'completed_campaigns_last_30d': metrics['completed_campaigns_last_30d'],
+            'total_applications_pending': metrics['pending_applications'],
+            'pending_applications_count': metrics['pending_applications'],
+            'pending_kyc_submissions': metrics['pending_kyc_submissions'],
+            'total_influencers': sum(metrics['influencers_by_status'].values()),
+            'campaign_stages_distribution': campaigns_by_status,
+            'charts': {
+                'campaigns_by_status': [
+                    {'status': status, 'count': count} for status, count in sorted(campaigns_by_status.items(), key=lambda kv: kv[0] or '')
+                ]
+            },
+            'computed_at': metrics['computed_at'],
+        }
+
+    def _format_ops_log_summary(self, metrics):
+        return {
+            'recent_errors_count': metrics['recent_errors_count'],
+            'admin_logins_today': metrics['logins_today'],
+            'critical_alerts_active': 0, # Placeholder
+            'computed_at': metrics['computed_at'],
+        }
+
+    @http.route('/influence_gen_admin/dashboard/summary', type='json', auth='user', methods=['POST'], csrf=False)
+    def get_dashboard_summary(self, **kw):
+        """
+        Returns every dashboard counter (campaigns, applications, KYC, influencers, audit
+        activity) in one call, replacing separate campaign_performance/ops_log_summary polls.
+        """
+        try:
+            metrics = self._get_dashboard_metrics()
+            return {
+                'campaign_performance': self._format_campaign_performance(metrics),
+                'ops_log_summary': self._format_ops_log_summary(metrics),
+                'kyc_by_status': metrics['kyc_by_status'],
+                'applications_by_status': metrics['applications_by_status'],
+                'influencers_by_status': metrics['influencers_by_status'],
+            }
+        except Exception as e:
+            _logger.error("Error fetching dashboard summary: %s", e)
+            return {'error': str(e)}
+
     @http.route('/influence_gen_admin/dashboard/campaign_performance', type='json', auth='user', methods=['POST'], csrf=False)
     def get_campaign_performance_summary(self, **kw):
         """
         Fetches campaign performance summary.
-        Queries influence_gen.campaign_performance_mv or calls services.
+        Served from the cached dashboard metrics (see get_dashboard_summary).
         """
         try:
-            # Placeholder: Call a service or query materialized view
-            # performance_data = request.env['influence_gen.campaign.performance.service'].get_summary()
-            # Or query the materialized view directly if appropriate for this layer
-            # request.env.cr.execute("SELECT * FROM influence_gen_campaign_performance_mv_view LIMIT 10") # Example
-            # campaign_performance = request.env.cr.dictfetchall()
-            
-            # Example Data Structure
-            performance_data = {
-                'active_campaigns': request.env['influence_gen.campaign'].search_count([('status', 'in', ['published', 'open'])]),
-                'completed_campaigns_last_30d': request.env['influence_gen.campaign'].search_count([('status', '=', 'completed'), ('endDate', '>=', fields.Date.subtract(fields.Date.today(), days=30))]),
-                'total_applications_pending': request.env['influence_gen.campaign_application'].search_count([('status', '=', 'submitted')]),
-                'charts': {
-                    'campaigns_by_status': [
-                        {'status': 'Draft', 'count': request.env['influence_gen.campaign'].search_count([('status', '=', 'draft')])},
-                        {'status': 'Published', 'count': request.env['influence_gen.campaign'].search_count([('status', '=', 'published')])},
-                        {'status': 'Open', 'count': request.env['influence_gen.campaign'].search_count([('status', '=', 'open')])},
-                        {'status': 'Closed', 'count': request.env['influence_gen.campaign'].search_count([('status', '=', 'closed')])},
-                        {'status': 'Completed', 'count': request.env['influence_gen.campaign'].search_count([('status', '=', 'completed')])},
-                    ]
-                }
-            }
-            return performance_data
+            return self._format_campaign_performance(self._get_dashboard_metrics())
         except Exception as e:
             _logger.error("Error fetching campaign performance summary: %s", e)
             return {'error': str(e)}
@@ -68,17 +104,11 @@ class AdminDashboardController(http.Controller):
     def get_operational_log_summary(self, **kw):
         """
         Fetches high-level operational log summaries.
-        Placeholder for fetching summaries. Direct integration with centralized logging might be complex.
+        Served from the cached dashboard metrics (see get_dashboard_summary); the audit
+        counters only scan the last 24 hours of audit log partitions.
         """
         try:
-            # Placeholder: Call a service or query audit logs
-            # log_summary = request.env['influence_gen.operational.log.service'].get_summary()
-            log_summary = {
-                'recent_errors_count': request.env['influence_gen.audit_log'].search_count([('eventType', 'ilike', '%error%'), ('timestamp', '>=', fields.Datetime.subtract(fields.Datetime.now(), days=1))]),
-                'admin_logins_today': request.env['influence_gen.audit_log'].search_count([('eventType', '=', 'user_login'), ('timestamp', '>=', fields.Date.today())]),
-                'critical_alerts_active': 0, # Placeholder
-            }
-            return log_summary
+            return self._format_ops_log_summary(self._get_dashboard_metrics())
         except Exception as e:
             _logger.error("Error fetching operational log summary: %s", e)
-            return {'error': str(e)}
\ No newline at end of file
+            return {'error': str(e)}
@@ -154,15 +154,15 @@ class AdminMainDashboard extends Component {
     async loadDashboardData() {
         this.state.isLoading = true;
         try {
-            const [systemHealth, campaignPerformance, opsLogSummary] = await Promise.all([
+            // All counters come from one cached aggregate endpoint.
+            const [systemHealth, summary] = await Promise.all([
                 this.rpc("/influence_gen_admin/dashboard/system_health", {}),
-                this.rpc("/influence_gen_admin/dashboard/campaign_performance", {}),
-                this.rpc("/influence_gen_admin/dashboard/ops_log_summary", {}),
+                this.rpc("/influence_gen_admin/dashboard/summary", {}),
             ]);
 
             this.state.systemHealth = systemHealth;
-            this.state.campaignPerformance = campaignPerformance;
-            this.state.opsLogSummary = opsLogSummary;
+            this.state.campaignPerformance = summary.campaign_performance || summary;
+            this.state.opsLogSummary = summary.ops_log_summary || summary;
 
             this.processDataForWidgets();
 
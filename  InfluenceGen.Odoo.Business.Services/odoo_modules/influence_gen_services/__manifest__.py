@@ -12,6 +12,7 @@
         'account', # For payment integration
         # Add other Odoo core dependencies as identified (e.g., 'portal' if directly extending portal features here)
         'influence_gen_infrastructure_integration', # Dependency for REPO-IGOII-004
+        'influence_gen_shared_core', # KeywordMatcher used by AI prompt moderation
     ],
     'data': [
         'security/ir.model.access.csv',
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 import json
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
 
+from odoo.addons.influence_gen_shared_core.utils.prompt_matcher import KeywordMatcher
+
 class InfluenceGenPlatformSetting(models.Model):
     _name = 'influence_gen.platform_setting'
     _description = "InfluenceGen Platform Setting"
@@ -56,6 +58,20 @@ class InfluenceGenPlatformSetting(models.Model):
                 return default # Or raise error
         return default # Should not happen if value_type is valid
 
+    @api.model
+    @tools.ormcache('key', 'word_boundary')
+    def _get_keyword_matcher(self, key: str, word_boundary: bool = False) -> KeywordMatcher:
+        """
+        Returns a compiled KeywordMatcher for a setting holding a keyword list (JSON list
+        or comma separated string). Cached until a platform setting is created, written or deleted.
+        """
+        keywords = self.sudo().get_param(key, [])
+        if isinstance(keywords, str): # If it's a comma separated string
+            keywords = [kw.strip() for kw in keywords.split(',')]
+        if not isinstance(keywords, list):
+            keywords = []
+        return KeywordMatcher(keywords, word_boundary=word_boundary)
+
     @api.model
     def set_param(self, key: str, value, value_type: str, description: str = None, module: str = None) -> models.Model:
         """
@@ -124,4 +140,17 @@ class InfluenceGenPlatformSetting(models.Model):
             vals['value_text'] = 'True' if str(vals['value_text']).lower() in ['true', '1', 'yes'] else 'False'
         elif self.value_type == 'boolean' and 'value_text' in vals and vals['value_text']:
              vals['value_text'] = 'True' if str(vals['value_text']).lower() in ['true', '1', 'yes'] else 'False'
-        return super(InfluenceGenPlatformSetting, self).write(vals)
\ No newline at end of file
+        res = super(InfluenceGenPlatformSetting, self).write(vals)
+        self.env.registry.clear_cache() # Drop compiled keyword matchers in all workers
+        return res
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(InfluenceGenPlatformSetting, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def unlink(self):
+        res = super(InfluenceGenPlatformSetting, self).unlink()
+        self.env.registry.clear_cache()
+        return res
\ No newline at end of file
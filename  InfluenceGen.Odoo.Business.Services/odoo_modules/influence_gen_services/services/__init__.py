@@ -2,6 +2,7 @@ from . import onboarding_service
 from . import campaign_service
 from . import ai_image_service
 from . import payment_service
+from . import retention_executor
 from . import data_management_service
 # Potentially an audit_service if complex audit logic is needed beyond model helper
 # For now, only the services listed in SDS section 3.4.1 are imported.
\ No newline at end of file
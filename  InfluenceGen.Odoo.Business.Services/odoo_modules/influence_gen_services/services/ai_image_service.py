@@ -16,23 +16,25 @@ class AIImageService:
     def _validate_prompt(self, prompt):
         """
         Internal: Validates prompt against content moderation rules.
+        Forbidden keywords are matched in one pass by a compiled, cached automaton
+        (case-insensitive, Unicode-normalized); every hit is reported.
         REQ-AIGS-003
         """
-        moderation_enabled = self.env['influence_gen.platform_setting'].get_param(
+        PlatformSetting = self.env['influence_gen.platform_setting']
+        moderation_enabled = PlatformSetting.get_param(
             'influence_gen.ai_image_prompt_moderation_enabled', False
         )
         if moderation_enabled:
-            # Placeholder for actual moderation logic (e.g., call external API via infra layer)
-            # For now, just a basic check
-            forbidden_keywords = self.env['influence_gen.platform_setting'].get_param(
-                'influence_gen.ai_image_prompt_forbidden_keywords', [] # Expects a list from setting if JSON
+            # Placeholder for external moderation (e.g., call external API via infra layer)
+            word_boundary = PlatformSetting.get_param('influence_gen.ai_image_prompt_keyword_word_boundary', False)
+            matcher = PlatformSetting._get_keyword_matcher(
+                'influence_gen.ai_image_prompt_forbidden_keywords', bool(word_boundary)
             )
-            if isinstance(forbidden_keywords, str): # If it's a comma separated string
-                forbidden_keywords = [kw.strip() for kw in forbidden_keywords.split(',')]
-
-            if any(keyword.lower() in prompt.lower() for keyword in forbidden_keywords if keyword):
-                _logger.warning("Prompt validation failed due to forbidden keyword: %s", prompt)
-                raise UserError(_("Your prompt contains restricted content. Please revise."))
+            hits = list(dict.fromkeys(match.keyword for match in matcher.find_all(prompt)))
+            if hits:
+                _logger.warning("Prompt validation failed due to forbidden keywords %s: %s", hits, prompt)
+                # The matched terms are logged, never shown: they would disclose the denylist.
+                raise UserError(_("Your prompt contains restricted content. Please revise it."))
         return True
 
 
@@ -3,6 +3,8 @@ from odoo import _, api, fields, models
 from odoo.exceptions import UserError, ValidationError
 from datetime import timedelta, datetime
 
+from .retention_executor import DEFAULT_CHUNK_SIZE, RetentionExecutor, RetentionTask
+
 _logger = logging.getLogger(__name__)
 
 class DataManagementService:
@@ -13,9 +15,12 @@ class DataManagementService:
     def __init__(self, env):
         self.env = env
 
-    def apply_data_retention_policies(self, data_category_filter=None, dry_run=False):
+    def apply_data_retention_policies(self, data_category_filter=None, dry_run=False, chunk_size=DEFAULT_CHUNK_SIZE):
         """
         Applies active data retention policies.
+        Matching records are processed in committed ID-range chunks (see RetentionExecutor):
+        one DELETE/UPDATE and one audit entry per chunk, resumable after an interruption.
+        In dry-run mode only the number of matching records is reported.
         REQ-DRH-001, REQ-DRH-002, REQ-DRH-005, REQ-DRH-006, REQ-IPF-008, REQ-AIGS-011
         """
         _logger.info("Applying data retention policies. Dry run: %s. Category filter: %s", dry_run, data_category_filter)
@@ -29,6 +34,23 @@ class DataManagementService:
         policies = self.env['influence_gen.data_retention_policy'].search(domain)
         summary_of_actions = {'processed_policies': 0, 'actions_taken': 0, 'errors': 0, 'details': []}
 
+        def log_chunk(task, record_ids, outcome, error=None):
+            # One audit entry per committed chunk instead of one per record.
+            AuditLog.create_log(
+                event_type='DATA_RETENTION_APPLIED' if outcome == 'success' else 'DATA_RETENTION_ERROR',
+                actor_user_id=actor_user_id, # System
+                action_performed=task.action.upper(),
+                details_dict={
+                    'policy_key': task.key, 'target_model_name': task.model_name,
+                    'record_count': len(record_ids), 'first_record_id': record_ids[0],
+                    'last_record_id': record_ids[-1],
+                },
+                outcome=outcome,
+                failure_reason=error,
+            )
+
+        executor = RetentionExecutor(self.env, chunk_size=chunk_size, audit_callback=log_chunk)
+
         for policy in policies:
             summary_of_actions['processed_policies'] += 1
             _logger.info("Processing policy: %s (Model: %s, Category: %s, Period: %s days, Action: %s)",
@@ -48,87 +70,29 @@ class DataManagementService:
                 summary_of_actions['details'].append({'policy': policy.name, 'error': f'Invalid model {policy.model_name}'})
                 continue
 
-            # Determine cutoff date
-            cutoff_date = fields.Datetime.now() - timedelta(days=policy.retention_period_days)
-            
-            # Domain to find records older than retention period
-            # Assumes a 'create_date' field exists on the target model.
-            # This might need to be configurable per policy if date field varies.
-            target_domain = [('create_date', '<=', fields.Datetime.to_string(cutoff_date))]
-            
-            # Add legal hold check if applicable
-            # This assumes a 'legal_hold_active' field on target models or a central LegalHold model
-            # For simplicity, assume 'legal_hold_active' boolean field.
-            if policy.legal_hold_overrideable and 'legal_hold_active' in TargetModel._fields:
-                 target_domain.append(('legal_hold_active', '=', False))
-            
-            records_to_process = TargetModel.search(target_domain)
-            _logger.info("Found %s records in %s matching policy %s criteria.", len(records_to_process), policy.model_name, policy.name)
-
-            if not records_to_process:
-                continue
-
-            action_details = {'policy': policy.name, 'model': policy.model_name, 'action': policy.disposition_action, 'count': 0, 'record_ids': []}
-
-            for record in records_to_process:
-                try:
-                    if dry_run:
-                        _logger.info("[DRY RUN] Would %s record %s (ID: %s) from model %s.",
-                                     policy.disposition_action, record.display_name, record.id, policy.model_name)
-                        action_details['count'] += 1
-                        action_details['record_ids'].append(record.id)
-                    else:
-                        disposition_details = {'original_id': record.id, 'original_name': record.display_name}
-                        if policy.disposition_action == 'delete':
-                            record.unlink()
-                            _logger.info("Deleted record %s (ID: %s) from model %s.", disposition_details['original_name'], disposition_details['original_id'], policy.model_name)
-                        
-                        elif policy.disposition_action == 'anonymize':
-                            # Anonymization logic is highly model-specific.
-                            # Placeholder: needs a method on the target model e.g., record.action_anonymize()
-                            if hasattr(record, 'action_anonymize'):
-                                record.action_anonymize()
-                                _logger.info("Anonymized record %s (ID: %s) from model %s.", disposition_details['original_name'], disposition_details['original_id'], policy.model_name)
-                            else:
-                                _logger.warning("Anonymization action not implemented for model %s. Skipping record %s.",
-                                                policy.model_name, record.id)
-                                continue # Don't count as action taken if not implemented
-
-                        elif policy.disposition_action == 'archive':
-                            # Archival logic: set 'active=False' if model supports it, or call infra layer
-                            # REQ-DRH-007
-                            if 'active' in record._fields:
-                                record.write({'active': False})
-                                _logger.info("Archived (active=False) record %s (ID: %s) from model %s.", disposition_details['original_name'], disposition_details['original_id'], policy.model_name)
-                            else:
-                                # Placeholder for calling infra layer for more complex archival
-                                # self.env['influence_gen.infrastructure.integration.services'].archive_record(record)
-                                _logger.warning("Standard archival (active=False) not supported by model %s. Archival for record %s skipped.",
-                                                policy.model_name, record.id)
-                                continue
-
-                        AuditLog.create_log(
-                            event_type='DATA_RETENTION_APPLIED',
-                            actor_user_id=actor_user_id, # System
-                            action_performed=policy.disposition_action.upper(),
-                            target_model_name=policy.model_name, # Log model name
-                            target_record_id=disposition_details['original_id'], # Log original ID
-                            details_dict={'policy_name': policy.name, 'disposition_details': disposition_details},
-                            outcome='success'
-                        )
-                        action_details['count'] += 1
-                        action_details['record_ids'].append(disposition_details['original_id'])
-                except Exception as e:
-                    _logger.error("Error applying disposition action %s on record %s (ID: %s, Model: %s) for policy %s: %s",
-                                 policy.disposition_action, record.display_name if hasattr(record,'display_name') else 'N/A', record.id, policy.model_name, policy.name, e)
-                    summary_of_actions['errors'] += 1
-                    AuditLog.create_log(
-                        event_type='DATA_RETENTION_ERROR', actor_user_id=actor_user_id, action_performed=policy.disposition_action.upper(),
-                        target_model_name=policy.model_name, target_record_id=record.id,
-                        details_dict={'policy_name': policy.name, 'error': str(e)}, outcome='failure', failure_reason=str(e)
-                    )
-            
-            if action_details['count'] > 0:
+            # Records older than the retention period (by create_date), excluding records under
+            # legal hold, disposed of in committed ID-range chunks. Assumes a 'legal_hold_active'
+            # boolean field on target models that support legal holds.
+            task = RetentionTask(
+                key=f'data_retention_policy_{policy.id}',
+                model_name=policy.model_name,
+                date_field='create_date',
+                period_days=policy.retention_period_days,
+                action=policy.disposition_action,
+                domain=[],
+                hold_field='legal_hold_active' if policy.legal_hold_overrideable else None,
+                anonymize_method='action_anonymize',
+            )
+            result = executor.run(task, dry_run=dry_run)
+            action_details = {
+                'policy': policy.name, 'model': policy.model_name, 'action': policy.disposition_action,
+                'count': result['matched'] if dry_run else result['processed'],
+                'chunks': result['chunks'], 'completed': result['completed'],
+            }
+            if result['error']:
+                summary_of_actions['errors'] += 1
+                action_details['error'] = result['error']
+            if action_details['count'] > 0 or result['error']:
                 summary_of_actions['actions_taken'] += action_details['count']
                 summary_of_actions['details'].append(action_details)
 
@@ -5,6 +5,10 @@ from odoo.tools import float_is_zero
 
 _logger = logging.getLogger(__name__)
 
+# A submission with a payment record in one of these statuses is not owed again.
+BLOCKING_PAYMENT_STATUSES = ('paid', 'processing', 'approved_for_payment')
+OWED_AMOUNTS_CHUNK_SIZE = 2000
+
 class PaymentService:
     """
     Manages influencer payment calculations and batching.
@@ -25,83 +29,121 @@ class PaymentService:
             raise UserError(_("Influencer profile not found."))
 
         owed_details = []
-        
-        # Search for approved content submissions not yet fully paid
-        domain = [
-            ('influencer_profile_id', '=', influencer.id),
-            ('review_status', '=', 'approved'),
-            ('is_final_submission', '=', True), # Consider only final approved submissions for payment
-            # Add logic to exclude already paid/processed submissions
-        ]
-        if campaign_id:
-            domain.append(('campaign_id', '=', campaign_id))
-        
-        approved_submissions = self.env['influence_gen.content_submission'].search(domain)
+        for chunk in self.iter_owed_amounts(influencer_id=influencer.id, campaign_id=campaign_id):
+            owed_details.extend(chunk)
 
-        for submission in approved_submissions:
-            campaign = submission.campaign_id
-            if not campaign:
-                _logger.warning("Submission %s has no linked campaign, cannot calculate payment.", submission.id)
-                continue
+        _logger.info("Calculated %s owed items for influencer %s.", len(owed_details), influencer_id)
+        return owed_details
 
-            # Check if a payment record already exists and is paid/processing for this submission
-            existing_payment = self.env['influence_gen.payment_record'].search([
-                ('content_submission_id', '=', submission.id),
-                ('status', 'in', ['paid', 'processing', 'approved_for_payment']) # approved_for_payment means it's in a batch
-            ], limit=1)
-            if existing_payment:
-                _logger.info("Submission %s already has a payment record %s in status %s. Skipping calculation.",
-                             submission.id, existing_payment.id, existing_payment.status)
-                continue
+    def iter_owed_amounts(self, influencer_id=None, campaign_id=None, chunk_size=OWED_AMOUNTS_CHUNK_SIZE):
+        """
+        Set-based dues engine. Streams owed-amount dicts (same format as
+        calculate_owed_amounts_for_influencer) in lists of at most `chunk_size`.
+        Payable submissions are resolved with one keyset-paginated query per chunk that
+        anti-joins blocking payment records, and campaign terms are parsed once per campaign.
+        Both filters are optional so month-end closes can run over all influencers.
+        REQ-2-013, REQ-IPF-004
+        """
+        self.env['influence_gen.content_submission'].flush_model(
+            ['review_status', 'is_final_submission', 'campaign_id', 'influencer_profile_id', 'name'])
+        self.env['influence_gen.payment_record'].flush_model(['content_submission_id', 'status'])
+
+        terms_by_campaign = {}
+        last_id = 0
+        while True:
+            rows = self._fetch_payable_submission_rows(last_id, chunk_size, influencer_id, campaign_id)
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            new_campaign_ids = {row[1] for row in rows if row[1] not in terms_by_campaign}
+            if new_campaign_ids:
+                terms_by_campaign.update(self._compile_campaign_terms(new_campaign_ids))
+
+            chunk = []
+            for submission_id, sub_campaign_id, sub_influencer_id, submission_name in rows:
+                if not sub_campaign_id:
+                    _logger.warning("Submission %s has no linked campaign, cannot calculate payment.", submission_id)
+                    continue
+                terms = terms_by_campaign[sub_campaign_id]
+                if terms['amount_due'] is None or float_is_zero(terms['amount_due'], precision_rounding=terms['rounding']):
+                    continue
+                chunk.append({
+                    'influencer_id': sub_influencer_id,
+                    'campaign_id': sub_campaign_id,
+                    'content_submission_id': submission_id,
+                    'amount': terms['amount_due'],
+                    'currency_id': terms['currency_id'],
+                    'description': _("Payment for approved content: %s - %s") % (terms['campaign_name'], submission_name),
+                })
+            yield chunk
 
+            if len(rows) < chunk_size:
+                break
 
-            amount_due = 0.0
-            currency = self.env.company.currency_id # Default currency
-            
+    def _fetch_payable_submission_rows(self, after_id, limit, influencer_id=None, campaign_id=None):
+        """
+        Returns the next page of approved final submissions without a paid/processing/batched
+        payment record, as tuples (submission_id, campaign_id, influencer_profile_id, name).
+        """
+        where_clauses = ["cs.review_status = 'approved'", "cs.is_final_submission", "cs.id > %s"]
+        params = [after_id]
+        if influencer_id:
+            where_clauses.append("cs.influencer_profile_id = %s")
+            params.append(influencer_id)
+        if campaign_id:
+            where_clauses.append("cs.campaign_id = %s")
+            params.append(campaign_id)
+        # approved_for_payment means it's in a batch
+        params.extend([BLOCKING_PAYMENT_STATUSES, limit])
+        self.env.cr.execute("""
+            SELECT cs.id, cs.campaign_id, cs.influencer_profile_id, cs.name
+              FROM influence_gen_content_submission cs
+             WHERE {where}
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM influence_gen_payment_record pr
+                     WHERE pr.content_submission_id = cs.id
+                       AND pr.status IN %s
+               )
+          ORDER BY cs.id
+             LIMIT %s
+        """.format(where=" AND ".join(where_clauses)), params)
+        return self.env.cr.fetchall()
+
+    def _compile_campaign_terms(self, campaign_ids):
+        """
+        Parses compensation terms once per campaign.
+        Returns {campaign_id: {'amount_due': float or None, 'currency_id': int, 'rounding': float, 'campaign_name': str}}.
+        amount_due is None for campaigns whose model is not payable per submission.
+        """
+        company_currency = self.env.company.currency_id
+        compiled = {}
+        for campaign in self.env['influence_gen.campaign'].browse(list(campaign_ids)):
+            amount_due = None
+            currency = company_currency
             if campaign.compensation_model_type == 'flat_fee':
-                # Assuming compensation_details stores the flat fee amount as a string or number
+                # This is a simplification. Flat fee might be per campaign, not per submission.
+                # Or 'compensation_details' on campaign might be JSON like {"submission_fee": 100}
                 try:
-                    # This is a simplification. Flat fee might be per campaign, not per submission.
-                    # Or 'compensation_details' on campaign might be JSON like {"submission_fee": 100}
-                    # For now, assume a simple flat fee from campaign's compensation_details
-                    # This logic needs refinement based on how compensation_details is structured
-                    comp_details_text = campaign.compensation_details or "0"
-                    amount_due = float(comp_details_text) # This is a fragile assumption
-                    currency = campaign.currency_id or currency # Assuming campaign might have a currency
+                    amount_due = float(campaign.compensation_details or "0") # This is a fragile assumption
+                    if 'currency_id' in campaign._fields and campaign.currency_id: # Assuming campaign might have a currency
+                        currency = campaign.currency_id
                 except ValueError:
                     _logger.error("Invalid flat fee amount in campaign %s details: %s", campaign.name, campaign.compensation_details)
-                    continue
-            
             elif campaign.compensation_model_type == 'commission':
-                # Commission calculation would be complex, based on performance metrics (e.g., sales, clicks)
-                # This service method might not be the place for real-time commission calculation.
-                # It might rely on pre-calculated commission values or another process.
-                # Placeholder:
+                # Commission calculation relies on performance metrics and is not done here.
                 _logger.warning("Commission-based payment calculation not fully implemented for campaign %s.", campaign.name)
-                # amount_due = self._calculate_commission_for_submission(submission)
-                continue # Skip for now
-
-            elif campaign.compensation_model_type == 'product_only':
-                # No monetary payment, skip.
-                continue
-            
             elif campaign.compensation_model_type == 'hybrid':
                 _logger.warning("Hybrid compensation model calculation not fully implemented for campaign %s.", campaign.name)
-                continue
-
-
-            if not float_is_zero(amount_due, precision_rounding=currency.rounding):
-                owed_details.append({
-                    'influencer_id': influencer.id,
-                    'campaign_id': campaign.id,
-                    'content_submission_id': submission.id,
-                    'amount': amount_due,
-                    'currency_id': currency.id,
-                    'description': _("Payment for approved content: %s - %s") % (campaign.name, submission.name),
-                })
-        
-        _logger.info("Calculated %s owed items for influencer %s.", len(owed_details), influencer_id)
-        return owed_details
+            # 'product_only': no monetary payment.
+            compiled[campaign.id] = {
+                'amount_due': amount_due,
+                'currency_id': currency.id,
+                'rounding': currency.rounding,
+                'campaign_name': campaign.name,
+            }
+        return compiled
 
     def create_payment_record_for_submission(self, submission_id, force_create=False):
         """
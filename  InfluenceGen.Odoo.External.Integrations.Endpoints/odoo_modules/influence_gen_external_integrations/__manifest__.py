@@ -14,7 +14,7 @@
     ],
     'data': [
         # Security files if any specific models are created for secure config
-        # 'security/ir.model.access.csv',
+        'security/ir.model.access.csv', # Circuit breaker state (influence_gen.integration.circuit_breaker)
         # Data files (e.g., for default configurations, although ir.config_parameter is preferred for settings)
     ],
     'installable': True,
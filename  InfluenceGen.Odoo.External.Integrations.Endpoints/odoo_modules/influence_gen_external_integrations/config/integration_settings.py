@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import logging
 from odoo import api, models, _
+from odoo.addons.influence_gen_external_integrations.utils.circuit_breaker import CircuitPolicy
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpPolicy, HttpSessionPool
 # from odoo.exceptions import UserError # Not used directly, ConfigurationError is custom
 
 _logger = logging.getLogger(__name__)
@@ -96,4 +98,61 @@ class IntegrationSettings(models.AbstractModel):
         base_url = self._get_param(key)
         if not base_url:
             _logger.warning(f"Payment Gateway Base URL for '{gateway_name}' ('{key}') is not configured.")
-        return base_url
\ No newline at end of file
+        return base_url
+
+    @api.model
+    def get_http_policy(self, service_key: str = None, **defaults) -> HttpPolicy:
+        """
+        Builds the HTTP connection/timeout/retry policy of a service from system parameters
+        'influence_gen.http.<service_key>.<field>', falling back to 'influence_gen.http.default.<field>'
+        and then to `defaults` and the HttpPolicy defaults. Fields: timeout, connect_timeout,
+        retries, backoff_factor, pool_maxsize.
+
+        :param service_key: e.g. 'kyc_service', 'bank_verification', 'n8n_ai'; None for the defaults only
+        :param defaults: caller defaults for fields not configured, e.g. timeout=60
+        :return: HttpPolicy
+        """
+        values = self._get_policy_values('http', service_key, (
+            ('timeout', float), ('connect_timeout', float), ('retries', int),
+            ('backoff_factor', float), ('pool_maxsize', int),
+        ), defaults)
+        return HttpPolicy(**values)
+
+    @api.model
+    def get_circuit_policy(self, service_key: str = None, **defaults) -> CircuitPolicy:
+        """
+        Builds the circuit breaker/bulkhead policy of a service from system parameters
+        'influence_gen.circuit.<service_key>.<field>', falling back to 'influence_gen.circuit.default.<field>'
+        and then to `defaults` and the CircuitPolicy defaults. Fields: failure_threshold,
+        reset_timeout, max_in_flight, slot_lease.
+
+        :param service_key: e.g. 'kyc_service', 'bank_verification', 'example_payment'
+        :param defaults: caller defaults for fields not configured
+        :return: CircuitPolicy
+        """
+        values = self._get_policy_values('circuit', service_key, (
+            ('failure_threshold', int), ('reset_timeout', float), ('max_in_flight', int), ('slot_lease', float),
+        ), defaults)
+        return CircuitPolicy(**values)
+
+    @api.model
+    def _get_policy_values(self, namespace, service_key, field_casts, defaults):
+        """Reads 'influence_gen.<namespace>.<service_key|default>.<field>' for each (field, cast) over `defaults`."""
+        values = dict(defaults)
+        for field_name, cast in field_casts:
+            raw_value = None
+            if service_key:
+                raw_value = self._get_param(f'influence_gen.{namespace}.{service_key}.{field_name}', default=False)
+            if not raw_value:
+                raw_value = self._get_param(f'influence_gen.{namespace}.default.{field_name}', default=False)
+            if raw_value:
+                try:
+                    values[field_name] = cast(raw_value)
+                except (TypeError, ValueError):
+                    _logger.warning(f"Invalid {namespace} policy value '{raw_value}' for {service_key or 'default'}.{field_name}. Using default.")
+        return values
+
+    @api.model
+    def get_http_pool_stats(self):
+        """Connection pool statistics of this worker process, per host (see HttpSessionPool.get_stats)."""
+        return HttpSessionPool.get_stats()
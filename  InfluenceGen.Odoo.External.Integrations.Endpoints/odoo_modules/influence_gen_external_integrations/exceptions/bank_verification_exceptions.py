@@ -25,4 +25,11 @@ class BankVerificationFailedError(BankVerificationServiceError):
         base_str = super().__str__()
         if self.reason_code:
             return f"{base_str} (Reason Code: {self.reason_code})"
-        return base_str
\ No newline at end of file
+        return base_str
+
+class BankVerificationServiceUnavailableError(BankVerificationServiceError):
+    """
+    Raised when the bank verification service is not called because its circuit breaker is
+    open or its bulkhead is full: the account goes to manual review. REQ-IOKYC-008, REQ-IPF-002
+    """
+    pass
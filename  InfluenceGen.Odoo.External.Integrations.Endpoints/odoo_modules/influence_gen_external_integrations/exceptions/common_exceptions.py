@@ -52,4 +52,21 @@ class ApiCommunicationError(ExternalServiceError):
             if len(content_preview) > 200:
                 content_preview = content_preview[:200] + "..."
             parts.append(f"(Response: {content_preview})")
-        return " ".join(parts)
\ No newline at end of file
+        return " ".join(parts)
+
+class ServiceUnavailableError(ExternalServiceError):
+    """
+    Raised without calling the service when its circuit breaker is open or its
+    bulkhead is full. Callers route the operation to manual review (or retry it later)
+    instead of waiting on a degraded service.
+    """
+    def __init__(self, message, service_name=None, reason=None, retry_after=None, original_exception=None):
+        super().__init__(message, service_name=service_name, original_exception=original_exception)
+        self.reason = reason # 'circuit_open' or 'bulkhead_full'
+        self.retry_after = retry_after # Seconds until the circuit lets a probe call through, if known
+
+    def __str__(self):
+        base_str = super().__str__()
+        if self.retry_after:
+            return f"{base_str} (Retry after: {int(self.retry_after)}s)"
+        return base_str
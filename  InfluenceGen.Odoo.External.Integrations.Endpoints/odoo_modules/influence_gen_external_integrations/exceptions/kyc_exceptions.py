@@ -24,4 +24,11 @@ class KYCVerificationFailedError(KYCServiceError):
 class KYCDocumentInvalidError(KYCServiceError):
     """Raised when the KYC service deems the submitted document invalid. REQ-IOKYC-005, REQ-IL-011"""
     # Inherits __init__ and __str__ from KYCServiceError, message passed to super is sufficient.
-    pass
\ No newline at end of file
+    pass
+
+class KYCServiceUnavailableError(KYCServiceError):
+    """
+    Raised when the KYC service is not called because its circuit breaker is open or its
+    bulkhead is full: the submission goes to manual review. REQ-IOKYC-005, REQ-IL-011
+    """
+    pass
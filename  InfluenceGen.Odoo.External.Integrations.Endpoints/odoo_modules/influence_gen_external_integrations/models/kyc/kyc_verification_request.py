@@ -10,9 +10,9 @@ class KYCVerificationRequest:
     REQ-IOKYC-005, REQ-IL-011
     """
     document_image_front_b64: str  # Base64 encoded image
-    document_image_back_b64: Optional[str] = None # Base64 encoded image, optional for some documents/services
     document_type: str  # e.g., 'PASSPORT', 'DRIVING_LICENSE', 'ID_CARD'. Must match service's expected values.
     influencer_id: int # Internal influencer ID (e.g., res.partner ID or custom model ID) for callback matching/logging.
+    document_image_back_b64: Optional[str] = None # Base64 encoded image, optional for some documents/services
     
     # Optional fields that might be required or beneficial for some KYC providers
     first_name: Optional[str] = None
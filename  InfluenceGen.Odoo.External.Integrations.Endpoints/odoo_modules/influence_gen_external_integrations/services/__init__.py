@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 from . import base_api_client
+from . import circuit_breaker
 from . import kyc_service_client
 from . import bank_verification_service_client
 from . import odoo_accounting_service
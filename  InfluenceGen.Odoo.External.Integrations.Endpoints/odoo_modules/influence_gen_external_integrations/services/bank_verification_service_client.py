@@ -7,8 +7,8 @@ from odoo import api, models, _
 from .base_api_client import BaseAPIClient
 from ..models.bank_verification.bank_verification_request import BankVerificationRequest
 from ..models.bank_verification.bank_verification_response import BankVerificationResponse
-from ..exceptions.bank_verification_exceptions import BankVerificationServiceError, BankAccountInvalidError, BankVerificationFailedError
-from ..exceptions.common_exceptions import ApiCommunicationError, ConfigurationError, ExternalServiceError
+from ..exceptions.bank_verification_exceptions import BankVerificationServiceError, BankVerificationServiceUnavailableError, BankAccountInvalidError, BankVerificationFailedError
+from ..exceptions.common_exceptions import ApiCommunicationError, ConfigurationError, ExternalServiceError, ServiceUnavailableError
 
 _logger = logging.getLogger(__name__)
 
@@ -19,6 +19,7 @@ class BankVerificationServiceClient(BaseAPIClient):
     SERVICE_NAME = "BankVerificationService"
     BASE_URL_PARAM = "influence_gen.bank_verification.base_url"
     API_KEY_PARAM = "influence_gen.bank_verification.api_key"
+    HTTP_POLICY_KEY = 'bank_verification'
 
     @api.model
     def _get_default_headers(self, api_key: str) -> Dict[str, str]:
@@ -61,6 +62,8 @@ class BankVerificationServiceClient(BaseAPIClient):
         :raises BankVerificationServiceError: For general communication or service-specific errors.
         :raises BankAccountInvalidError: If the service indicates the submitted account details are invalid.
         :raises BankVerificationFailedError: If the service explicitly returns a 'failed' or 'rejected' status.
+        :raises BankVerificationServiceUnavailableError: If the service is not called (circuit open or too many calls in flight);
+                 the caller routes the case to manual review.
         :raises ConfigurationError: If essential configuration is missing.
         """
         _logger.info(f"Attempting bank account verification for influencer ID (ref): {request_data.influencer_id} via {self.SERVICE_NAME}")
@@ -133,6 +136,12 @@ class BankVerificationServiceClient(BaseAPIClient):
             )
             return response_dto
 
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{self.SERVICE_NAME} unavailable for influencer (ref) {request_data.influencer_id}, routing to manual review: {e}")
+            raise BankVerificationServiceUnavailableError(
+                f"{self.SERVICE_NAME} is temporarily unavailable; the submission requires manual review.",
+                original_exception=e
+            )
         except (ApiCommunicationError, ConfigurationError) as e:
             _logger.error(f"{self.SERVICE_NAME} API communication or configuration error for influencer (ref) {request_data.influencer_id}: {e}")
             raise BankVerificationServiceError(
@@ -157,6 +166,8 @@ class BankVerificationServiceClient(BaseAPIClient):
         :param transaction_id: The external service's transaction ID.
         :return: DTO containing the latest status details.
         :raises BankVerificationServiceError: For communication or service-specific errors.
+        :raises BankVerificationServiceUnavailableError: If the service is not called (circuit open or too many calls in flight);
+                 the caller retries later.
         :raises ConfigurationError: If essential configuration is missing.
         :raises ValueError: If transaction_id is not provided.
         """
@@ -187,6 +198,12 @@ class BankVerificationServiceClient(BaseAPIClient):
             _logger.info(f"Fetched {self.SERVICE_NAME} bank verification status for transaction {transaction_id}: {response_dto.status}")
             return response_dto
 
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{self.SERVICE_NAME} unavailable, status of transaction {transaction_id} not fetched: {e}")
+            raise BankVerificationServiceUnavailableError(
+                f"{self.SERVICE_NAME} is temporarily unavailable; status of {transaction_id} not fetched.",
+                original_exception=e
+            )
         except (ApiCommunicationError, ConfigurationError) as e:
             _logger.error(f"{self.SERVICE_NAME} API communication error fetching status for transaction {transaction_id}: {e}")
             raise BankVerificationServiceError(
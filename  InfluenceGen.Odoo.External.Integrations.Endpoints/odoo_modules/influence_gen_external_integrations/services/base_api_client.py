@@ -8,7 +8,7 @@ from odoo import api, models
 from odoo.addons.influence_gen_external_integrations.utils.http_client_wrapper import HttpClientWrapper
 # Correct import for IntegrationSettings service
 # from odoo.addons.influence_gen_external_integrations.config.integration_settings import IntegrationSettings
-from odoo.addons.influence_gen_external_integrations.exceptions.common_exceptions import ConfigurationError, ApiCommunicationError, ExternalServiceError
+from odoo.addons.influence_gen_external_integrations.exceptions.common_exceptions import ConfigurationError, ApiCommunicationError, ExternalServiceError, ServiceUnavailableError
 
 _logger = logging.getLogger(__name__)
 
@@ -21,6 +21,24 @@ class BaseAPIClient(models.AbstractModel):
     SERVICE_NAME: str = "GenericService"
     BASE_URL_PARAM: str = "influence_gen.generic_service.base_url" # e.g., 'influence_gen.kyc_service.base_url'
     API_KEY_PARAM: Optional[str] = "influence_gen.generic_service.api_key" # e.g., 'influence_gen.kyc_service.api_key', can be None if no API key
+    HTTP_POLICY_KEY: Optional[str] = None # e.g., 'kyc_service': reads 'influence_gen.http.kyc_service.*' (see IntegrationSettings.get_http_policy)
+                                          # and keys the service's circuit breaker ('influence_gen.circuit.kyc_service.*')
+
+    @api.model
+    def _get_circuit_key(self) -> str:
+        """Key of the circuit breaker and bulkhead shared by all calls to this service."""
+        return self.HTTP_POLICY_KEY or self.SERVICE_NAME
+
+    @api.model
+    def _is_service_failure(self, error: Exception) -> bool:
+        """
+        Tells whether a failed call means the service is degraded and counts towards opening
+        its circuit: network errors, timeouts and 5xx responses. 4xx responses (bad input,
+        authentication) are answers of a healthy service.
+        """
+        if isinstance(error, ApiCommunicationError):
+            return error.status_code is None or error.status_code >= 500
+        return False
 
     @api.model
     def _get_service_config(self) -> tuple[str, Optional[str]]:
@@ -143,6 +161,7 @@ class BaseAPIClient(models.AbstractModel):
         :return: Parsed JSON response as a dictionary.
         :raises ConfigurationError: If service configuration is missing.
         :raises ApiCommunicationError: For network issues or non-2xx HTTP responses.
+        :raises ServiceUnavailableError: If the service's circuit is open or its bulkhead is full (nothing was sent).
         :raises ExternalServiceError: For other unexpected errors during the process.
         """
         base_url, api_key = self._get_service_config() # Can raise ConfigurationError
@@ -161,18 +180,25 @@ class BaseAPIClient(models.AbstractModel):
                 f"JSONData provided: {'Yes' if json_data is not None else 'No'}, "
                 f"Data provided: {'Yes' if data is not None else 'No'}"
             )
-            response_obj = HttpClientWrapper.request(
-                method=method,
-                url=full_url,
-                headers=final_headers,
-                json_data=json_data,
-                params=params,
-                data=data,
-                service_name=self.SERVICE_NAME,
-                mask_sensitive_headers=self._get_sensitive_headers_to_mask(),
-                mask_sensitive_json_fields=self._get_sensitive_json_fields_to_mask()
-            )
+            # Fails fast with ServiceUnavailableError while the service's circuit is open or its bulkhead is full.
+            with self.env['influence_gen.integration.circuit_breaker'].guard(
+                    self._get_circuit_key(), is_failure=self._is_service_failure):
+                response_obj = HttpClientWrapper.request(
+                    method=method,
+                    url=full_url,
+                    headers=final_headers,
+                    json_data=json_data,
+                    params=params,
+                    data=data,
+                    service_name=self.SERVICE_NAME,
+                    mask_sensitive_headers=self._get_sensitive_headers_to_mask(),
+                    mask_sensitive_json_fields=self._get_sensitive_json_fields_to_mask(),
+                    policy=self.env['influence_gen.integration.settings'].get_http_policy(self.HTTP_POLICY_KEY),
+                )
             return self._handle_api_response(response_obj)
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{self.SERVICE_NAME} call to {endpoint} not sent: {e}")
+            raise
         except ApiCommunicationError: # Already logged by HttpClientWrapper, re-raise
             raise
         except ConfigurationError: # Raised by _get_service_config or _get_default_headers
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+import logging
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Optional
+
+import psycopg2
+
+from odoo import api, fields, models
+from odoo.addons.influence_gen_external_integrations.exceptions.common_exceptions import ServiceUnavailableError
+from odoo.addons.influence_gen_external_integrations.utils.circuit_breaker import (
+    CircuitPolicy,
+    forget_healthy,
+    forget_open,
+    known_healthy,
+    known_open_for,
+    remember_healthy,
+    remember_open,
+)
+
+_logger = logging.getLogger(__name__)
+
+LAST_ERROR_MAX_LENGTH = 1000
+BULKHEAD_TABLE = 'influence_gen_integration_bulkhead_slot'
+# Attempts at leasing a free slot; an attempt loses when a concurrent caller leased the same slot first.
+SLOT_LEASE_ATTEMPTS = 3
+
+
+class IntegrationCircuitBreaker(models.Model):
+    """
+    Circuit breaker and bulkhead shared by all Odoo workers, one row per external service.
+    REQ-IL-008, REQ-IL-011
+
+    - closed: calls go through; consecutive failures are counted and reaching the
+      failure threshold opens the circuit.
+    - open: calls fail fast with ServiceUnavailableError until the reset timeout elapses.
+    - half_open: exactly one probe call goes through (other calls keep failing fast);
+      its success closes the circuit, its failure opens it again.
+
+    State changes are written on a separate cursor and committed at once, so they are
+    visible to every worker and survive the rollback of the failed caller's transaction.
+    While a circuit is closed without failures, calls do not touch the database for the
+    breaker at all (see utils.circuit_breaker): only state changes are written.
+    The bulkhead bounds the calls in flight across workers with leased slots (one row per
+    service and slot in BULKHEAD_TABLE), taken and given back with one short committed
+    statement each, so no database connection is held while the call is in flight. The
+    lease of a call that never returned (killed worker) expires after policy.slot_lease.
+    """
+    _name = 'influence_gen.integration.circuit_breaker'
+    _description = 'Integration Circuit Breaker State'
+    _order = 'service_key'
+    _rec_name = 'service_key'
+
+    service_key = fields.Char(string='Service', required=True, readonly=True,
+                              help="e.g. 'kyc_service', 'bank_verification', 'example_payment'.")
+    state = fields.Selection([
+        ('closed', 'Closed'),
+        ('open', 'Open'),
+        ('half_open', 'Half-Open'),
+    ], string='State', required=True, default='closed', readonly=True)
+    failure_count = fields.Integer(string='Consecutive Failures', default=0, readonly=True)
+    trip_count = fields.Integer(string='Times Opened', default=0, readonly=True)
+    opened_at = fields.Datetime(string='Opened At', readonly=True)
+    probe_started_at = fields.Datetime(string='Probe Started At', readonly=True)
+    last_failure_at = fields.Datetime(string='Last Failure', readonly=True)
+    last_success_at = fields.Datetime(string='Last Success', readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    _sql_constraints = [
+        ('service_key_uniq', 'unique(service_key)', 'There can only be one circuit breaker per service.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {BULKHEAD_TABLE} (
+                service_key varchar NOT NULL,
+                slot integer NOT NULL,
+                leased_until timestamp NOT NULL,
+                PRIMARY KEY (service_key, slot)
+            )
+        """)
+
+    @api.model
+    def _execute_on_own_cursor(self, query, params):
+        """
+        Runs one breaker statement on a separate, immediately committed cursor.
+        Breaker bookkeeping is best effort: a concurrent update losing the race or a database
+        hiccup must never fail the guarded call.
+        :return: the fetched rows, or None if the statement failed
+        """
+        try:
+            with self.env.registry.cursor() as cr:
+                cr.execute(query, params)
+                return cr.fetchall() if cr.description else []
+        except psycopg2.Error as e:
+            _logger.warning(f"Circuit breaker bookkeeping failed ({type(e).__name__}): {e}")
+            return None
+
+    @api.model
+    def _open_until(self, opened_at, policy: CircuitPolicy) -> float:
+        return (opened_at + timedelta(seconds=policy.reset_timeout)).timestamp() if opened_at else time.time() + policy.reset_timeout
+
+    @api.model
+    def _fail_fast(self, service_key, reason, message, retry_after=None):
+        raise ServiceUnavailableError(message, service_name=service_key, reason=reason, retry_after=retry_after)
+
+    @api.model
+    def _before_call(self, service_key, policy: CircuitPolicy):
+        """
+        Lets the call through or fails fast.
+        :return: tuple (is_probe, state, failure_count) as seen before the call
+        :raises ServiceUnavailableError: if the circuit is open or another worker is probing
+        """
+        dbname = self.env.cr.dbname
+        remaining = known_open_for(dbname, service_key)
+        if remaining:
+            self._fail_fast(service_key, 'circuit_open', f"Circuit of {service_key} is open.", retry_after=remaining)
+        if known_healthy(dbname, service_key):
+            return False, 'closed', 0
+
+        rows = self._execute_on_own_cursor("""
+            SELECT state, failure_count, opened_at
+              FROM influence_gen_integration_circuit_breaker
+             WHERE service_key = %s
+        """, [service_key])
+        if rows == []:
+            # First call to the service: the row all workers share from now on.
+            self._execute_on_own_cursor("""
+                INSERT INTO influence_gen_integration_circuit_breaker
+                       (service_key, state, failure_count, trip_count, create_uid, create_date, write_uid, write_date)
+                VALUES (%(key)s, 'closed', 0, 0, %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC')
+                ON CONFLICT (service_key) DO NOTHING
+            """, {'key': service_key, 'uid': self.env.uid})
+            remember_healthy(dbname, service_key)
+        if not rows:
+            return False, 'closed', 0 # New row, or bookkeeping unavailable: do not block the call
+        state, failure_count, opened_at = rows[0]
+        if state == 'closed':
+            if not failure_count:
+                remember_healthy(dbname, service_key)
+            return False, state, failure_count
+
+        # Open (or half-open with a stale probe): claim the single probe once the reset timeout elapsed.
+        rows = self._execute_on_own_cursor("""
+            UPDATE influence_gen_integration_circuit_breaker
+               SET state = 'half_open', probe_started_at = now() at time zone 'UTC',
+                   write_uid = %(uid)s, write_date = now() at time zone 'UTC'
+             WHERE service_key = %(key)s
+               AND ((state = 'open' AND opened_at <= now() at time zone 'UTC' - %(reset)s * interval '1 second')
+                 OR (state = 'half_open' AND probe_started_at <= now() at time zone 'UTC' - %(reset)s * interval '1 second'))
+         RETURNING id
+        """, {'key': service_key, 'uid': self.env.uid, 'reset': policy.reset_timeout})
+        if rows:
+            _logger.info(f"Circuit of {service_key} is half-open: sending a probe call.")
+            return True, 'half_open', failure_count
+        if state == 'open':
+            open_until = self._open_until(opened_at, policy)
+            remember_open(dbname, service_key, open_until)
+            self._fail_fast(service_key, 'circuit_open', f"Circuit of {service_key} is open.",
+                            retry_after=max(open_until - time.time(), 0))
+        self._fail_fast(service_key, 'circuit_open', f"Circuit of {service_key} is half-open; a probe call is in progress.",
+                        retry_after=policy.reset_timeout)
+
+    @api.model
+    def _record_success(self, service_key, is_probe, state, failure_count):
+        if not is_probe and state == 'closed' and not failure_count:
+            return # Nothing to reset: the healthy path costs no write
+        rows = self._execute_on_own_cursor("""
+            UPDATE influence_gen_integration_circuit_breaker
+               SET state = 'closed', failure_count = 0, opened_at = NULL, probe_started_at = NULL,
+                   last_success_at = now() at time zone 'UTC',
+                   write_uid = %(uid)s, write_date = now() at time zone 'UTC'
+             WHERE service_key = %(key)s AND (state = 'closed' OR %(probe)s)
+         RETURNING id
+        """, {'key': service_key, 'uid': self.env.uid, 'probe': is_probe})
+        if rows:
+            remember_healthy(self.env.cr.dbname, service_key)
+        if is_probe and rows:
+            forget_open(self.env.cr.dbname, service_key)
+            _logger.info(f"Circuit of {service_key} closed: probe call succeeded.")
+
+    @api.model
+    def _record_failure(self, service_key, policy: CircuitPolicy, is_probe, error):
+        # The next success has a failure count to reset, so it must go to the database.
+        forget_healthy(self.env.cr.dbname, service_key)
+        rows = self._execute_on_own_cursor("""
+            UPDATE influence_gen_integration_circuit_breaker
+               SET failure_count = failure_count + 1,
+                   trip_count = trip_count + CASE WHEN state <> 'open' AND (%(probe)s OR failure_count + 1 >= %(threshold)s) THEN 1 ELSE 0 END,
+                   opened_at = CASE WHEN state = 'open' THEN opened_at
+                                    WHEN %(probe)s OR failure_count + 1 >= %(threshold)s THEN now() at time zone 'UTC'
+                                    ELSE opened_at END,
+                   state = CASE WHEN %(probe)s OR failure_count + 1 >= %(threshold)s THEN 'open' ELSE state END,
+                   probe_started_at = CASE WHEN %(probe)s THEN NULL ELSE probe_started_at END,
+                   last_failure_at = now() at time zone 'UTC', last_error = %(error)s,
+                   write_uid = %(uid)s, write_date = now() at time zone 'UTC'
+             WHERE service_key = %(key)s
+         RETURNING state, opened_at, failure_count
+        """, {
+            'key': service_key, 'uid': self.env.uid, 'probe': is_probe,
+            'threshold': policy.failure_threshold, 'error': str(error)[:LAST_ERROR_MAX_LENGTH],
+        })
+        if rows and rows[0][0] == 'open':
+            remember_open(self.env.cr.dbname, service_key, self._open_until(rows[0][1], policy))
+            _logger.warning(f"Circuit of {service_key} is open after {rows[0][2]} consecutive failure(s): {error}")
+
+    @api.model
+    def _acquire_slot(self, service_key, policy: CircuitPolicy) -> Optional[tuple]:
+        """
+        Leases a free bulkhead slot of the service, in a statement committed at once so
+        every worker sees it; no connection is held while the call is in flight.
+        :return: tuple (slot, leased_until), or None when the bulkhead is disabled or
+                 its bookkeeping is unavailable (the call is not blocked)
+        :raises ServiceUnavailableError: if all slots are leased
+        """
+        if policy.max_in_flight <= 0:
+            return None
+        for _attempt in range(SLOT_LEASE_ATTEMPTS):
+            rows = self._execute_on_own_cursor(f"""
+                WITH free AS (
+                    SELECT s.slot FROM generate_series(0, %(max)s - 1) AS s(slot)
+                     WHERE NOT EXISTS (
+                            SELECT 1 FROM {BULKHEAD_TABLE} b
+                             WHERE b.service_key = %(key)s AND b.slot = s.slot
+                               AND b.leased_until > now() at time zone 'UTC')
+                  ORDER BY random() -- Spreads concurrent callers over the slots
+                     LIMIT 1
+                )
+                INSERT INTO {BULKHEAD_TABLE} AS b (service_key, slot, leased_until)
+                SELECT %(key)s, slot, now() at time zone 'UTC' + %(lease)s * interval '1 second' FROM free
+                ON CONFLICT (service_key, slot) DO UPDATE SET leased_until = EXCLUDED.leased_until
+                 WHERE b.leased_until <= now() at time zone 'UTC'
+             RETURNING slot, leased_until
+            """, {'key': service_key, 'max': policy.max_in_flight, 'lease': policy.slot_lease})
+            if rows is None:
+                return None
+            if rows:
+                return rows[0]
+            if self._count_in_flight(service_key) >= policy.max_in_flight:
+                break
+        _logger.warning(f"Bulkhead of {service_key} is full ({policy.max_in_flight} calls in flight).")
+        self._fail_fast(service_key, 'bulkhead_full',
+                        f"Too many calls in flight to {service_key} ({policy.max_in_flight}).")
+
+    @api.model
+    def _count_in_flight(self, service_key) -> int:
+        """Calls in flight to the service across all workers, i.e. unexpired slot leases."""
+        rows = self._execute_on_own_cursor(f"""
+            SELECT count(*) FROM {BULKHEAD_TABLE}
+             WHERE service_key = %s AND leased_until > now() at time zone 'UTC'
+        """, [service_key])
+        return rows[0][0] if rows else 0
+
+    @api.model
+    def _release_slot(self, service_key, leased_slot):
+        if leased_slot is None:
+            return
+        slot, leased_until = leased_slot
+        # Only our own lease: once expired, the slot may already be leased by another call.
+        self._execute_on_own_cursor(f"""
+            DELETE FROM {BULKHEAD_TABLE}
+             WHERE service_key = %s AND slot = %s AND leased_until = %s
+        """, [service_key, slot, leased_until])
+
+    @contextmanager
+    def guard(self, service_key: str, policy: Optional[CircuitPolicy] = None,
+              is_failure: Optional[Callable[[Exception], bool]] = None):
+        """
+        Runs the enclosed call under the service's circuit breaker and bulkhead:
+
+            with self.env['influence_gen.integration.circuit_breaker'].guard('kyc_service', is_failure=...):
+                response = ...
+
+        :param service_key: breaker key, also used for the 'influence_gen.circuit.<service_key>.*' policy
+        :param policy: CircuitPolicy; read from IntegrationSettings when omitted
+        :param is_failure: predicate telling whether an exception raised by the call means the
+                           service is degraded (timeouts, 5xx); other exceptions (e.g. 4xx
+                           validation errors) count as answered calls. Defaults to every exception.
+        :raises ServiceUnavailableError: without running the call, if the circuit is open or the bulkhead is full
+        """
+        policy = policy or self.env['influence_gen.integration.settings'].get_circuit_policy(service_key)
+        # Circuit first: an open circuit fails fast without leasing a slot.
+        # A probe claimed here but refused by a full bulkhead is claimed again after the reset timeout.
+        is_probe, state, failure_count = self._before_call(service_key, policy)
+        leased_slot = self._acquire_slot(service_key, policy)
+        try:
+            try:
+                yield
+            except Exception as e:
+                if is_failure is None or is_failure(e):
+                    self._record_failure(service_key, policy, is_probe, e)
+                else:
+                    self._record_success(service_key, is_probe, state, failure_count)
+                raise
+            self._record_success(service_key, is_probe, state, failure_count)
+        finally:
+            self._release_slot(service_key, leased_slot)
+
+    @api.model
+    def get_status(self):
+        """
+        Breaker state and bulkhead usage of every known service, for the system health dashboard.
+        :return: list of dicts
+        """
+        IntegrationSettings = self.env['influence_gen.integration.settings']
+        self.env.cr.execute(f"""
+            SELECT service_key, count(*) FROM {BULKHEAD_TABLE}
+             WHERE leased_until > now() at time zone 'UTC'
+          GROUP BY service_key
+        """)
+        in_flight = dict(self.env.cr.fetchall())
+        status = []
+        for breaker in self.sudo().search([]):
+            policy = IntegrationSettings.get_circuit_policy(breaker.service_key)
+            retry_at = False
+            if breaker.state == 'open' and breaker.opened_at:
+                retry_at = breaker.opened_at + timedelta(seconds=policy.reset_timeout)
+            status.append({
+                'service': breaker.service_key,
+                'state': breaker.state,
+                'consecutive_failures': breaker.failure_count,
+                'failure_threshold': policy.failure_threshold,
+                'times_opened': breaker.trip_count,
+                'opened_at': fields.Datetime.to_string(breaker.opened_at),
+                'probe_at': fields.Datetime.to_string(retry_at),
+                'last_failure_at': fields.Datetime.to_string(breaker.last_failure_at),
+                'last_success_at': fields.Datetime.to_string(breaker.last_success_at),
+                'last_error': breaker.last_error or '',
+                'in_flight': in_flight.get(breaker.service_key, 0),
+                'max_in_flight': policy.max_in_flight,
+            })
+        return status
@@ -7,8 +7,8 @@ from odoo import api, models, _
 from .base_api_client import BaseAPIClient
 from ..models.kyc.kyc_verification_request import KYCVerificationRequest
 from ..models.kyc.kyc_verification_response import KYCVerificationResponse
-from ..exceptions.kyc_exceptions import KYCServiceError, KYCVerificationFailedError, KYCDocumentInvalidError
-from ..exceptions.common_exceptions import ApiCommunicationError, ConfigurationError, ExternalServiceError
+from ..exceptions.kyc_exceptions import KYCServiceError, KYCServiceUnavailableError, KYCVerificationFailedError, KYCDocumentInvalidError
+from ..exceptions.common_exceptions import ApiCommunicationError, ConfigurationError, ExternalServiceError, ServiceUnavailableError
 
 _logger = logging.getLogger(__name__)
 
@@ -19,6 +19,7 @@ class KYCServiceClient(BaseAPIClient):
     SERVICE_NAME = "KYCService"
     BASE_URL_PARAM = "influence_gen.kyc_service.base_url"
     API_KEY_PARAM = "influence_gen.kyc_service.api_key" # Name of the ir.config_parameter key
+    HTTP_POLICY_KEY = 'kyc_service'
 
     @api.model
     def _get_default_headers(self, api_key: str) -> Dict[str, str]:
@@ -60,20 +61,8 @@ class KYCServiceClient(BaseAPIClient):
         ]
 
     @api.model
-    def verify_identity_document(self, request_data: KYCVerificationRequest) -> KYCVerificationResponse:
-        """
-        Submits identity document for verification to the third-party KYC service.
-        REQ-IOKYC-005, REQ-IL-011
-
-        :param request_data: DTO containing data for the verification request.
-        :return: DTO containing the response details from the KYC service.
-        :raises KYCServiceError: For general communication or service-specific errors.
-        :raises KYCVerificationFailedError: If the service explicitly returns a 'failed' or 'rejected' status.
-        :raises KYCDocumentInvalidError: If the service indicates the submitted document is invalid.
-        :raises ConfigurationError: If essential configuration (URL, API Key) is missing.
-        """
-        _logger.info(f"Attempting to verify identity for influencer ID (ref): {request_data.influencer_id} via {self.SERVICE_NAME}")
-
+    def _build_verification_payload(self, request_data: KYCVerificationRequest) -> Dict[str, Any]:
+        """Maps a verification request DTO to the KYC service's request payload."""
         # Construct the payload based on the specific KYC service API requirements.
         # This is an example and likely needs adjustment.
         payload = {
@@ -91,6 +80,45 @@ class KYCServiceClient(BaseAPIClient):
         }
         # Remove None or empty values from payload for a cleaner request, if the API prefers this
         payload = {k: v for k, v in payload.items() if v is not None and v != {} and v != ""}
+        return payload
+
+    @api.model
+    def _to_verification_response(self, response_json: Dict[str, Any], transaction_id: str = None) -> KYCVerificationResponse:
+        """
+        Maps a verification JSON object of the KYC service to the KYCVerificationResponse DTO.
+        This mapping is highly dependent on the specific KYC service's response structure.
+        :param transaction_id: fallback transaction ID if the object does not carry one
+        """
+        return KYCVerificationResponse(
+            transaction_id=response_json.get('transaction_id', response_json.get('id', transaction_id)), # Common alternatives
+            status=str(response_json.get('status', 'UNKNOWN')).upper(), # Normalize status
+            reason=response_json.get('reason', response_json.get('message')), # Common alternatives
+            reason_code=str(response_json.get('reason_code', response_json.get('code', ''))), # Common alternatives
+            extracted_data=response_json.get('extracted_data', response_json.get('data', {})), # Common alternatives
+            kyc_score=float(response_json.get('score')) if response_json.get('score') is not None else None,
+            document_validity=str(response_json.get('document_validity','')),
+            face_match_score=float(response_json.get('face_match_score')) if response_json.get('face_match_score') is not None else None,
+            original_response=response_json # Store the full original response for auditing/debugging
+        )
+
+    @api.model
+    def verify_identity_document(self, request_data: KYCVerificationRequest) -> KYCVerificationResponse:
+        """
+        Submits identity document for verification to the third-party KYC service.
+        REQ-IOKYC-005, REQ-IL-011
+
+        :param request_data: DTO containing data for the verification request.
+        :return: DTO containing the response details from the KYC service.
+        :raises KYCServiceError: For general communication or service-specific errors.
+        :raises KYCVerificationFailedError: If the service explicitly returns a 'failed' or 'rejected' status.
+        :raises KYCDocumentInvalidError: If the service indicates the submitted document is invalid.
+        :raises KYCServiceUnavailableError: If the service is not called (circuit open or too many calls in flight);
+                 the caller routes the case to manual review.
+        :raises ConfigurationError: If essential configuration (URL, API Key) is missing.
+        """
+        _logger.info(f"Attempting to verify identity for influencer ID (ref): {request_data.influencer_id} via {self.SERVICE_NAME}")
+
+        payload = self._build_verification_payload(request_data)
 
         try:
             # The API endpoint is an example; replace with the actual KYC service endpoint.
@@ -100,19 +128,7 @@ class KYCServiceClient(BaseAPIClient):
                 json_data=payload
             )
 
-            # Map JSON response from the service to the KYCVerificationResponse DTO.
-            # This mapping is highly dependent on the specific KYC service's response structure.
-            response_dto = KYCVerificationResponse(
-                transaction_id=response_json.get('transaction_id', response_json.get('id')), # Common alternatives
-                status=str(response_json.get('status', 'UNKNOWN')).upper(), # Normalize status
-                reason=response_json.get('reason', response_json.get('message')), # Common alternatives
-                reason_code=str(response_json.get('reason_code', response_json.get('code', ''))), # Common alternatives
-                extracted_data=response_json.get('extracted_data', response_json.get('data', {})), # Common alternatives
-                kyc_score=float(response_json.get('score')) if response_json.get('score') is not None else None,
-                document_validity=str(response_json.get('document_validity','')),
-                face_match_score=float(response_json.get('face_match_score')) if response_json.get('face_match_score') is not None else None,
-                original_response=response_json # Store the full original response for auditing/debugging
-            )
+            response_dto = self._to_verification_response(response_json)
 
             # Handle specific failure statuses from the KYC service
             # These status strings are examples and must match the actual service's responses.
@@ -148,6 +164,12 @@ class KYCServiceClient(BaseAPIClient):
             )
             return response_dto
 
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{self.SERVICE_NAME} unavailable for influencer (ref) {request_data.influencer_id}, routing to manual review: {e}")
+            raise KYCServiceUnavailableError(
+                f"{self.SERVICE_NAME} is temporarily unavailable; the submission requires manual review.",
+                original_exception=e
+            )
         except (ApiCommunicationError, ConfigurationError) as e:
             _logger.error(f"{self.SERVICE_NAME} API communication or configuration error for influencer (ref) {request_data.influencer_id}: {e}")
             raise KYCServiceError(
@@ -172,6 +194,8 @@ class KYCServiceClient(BaseAPIClient):
         :param transaction_id: The external service's transaction ID for the verification.
         :return: DTO containing the latest status details.
         :raises KYCServiceError: For communication or service-specific errors.
+        :raises KYCServiceUnavailableError: If the service is not called (circuit open or too many calls in flight);
+                 the caller retries later.
         :raises ConfigurationError: If essential configuration is missing.
         :raises ValueError: If transaction_id is not provided.
         """
@@ -188,21 +212,16 @@ class KYCServiceClient(BaseAPIClient):
                 endpoint=f'/v1/verifications/identity/{transaction_id}' # Example endpoint
             )
 
-            # Map JSON response to DTO (similar to verify_identity_document response mapping)
-            response_dto = KYCVerificationResponse(
-                transaction_id=response_json.get('transaction_id', transaction_id), # Fallback to passed ID
-                status=str(response_json.get('status', 'UNKNOWN')).upper(),
-                reason=response_json.get('reason', response_json.get('message')),
-                reason_code=str(response_json.get('reason_code', response_json.get('code', ''))),
-                extracted_data=response_json.get('extracted_data', response_json.get('data', {})),
-                kyc_score=float(response_json.get('score')) if response_json.get('score') is not None else None,
-                document_validity=str(response_json.get('document_validity','')),
-                face_match_score=float(response_json.get('face_match_score')) if response_json.get('face_match_score') is not None else None,
-                original_response=response_json
-            )
+            response_dto = self._to_verification_response(response_json, transaction_id=transaction_id)
             _logger.info(f"Fetched {self.SERVICE_NAME} verification status for transaction {transaction_id}: {response_dto.status}")
             return response_dto
 
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{self.SERVICE_NAME} unavailable, status of transaction {transaction_id} not fetched: {e}")
+            raise KYCServiceUnavailableError(
+                f"{self.SERVICE_NAME} is temporarily unavailable; status of {transaction_id} not fetched.",
+                original_exception=e
+            )
         except (ApiCommunicationError, ConfigurationError) as e:
             _logger.error(f"{self.SERVICE_NAME} API communication or configuration error fetching status for transaction {transaction_id}: {e}")
             raise KYCServiceError(
@@ -214,4 +233,106 @@ class KYCServiceClient(BaseAPIClient):
             raise KYCServiceError(
                 f"An unexpected error occurred fetching {self.SERVICE_NAME} status for {transaction_id}: {str(e)}",
                 original_exception=e
-            )
\ No newline at end of file
+            )
+
+    @api.model
+    def submit_identity_documents_batch(self, requests_data: List[KYCVerificationRequest]) -> List[KYCVerificationResponse]:
+        """
+        Submits several identity documents to the third-party KYC service in one call.
+        Unlike verify_identity_document, per-document outcomes (rejected, invalid document, pending)
+        are returned as statuses, never raised, so one bad document does not fail the batch.
+        REQ-IOKYC-005, REQ-IL-011
+
+        :param requests_data: DTOs of the documents to verify.
+        :return: one response DTO per request, in the order of requests_data.
+        :raises KYCServiceError: If the batch call fails or the response does not match the batch.
+        :raises KYCServiceUnavailableError: If the service is not called (circuit open or too many calls in flight);
+                 the caller keeps the documents queued or routes them to manual review.
+        :raises ConfigurationError: If essential configuration (URL, API Key) is missing.
+        """
+        if not requests_data:
+            return []
+        _logger.info(f"Submitting a batch of {len(requests_data)} identity document(s) to {self.SERVICE_NAME}")
+        try:
+            # The API endpoint is an example; replace with the actual KYC service endpoint.
+            response_json = self._make_request(
+                method='POST',
+                endpoint='/v1/verifications/identity/batch', # Example endpoint
+                json_data={'verifications': [self._build_verification_payload(request_data) for request_data in requests_data]}
+            )
+            results = response_json.get('results', response_json.get('verifications'))
+            if not isinstance(results, list) or len(results) != len(requests_data):
+                raise KYCServiceError(
+                    f"{self.SERVICE_NAME} returned {len(results) if isinstance(results, list) else 'no'} result(s) "
+                    f"for a batch of {len(requests_data)} document(s)."
+                )
+            return [self._to_verification_response(result) for result in results]
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{self.SERVICE_NAME} unavailable, batch of {len(requests_data)} document(s) not submitted: {e}")
+            raise KYCServiceUnavailableError(
+                f"{self.SERVICE_NAME} is temporarily unavailable; the batch was not submitted.",
+                original_exception=e
+            )
+        except (ApiCommunicationError, ConfigurationError) as e:
+            _logger.error(f"{self.SERVICE_NAME} API communication or configuration error submitting a batch of {len(requests_data)} document(s): {e}")
+            raise KYCServiceError(
+                f"Failed to submit the batch to {self.SERVICE_NAME}: {e.message}",
+                original_exception=e
+            )
+        except KYCServiceError:
+            raise
+        except Exception as e:
+            _logger.exception(f"Unexpected error submitting a batch of {len(requests_data)} document(s) to {self.SERVICE_NAME}: {e}")
+            raise KYCServiceError(
+                f"An unexpected error occurred submitting a batch to {self.SERVICE_NAME}: {str(e)}",
+                original_exception=e
+            )
+
+    @api.model
+    def get_verification_statuses(self, transaction_ids: List[str]) -> Dict[str, KYCVerificationResponse]:
+        """
+        Retrieves the status of several previous verification attempts in one call.
+        REQ-IOKYC-005
+
+        :param transaction_ids: the external service's transaction IDs.
+        :return: dict {transaction_id: response DTO}; transactions unknown to the service are omitted.
+        :raises KYCServiceError: For communication or service-specific errors.
+        :raises KYCServiceUnavailableError: If the service is not called (circuit open or too many calls in flight);
+                 the caller retries later.
+        :raises ConfigurationError: If essential configuration is missing.
+        """
+        if not transaction_ids:
+            return {}
+        _logger.info(f"Fetching {self.SERVICE_NAME} verification statuses for {len(transaction_ids)} transaction(s)")
+        try:
+            # The API endpoint is an example; replace with the actual KYC service endpoint.
+            response_json = self._make_request(
+                method='GET',
+                endpoint='/v1/verifications/identity', # Example endpoint
+                params={'ids': ','.join(transaction_ids)}
+            )
+            results = response_json.get('results', response_json.get('verifications')) or []
+            statuses = {}
+            for result in results:
+                response_dto = self._to_verification_response(result)
+                if response_dto.transaction_id:
+                    statuses[str(response_dto.transaction_id)] = response_dto
+            return statuses
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{self.SERVICE_NAME} unavailable, statuses of {len(transaction_ids)} transaction(s) not fetched: {e}")
+            raise KYCServiceUnavailableError(
+                f"{self.SERVICE_NAME} is temporarily unavailable; statuses not fetched.",
+                original_exception=e
+            )
+        except (ApiCommunicationError, ConfigurationError) as e:
+            _logger.error(f"{self.SERVICE_NAME} API communication or configuration error fetching {len(transaction_ids)} status(es): {e}")
+            raise KYCServiceError(
+                f"Failed to fetch {self.SERVICE_NAME} statuses: {e.message}",
+                original_exception=e
+            )
+        except Exception as e:
+            _logger.exception(f"Unexpected error fetching {self.SERVICE_NAME} statuses: {e}")
+            raise KYCServiceError(
+                f"An unexpected error occurred fetching {self.SERVICE_NAME} statuses: {str(e)}",
+                original_exception=e
+            )
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+from . import test_circuit_breaker
+from . import test_http_session_pool
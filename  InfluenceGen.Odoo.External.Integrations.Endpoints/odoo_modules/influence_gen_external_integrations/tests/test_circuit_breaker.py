@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase, tagged
+from odoo.addons.influence_gen_external_integrations.exceptions.common_exceptions import ServiceUnavailableError
+from odoo.addons.influence_gen_external_integrations.utils.circuit_breaker import (
+    CircuitPolicy,
+    forget_healthy,
+    forget_open,
+    known_open_for,
+)
+
+from ..services.circuit_breaker import BULKHEAD_TABLE
+
+SERVICE_KEY = 'test_service'
+
+
+class ServiceDown(Exception):
+    pass
+
+
+@tagged('post_install', '-at_install')
+class TestCircuitBreaker(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Breaker = self.env['influence_gen.integration.circuit_breaker']
+        self._forget_memos()
+        self.addCleanup(self._forget_memos)
+        # Breaker bookkeeping normally commits on its own cursor; keep it in the test transaction.
+        self.own_cursor = self.startPatcher(patch.object(
+            self.registry['influence_gen.integration.circuit_breaker'], '_execute_on_own_cursor',
+            autospec=True, side_effect=self._execute_on_test_cursor,
+        ))
+
+    def _forget_memos(self):
+        forget_open(self.env.cr.dbname, SERVICE_KEY)
+        forget_healthy(self.env.cr.dbname, SERVICE_KEY)
+
+    @staticmethod
+    def _execute_on_test_cursor(breaker, query, params):
+        breaker.env.cr.execute(query, params)
+        return breaker.env.cr.fetchall() if breaker.env.cr.description else []
+
+    def _call(self, policy, fail=False):
+        with self.Breaker.guard(SERVICE_KEY, policy=policy):
+            if fail:
+                raise ServiceDown("Service down")
+
+    def _fail(self, policy, times=1):
+        for _attempt in range(times):
+            with self.assertRaises(ServiceDown):
+                self._call(policy, fail=True)
+
+    def _breaker(self):
+        self.Breaker.invalidate_model()
+        return self.Breaker.search([('service_key', '=', SERVICE_KEY)])
+
+    def _expire_reset_timeout(self, policy):
+        """Moves the opening of the circuit past the reset timeout, in this process as well."""
+        self.env.cr.execute("""
+            UPDATE influence_gen_integration_circuit_breaker
+               SET opened_at = opened_at - %s * interval '1 second'
+             WHERE service_key = %s
+        """, [policy.reset_timeout + 1, SERVICE_KEY])
+        forget_open(self.env.cr.dbname, SERVICE_KEY)
+
+    def test_failures_open_the_circuit(self):
+        policy = CircuitPolicy(failure_threshold=3, reset_timeout=60, max_in_flight=0)
+        self._fail(policy, times=2)
+        self.assertEqual((self._breaker().state, self._breaker().failure_count), ('closed', 2))
+
+        self._fail(policy)
+        breaker = self._breaker()
+        self.assertEqual((breaker.state, breaker.trip_count), ('open', 1))
+        self.assertTrue(known_open_for(self.env.cr.dbname, SERVICE_KEY))
+
+        with self.assertRaises(ServiceUnavailableError) as error:
+            self._call(policy)
+        self.assertEqual(error.exception.reason, 'circuit_open')
+
+    def test_success_resets_failure_count(self):
+        policy = CircuitPolicy(failure_threshold=3, reset_timeout=60, max_in_flight=0)
+        self._fail(policy, times=2)
+        self._call(policy)
+        self._fail(policy, times=2)
+        self.assertEqual((self._breaker().state, self._breaker().failure_count), ('closed', 2))
+
+    def test_open_circuit_fails_fast_from_database(self):
+        policy = CircuitPolicy(failure_threshold=1, reset_timeout=60, max_in_flight=0)
+        self._fail(policy)
+        # Another worker opened the circuit: this process has no memo of it.
+        forget_open(self.env.cr.dbname, SERVICE_KEY)
+        with self.assertRaises(ServiceUnavailableError):
+            self._call(policy)
+        self.assertTrue(known_open_for(self.env.cr.dbname, SERVICE_KEY))
+
+    def test_probe_success_closes_the_circuit(self):
+        policy = CircuitPolicy(failure_threshold=1, reset_timeout=60, max_in_flight=0)
+        self._fail(policy)
+        self._expire_reset_timeout(policy)
+
+        with self.Breaker.guard(SERVICE_KEY, policy=policy):
+            self.assertEqual(self._breaker().state, 'half_open')
+            # Only one probe at a time: other calls keep failing fast.
+            with self.assertRaises(ServiceUnavailableError):
+                self._call(policy)
+        breaker = self._breaker()
+        self.assertEqual((breaker.state, breaker.failure_count), ('closed', 0))
+        self.assertFalse(known_open_for(self.env.cr.dbname, SERVICE_KEY))
+
+    def test_probe_failure_opens_the_circuit_again(self):
+        policy = CircuitPolicy(failure_threshold=1, reset_timeout=60, max_in_flight=0)
+        self._fail(policy)
+        self._expire_reset_timeout(policy)
+
+        self._fail(policy)
+        breaker = self._breaker()
+        self.assertEqual((breaker.state, breaker.trip_count), ('open', 2))
+        with self.assertRaises(ServiceUnavailableError):
+            self._call(policy)
+
+    def test_healthy_circuit_skips_database(self):
+        policy = CircuitPolicy(failure_threshold=3, reset_timeout=60, max_in_flight=0)
+        self._call(policy)
+        self.own_cursor.reset_mock()
+        for _call in range(5):
+            self._call(policy)
+        self.assertFalse(self.own_cursor.called, "A closed circuit without failures costs no database round trip.")
+
+        # A failure is a state change: it is written, and the next success resets it.
+        self._fail(policy)
+        self._call(policy)
+        self.assertEqual(self._breaker().failure_count, 0)
+
+    def test_bulkhead_rejects_calls_over_the_limit(self):
+        policy = CircuitPolicy(failure_threshold=3, reset_timeout=60, max_in_flight=1)
+        with self.Breaker.guard(SERVICE_KEY, policy=policy):
+            with self.assertRaises(ServiceUnavailableError) as error:
+                self._call(policy)
+            self.assertEqual(error.exception.reason, 'bulkhead_full')
+        # The slot is given back when the call returns, even if it failed.
+        self._fail(policy)
+        self._call(policy)
+        self.env.cr.execute(f"SELECT count(*) FROM {BULKHEAD_TABLE} WHERE service_key = %s", [SERVICE_KEY])
+        self.assertEqual(self.env.cr.fetchone()[0], 0)
+
+    def test_bulkhead_reclaims_expired_lease(self):
+        policy = CircuitPolicy(failure_threshold=3, reset_timeout=60, max_in_flight=1)
+        # Lease of a call whose worker died.
+        self.env.cr.execute(f"""
+            INSERT INTO {BULKHEAD_TABLE} (service_key, slot, leased_until)
+            VALUES (%s, 0, now() at time zone 'UTC' - interval '1 second')
+        """, [SERVICE_KEY])
+        self._call(policy)
+
+        # Lease of a call still in flight in another worker.
+        self.env.cr.execute(f"""
+            INSERT INTO {BULKHEAD_TABLE} (service_key, slot, leased_until)
+            VALUES (%s, 0, now() at time zone 'UTC' + interval '1 hour')
+        """, [SERVICE_KEY])
+        with self.assertRaises(ServiceUnavailableError):
+            self._call(policy)
+
+    def test_status_reports_in_flight_calls(self):
+        policy = CircuitPolicy(failure_threshold=3, reset_timeout=60, max_in_flight=2)
+        self._call(policy)
+        with self.Breaker.guard(SERVICE_KEY, policy=policy):
+            status = {entry['service']: entry for entry in self.Breaker.get_status()}
+        self.assertEqual(status[SERVICE_KEY]['in_flight'], 1)
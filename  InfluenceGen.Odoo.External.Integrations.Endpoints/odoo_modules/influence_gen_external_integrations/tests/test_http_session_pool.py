@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from odoo.tests.common import TransactionCase, tagged
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_MAXSIZE,
+    HttpPolicy,
+    HttpSessionPool,
+)
+
+
+class LocalServiceHandler(BaseHTTPRequestHandler):
+    """Keep-alive HTTP/1.1 endpoint answering the next status queued on the server (200 when none is left)."""
+    protocol_version = 'HTTP/1.1'
+
+    def _answer(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        statuses = self.server.statuses
+        status = statuses.pop(0) if statuses else 200
+        self.server.requests.append(self.command)
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, format, *args):
+        pass
+
+
+@tagged('post_install', '-at_install')
+class TestHttpSessionPool(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), LocalServiceHandler)
+        cls.server.statuses, cls.server.requests = [], []
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    def setUp(self):
+        super().setUp()
+        # An empty registry for the test, the process' sessions are left untouched.
+        self.startPatcher(patch.object(HttpSessionPool, '_sessions', {}))
+        self.startPatcher(patch.object(HttpSessionPool, '_pid', os.getpid()))
+        self.addCleanup(HttpSessionPool.close_all)
+        self.server.statuses.clear()
+        self.server.requests.clear()
+
+    def test_session_reused_per_host_and_policy(self):
+        session = HttpSessionPool.get_session('https://kyc.example.com/v1/verify')
+        self.assertIs(HttpSessionPool.get_session('https://KYC.example.com/v1/status/42'), session)
+        self.assertIsNot(HttpSessionPool.get_session('https://bank.example.com/v1/verify'), session)
+        self.assertIsNot(HttpSessionPool.get_session('https://kyc.example.com/v1/verify', HttpPolicy(timeout=5)), session)
+        self.assertIs(HttpSessionPool.get_session('https://kyc.example.com/', HttpPolicy()), session,
+                      "Equal policies share the session.")
+
+    def test_connections_kept_alive(self):
+        for _call in range(3):
+            response = HttpSessionPool.request('GET', f'{self.base_url}/status')
+            self.assertEqual(response.status_code, 200)
+        stats = {entry['host']: entry for entry in HttpSessionPool.get_stats()}[self.base_url]
+        self.assertEqual((stats['requests'], stats['created'], stats['reused']), (3, 1, 2))
+        self.assertEqual(stats['pool_maxsize'], DEFAULT_POOL_MAXSIZE)
+
+    def test_policy_timeouts_applied(self):
+        policy = HttpPolicy(timeout=12, connect_timeout=3)
+        with patch('requests.Session.request') as session_request:
+            HttpSessionPool.request('get', 'https://kyc.example.com/v1/status', policy=policy)
+            HttpSessionPool.request('get', 'https://kyc.example.com/v1/status', policy=policy, timeout=60)
+        first, second = session_request.call_args_list
+        self.assertEqual(first.kwargs['method'], 'GET')
+        self.assertEqual(first.kwargs['timeout'], (3, 12))
+        self.assertEqual(second.kwargs['timeout'], 60, "An explicit timeout wins over the policy.")
+
+    def test_retries_only_replay_idempotent_requests(self):
+        policy = HttpPolicy(retries=1, backoff_factor=0)
+        self.server.statuses.extend([503])
+        response = HttpSessionPool.request('GET', f'{self.base_url}/status', policy=policy)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.requests, ['GET', 'GET'])
+
+        self.server.requests.clear()
+        self.server.statuses.extend([503])
+        response = HttpSessionPool.request('POST', f'{self.base_url}/verify', policy=policy, json={'id': 1})
+        self.assertEqual(response.status_code, 503, "A POST is never sent twice.")
+        self.assertEqual(self.server.requests, ['POST'])
+
+    def test_no_retries_by_default(self):
+        self.server.statuses.extend([503])
+        response = HttpSessionPool.request('GET', f'{self.base_url}/status')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.requests, ['GET'])
+
+
+@tagged('post_install', '-at_install')
+class TestHttpPolicySettings(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ICP = self.env['ir.config_parameter'].sudo()
+        self.Settings = self.env['influence_gen.integration.settings']
+
+    def test_defaults(self):
+        self.assertEqual(self.Settings.get_http_policy('unconfigured_service'), HttpPolicy())
+
+    def test_service_params_over_default_params_over_caller_defaults(self):
+        self.ICP.set_param('influence_gen.http.test_service.timeout', '12')
+        self.ICP.set_param('influence_gen.http.default.timeout', '45')
+        self.ICP.set_param('influence_gen.http.default.retries', '2')
+        policy = self.Settings.get_http_policy('test_service', timeout=90, pool_maxsize=4)
+        self.assertEqual(policy.timeout, 12.0)
+        self.assertEqual(policy.retries, 2)
+        self.assertEqual(policy.pool_maxsize, 4)
+        self.assertEqual(policy.connect_timeout, DEFAULT_CONNECT_TIMEOUT)
+        self.assertEqual(policy.requests_timeout, (DEFAULT_CONNECT_TIMEOUT, 12.0))
+
+    def test_invalid_value_falls_back(self):
+        self.ICP.set_param('influence_gen.http.test_service.retries', 'three')
+        self.assertEqual(self.Settings.get_http_policy('test_service', retries=1).retries, 1)
+
+    def test_policy_builds_pool_and_retry(self):
+        self.ICP.set_param('influence_gen.http.test_service.retries', '3')
+        self.ICP.set_param('influence_gen.http.test_service.pool_maxsize', '7')
+        policy = self.Settings.get_http_policy('test_service')
+        with patch.object(HttpSessionPool, '_sessions', {}), patch.object(HttpSessionPool, '_pid', os.getpid()):
+            adapter = HttpSessionPool.get_session('https://kyc.example.com/', policy).get_adapter('https://kyc.example.com/')
+            HttpSessionPool.close_all()
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertNotIn('POST', adapter.max_retries.allowed_methods)
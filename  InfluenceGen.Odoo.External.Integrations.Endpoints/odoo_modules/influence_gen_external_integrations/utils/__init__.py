@@ -1,2 +1,4 @@
 # -*- coding: utf-8 -*-
-from . import http_client_wrapper
\ No newline at end of file
+from . import http_session_pool
+from . import http_client_wrapper
+from . import circuit_breaker
\ No newline at end of file
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breaker and bulkhead policy of an external service, and the per-process
+helpers used by the 'influence_gen.integration.circuit_breaker' model.
+
+The breaker state itself lives in the database so every Odoo worker sees the
+same state; this module only keeps per-process memos of circuits known to be
+open, so calls to an open circuit fail without a database round trip, and of
+circuits known to be closed without failures, so healthy calls do not read the
+state at all. The closed memo is only trusted for CLOSED_MEMO_TTL seconds: a
+circuit opened by another worker is noticed within that delay.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60  # seconds
+DEFAULT_MAX_IN_FLIGHT = 10
+DEFAULT_SLOT_LEASE = 300  # seconds
+CLOSED_MEMO_TTL = 5  # seconds
+
+
+@dataclass(frozen=True)
+class CircuitPolicy:
+    """
+    Circuit breaker and bulkhead policy of a service (see IntegrationSettings.get_circuit_policy).
+
+    :param failure_threshold: consecutive failed calls opening the circuit
+    :param reset_timeout: seconds an open circuit fails fast before letting one probe call through
+    :param max_in_flight: calls in flight at once across all workers; 0 disables the bulkhead
+    :param slot_lease: seconds after which the bulkhead slot of a call that never returned
+                       (e.g. killed worker) is free again; longer than any call with its retries
+    """
+    failure_threshold: int = DEFAULT_FAILURE_THRESHOLD
+    reset_timeout: float = DEFAULT_RESET_TIMEOUT
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    slot_lease: float = DEFAULT_SLOT_LEASE
+
+
+DEFAULT_CIRCUIT_POLICY = CircuitPolicy()
+
+# {(dbname, service_key): epoch seconds until which the circuit is known to be open}
+_OPEN_UNTIL = {}
+# {(dbname, service_key): epoch seconds until which the circuit is trusted to be closed without failures}
+_HEALTHY_UNTIL = {}
+_MEMO_LOCK = threading.Lock()
+
+
+def remember_open(dbname: str, service_key: str, open_until: float):
+    with _MEMO_LOCK:
+        _OPEN_UNTIL[(dbname, service_key)] = open_until
+        _HEALTHY_UNTIL.pop((dbname, service_key), None)
+
+
+def forget_open(dbname: str, service_key: str):
+    with _MEMO_LOCK:
+        _OPEN_UNTIL.pop((dbname, service_key), None)
+
+
+def known_open_for(dbname: str, service_key: str) -> Optional[float]:
+    """Seconds the circuit is still known to be open in this process, or None."""
+    with _MEMO_LOCK:
+        open_until = _OPEN_UNTIL.get((dbname, service_key))
+    remaining = open_until - time.time() if open_until else 0
+    return remaining if remaining > 0 else None
+
+
+def remember_healthy(dbname: str, service_key: str):
+    with _MEMO_LOCK:
+        _HEALTHY_UNTIL[(dbname, service_key)] = time.time() + CLOSED_MEMO_TTL
+
+
+def forget_healthy(dbname: str, service_key: str):
+    with _MEMO_LOCK:
+        _HEALTHY_UNTIL.pop((dbname, service_key), None)
+
+
+def known_healthy(dbname: str, service_key: str) -> bool:
+    """True while the circuit is trusted to be closed without failures in this process."""
+    with _MEMO_LOCK:
+        healthy_until = _HEALTHY_UNTIL.get((dbname, service_key))
+    return bool(healthy_until and healthy_until > time.time())
@@ -4,15 +4,15 @@ import logging
 from typing import Dict, Any, Optional, List # List added for mask_sensitive_headers
 
 from odoo.addons.influence_gen_external_integrations.exceptions.common_exceptions import ApiCommunicationError
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import DEFAULT_POLICY, HttpPolicy, HttpSessionPool
 
 _logger = logging.getLogger(__name__)
 
-DEFAULT_TIMEOUT = 30  # seconds
-
 class HttpClientWrapper:
     """
     A wrapper for the requests library to standardize HTTP calls, headers, timeouts,
     and basic error handling for external API communications.
+    Requests go through the per-process pooled sessions of HttpSessionPool.
     """
 
     @staticmethod
@@ -21,7 +21,8 @@ class HttpClientWrapper:
                 data: Any = None, # requests data parameter for form-data etc.
                 timeout: Optional[int] = None, service_name: str = "ExternalService",
                 mask_sensitive_headers: Optional[List[str]] = None,
-                mask_sensitive_json_fields: Optional[List[str]] = None): # Parameter added as per SDS
+                mask_sensitive_json_fields: Optional[List[str]] = None, # Parameter added as per SDS
+                policy: Optional[HttpPolicy] = None):
         """
         Makes an HTTP request using the requests library.
 
@@ -31,14 +32,16 @@ class HttpClientWrapper:
         :param json_data: Dictionary to be sent as JSON in the request body
         :param params: Dictionary of URL parameters
         :param data: Dictionary, list of tuples, bytes, or file-like object to send in the body (for form-data)
-        :param timeout: Request timeout in seconds. Defaults to DEFAULT_TIMEOUT.
+        :param timeout: Request timeout in seconds. Defaults to the policy's (connect, read) timeouts.
         :param service_name: Name of the service being called (for logging/error context).
         :param mask_sensitive_headers: List of header keys whose values should be masked in logs.
         :param mask_sensitive_json_fields: List of JSON field keys whose values should be masked in logs (if body is logged).
+        :param policy: HttpPolicy of the service (timeouts, transport retries, pool size). Defaults to DEFAULT_POLICY.
         :return: requests.Response object
         :raises ApiCommunicationError: if the request fails due to network issues or returns an HTTP error status code (4xx or 5xx).
         """
-        effective_timeout = timeout if timeout is not None else DEFAULT_TIMEOUT
+        policy = policy or DEFAULT_POLICY
+        effective_timeout = timeout if timeout is not None else policy.requests_timeout
         effective_headers = headers.copy() if headers else {} # Use a copy to avoid modifying original
 
         # Common headers: ensure Content-Type for JSON, and a default Accept header.
@@ -73,9 +76,10 @@ class HttpClientWrapper:
         #     _logger.debug(f"Request data (form/other): Type {type(data)}") # Avoid logging raw form data directly
 
         try:
-            response = requests.request(
-                method=method.upper(),
-                url=url,
+            response = HttpSessionPool.request(
+                method,
+                url,
+                policy=policy,
                 headers=effective_headers,
                 json=json_data,
                 params=params,
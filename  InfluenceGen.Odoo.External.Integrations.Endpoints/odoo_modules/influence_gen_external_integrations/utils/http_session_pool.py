@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Per-process registry of pooled HTTP sessions shared by every InfluenceGen
+integration (external service clients, N8N and provider adapters, AI image
+downloads).
+
+One requests.Session is kept per (scheme, host, policy), so consecutive calls to
+the same service reuse kept-alive TCP/TLS connections instead of opening a new
+connection per call. Sessions are created lazily in each worker process and are
+never shared across a fork.
+"""
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30  # seconds, read timeout
+DEFAULT_CONNECT_TIMEOUT = 5  # seconds
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+@dataclass(frozen=True)
+class HttpPolicy:
+    """
+    Connection, timeout and retry policy of a service (see IntegrationSettings.get_http_policy).
+
+    :param timeout: read timeout in seconds
+    :param connect_timeout: connect timeout in seconds
+    :param retries: transport-level retries: connection errors for every method, 502/503/504
+                    responses for idempotent methods only
+    :param backoff_factor: urllib3 exponential backoff factor between retries
+    :param pool_maxsize: kept-alive connections per host
+    """
+    timeout: float = DEFAULT_TIMEOUT
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    retries: int = 0
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+
+    @property
+    def requests_timeout(self) -> Tuple[float, float]:
+        return (self.connect_timeout, self.timeout)
+
+
+DEFAULT_POLICY = HttpPolicy()
+
+
+class HttpSessionPool:
+    """
+    Registry of pooled sessions, keyed on (scheme, host, policy).
+    All methods are class methods: there is exactly one registry per process.
+    """
+
+    _sessions: Dict[tuple, requests.Session] = {}
+    _lock = threading.Lock()
+    _pid: Optional[int] = None
+
+    @classmethod
+    def get_session(cls, url: str, policy: Optional[HttpPolicy] = None) -> requests.Session:
+        """
+        Returns the pooled session for the host of `url` under `policy`, creating it on first use.
+        """
+        policy = policy or DEFAULT_POLICY
+        parts = urlsplit(url)
+        key = (parts.scheme.lower(), parts.netloc.lower(), policy)
+        with cls._lock:
+            if cls._pid != os.getpid():
+                # Forked worker: never reuse sockets opened by the parent process.
+                cls._sessions = {}
+                cls._pid = os.getpid()
+            session = cls._sessions.get(key)
+            if session is None:
+                session = cls._create_session(policy)
+                cls._sessions[key] = session
+                _logger.debug(f"Created pooled HTTP session for {parts.scheme}://{parts.netloc} ({policy}).")
+            return session
+
+    @classmethod
+    def _create_session(cls, policy: HttpPolicy) -> requests.Session:
+        retry = Retry(
+            total=policy.retries,
+            connect=policy.retries,
+            read=policy.retries,
+            status=policy.retries,
+            backoff_factor=policy.backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,  # never replays non-idempotent requests
+            raise_on_status=False,  # the last response is returned and handled by the caller
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=policy.pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @classmethod
+    def request(cls, method: str, url: str, policy: Optional[HttpPolicy] = None, **kwargs) -> requests.Response:
+        """
+        Sends a request through the pooled session of the host, with the policy's timeouts
+        unless `timeout` is given explicitly. Same keyword arguments as requests.request.
+        """
+        policy = policy or DEFAULT_POLICY
+        kwargs.setdefault('timeout', policy.requests_timeout)
+        return cls.get_session(url, policy).request(method=method.upper(), url=url, **kwargs)
+
+    @classmethod
+    def get_stats(cls) -> List[dict]:
+        """
+        Connection pool statistics per host, for monitoring:
+        in_use and idle connections, connections created, and requests served on a
+        reused connection. Counters are per process since the pools were created.
+        """
+        with cls._lock:
+            sessions = list(cls._sessions.items()) if cls._pid == os.getpid() else []
+        stats = []
+        for (scheme, host, policy), session in sessions:
+            entry = {
+                'host': f"{scheme}://{host}", 'pool_maxsize': policy.pool_maxsize,
+                'in_use': 0, 'idle': 0, 'created': 0, 'requests': 0, 'reused': 0,
+            }
+            adapter = session.get_adapter(f"{scheme}://{host}")
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None or pool.pool is None:
+                    continue
+                queued = list(pool.pool.queue)
+                entry['in_use'] += max(pool.pool.maxsize - len(queued), 0)
+                entry['idle'] += sum(1 for conn in queued if conn is not None)
+                entry['created'] += pool.num_connections
+                entry['requests'] += pool.num_requests
+            entry['reused'] = max(entry['requests'] - entry['created'], 0)
+            stats.append(entry)
+        return stats
+
+    @classmethod
+    def close_all(cls):
+        """Closes every pooled connection of the process (e.g. after a configuration change)."""
+        with cls._lock:
+            sessions, cls._sessions = cls._sessions, {}
+        for session in sessions.values():
+            session.close()
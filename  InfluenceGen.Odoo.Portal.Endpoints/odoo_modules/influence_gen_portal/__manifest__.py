@@ -17,7 +17,7 @@ Includes:
         'portal',
         'website',
         'mail',
-        'influence_gen_business_services', # Assumed name for REPO-IGBS-003
+        'influence_gen_services', # REPO-IGBS-003
     ],
     'data': [
         # 'security/ir.model.access.csv', # To be created if any custom portal models are needed here (unlikely, data models in business layer)
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 import logging
+from urllib.parse import urlencode
 from odoo import http, _, SUPERUSER_ID
 from odoo.http import request
-from odoo.addons.portal.controllers.portal import CustomerPortal, pager as portal_pager
+from odoo.addons.portal.controllers.portal import CustomerPortal
 from odoo.exceptions import UserError, AccessError
 from werkzeug.exceptions import Forbidden, NotFound
+from odoo.addons.influence_gen_services.services.campaign_discovery_service import CampaignDiscoveryService
 
 _logger = logging.getLogger(__name__)
 
@@ -22,51 +24,45 @@ class InfluenceGenPortalCampaign(http.Controller):
              raise Forbidden(_("Your KYC must be approved to participate in campaigns."))
         return influencer_profile
 
-    @http.route(['/my/campaigns', '/my/campaigns/page/<int:page>'], type='http', auth='user', website=True)
-    def campaign_discovery(self, page=1, search=None, sort_by=None, **kw):
+    @http.route(['/my/campaigns'], type='http', auth='user', website=True)
+    def campaign_discovery(self, search=None, sort_by=None, after=None, **kw):
         """
         Campaign Discovery page. Lists campaigns available for the influencer.
+        Pages are keyset-paginated: 'after' is the cursor of the last campaign of the previous page.
         """
         try:
             influencer_profile = self._get_influencer_profile_or_raise()
-            campaign_service = request.env['influence_gen.campaign.service'] # Specific campaign service
-
-            domain_params = {
-                'search': search,
-                'sort_by': sort_by,
-                'filters': kw # Pass all other query params as potential filters
-            }
-            
-            campaign_count = campaign_service.sudo(influencer_profile.user_id.id).get_discoverable_campaign_count(influencer_profile.id, domain_params)
-            
-            pager = portal_pager(
-                url="/my/campaigns",
-                url_args={'search': search, 'sort_by': sort_by, **kw},
-                total=campaign_count,
-                page=page,
-                step=self._items_per_page
-            )
-
-            campaigns = campaign_service.sudo(influencer_profile.user_id.id).get_discoverable_campaigns(
+            discovery_service = CampaignDiscoveryService(request.env(su=True))
+            # Page, total and next cursor come from a single indexed query.
+            result = discovery_service.search(
                 influencer_profile.id,
-                domain_params=domain_params,
+                search=search,
+                filters=kw, # Only the filters known to the service are applied
+                sort_by=sort_by,
                 limit=self._items_per_page,
-                offset=pager['offset']
+                after=after,
             )
-            # filter_options = campaign_service.get_campaign_filter_options() # For template
+            filter_options = discovery_service.get_filter_options()
         except Forbidden as e:
             return request.render("influence_gen_portal.portal_error_page", {'title': _("Access Denied"), 'message': str(e)})
         except Exception as e:
             _logger.error("Error fetching campaigns for user %s: %s", request.env.user.login, e)
             return request.render("influence_gen_portal.portal_error_page", {'title': _("Campaigns Load Error"), 'message': _("Could not load campaign list. Please try again later.")})
 
+        url_args = {key: value for key, value in dict(kw, search=search, sort_by=sort_by).items() if value}
+        next_url = False
+        if result['next_cursor']:
+            next_url = "/my/campaigns?%s" % urlencode(dict(url_args, after=result['next_cursor']))
         return request.render("influence_gen_portal.portal_campaign_discovery_list", {
-            'campaigns': campaigns,
-            'pager': pager,
+            'campaigns': result['campaigns'],
+            'campaign_total': result['total'],
+            'campaign_total_is_estimate': result['total_is_estimate'],
+            'next_url': next_url,
+            'first_page_url': after and "/my/campaigns?%s" % urlencode(url_args),
             'search': search,
             'sort_by': sort_by,
             'filter_args': kw,
-            # 'filter_options': filter_options,
+            'filter_options': filter_options,
             'page_name': 'campaigns',
             'influencer_profile': influencer_profile,
         })
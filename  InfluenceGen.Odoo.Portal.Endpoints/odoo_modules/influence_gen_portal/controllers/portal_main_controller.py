@@ -5,6 +5,7 @@ from odoo.http import request
 from odoo.addons.portal.controllers.portal import CustomerPortal
 from odoo.exceptions import UserError, AccessError
 from werkzeug.exceptions import Forbidden, NotFound
+from odoo.addons.influence_gen_services.services.performance_summary_service import PerformanceSummaryService
 
 _logger = logging.getLogger(__name__)
 
@@ -163,8 +164,8 @@ class InfluenceGenPortalMain(CustomerPortal):
         """
         try:
             influencer_profile = self._get_influencer_profile_or_raise()
-            business_service = request.env['influence_gen.business.service']
-            performance_data = business_service.sudo(influencer_profile.user_id.id).get_influencer_performance_data(influencer_profile.id)
+            # Totals come from the influencer's performance summary row, metrics from the campaign rollups.
+            performance_data = PerformanceSummaryService(request.env(su=True)).get_influencer_performance_data(influencer_profile.id)
         except Forbidden as e:
             return request.render("influence_gen_portal.portal_error_page", {'title': _("Access Denied"), 'message': str(e)})
         except Exception as e:
@@ -1,11 +1,15 @@
 /** @odoo-module */
 
-import { Component, useState, useRef, onWillStart, useEffect } from "@odoo/owl";
+import { Component, useState, useRef, onWillStart, onWillUnmount, useEffect } from "@odoo/owl";
 import { useService } from "@web/core/utils/hooks";
 import { _t } from "@web/core/l10n/translation";
 
-const POLLING_INTERVAL = 3000; // Poll status every 3 seconds
-const MAX_POLLING_ATTEMPTS = 60; // Stop polling after 3 minutes
+// Status updates are pushed on the bus; polling is only a fallback for missed notifications
+// (e.g. websocket unavailable), with an exponentially growing delay.
+const POLLING_INITIAL_DELAY = 5000; // First fallback check after 5 seconds
+const POLLING_MAX_DELAY = 60000; // Never wait more than 1 minute between checks
+const POLLING_BACKOFF_FACTOR = 2;
+const POLLING_TIMEOUT = 180000; // Give up after 3 minutes
 
 export class AIImageGeneratorComponent extends Component {
     setup() {
@@ -36,7 +40,9 @@ export class AIImageGeneratorComponent extends Component {
             savedPrompts: [],
             templatePrompts: [], // Admin defined
             activeRequestId: null,
-            pollingIntervalId: null,
+            pollingTimeoutId: null,
+            pollingDelay: POLLING_INITIAL_DELAY,
+            pollingStartedAt: null,
             pollingAttempts: 0,
         });
 
@@ -55,11 +61,15 @@ export class AIImageGeneratorComponent extends Component {
             await this._loadInitialData();
         });
 
-        // Effect to manage polling when activeRequestId changes
+        // Status changes of the user's requests are pushed by the backend on the bus
+        this._unsubscribeStatus = this.aiImageService.subscribeToGenerationStatus(this._onStatusNotification.bind(this));
+        onWillUnmount(() => this._unsubscribeStatus());
+
+        // Effect to manage the fallback polling when activeRequestId changes
         useEffect(() => {
-            if (this.state.activeRequestId && !this.state.pollingIntervalId) {
+            if (this.state.activeRequestId && !this.state.pollingTimeoutId) {
                 this._startPolling();
-            } else if (!this.state.activeRequestId && this.state.pollingIntervalId) {
+            } else if (!this.state.activeRequestId && this.state.pollingTimeoutId) {
                 this._stopPolling();
             }
              // Cleanup function to stop polling when component is unmounted or activeRequestId becomes null
@@ -158,27 +168,47 @@ export class AIImageGeneratorComponent extends Component {
     }
 
     /**
-     * Starts the polling process to check generation status.
+     * Handles a status notification pushed on the bus.
+     * Notifications for other requests (e.g. from another tab) are ignored.
+     * @param {Object} payload - {request_id, status, images, error_message, quota_status}
+     */
+    _onStatusNotification(payload) {
+         if (!payload || !this.state.activeRequestId || String(payload.request_id) !== String(this.state.activeRequestId)) {
+              return;
+         }
+         this._applyStatusResult(payload);
+    }
+
+    /**
+     * Starts the fallback polling, as a safety net for missed bus notifications.
      */
     _startPolling() {
-         if (this.state.pollingIntervalId) {
-              this._stopPolling(); // Ensure no duplicate intervals
+         if (this.state.pollingTimeoutId) {
+              this._stopPolling(); // Ensure no duplicate timers
          }
-          console.info("Starting polling for AI generation request:", this.state.activeRequestId);
+          console.info("Starting fallback polling for AI generation request:", this.state.activeRequestId);
          this.state.pollingAttempts = 0;
-         this.state.pollingIntervalId = setInterval(this._pollGenerationStatus.bind(this), POLLING_INTERVAL);
-          // Perform initial check immediately
-         this._pollGenerationStatus();
+         this.state.pollingDelay = POLLING_INITIAL_DELAY;
+         this.state.pollingStartedAt = Date.now();
+         this._schedulePoll();
+    }
+
+    /**
+     * Schedules the next status check and doubles the delay for the one after (capped).
+     */
+    _schedulePoll() {
+         this.state.pollingTimeoutId = setTimeout(this._pollGenerationStatus.bind(this), this.state.pollingDelay);
+         this.state.pollingDelay = Math.min(this.state.pollingDelay * POLLING_BACKOFF_FACTOR, POLLING_MAX_DELAY);
     }
 
     /**
      * Stops the polling process.
      */
     _stopPolling() {
-         if (this.state.pollingIntervalId) {
+         if (this.state.pollingTimeoutId) {
               console.info("Stopping polling for AI generation request:", this.state.activeRequestId);
-              clearInterval(this.state.pollingIntervalId);
-              this.state.pollingIntervalId = null;
+              clearTimeout(this.state.pollingTimeoutId);
+              this.state.pollingTimeoutId = null;
          }
           this.state.isLoading = false; // Generation finished (success/fail) or stopped
           // Do not reset activeRequestId here, it might be useful to show context if error occurred
@@ -199,36 +229,50 @@ export class AIImageGeneratorComponent extends Component {
           console.debug("Polling status for request", this.state.activeRequestId, "Attempt", this.state.pollingAttempts);
 
 
-         if (this.state.pollingAttempts > MAX_POLLING_ATTEMPTS) {
+         if (Date.now() - this.state.pollingStartedAt > POLLING_TIMEOUT) {
               this._handleGenerationError({ message: _t("Generation status check timed out.") });
               return;
          }
 
          try {
               const statusResult = await this.aiImageService.checkGenerationStatus(this.state.activeRequestId);
-
-              if (statusResult && statusResult.status) {
-                   if (statusResult.status === 'completed') {
-                        this._handleGenerationResult(statusResult);
-                   } else if (statusResult.status === 'failed') {
-                        this._handleGenerationError(statusResult);
-                   } else {
-                        // Status is 'processing' or other interim state, continue polling
-                         // Optional: Update UI with statusResult.progress if provided by backend
-                         // this.state.progress = statusResult.progress;
-                   }
-              } else if (statusResult && statusResult.error) {
-                  // If status result itself indicates an error
-                  this._handleGenerationError(statusResult);
-              } else {
-                   // Unexpected response structure, treat as error? Or log and continue?
-                   console.warn("Unexpected status response for request", this.state.activeRequestId, statusResult);
+              if (!this.state.pollingTimeoutId) {
+                   return; // Finished by a bus notification while this check was in flight
               }
-
+              this._applyStatusResult(statusResult);
          } catch (error) {
               // Handle polling error (e.g., network issues)
               console.error("Polling error for request", this.state.activeRequestId, error);
              this._handleGenerationError(error);
+             return;
+         }
+         // Still waiting: check again later
+         if (this.state.pollingTimeoutId) {
+              this._schedulePoll();
+         }
+    }
+
+    /**
+     * Applies a status result, whether pushed on the bus or fetched by the fallback poll.
+     * @param {Object} statusResult
+     */
+    _applyStatusResult(statusResult) {
+         if (statusResult && statusResult.status) {
+              if (statusResult.status === 'completed') {
+                   this._handleGenerationResult(statusResult);
+              } else if (['failed', 'cancelled'].includes(statusResult.status)) {
+                   this._handleGenerationError(statusResult);
+              } else {
+                   // Status is 'processing' or other interim state, keep waiting
+                    // Optional: Update UI with statusResult.progress if provided by backend
+                    // this.state.progress = statusResult.progress;
+              }
+         } else if (statusResult && statusResult.error) {
+             // If status result itself indicates an error
+             this._handleGenerationError(statusResult);
+         } else {
+              // Unexpected response structure, treat as error? Or log and continue?
+              console.warn("Unexpected status response for request", this.state.activeRequestId, statusResult);
          }
     }
 
@@ -4,6 +4,9 @@ import { Service } from "@web/core/webclient/service";
 // No direct useService here, it's a class to be instantiated by the registry
 // However, its methods will use the portalService which in turn uses core services.
 
+// Bus notification type sent by influence_gen.ai_image_generation_request on status changes.
+export const AI_STATUS_NOTIFICATION_TYPE = "influence_gen.ai_generation_status";
+
 class AiImageService extends Service {
      // The portalService dependency is injected by the service registry
      get portalService() {
@@ -30,6 +33,22 @@ class AiImageService extends Service {
         return this.portalService.rpc('/my/ai/generate/status', { request_id: requestId });
     }
 
+    /**
+     * Subscribes to the AI generation status notifications pushed on the user's bus channel
+     * by the backend whenever one of their requests changes status.
+     * @param {Function} callback - Called with the status payload ({request_id, status, images, error_message, quota_status}).
+     * @returns {Function} - Unsubscribe function.
+     */
+    subscribeToGenerationStatus(callback) {
+        const busService = this.env.services.bus_service;
+        if (!busService) {
+            return () => {};
+        }
+        busService.subscribe(AI_STATUS_NOTIFICATION_TYPE, callback);
+        busService.start();
+        return () => busService.unsubscribe(AI_STATUS_NOTIFICATION_TYPE, callback);
+    }
+
      /**
       * Fetches the list of available AI models.
       * @returns {Promise<Array<{id: any, name: string}>>} - Promise resolving with a list of available models.
@@ -61,7 +80,7 @@ class AiImageService extends Service {
 
 // Register the service
 export const aiImageService = {
-    dependencies: ["influence_gen_portal.services.portal"], // Declare dependency
+    dependencies: ["influence_gen_portal.services.portal", "bus_service"], // Declare dependencies
     start(env, { portalService }) { // Dependency is injected here
         const serviceInstance = new AiImageService(env);
         // Manually assign dependencies if not using setup() for services (older style)
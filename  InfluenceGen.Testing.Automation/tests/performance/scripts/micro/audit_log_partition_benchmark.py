@@ -0,0 +1,153 @@
+# Benchmark: admin dashboard audit log queries and retention on a plain vs. a monthly
+# range-partitioned audit log table.
+#
+# Needs a scratch PostgreSQL database (12+) and psycopg2 (an Odoo dependency):
+#   python " InfluenceGen.Testing.Automation/tests/performance/scripts/micro/audit_log_partition_benchmark.py" \
+#       --dsn "dbname=bench user=odoo" --rows 5000000 --months 24
+#
+# Everything is created in a throw-away schema that is dropped at the end. The partitioned
+# layout mirrors influence_gen.audit_log after its conversion (see AuditLog.init()).
+
+import argparse
+import statistics
+import time
+
+import psycopg2
+
+SCHEMA = 'bench_audit_log'
+
+COLUMNS = """
+    id bigint NOT NULL,
+    "timestamp" timestamp NOT NULL,
+    user_id integer,
+    event_type varchar NOT NULL,
+    target_model varchar,
+    target_res_id integer,
+    action varchar NOT NULL,
+    details_json text,
+    outcome varchar NOT NULL,
+    legal_hold_status boolean
+"""
+
+# Queries issued by the admin dashboards, with the time filters they use.
+DASHBOARD_QUERIES = {
+    'errors_last_24h': """
+        SELECT count(*) FROM {table}
+         WHERE event_type ILIKE '%%error%%' AND "timestamp" >= %(now)s - interval '1 day'
+    """,
+    'errors_last_30d': """
+        SELECT count(*) FROM {table}
+         WHERE event_type ILIKE '%%error%%' AND "timestamp" >= %(now)s - interval '30 days'
+    """,
+    'logins_today': """
+        SELECT count(*) FROM {table}
+         WHERE event_type = 'user.login' AND "timestamp" >= date_trunc('day', %(now)s)
+    """,
+    'latest_page': """
+        SELECT id FROM {table}
+         WHERE "timestamp" >= %(now)s - interval '7 days'
+      ORDER BY "timestamp" DESC, id DESC LIMIT 80
+    """,
+}
+
+EVENT_TYPES = ['influence_gen.campaign.write', 'influence_gen.content_submission.create', 'user.login',
+               'influence_gen.payment_record.write', 'influence_gen.kyc_data.write', 'retention.delete.error',
+               'n8n.callback.error', 'influence_gen.generated_image.create']
+
+
+def add_months(month_start, months):
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1)
+
+
+def setup(cur, rows, months):
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))")
+    cur.execute(f'CREATE TABLE {SCHEMA}.part ({COLUMNS}, PRIMARY KEY (id, "timestamp")) PARTITION BY RANGE ("timestamp")')
+    cur.execute(f"CREATE TABLE {SCHEMA}.part_pdefault PARTITION OF {SCHEMA}.part DEFAULT")
+    cur.execute("SELECT date_trunc('month', now())::timestamp")
+    current_month = cur.fetchone()[0]
+    for offset in range(-months, 2):
+        month = add_months(current_month, offset)
+        cur.execute(f"CREATE TABLE {SCHEMA}.part_p{month:%Y%m} PARTITION OF {SCHEMA}.part "
+                    f"FOR VALUES FROM (%s) TO (%s)", [month, add_months(month, 1)])
+
+    event_types = "ARRAY[%s]" % ", ".join(f"'{event_type}'" for event_type in EVENT_TYPES)
+    cur.execute(f"""
+        INSERT INTO {SCHEMA}.plain
+        SELECT g,
+               now()::timestamp - (random() * interval '{months} months'),
+               (random() * 500)::int,
+               ({event_types})[1 + (random() * {len(EVENT_TYPES) - 1})::int],
+               'influence_gen.campaign', (random() * 100000)::int, 'write',
+               '{{"updated_values": {{"status": "active"}}}}', 'success', false
+          FROM generate_series(1, %s) g
+    """, [rows])
+    cur.execute(f"INSERT INTO {SCHEMA}.part SELECT * FROM {SCHEMA}.plain")
+    for table in ('plain', 'part'):
+        cur.execute(f'CREATE INDEX ON {SCHEMA}.{table} ("timestamp")')
+        cur.execute(f"CREATE INDEX ON {SCHEMA}.{table} (event_type)")
+        cur.execute(f"ANALYZE {SCHEMA}.{table}")
+    return current_month
+
+
+def time_query(cur, query, params, repeat):
+    samples = []
+    for _i in range(repeat):
+        start = time.perf_counter()
+        cur.execute(query, params)
+        cur.fetchall()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def time_retention(conn, cur, current_month, months):
+    """Expires the oldest month: row DELETE on the plain table vs. DROP of one partition (rolled back)."""
+    oldest_month = add_months(current_month, -months)
+    start = time.perf_counter()
+    cur.execute(f'DELETE FROM {SCHEMA}.plain WHERE "timestamp" < %s::timestamp + interval \'1 month\'', [oldest_month])
+    delete_seconds = time.perf_counter() - start
+    conn.rollback()
+    start = time.perf_counter()
+    cur.execute(f"DROP TABLE {SCHEMA}.part_p{oldest_month:%Y%m}")
+    drop_seconds = time.perf_counter() - start
+    conn.rollback()
+    return delete_seconds, drop_seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit log partitioning benchmark")
+    parser.add_argument('--dsn', required=True, help="libpq connection string of a scratch database")
+    parser.add_argument('--rows', type=int, default=2000000, help="Audit log rows to generate")
+    parser.add_argument('--months', type=int, default=24, help="Months of history to spread rows over")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per query (median reported)")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        cur = conn.cursor()
+        print(f"Loading {args.rows} rows over {args.months} months...")
+        current_month = setup(cur, args.rows, args.months)
+        conn.commit()
+        cur.execute("SELECT now()::timestamp")
+        params = {'now': cur.fetchone()[0]}
+
+        print(f"{'query':<20}{'plain (ms)':>14}{'partitioned (ms)':>20}{'speed-up':>12}")
+        for name, query in DASHBOARD_QUERIES.items():
+            plain = time_query(cur, query.format(table=f"{SCHEMA}.plain"), params, args.repeat)
+            part = time_query(cur, query.format(table=f"{SCHEMA}.part"), params, args.repeat)
+            print(f"{name:<20}{plain * 1000:>14.1f}{part * 1000:>20.1f}{plain / part:>11.1f}x")
+
+        delete_seconds, drop_seconds = time_retention(conn, cur, current_month, args.months)
+        print(f"{'expire oldest month':<20}{delete_seconds * 1000:>14.1f}{drop_seconds * 1000:>20.1f}"
+              f"{delete_seconds / drop_seconds:>11.1f}x")
+    finally:
+        conn.rollback()
+        conn.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
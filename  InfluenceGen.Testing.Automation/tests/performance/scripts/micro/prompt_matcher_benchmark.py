@@ -0,0 +1,69 @@
+# Micro-benchmark: compiled prompt denylist matcher vs. the previous linear keyword scan.
+#
+# Run from the repository root:
+#   python " InfluenceGen.Testing.Automation/tests/performance/scripts/micro/prompt_matcher_benchmark.py" --keywords 5000
+#
+# The matcher module has no Odoo dependency, so it is loaded directly from the
+# influence_gen_shared_core addon source without an Odoo environment.
+
+import argparse
+import importlib.util
+import random
+import string
+import timeit
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[5]
+MATCHER_PATH = (REPO_ROOT / 'InfluenceGen.Odoo.Shared.CoreUtilities' / 'odoo_modules'
+                / 'influence_gen_shared_core' / 'utils' / 'prompt_matcher.py')
+
+
+def load_matcher_module():
+    spec = importlib.util.spec_from_file_location('prompt_matcher', MATCHER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def linear_scan(denylist_keywords, prompt_text):
+    """The pre-automaton implementation of AiIntegrationService.validate_ai_prompt."""
+    for keyword in denylist_keywords:
+        if keyword.lower() in prompt_text.lower():
+            return keyword
+    return None
+
+
+def random_word(rng, min_len=4, max_len=12):
+    return ''.join(rng.choice(string.ascii_lowercase) for _i in range(rng.randint(min_len, max_len)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt denylist matcher micro-benchmark")
+    parser.add_argument('--keywords', type=int, default=5000, help="Denylist size")
+    parser.add_argument('--prompt-words', type=int, default=60, help="Words per prompt")
+    parser.add_argument('--iterations', type=int, default=200, help="Prompts validated per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    prompt_matcher = load_matcher_module()
+    denylist = [random_word(rng) + ' ' + random_word(rng) for _i in range(args.keywords)]
+    clean_prompt = ' '.join(random_word(rng, 3, 9) for _i in range(args.prompt_words))
+
+    build_seconds = timeit.timeit(lambda: prompt_matcher.KeywordMatcher(denylist), number=1)
+    matcher = prompt_matcher.KeywordMatcher(denylist)
+
+    # Clean prompts are the common case and the worst case for the linear scan.
+    linear_seconds = timeit.timeit(lambda: linear_scan(denylist, clean_prompt), number=args.iterations)
+    automaton_seconds = timeit.timeit(lambda: matcher.find_all(clean_prompt), number=args.iterations)
+    assert linear_scan(denylist, clean_prompt) is None and not matcher.find_all(clean_prompt)
+
+    print(f"denylist keywords:        {args.keywords}")
+    print(f"prompt length (chars):    {len(clean_prompt)}")
+    print(f"automaton build (once):   {build_seconds * 1000:.1f} ms")
+    print(f"linear scan per prompt:   {linear_seconds / args.iterations * 1e6:.1f} us")
+    print(f"automaton per prompt:     {automaton_seconds / args.iterations * 1e6:.1f} us")
+    print(f"speed-up:                 {linear_seconds / automaton_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+# The matcher has no Odoo dependency: it is loaded straight from the addon source.
+REPO_ROOT = Path(__file__).resolve().parents[5]
+MATCHER_PATH = (REPO_ROOT / 'InfluenceGen.Odoo.Shared.CoreUtilities' / 'odoo_modules'
+                / 'influence_gen_shared_core' / 'utils' / 'prompt_matcher.py')
+
+
+def load_matcher_module():
+    spec = importlib.util.spec_from_file_location('prompt_matcher', MATCHER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+prompt_matcher = load_matcher_module()
+KeywordMatcher = prompt_matcher.KeywordMatcher
+
+
+@pytest.mark.unit
+def test_normalize_text_folds_case_accents_width_and_whitespace():
+    """
+    Tests that prompts and keywords are compared on a normalized form.
+    Requirement REQ-AIGS-003
+    """
+    assert prompt_matcher.normalize_text("  Ｖｉｏｌｅｎｃｅ\tAND   Gore ") == "violence and gore"
+    assert prompt_matcher.normalize_text("Café NAÏVE") == "cafe naive"
+
+
+@pytest.mark.unit
+def test_find_all_reports_every_hit_in_order():
+    matcher = KeywordMatcher(['gore', 'violence', 'blood'])
+
+    matches = matcher.find_all("Blood and VIOLENCE, more blood")
+
+    assert [match.keyword for match in matches] == ['blood', 'violence', 'blood']
+    assert (matches[0].start, matches[0].end) == (0, 5)
+
+
+@pytest.mark.unit
+def test_overlapping_and_nested_keywords_are_all_found():
+    matcher = KeywordMatcher(['he', 'she', 'his', 'hers'])
+
+    assert sorted(match.keyword for match in matcher.find_all("ushers")) == ['he', 'hers', 'she']
+
+
+@pytest.mark.unit
+def test_keywords_keep_their_configured_spelling():
+    matcher = KeywordMatcher(['Gore', 'gore ', 'GORE'])
+
+    assert len(matcher) == 1
+    assert matcher.first_match("so much gore").keyword == 'Gore'
+
+
+@pytest.mark.unit
+def test_word_boundary_ignores_hits_inside_words():
+    """
+    Tests that whole-word matching does not flag innocent words containing a keyword.
+    Requirement REQ-AIGS-003
+    """
+    substring_matcher = KeywordMatcher(['ass'])
+    word_matcher = KeywordMatcher(['ass'], word_boundary=True)
+
+    assert substring_matcher.first_match("a classic pose") is not None
+    assert word_matcher.first_match("a classic pose") is None
+    assert word_matcher.first_match("kick ass!").keyword == 'ass'
+
+
+@pytest.mark.unit
+def test_multi_word_keyword_matches_across_whitespace_runs():
+    matcher = KeywordMatcher(['hate speech'], word_boundary=True)
+
+    assert matcher.first_match("no HATE \n speech here") is not None
+    assert matcher.first_match("no hatespeech here") is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('keywords, text', [
+    ([], "anything"),
+    (['', '   ', None, 42], "anything"),
+    (['gore'], ""),
+    (['gore'], None),
+])
+def test_empty_denylist_or_prompt_has_no_match(keywords, text):
+    matcher = KeywordMatcher(keywords)
+
+    assert matcher.find_all(text) == []
+    assert matcher.first_match(text) is None
@@ -38,12 +38,15 @@
         'views/platform_config_settings_views.xml',
         'views/user_management_views.xml', # Extensions to Odoo user/group views
         'views/kyc_submission_views.xml',
+        'views/influencer_duplicate_candidate_views.xml',
         'views/campaign_management_views.xml', # Covers campaign, application, submission admin views
         'views/ai_model_config_views.xml',
         'views/ai_usage_tracking_views.xml',
         'views/payment_management_views.xml',
         'views/legal_document_version_views.xml',
         'views/maintenance_window_views.xml',
+        'views/broadcast_notification_views.xml',
+        'views/data_quality_issue_views.xml',
         'views/legal_hold_management_views.xml',
         'views/audit_log_viewer_views.xml',
         'views/system_health_dashboard_views.xml', # Placeholder, may need controller
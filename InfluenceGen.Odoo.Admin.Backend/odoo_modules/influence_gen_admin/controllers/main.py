@@ -4,6 +4,8 @@ import logging
 from odoo import http
 from odoo.http import request
 from odoo.exceptions import AccessError
+from odoo.addons.influence_gen_services.services.dashboard_metrics_service import DashboardMetricsService
+from odoo.addons.influence_gen_services.services.performance_summary_service import PerformanceSummaryService
 
 _logger = logging.getLogger(__name__)
 
@@ -14,6 +16,18 @@ class InfluenceGenAdminController(http.Controller):
         if not request.env.user.has_group('influence_gen_admin.group_influence_gen_platform_admin'):
             raise AccessError("Access denied. You must be a Platform Administrator to perform this action.")
 
+    def _get_integration_health(self):
+        """
+        Circuit breaker state of each external service (shared by all workers) and the HTTP
+        connection pools of this worker. Empty if the external integrations module is not installed.
+        """
+        if 'influence_gen.integration.circuit_breaker' not in request.env:
+            return {}
+        return {
+            'circuit_breakers': request.env['influence_gen.integration.circuit_breaker'].sudo().get_status(),
+            'http_pools': request.env['influence_gen.integration.settings'].sudo().get_http_pool_stats(),
+        }
+
     @http.route('/influence_gen/admin/system_health_data', type='json', auth='user', methods=['POST'], csrf=False)
     def get_system_health_data(self, **kwargs):
         """
@@ -60,8 +74,11 @@ class InfluenceGenAdminController(http.Controller):
                 'n8n_cpu_usage_percentage': 20, # If monitored
                 'n8n_memory_usage_percentage': 40, # If monitored
             },
+            'integrations': self._get_integration_health(),
             'last_updated': http.request.env['ir.fields.datetime'].now().isoformat(),
         }
+        if any(breaker['state'] != 'closed' for breaker in health_data['integrations'].get('circuit_breakers', [])):
+            health_data['api_status']['overall'] = 'degraded'
 
         # Simulate fetching or error
         # if some_condition_fails:
@@ -85,60 +102,33 @@ class InfluenceGenAdminController(http.Controller):
             _logger.error(f"Error checking admin access in get_admin_performance_dashboard_data: {e}")
             return {'error': 'Internal server error during access check.', 'status': 'error'}
 
-        # Placeholder logic for fetching data.
-        # In a real application, you would query models like:
-        # - influence_gen.campaign
-        # - influence_gen.campaign_application
-        # - influence_gen.content_submission
-        # - influence_gen.payment_record
-        # - A Materialized View like 'CampaignPerformanceMV' if it exists and is defined in Odoo.
-        
-        # Example: Number of active campaigns
-        active_campaigns = request.env['influence_gen.campaign'].search_count([
-            ('status', 'in', ['published', 'open_for_applications', 'in_execution'])
-        ])
-        
-        # Example: Total budget of active campaigns
-        active_campaigns_records = request.env['influence_gen.campaign'].search([
-            ('status', 'in', ['published', 'open_for_applications', 'in_execution'])
-        ])
-        total_budget_active = sum(active_campaigns_records.mapped('budget'))
-        
-        # Example: Total influencers registered (assuming a way to count them, e.g., from influencer_profile)
-        total_influencers = request.env['influence_gen.influencer_profile'].search_count([('active','=',True)]) # or based on kyc_status etc.
-
-        # Example: Pending KYC submissions
-        pending_kyc = request.env['influence_gen.kyc_data'].search_count([('verification_status', '=', 'pending')])
-
-        # Example: Campaign status distribution
-        campaign_statuses = request.env['influence_gen.campaign'].read_group(
-            domain=[],
-            fields=['status'],
-            groupby=['status']
-        )
-        campaign_status_data = {item['status']: item['status_count'] for item in campaign_statuses}
-
+        # All counters come from one aggregate query, cached for a short TTL and shared
+        # across admin sessions (see DashboardMetricsService in influence_gen_services).
+        metrics = DashboardMetricsService(request.env).get_admin_metrics()
 
         dashboard_data = {
             'key_metrics': {
-                'active_campaigns': active_campaigns,
-                'total_budget_active_campaigns': total_budget_active,
-                'total_influencers': total_influencers,
-                'pending_kyc_submissions': pending_kyc,
+                'active_campaigns': metrics['active_campaigns'],
+                'total_budget_active_campaigns': metrics['total_budget_active_campaigns'],
+                'total_influencers': metrics['active_influencers'],
+                'pending_kyc_submissions': metrics['pending_kyc_submissions'],
+                'pending_applications': metrics['pending_applications'],
             },
             'campaign_summary': {
-                'status_distribution': campaign_status_data,
-                # Add more like: campaigns_by_type, top_performing_campaigns (placeholder)
+                'status_distribution': metrics['campaigns_by_status'],
+                # One indexed read of the campaign performance summaries.
+                'top_performing_campaigns': PerformanceSummaryService(request.env).get_top_campaigns(),
             },
             'influencer_activity': {
                 'new_signups_last_30d': 0, # Placeholder
-                'active_influencers_in_campaigns': 0, # Placeholder
+                'active_influencers_in_campaigns': metrics['influencers_in_campaigns'],
             },
             'financial_overview': {
-                'total_payouts_pending': 0.0, # Placeholder, sum from payment_record
+                'total_payouts_pending': metrics['payments_outstanding_amount'],
+                'total_paid': metrics['payments_paid_amount'],
                 'total_paid_last_30d': 0.0, # Placeholder
             },
-            'last_updated': http.request.env['ir.fields.datetime'].now().isoformat(),
+            'last_updated': metrics['computed_at'],
         }
         
         _logger.info("Admin performance dashboard data requested.")
@@ -1,6 +1,8 @@
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 
+from odoo.addons.influence_gen_services.services.legal_hold_propagation_service import LegalHoldPropagationService
+
 class LegalHold(models.Model):
     _name = 'influence_gen.legal_hold'
     _description = 'InfluenceGen Legal Hold'
@@ -69,6 +71,75 @@ class LegalHold(models.Model):
         readonly=True,
         copy=False
     )
+    held_record_count = fields.Integer(
+        string='Held Records',
+        compute='_compute_held_record_count',
+        help="Records covered by this hold: its targets and all their related data."
+    )
+
+    _HOLD_TARGET_FIELDS = ('target_model_id', 'target_record_id', 'target_influencer_id', 'target_campaign_id')
+
+    def _compute_held_record_count(self):
+        counts = LegalHoldPropagationService(self.env).get_member_counts(
+            [hold._get_hold_ref() for hold in self if hold.id])
+        for hold in self:
+            hold.held_record_count = counts.get(hold._get_hold_ref(), 0) if hold.id else 0
+
+    def _get_hold_ref(self):
+        self.ensure_one()
+        return f"{self._name},{self.id}"
+
+    def _get_hold_targets(self):
+        """:return: (model name, domain) pairs of the records held directly"""
+        self.ensure_one()
+        targets = []
+        if self.target_record_id:
+            targets.append((self.target_record_id._name, [('id', '=', self.target_record_id.id)]))
+        elif self.target_model_id:
+            # A model without a specific record: the whole model is held.
+            targets.append((self.target_model_id.model, []))
+        if self.target_influencer_id:
+            targets.append(('influence_gen.influencer_profile', [('id', '=', self.target_influencer_id.id)]))
+        if self.target_campaign_id:
+            targets.append(('influence_gen.campaign', [('id', '=', self.target_campaign_id.id)]))
+        return targets
+
+    def _apply_hold(self):
+        """Places the active holds on their targets and all the related data."""
+        service = LegalHoldPropagationService(self.env)
+        for hold in self.filtered(lambda h: h.status == 'active'):
+            service.place(hold._get_hold_ref(), hold._get_hold_targets(), reason=hold.name, user_id=self.env.uid)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        holds = super().create(vals_list)
+        holds._apply_hold()
+        return holds
+
+    def write(self, vals):
+        # Status changes place or release the membership, whichever way the status is written.
+        to_lift = self.filtered(lambda h: h.status == 'active') if vals.get('status') == 'lifted' else self.browse()
+        to_place = self.filtered(lambda h: h.status == 'lifted') if vals.get('status') == 'active' else self.browse()
+        res = super().write(vals)
+        service = LegalHoldPropagationService(self.env)
+        if to_lift:
+            # One statement for all the holds, however many are lifted at once.
+            service.lift([hold._get_hold_ref() for hold in to_lift], reason=', '.join(to_lift.mapped('name')),
+                         user_id=self.env.uid)
+        to_place._apply_hold()
+        if any(field_name in vals for field_name in self._HOLD_TARGET_FIELDS):
+            # Targets changed: rebuild the membership of the active holds.
+            active_holds = self.filtered(lambda h: h.status == 'active') - to_place
+            if active_holds:
+                service.lift([hold._get_hold_ref() for hold in active_holds], reason=_("Hold targets changed"))
+                active_holds._apply_hold()
+        return res
+
+    @api.ondelete(at_uninstall=False)
+    def _unlink_except_active(self):
+        # Deleting an active hold would silently release everything it covers.
+        if any(hold.status == 'active' for hold in self):
+            raise UserError(_("Active legal holds cannot be deleted. Lift them first."))
 
     @api.onchange('target_model_id')
     def _onchange_target_model_id(self):
@@ -80,14 +151,16 @@ class LegalHold(models.Model):
         for record in self:
             if record.status != 'active':
                 raise UserError(_("Legal hold '%s' is not active and cannot be lifted.") % record.name)
-            
-            record.write({
-                'status': 'lifted',
-                'lifted_date': fields.Date.today(),
-                'lifted_by_id': self.env.user.id
-            })
+
+        # Writing the status releases the records covered by the holds, all of them at once.
+        self.write({
+            'status': 'lifted',
+            'lifted_date': fields.Date.today(),
+            'lifted_by_id': self.env.user.id
+        })
+        for record in self:
             record.message_post(body=_("Legal hold lifted by %s.") % self.env.user.name)
-            
+
             # Placeholder: Audit log entry should be created by the audit log service
             # self.env['influence_gen.audit_log'].sudo().create_log_entry(
             #     actor_user_id=self.env.user.id,
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests.common import tagged
+from odoo.addons.influence_gen_services.services.legal_hold_propagation_service import LegalHoldPropagationService
+from odoo.addons.influence_gen_services.tests.common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestLegalHold(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.LegalHold = self.env['influence_gen.legal_hold']
+        self.first = self._create_influencer('First Influencer')
+        self.second = self._create_influencer('Second Influencer')
+        self.campaign = self._create_campaign()
+        self.first_payment = self._create_payment(self.first, self.campaign, 100.0)
+        self.second_payment = self._create_payment(self.second, self.campaign, 100.0)
+
+    def _create_hold(self, influencer, name='Case 42'):
+        return self.LegalHold.create({
+            'name': name,
+            'description': 'Pending litigation',
+            'target_influencer_id': influencer.id,
+        })
+
+    def test_hold_covers_target_and_related_data(self):
+        hold = self._create_hold(self.first)
+        self.assertTrue(self.first.legal_hold_status)
+        self.assertTrue(self.first_payment.legal_hold_status)
+        self.assertFalse(self.second_payment.legal_hold_status)
+        self.assertEqual(hold.held_record_count, 2)
+
+    def test_target_change_moves_the_hold(self):
+        hold = self._create_hold(self.first)
+        hold.write({'target_influencer_id': self.second.id})
+        self.assertFalse(self.first.legal_hold_status)
+        self.assertFalse(self.first_payment.legal_hold_status)
+        self.assertTrue(self.second.legal_hold_status)
+        self.assertTrue(self.second_payment.legal_hold_status)
+
+    def test_lift_and_place_again(self):
+        hold = self._create_hold(self.first)
+        hold.write({'status': 'lifted'})
+        self.assertFalse(self.first_payment.legal_hold_status)
+        self.assertEqual(hold.held_record_count, 0)
+        hold.write({'status': 'active'})
+        self.assertTrue(self.first_payment.legal_hold_status)
+
+    def test_holds_lifted_together_in_one_call(self):
+        holds = self._create_hold(self.first, 'Case 1') | self._create_hold(self.second, 'Case 2')
+        with patch.object(LegalHoldPropagationService, 'lift', autospec=True,
+                          side_effect=LegalHoldPropagationService.lift) as lift:
+            holds.write({'status': 'lifted'})
+        self.assertEqual(lift.call_count, 1)
+        self.assertCountEqual(lift.call_args.args[1], [hold._get_hold_ref() for hold in holds])
+        self.assertFalse(self.first_payment.legal_hold_status)
+        self.assertFalse(self.second_payment.legal_hold_status)
+
+    def test_record_held_twice_stays_held(self):
+        self._create_hold(self.first, 'Case 1')
+        second_hold = self._create_hold(self.first, 'Case 2')
+        second_hold.write({'status': 'lifted'})
+        self.assertTrue(self.first_payment.legal_hold_status)
+
+    def test_active_hold_cannot_be_deleted(self):
+        hold = self._create_hold(self.first)
+        with self.assertRaises(UserError):
+            hold.unlink()
+        self.assertTrue(self.first_payment.legal_hold_status)
+        hold.write({'status': 'lifted'})
+        hold.unlink()
+        self.assertFalse(hold.exists())
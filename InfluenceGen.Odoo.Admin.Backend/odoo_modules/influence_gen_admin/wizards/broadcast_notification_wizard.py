@@ -2,6 +2,8 @@ from odoo import api, fields, models, _
 from odoo.exceptions import UserError
 import logging
 
+from odoo.addons.influence_gen_services.services.broadcast_notification_service import BroadcastNotificationService
+
 _logger = logging.getLogger(__name__)
 
 class BroadcastNotificationWizard(models.TransientModel):
@@ -27,64 +29,17 @@ class BroadcastNotificationWizard(models.TransientModel):
 
     def action_send_notification(self):
         self.ensure_one()
-        target_partners = self.env['res.partner']
-        target_user_emails = set()
-
-        if self.target_influencer_ids:
-            # Assuming influencer_profile has a partner_id or user_id.partner_id
-            for influencer in self.target_influencer_ids:
-                if hasattr(influencer, 'user_id') and influencer.user_id.partner_id:
-                    target_partners |= influencer.user_id.partner_id
-                    if influencer.user_id.partner_id.email:
-                         target_user_emails.add(influencer.user_id.partner_id.email_normalized)
-                elif hasattr(influencer, 'partner_id'): # Fallback if direct partner_id
-                     target_partners |= influencer.partner_id
-                     if influencer.partner_id.email:
-                         target_user_emails.add(influencer.partner_id.email_normalized)
-
-
-        if self.target_user_group_ids:
-            for group in self.target_user_group_ids:
-                for user in group.users:
-                    if user.partner_id:
-                        target_partners |= user.partner_id
-                        if user.partner_id.email:
-                            target_user_emails.add(user.partner_id.email_normalized)
-        
-        if not self.target_influencer_ids and not self.target_user_group_ids:
-            # Target all active internal and portal users
-            all_users = self.env['res.users'].search([('active', '=', True)])
-            for user in all_users:
-                 if user.partner_id:
-                    target_partners |= user.partner_id
-                    if user.partner_id.email:
-                        target_user_emails.add(user.partner_id.email_normalized)
-
-
-        if not target_partners and not target_user_emails:
-            raise UserError(_("No recipients found for this notification."))
-
+        broadcast = False
         if self.send_email:
-            if not target_user_emails: # or check target_partners with email
-                _logger.warning("Broadcast notification: No valid email addresses found for selected recipients.")
-            else:
-                # Using mail.mail to send individual emails
-                # For mass mailing, consider using 'mailing.mailing' model if available and suitable
-                # This ensures individual emails are sent, which is better for privacy and tracking
-                mail_obj = self.env['mail.mail']
-                for partner in target_partners:
-                    if partner.email:
-                        mail_values = {
-                            'subject': self.message_subject,
-                            'body_html': self.message_body,
-                            'email_to': partner.email_formatted,
-                            'auto_delete': True, # Delete mail.mail record after sending
-                            'state': 'outgoing', # Set to outgoing to be picked by cron
-                        }
-                        mail_id = mail_obj.create(mail_values)
-                        # mail_id.send() # Optionally send immediately, or let cron handle
-                _logger.info(f"Broadcast email notifications queued for {len(target_partners)} partners.")
-
+            # Recipients are resolved and deduplicated in the database; emails are sent in the background.
+            broadcast = BroadcastNotificationService(self.env).create_broadcast(
+                self.message_subject,
+                self.message_body,
+                group_ids=self.target_user_group_ids.ids,
+                influencer_ids=self.target_influencer_ids.ids,
+            )
+            if not broadcast.recipient_count:
+                raise UserError(_("No recipients with an email address found for this notification."))
 
         if self.show_in_app_banner_duration_hours > 0:
             # Placeholder: Logic to create in-app banner records
@@ -111,15 +66,6 @@ class BroadcastNotificationWizard(models.TransientModel):
             pass
 
 
-        # Log the broadcast action
-        self.env['mail.message'].create({
-            'model': self._name, # or a central log model
-            'res_id': self.id, # For transient model, this might not be ideal. Could log on a config model or custom log.
-            'body': _('Broadcast notification sent: "%s" to selected targets.', self.message_subject),
-            'message_type': 'comment',
-            'subtype_id': self.env.ref('mail.mt_note').id,
-        })
-        
         # Optionally create an audit log entry
         # self.env['influence_gen.audit_log'].sudo().create_log_entry(
         #     actor_user_id=self.env.user.id,
@@ -135,4 +81,13 @@ class BroadcastNotificationWizard(models.TransientModel):
         #     }
         # )
 
+        if broadcast:
+            # Follow the sending progress on the broadcast itself.
+            return {
+                'type': 'ir.actions.act_window',
+                'res_model': 'influence_gen.broadcast_notification',
+                'res_id': broadcast.id,
+                'view_mode': 'form',
+                'target': 'current',
+            }
         return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file
@@ -11,6 +11,8 @@
         'mail',       # For mail.thread, mail.activity.mixin, mail.template
         'account',    # For integration with accounting (vendor bills, payments)
         'iap',        # If any Odoo IAP services are planned for use (e.g., for 3rd party integrations)
+        'influence_gen_external_integrations', # KYC provider client used by the verification queue
+        'influence_gen_shared_core', # REPO-IGSCU-007: normalize_social_media_handle for duplicate detection
     ],
     'data': [
         # Security files
@@ -2,6 +2,7 @@ from . import base_audit_mixin
 from . import influencer_profile
 from . import area_of_influence
 from . import social_media_profile
+from . import influencer_duplicate_candidate
 from . import kyc_data
 from . import bank_account
 from . import terms_consent
@@ -9,11 +10,20 @@ from . import campaign
 from . import campaign_kpi
 from . import campaign_application
 from . import content_submission
+from . import campaign_performance_rollup
 from . import content_feedback_log
 from . import ai_image_model
 from . import ai_image_generation_request
+from . import ai_quota_ledger
+from . import n8n_callback_ledger
+from . import n8n_dispatch_outbox
 from . import generated_image
 from . import payment_record
+from . import campaign_performance_summary
+from . import influencer_performance_summary
+from . import broadcast_notification
+from . import data_quality_issue
+from . import legal_hold_index
 from . import audit_log
 from . import usage_tracking_log
 from . import platform_setting
\ No newline at end of file
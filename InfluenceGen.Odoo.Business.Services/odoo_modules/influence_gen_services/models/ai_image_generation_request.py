@@ -5,6 +5,9 @@ import json
 
 _logger = logging.getLogger(__name__)
 
+# Bus notification type carrying status changes to the requesting user's portal.
+AI_STATUS_NOTIFICATION_TYPE = 'influence_gen.ai_generation_status'
+
 class AiImageGenerationRequest(models.Model):
     """
     Represents a single request made by a user to generate an AI image.
@@ -146,6 +149,24 @@ class AiImageGenerationRequest(models.Model):
         tracking=True,
         help="How many images are expected from this request."
     )
+    quota_period_start = fields.Date(
+        string='Quota Period',
+        readonly=True,
+        copy=False,
+        help="Quota ledger period the reservation for this request was booked on."
+    )
+    quota_units_reserved = fields.Integer(
+        string='Quota Units Reserved',
+        readonly=True,
+        copy=False,
+        help="Quota units reserved when the request was submitted, settled on the N8N callback."
+    )
+    quota_settled = fields.Boolean(
+        string='Quota Settled',
+        readonly=True,
+        copy=False,
+        help="Set once the quota reservation has been converted into usage or released."
+    )
 
 
     @api.depends('prompt', 'create_date')
@@ -250,7 +271,8 @@ class AiImageGenerationRequest(models.Model):
         for record in self:
             if record.status not in ['draft', 'queued', 'processing_validation']: # Add other cancellable states
                 raise UserError(_("This request cannot be cancelled in its current state: %s.") % record.status)
-            
+            record._settle_quota_reservation(0) # Release any reserved quota
+
             # Potentially call a service method to attempt cancellation in N8N if already sent
             # For now, just mark as cancelled
             record.write({
@@ -321,6 +343,32 @@ class AiImageGenerationRequest(models.Model):
         # Send notification of failure (REQ-AIGS-001 implies notification on failure)
         # This could be handled by AiIntegrationService or a mail template triggered here.
 
+    def _settle_quota_reservation(self, used_units):
+        """
+        Settles this request's quota reservation exactly once: releases the reserved
+        units and records `used_units` as consumed. Duplicate or concurrent callbacks
+        are no-ops thanks to the conditional UPDATE on quota_settled. Call it before
+        writing the final status: the status notification reports the remaining quota.
+        REQ-AIGS-002
+        """
+        self.ensure_one()
+        self.flush_recordset(['quota_settled', 'quota_period_start', 'quota_units_reserved'])
+        self.env.cr.execute("""
+            UPDATE influence_gen_ai_image_generation_request
+               SET quota_settled = TRUE
+             WHERE id = %s AND quota_settled IS NOT TRUE
+         RETURNING quota_period_start, COALESCE(quota_units_reserved, 0)
+        """, [self.id])
+        row = self.env.cr.fetchone()
+        self.invalidate_recordset(['quota_settled'])
+        if row is None:
+            _logger.info(f"Quota for AI Image Generation Request ID {self.id} already settled. Skipping.")
+            return False
+        period_start, reserved_units = row
+        self.env['influence_gen.ai_quota_ledger'].settle_units(
+            self.influencer_profile_id.id, period_start, reserved_units, used_units)
+        return True
+
     @api.model
     def create(self, vals):
         # REQ-DMG-007: Record AI Image Request
@@ -346,4 +394,39 @@ class AiImageGenerationRequest(models.Model):
 
     def write(self, vals):
         # REQ-AIGS-012: Audit trail (handled by BaseAuditMixin)
-        return super(AiImageGenerationRequest, self).write(vals)
\ No newline at end of file
+        res = super(AiImageGenerationRequest, self).write(vals)
+        if 'status' in vals:
+            self._notify_status_to_requester()
+        return res
+
+    def _get_status_notification_payload(self):
+        """
+        Status payload pushed to the portal, in the format returned by the
+        /my/ai/generate/status route.
+        """
+        self.ensure_one()
+        payload = {'request_id': self.id, 'status': self.status, 'images': [], 'error_message': None}
+        if self.status == 'completed':
+            payload['images'] = [{
+                'id': image.id,
+                'url': f"/web/image/{image.image_attachment_id.id}" if image.image_attachment_id else image.storage_url,
+                'width': image.width,
+                'height': image.height,
+            } for image in self.generated_image_ids]
+        elif self.status in ('failed', 'cancelled'):
+            payload['error_message'] = self.error_details
+        if self.status in ('completed', 'failed', 'cancelled') and self.influencer_profile_id:
+            payload['quota_status'] = {
+                'remaining': self.env['influence_gen.ai_quota_ledger'].get_remaining_units(self.influencer_profile_id.id),
+            }
+        return payload
+
+    def _notify_status_to_requester(self):
+        """
+        Publishes the request status on the requesting user's bus channel, so the portal
+        generator is notified instead of polling. Bus notifications are only sent once
+        the transaction commits. REQ-AIGS-001
+        """
+        Bus = self.env['bus.bus'].sudo()
+        for record in self.filtered('user_id'):
+            Bus._sendone(record.user_id.partner_id, AI_STATUS_NOTIFICATION_TYPE, record._get_status_notification_payload())
\ No newline at end of file
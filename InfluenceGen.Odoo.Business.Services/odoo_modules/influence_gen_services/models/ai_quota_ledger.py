@@ -0,0 +1,174 @@
+from odoo import models, fields, api, _
+import logging
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MONTHLY_QUOTA = 100
+
+
+class AiQuotaLedger(models.Model):
+    """
+    Per-influencer, per-period AI image generation quota counter (REQ-AIGS-002).
+    One row holds the period's limit, the units already consumed and the units
+    reserved by requests still in flight, so a quota check reads a single row
+    instead of counting usage logs. Counters are only changed through the
+    conditional UPDATE statements below, which makes reservations atomic under
+    concurrency without explicit locking.
+    """
+    _name = 'influence_gen.ai_quota_ledger'
+    _description = 'AI Generation Quota Ledger'
+    # No BaseAuditMixin: counters change on every generation; usage itself is audited via UsageTrackingLog.
+    _order = 'period_start desc, id desc'
+    _rec_name = 'influencer_profile_id'
+
+    influencer_profile_id = fields.Many2one(
+        'influence_gen.influencer_profile',
+        string='Influencer Profile',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True
+    )
+    period_start = fields.Date(
+        string='Period Start',
+        required=True,
+        index=True,
+        readonly=True,
+        help="First day of the quota period (calendar month)."
+    )
+    quota_limit = fields.Integer(
+        string='Quota Limit',
+        required=True,
+        default=DEFAULT_MONTHLY_QUOTA,
+        help="Number of images the influencer may generate in this period."
+    )
+    used_units = fields.Integer(
+        string='Used',
+        default=0,
+        readonly=True,
+        help="Images generated and settled in this period."
+    )
+    reserved_units = fields.Integer(
+        string='Reserved',
+        default=0,
+        readonly=True,
+        help="Images reserved by requests awaiting their N8N callback."
+    )
+    remaining_units = fields.Integer(
+        string='Remaining',
+        compute='_compute_remaining_units'
+    )
+
+    _sql_constraints = [
+        ('influencer_period_uniq', 'unique(influencer_profile_id, period_start)',
+         'Only one quota ledger entry is allowed per influencer and period.'),
+    ]
+
+    @api.depends('quota_limit', 'used_units', 'reserved_units')
+    def _compute_remaining_units(self):
+        for record in self:
+            record.remaining_units = max(record.quota_limit - record.used_units - record.reserved_units, 0)
+
+    @api.model
+    def _get_period_start(self, day=None):
+        """Returns the first day of the quota period containing `day` (default: today)."""
+        return (day or fields.Date.context_today(self)).replace(day=1)
+
+    @api.model
+    def _get_default_quota_limit(self):
+        value = self.env['influence_gen.platform_setting'].get_setting(
+            'ai.image_generation.default_monthly_quota', default=DEFAULT_MONTHLY_QUOTA)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            _logger.warning(f"Could not parse 'ai.image_generation.default_monthly_quota'. Using fallback {DEFAULT_MONTHLY_QUOTA}.")
+            return DEFAULT_MONTHLY_QUOTA
+
+    @api.model
+    def open_period(self, period_start=None, influencer_profile_ids=None):
+        """
+        Creates the ledger rows of a period in one INSERT ... SELECT, for the given
+        influencers or for every active influencer. Existing rows are left untouched,
+        so the call is idempotent and safe to re-run.
+        :param period_start: date, defaults to the current period
+        :param influencer_profile_ids: list of int, optional
+        :return: int, number of rows created
+        """
+        period_start = period_start or self._get_period_start()
+        self.env['influence_gen.influencer_profile'].flush_model(['account_status'])
+        if influencer_profile_ids is None:
+            profile_filter, filter_param = "ip.account_status = %s", 'active'
+        else:
+            profile_filter, filter_param = "ip.id = ANY(%s)", list(influencer_profile_ids)
+        self.env.cr.execute(f"""
+            INSERT INTO influence_gen_ai_quota_ledger
+                   (influencer_profile_id, period_start, quota_limit, used_units, reserved_units,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT ip.id, %s, %s, 0, 0, %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+              FROM influence_gen_influencer_profile ip
+             WHERE {profile_filter}
+            ON CONFLICT (influencer_profile_id, period_start) DO NOTHING
+        """, [period_start, self._get_default_quota_limit(), self.env.uid, self.env.uid, filter_param])
+        return self.env.cr.rowcount
+
+    @api.model
+    def reserve_units(self, influencer_profile_id, units):
+        """
+        Atomically reserves `units` of the current period's quota.
+        The reservation only succeeds if used + reserved + units stays within the limit;
+        concurrent reservations serialize on the ledger row.
+        :return: date (period_start the reservation was booked on), or False if the quota is exhausted
+        """
+        period_start = self._get_period_start()
+        self.open_period(period_start, [influencer_profile_id])
+        self.env.cr.execute("""
+            UPDATE influence_gen_ai_quota_ledger
+               SET reserved_units = reserved_units + %(units)s,
+                   write_uid = %(uid)s, write_date = now() at time zone 'UTC'
+             WHERE influencer_profile_id = %(influencer)s
+               AND period_start = %(period)s
+               AND used_units + reserved_units + %(units)s <= quota_limit
+         RETURNING quota_limit - used_units - reserved_units
+        """, {'units': units, 'uid': self.env.uid, 'influencer': influencer_profile_id, 'period': period_start})
+        row = self.env.cr.fetchone()
+        self.invalidate_model(['reserved_units', 'write_uid', 'write_date'])
+        if row is None:
+            _logger.info(f"Quota reservation of {units} unit(s) refused for influencer {influencer_profile_id}.")
+            return False
+        _logger.info(f"Reserved {units} quota unit(s) for influencer {influencer_profile_id}; {row[0]} remaining.")
+        return period_start
+
+    @api.model
+    def settle_units(self, influencer_profile_id, period_start, reserved_units, used_units):
+        """
+        Converts a reservation into actual usage: releases `reserved_units` and records
+        `used_units` on the period the reservation was booked on. Pass reserved_units=0
+        to record usage that had no reservation, or used_units=0 to release a reservation.
+        """
+        period_start = period_start or self._get_period_start()
+        if used_units:
+            self.open_period(period_start, [influencer_profile_id])
+        self.env.cr.execute("""
+            UPDATE influence_gen_ai_quota_ledger
+               SET reserved_units = GREATEST(reserved_units - %(reserved)s, 0),
+                   used_units = used_units + %(used)s,
+                   write_uid = %(uid)s, write_date = now() at time zone 'UTC'
+             WHERE influencer_profile_id = %(influencer)s
+               AND period_start = %(period)s
+        """, {'reserved': reserved_units, 'used': used_units, 'uid': self.env.uid,
+              'influencer': influencer_profile_id, 'period': period_start})
+        self.invalidate_model(['reserved_units', 'used_units', 'write_uid', 'write_date'])
+        _logger.info(f"Settled quota for influencer {influencer_profile_id} ({period_start}): "
+                     f"released {reserved_units}, used {used_units}.")
+
+    @api.model
+    def get_remaining_units(self, influencer_profile_id):
+        """Returns the units still available to the influencer in the current period (one indexed lookup)."""
+        self.flush_model(['quota_limit'])
+        self.env.cr.execute("""
+            SELECT GREATEST(quota_limit - used_units - reserved_units, 0)
+              FROM influence_gen_ai_quota_ledger
+             WHERE influencer_profile_id = %s AND period_start = %s
+        """, [influencer_profile_id, self._get_period_start()])
+        row = self.env.cr.fetchone()
+        return row[0] if row else self._get_default_quota_limit()
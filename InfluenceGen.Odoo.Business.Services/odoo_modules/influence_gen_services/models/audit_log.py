@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
+import logging
+from dateutil.relativedelta import relativedelta
 from odoo import models, fields, api, _
+from odoo.tools.sql import add_foreign_key, create_index, make_index_name
+
+_logger = logging.getLogger(__name__)
+
+# Monthly partitions created ahead of time so inserts never land in the default partition.
+PARTITION_MONTHS_AHEAD = 3
 
 class AuditLog(models.Model):
     """
@@ -15,6 +23,9 @@ class AuditLog(models.Model):
     _name = 'influence_gen.audit_log'
     _description = 'InfluenceGen Audit Log'
     _order = 'timestamp desc, id desc' # Added id desc for secondary sort for very close timestamps
+    # Stored as a table range-partitioned by month on `timestamp` (see init()).
+    # Queries filtering on timestamp only scan the matching partitions, and
+    # retention drops or detaches whole partitions (_apply_partition_retention).
 
     timestamp = fields.Datetime(
         string='Timestamp (UTC)', 
@@ -127,4 +138,155 @@ class AuditLog(models.Model):
             #     # For now, rely on BaseAuditMixin's sudo() and CSV security.
             #     pass
             _logger.debug(f"Attempt to create audit log by non-superuser/non-system context. User: {self.env.user.login if self.env.user else 'N/A'}")
-        return super(AuditLog, self).create(vals)
\ No newline at end of file
+        return super(AuditLog, self).create(vals)
+
+    # ------------------------------------------------------------------
+    # Monthly range partitioning (REQ-ATEL-007, REQ-DRH-002)
+    # ------------------------------------------------------------------
+
+    def init(self):
+        """
+        Converts the ORM-created table into a partitioned one on install, and migrates
+        the existing rows on upgrade from the unpartitioned layout. Idempotent.
+        """
+        if self._get_table_relkind() == 'r':
+            self._convert_to_partitioned_table()
+        self._ensure_partitions()
+
+    def _get_table_relkind(self):
+        self.env.cr.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [self._table])
+        row = self.env.cr.fetchone()
+        return row[0] if row else None
+
+    def _partition_name(self, month_start):
+        return f"{self._table}_p{month_start:%Y%m}"
+
+    @api.model
+    def _convert_to_partitioned_table(self):
+        """
+        Migration path from a regular table: the table is renamed, an identical table
+        partitioned by RANGE (timestamp) takes its name, partitions are created for every
+        month holding data and the rows are copied over before the old table is dropped.
+        The id sequence is kept, so existing IDs and references stay valid. Uniqueness is
+        enforced on (id, timestamp) as PostgreSQL requires the partition key in the primary key.
+        """
+        cr = self.env.cr
+        table = self._table
+        legacy_table = f"{table}_legacy"
+        _logger.info("Converting %s to a monthly partitioned table.", table)
+        cr.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy_table}"')
+        cr.execute(f'CREATE TABLE "{table}" (LIKE "{legacy_table}" INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")')
+        cr.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, "timestamp")')
+        cr.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy_table])
+        sequence = cr.fetchone()[0]
+        if sequence:
+            cr.execute(f'ALTER SEQUENCE {sequence} OWNED BY "{table}".id')
+
+        cr.execute(f'SELECT min("timestamp"), max("timestamp"), count(*) FROM "{legacy_table}"')
+        min_timestamp, max_timestamp, row_count = cr.fetchone()
+        if min_timestamp:
+            self._ensure_partitions(min_timestamp.date().replace(day=1), max_timestamp.date().replace(day=1))
+        else:
+            self._ensure_partitions()
+        cr.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy_table}"')
+        cr.execute(f'DROP TABLE "{legacy_table}"')
+
+        # Indexes and foreign keys of the legacy table were dropped with it.
+        for field in self._fields.values():
+            if not field.store or not field.column_type:
+                continue
+            if field.index:
+                create_index(cr, make_index_name(table, field.name), table, [f'"{field.name}"'])
+            if field.type == 'many2one':
+                comodel = self.env[field.comodel_name]
+                add_foreign_key(cr, table, field.name, comodel._table, 'id', field.ondelete or 'set null')
+        _logger.info("Migrated %s audit log rows into partitioned table %s.", row_count, table)
+
+    @api.model
+    def _ensure_partitions(self, from_month=None, to_month=None):
+        """
+        Creates the default partition and one partition per month from `from_month`
+        (default: current month) to max(`to_month`, current month + PARTITION_MONTHS_AHEAD).
+        :return: list of partition names created
+        """
+        cr = self.env.cr
+        table = self._table
+        cr.execute(f'CREATE TABLE IF NOT EXISTS "{table}_pdefault" PARTITION OF "{table}" DEFAULT')
+        current_month = fields.Date.today().replace(day=1)
+        month = from_month or current_month
+        last_month = max(to_month or current_month, current_month + relativedelta(months=PARTITION_MONTHS_AHEAD))
+        cr.execute("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                   "WHERE i.inhparent = %s::regclass", [table])
+        existing = {row[0] for row in cr.fetchall()}
+        created = []
+        while month <= last_month:
+            next_month = month + relativedelta(months=1)
+            partition = self._partition_name(month)
+            if partition not in existing:
+                try:
+                    with cr.savepoint():
+                        cr.execute(f'CREATE TABLE "{partition}" PARTITION OF "{table}" FOR VALUES FROM (%s) TO (%s)',
+                                   [month, next_month])
+                    created.append(partition)
+                except Exception as e:
+                    # Typically rows for that month already sit in the default partition.
+                    _logger.error("Could not create audit log partition %s: %s", partition, e)
+            month = next_month
+        if created:
+            _logger.info("Created audit log partitions: %s", ", ".join(created))
+        return created
+
+    @api.model
+    def _cron_maintain_partitions(self):
+        """CRON JOB METHOD: keeps monthly partitions created ahead of time."""
+        return self._ensure_partitions()
+
+    @api.model
+    def _get_month_partitions(self):
+        """:return: list of (month_start date, partition name) attached to the table, oldest first"""
+        self.env.cr.execute("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                            "WHERE i.inhparent = %s::regclass", [self._table])
+        prefix = f"{self._table}_p"
+        partitions = []
+        for (name,) in self.env.cr.fetchall():
+            suffix = name[len(prefix):]
+            if name.startswith(prefix) and suffix.isdigit() and len(suffix) == 6:
+                partitions.append((fields.Date.to_date(f"{suffix[:4]}-{suffix[4:]}-01"), name))
+        return sorted(partitions)
+
+    @api.model
+    def _apply_partition_retention(self, cutoff_date, action='delete', dry_run=False):
+        """
+        Applies retention to whole monthly partitions ending on or before cutoff_date.
+        'delete' drops the partition; 'archive' detaches it, leaving a standalone table
+        (same name) for export or cold storage. Partitions holding entries under legal
+        hold are left in place.
+        :param cutoff_date: date or datetime; entries older than this are expired
+        :param str action: 'delete' or 'archive'
+        :param bool dry_run: only return the partitions that would be processed
+        :return: list of partition names processed
+        """
+        cutoff_date = fields.Date.to_date(cutoff_date)
+        self.flush_model()
+        processed = []
+        for month_start, partition in self._get_month_partitions():
+            if month_start + relativedelta(months=1) > cutoff_date:
+                break
+            self.env.cr.execute(f'SELECT EXISTS (SELECT 1 FROM "{partition}" WHERE legal_hold_status)')
+            if self.env.cr.fetchone()[0]:
+                _logger.info("Audit log partition %s has entries under legal hold; kept.", partition)
+                continue
+            if dry_run:
+                pass
+            elif action == 'delete':
+                self.env.cr.execute(f'DROP TABLE "{partition}"')
+            elif action == 'archive':
+                self.env.cr.execute(f'ALTER TABLE "{self._table}" DETACH PARTITION "{partition}"')
+            else:
+                _logger.warning("Unknown audit log retention action '%s'.", action)
+                break
+            processed.append(partition)
+        if processed and not dry_run:
+            self.env.invalidate_all()
+            _logger.info("Audit log retention (%s) applied to partitions: %s", action, ", ".join(processed))
+        return processed
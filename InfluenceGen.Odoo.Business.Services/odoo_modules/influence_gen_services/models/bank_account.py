@@ -68,7 +68,11 @@ class BankAccount(models.Model):
 
     is_primary = fields.Boolean(string='Primary Account', default=False, tracking=True,
                                 help="Is this the primary bank account for payouts?")
-    
+
+    legal_hold_status = fields.Boolean(
+        string='Legal Hold Active', default=False, readonly=True, copy=False,
+        help="Set while a legal hold covers this bank account (see LegalHoldPropagationService).")
+
     company_id = fields.Many2one(related='influencer_profile_id.company_id', store=True)
 
     @api.constrains('is_primary', 'influencer_profile_id')
@@ -1,24 +1,142 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+from functools import partial
 from odoo import models, fields, api, _
+from odoo.http import request
+from odoo.tools import split_every
 
 _logger = logging.getLogger(__name__)
 
+# Key of the per-transaction audit buffer in cr.precommit.data.
+AUDIT_BUFFER_KEY = 'influence_gen.audit_buffer'
+# Rows per INSERT statement when flushing the buffer.
+AUDIT_INSERT_BATCH_SIZE = 500
+# Columns written by the buffer flush, in the order of the buffered tuples.
+AUDIT_LOG_COLUMNS = (
+    'timestamp', 'user_id', 'event_type', 'target_model', 'target_res_id', 'action',
+    'details_json', 'ip_address', 'outcome', 'failure_reason', 'correlation_id',
+    'legal_hold_status', 'create_uid', 'create_date', 'write_uid', 'write_date',
+)
+# Fields never worth an audit entry on their own (ORM bookkeeping, chatter, activities).
+AUDIT_IGNORED_FIELDS = frozenset({'create_uid', 'create_date', 'write_uid', 'write_date', 'display_name'})
+AUDIT_IGNORED_FIELD_PREFIXES = ('message_', 'activity_', 'website_message_')
+
+
+def _flush_audit_buffer(cr):
+    """
+    Pre-commit hook writing every buffered audit event of the transaction with
+    multi-row INSERTs. Events buffered by later pre-commit hooks re-register a flush.
+    """
+    rows = cr.precommit.data.pop(AUDIT_BUFFER_KEY, None)
+    if not rows:
+        return
+    row_placeholder = "(%s)" % ", ".join(["%s"] * len(AUDIT_LOG_COLUMNS))
+    for batch in split_every(AUDIT_INSERT_BATCH_SIZE, rows):
+        cr.execute(
+            "INSERT INTO influence_gen_audit_log ({columns}) VALUES {values}".format(
+                columns=", ".join(AUDIT_LOG_COLUMNS),
+                values=", ".join([row_placeholder] * len(batch)),
+            ),
+            [value for row in batch for value in row],
+        )
+    _logger.debug("Flushed %s buffered audit log entries.", len(rows))
+
+
 class BaseAuditMixin(models.AbstractModel):
     """
     Base Audit Mixin for InfluenceGen Models.
     Provides base audit logging functionality for key Odoo models.
-    It logs create, write, and unlink operations by creating entries
-    in the 'influence_gen.audit_log' model.
+    Create, write and unlink events are collected in a per-transaction buffer
+    and written to 'influence_gen.audit_log' with multi-row INSERTs just before
+    the transaction commits, so a rolled back transaction leaves no entries.
+    Models restrict which fields are audited with `_audit_log_fields`, or per
+    database with the 'audit.field_allowlist' platform setting.
     REQ-ATEL-005, REQ-ATEL-006
     """
     _name = 'influence_gen.base_audit_mixin'
     _description = 'Base Audit Mixin for InfluenceGen Models'
 
+    # Fields whose changes are audited; None audits every field except the ignored ones.
+    _audit_log_fields = None
+
+    @api.model
+    def _get_audit_field_names(self, field_names):
+        """
+        Filters field_names down to the fields audited on this model: the model's entry in
+        the 'audit.field_allowlist' setting ({model: [fields]}) if any, else `_audit_log_fields`,
+        minus bookkeeping/chatter fields and binary fields (whose content is never logged).
+        :return: list of field names, possibly empty
+        """
+        allowlist = self.env['influence_gen.platform_setting'].sudo().get_setting('audit.field_allowlist', default=None)
+        allowed = allowlist.get(self._name) if isinstance(allowlist, dict) else None
+        if allowed is None:
+            allowed = self._audit_log_fields
+        return [
+            field_name for field_name in field_names
+            if field_name in self._fields
+            and (allowed is None or field_name in allowed)
+            and field_name not in AUDIT_IGNORED_FIELDS
+            and not field_name.startswith(AUDIT_IGNORED_FIELD_PREFIXES)
+            and self._fields[field_name].type != 'binary'
+        ]
+
+    @api.model
+    def _get_audit_ip_address(self):
+        if self.env.context.get('remote_addr'):
+            return self.env.context['remote_addr']
+        try:
+            return request.httprequest.remote_addr if request else None
+        except RuntimeError: # No request bound to this thread (cron, shell)
+            return None
+
+    @api.model
+    def _buffer_audit_events(self, events):
+        """
+        Appends audit events to the transaction's buffer, registering the pre-commit flush
+        on first use.
+
+        :param list events: dicts with keys action, target_model, target_res_id and optionally
+                            details (dict), outcome, failure_reason, event_type.
+        Bulk jobs writing their own summary entries pass skip_audit_log=True in the context.
+        """
+        if not events or self.env.context.get('skip_audit_log'):
+            return
+        cr = self.env.cr
+        buffer = cr.precommit.data.get(AUDIT_BUFFER_KEY)
+        if buffer is None:
+            buffer = cr.precommit.data[AUDIT_BUFFER_KEY] = []
+            cr.precommit.add(partial(_flush_audit_buffer, cr))
+        now = fields.Datetime.now()
+        user_id = self.env.uid or None
+        ip_address = self._get_audit_ip_address()
+        correlation_id = self.env.context.get('audit_correlation_id')
+        for event in events:
+            details = event.get('details')
+            buffer.append((
+                now,
+                user_id,
+                event.get('event_type') or f"{event['target_model']}.{event['action']}",
+                event['target_model'],
+                event.get('target_res_id') or None,
+                event['action'],
+                json.dumps(details, default=str) if details else None,
+                ip_address,
+                event.get('outcome') or 'success',
+                event.get('failure_reason'),
+                correlation_id,
+                False,
+                user_id, now, user_id, now,
+            ))
+
+    @api.model
+    def flush_audit_buffer(self):
+        """Writes buffered audit events immediately, for callers that read audit logs in the same transaction."""
+        _flush_audit_buffer(self.env.cr)
+
     def _log_audit_event(self, action, target_entity_name=None, target_id=None, details=None, outcome='success', reason=None):
         """
-        Creates an 'influence_gen.audit_log' record.
+        Buffers an 'influence_gen.audit_log' entry, written at pre-commit.
 
         :param str action: The action being logged (e.g., 'create', 'write', 'unlink').
         :param str target_entity_name: Name of the target model if different from self._name.
@@ -28,142 +146,92 @@ class BaseAuditMixin(models.AbstractModel):
         :param str reason: Reason for failure, if any.
         """
         self.ensure_one() # Expects to be called on a single record context for self._name and self.id defaults
-        audit_log_model = self.env['influence_gen.audit_log']
-
-        log_vals = {
-            'timestamp': fields.Datetime.now(),
-            'user_id': self.env.user.id if self.env.user else None,
-            'event_type': f"{target_entity_name or self._name}.{action}",
-            'target_model': target_entity_name or self._name,
-            'target_res_id': target_id or (self.id if self and self.exists() else None),
+        self._buffer_audit_events([{
             'action': action,
-            'details_json': json.dumps(details, default=str) if details else None,
-            'ip_address': self.env.context.get('remote_addr') or \
-                          (self.env.request.httprequest.remote_addr if self.env.request and hasattr(self.env.request, 'httprequest') else None),
+            'target_model': target_entity_name or self._name,
+            'target_res_id': target_id or self.id,
+            'details': details,
             'outcome': outcome,
             'failure_reason': reason,
-        }
-        try:
-            # Use sudo() to ensure audit logs are created even if the current user
-            # doesn't have direct create permission on audit_log model,
-            # assuming the audit system itself should always be able to write.
-            audit_log_model.sudo().create(log_vals)
-        except Exception as e:
-            _logger.error("Failed to create audit log entry: %s. Values: %s", str(e), log_vals, exc_info=True)
-
+        }])
 
     @api.model_create_multi
     def create(self, vals_list):
         """
         Overrides create to log the event.
-        Calls super().create(vals_list). For each created record,
-        calls _log_audit_event('create', details={'created_values': vals}).
+        Buffers one 'create' event per record with the audited subset of its values.
         """
         records = super(BaseAuditMixin, self).create(vals_list)
-        for i, record in enumerate(records):
-            try:
-                # vals_list[i] contains the original values used for creation
-                record._log_audit_event(
-                    action='create',
-                    target_id=record.id,
-                    details={'created_values': vals_list[i]}
-                )
-            except Exception as e:
-                _logger.error("Audit log error during create for model %s, record ID %s: %s",
-                              record._name, record.id, str(e), exc_info=True)
+        try:
+            events = []
+            for record, vals in zip(records, vals_list):
+                audited = self._get_audit_field_names(vals)
+                events.append({
+                    'action': 'create',
+                    'target_model': record._name,
+                    'target_res_id': record.id,
+                    'details': {'created_values': {field_name: vals[field_name] for field_name in audited}},
+                })
+            self._buffer_audit_events(events)
+        except Exception as e:
+            _logger.error("Audit log error during create for model %s, record IDs %s: %s",
+                          self._name, records.ids, str(e), exc_info=True)
         return records
 
     def write(self, vals):
         """
         Overrides write to log the event.
-        Captures old values for fields in vals. Calls super().write(vals).
-        For each record in self, calls _log_audit_event('write',
-        details={'updated_values': vals, 'old_values': captured_old_values}).
+        Old values of the audited fields in vals are read with a single read() for the
+        whole recordset before calling super().write(vals). Writes touching no audited
+        field (e.g. chatter or bookkeeping only) are not logged.
         """
+        audited = self._get_audit_field_names(vals) if vals and self and not self.env.context.get('skip_audit_log') else []
         old_values_by_record = {}
-        # Capture old values before the write operation
-        # Only capture values for fields present in 'vals' and exist on the model
-        # To ensure we are comparing apples to apples, fetch current values of fields being updated.
-        if vals: # Proceed only if there are values to write
-            for record in self:
-                record_old_values = {}
-                for field_name in vals.keys():
-                    if hasattr(record, field_name) and field_name in record._fields:
-                        current_value = record[field_name]
-                        # For relational fields, log their current representation or ID
-                        if isinstance(record._fields[field_name], (fields.Many2one, fields.Many2many, fields.One2many)):
-                            if isinstance(current_value, models.BaseModel):
-                                if record._fields[field_name].type == 'many2one':
-                                    record_old_values[field_name] = current_value.id if current_value else False
-                                else: # many2many, one2many
-                                    record_old_values[field_name] = current_value.ids if current_value else []
-                            else: # if it's already an ID or list of IDs
-                                record_old_values[field_name] = current_value
-                        else:
-                            record_old_values[field_name] = current_value
-                old_values_by_record[record.id] = record_old_values
-        
+        if audited:
+            try:
+                # load=None returns many2one values as IDs and x2many values as ID lists.
+                old_values_by_record = {
+                    values.pop('id'): values for values in self.read(audited, load=None)
+                }
+            except Exception as e:
+                _logger.error("Audit log error reading old values for model %s, record IDs %s: %s",
+                              self._name, self.ids, str(e), exc_info=True)
+
         res = super(BaseAuditMixin, self).write(vals)
 
-        if vals: # Log only if there were values to write
-            for record in self:
-                try:
-                    details = {'updated_values': vals}
-                    if record.id in old_values_by_record:
-                        # Filter old_values to only include fields actually changed.
-                        # A field is considered changed if its old value differs from its new value in 'vals'.
-                        # However, 'vals' only contains the values *to be set*. The actual new value is now in record[field_name].
-                        # So, old_values_by_record[record.id] is what we need.
-                        details['old_values'] = old_values_by_record[record.id]
-                    
-                    record._log_audit_event(
-                        action='write',
-                        details=details
-                    )
-                except Exception as e:
-                    _logger.error("Audit log error during write for model %s, record ID %s: %s",
-                                  record._name, record.id, str(e), exc_info=True)
+        if audited:
+            try:
+                updated_values = {field_name: vals[field_name] for field_name in audited}
+                self._buffer_audit_events([{
+                    'action': 'write',
+                    'target_model': self._name,
+                    'target_res_id': record_id,
+                    'details': {'updated_values': updated_values, 'old_values': old_values_by_record.get(record_id, {})},
+                } for record_id in self.ids])
+            except Exception as e:
+                _logger.error("Audit log error during write for model %s, record IDs %s: %s",
+                              self._name, self.ids, str(e), exc_info=True)
         return res
 
     def unlink(self):
         """
         Overrides unlink to log the event.
-        For each record in self, captures identifying information.
-        Calls _log_audit_event('unlink', details=captured_info).
-        Then calls super().unlink().
+        Captures identifying information of every record before calling super().unlink(),
+        as record data is not accessible afterwards.
         """
-        records_to_log = []
-        for record in self:
-            records_to_log.append({
-                'id': record.id,
-                'display_name': record.display_name if hasattr(record, 'display_name') and record.display_name else str(record.id),
-                'model_name': record._name
-            })
-
-        # Log before actual unlinking, as record data might not be accessible afterwards
-        for record_data in records_to_log:
-            try:
-                # Create a temporary browse record context for logging if needed,
-                # or ensure _log_audit_event can handle being called from a record about to be unlinked.
-                # Calling it on 'self.browse(record_data['id'])' won't work once unlinked.
-                # Here, we call it on the 'record' instance from the loop before super().unlink().
-                # Find the original record in the recordset to call _log_audit_event method from it.
-                # This ensures `self` in `_log_audit_event` is correctly set.
-                original_record = self.filtered(lambda r: r.id == record_data['id'])
-                if original_record: # Should always be true here
-                    details = {
-                        'unlinked_record_id': record_data['id'],
-                        'unlinked_record_display_name': record_data['display_name']
-                    }
-                    original_record._log_audit_event(
-                        action='unlink',
-                        target_entity_name=record_data['model_name'],
-                        target_id=record_data['id'],
-                        details=details
-                    )
-            except Exception as e:
-                _logger.error("Audit log error during pre-unlink for model %s, record ID %s: %s",
-                              record_data['model_name'], record_data['id'], str(e), exc_info=True)
+        try:
+            if not self.env.context.get('skip_audit_log'):
+                self._buffer_audit_events([{
+                    'action': 'unlink',
+                    'target_model': record._name,
+                    'target_res_id': record.id,
+                    'details': {
+                        'unlinked_record_id': record.id,
+                        'unlinked_record_display_name': record.display_name or str(record.id),
+                    },
+                } for record in self])
+        except Exception as e:
+            _logger.error("Audit log error during pre-unlink for model %s, record IDs %s: %s",
+                          self._name, self.ids, str(e), exc_info=True)
 
-        res = super(BaseAuditMixin, self).unlink()
-        return res
\ No newline at end of file
+        return super(BaseAuditMixin, self).unlink()
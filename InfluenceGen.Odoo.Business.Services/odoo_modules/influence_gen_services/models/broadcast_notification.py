@@ -0,0 +1,113 @@
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+import logging
+
+from ..services.broadcast_notification_service import BroadcastNotificationService, RECIPIENT_TABLE
+
+_logger = logging.getLogger(__name__)
+
+
+class BroadcastNotification(models.Model):
+    """
+    Email notification broadcast to many users at once, e.g. a platform-wide
+    maintenance notice. Recipients are queued in a technical table when the
+    broadcast is created and sent in throttled batches by the sending cron
+    (see BroadcastNotificationService); the counters track the progress.
+    """
+    _name = 'influence_gen.broadcast_notification'
+    _description = 'Broadcast Notification'
+    _inherit = ['influence_gen.base_audit_mixin']
+    # Progress counters change with every batch: only the content and lifecycle are audited.
+    _audit_log_fields = ('subject', 'state')
+    _order = 'id desc'
+    _rec_name = 'subject'
+
+    subject = fields.Char(string='Subject', required=True, readonly=True)
+    body_html = fields.Html(string='Message Body', required=True, readonly=True)
+    target_group_ids = fields.Many2many(
+        'res.groups',
+        'influence_gen_broadcast_notification_group_rel',
+        'broadcast_id', 'group_id',
+        string='Target User Groups',
+        readonly=True
+    )
+    target_influencer_ids = fields.Many2many(
+        'influence_gen.influencer_profile',
+        'influence_gen_broadcast_notification_influencer_rel',
+        'broadcast_id', 'influencer_id',
+        string='Specific Influencers',
+        readonly=True
+    )
+    state = fields.Selection([
+        ('sending', 'Sending'),
+        ('paused', 'Paused'),
+        ('done', 'Done'),
+        ('cancelled', 'Cancelled'),
+    ], string='Status', required=True, default='sending', readonly=True, index=True)
+    requested_by_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        default=lambda self: self.env.user,
+        readonly=True
+    )
+    recipient_count = fields.Integer(string='Recipients', readonly=True, help="Distinct email addresses targeted.")
+    sent_count = fields.Integer(string='Sent', readonly=True)
+    failed_count = fields.Integer(string='Failed', readonly=True)
+    progress = fields.Float(string='Progress (%)', compute='_compute_progress')
+    started_at = fields.Datetime(string='Started At', readonly=True)
+    completed_at = fields.Datetime(string='Completed At', readonly=True)
+
+    def init(self):
+        # Recipient queue: one row per (broadcast, normalized email), written and drained with raw SQL.
+        # No ORM model: a broadcast may target hundreds of thousands of addresses.
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {RECIPIENT_TABLE} (
+                broadcast_id integer NOT NULL REFERENCES influence_gen_broadcast_notification(id) ON DELETE CASCADE,
+                email_normalized varchar NOT NULL,
+                partner_id integer NOT NULL REFERENCES res_partner(id) ON DELETE CASCADE,
+                state varchar NOT NULL DEFAULT 'pending',
+                processed_at timestamp,
+                PRIMARY KEY (broadcast_id, email_normalized)
+            )
+        """)
+        tools.create_index(
+            self.env.cr, f'{RECIPIENT_TABLE}_pending_idx', RECIPIENT_TABLE,
+            ['broadcast_id', 'email_normalized'], where="state = 'pending'",
+        )
+
+    @api.depends('recipient_count', 'sent_count', 'failed_count')
+    def _compute_progress(self):
+        for broadcast in self:
+            processed = broadcast.sent_count + broadcast.failed_count
+            broadcast.progress = 100.0 * processed / broadcast.recipient_count if broadcast.recipient_count else 100.0
+
+    def action_pause(self):
+        self.filtered(lambda b: b.state == 'sending').write({'state': 'paused'})
+        return True
+
+    def action_resume(self):
+        to_resume = self.filtered(lambda b: b.state == 'paused')
+        if to_resume:
+            to_resume.write({'state': 'sending'})
+            BroadcastNotificationService(self.env)._trigger_cron()
+        return True
+
+    def action_cancel(self):
+        if self.filtered(lambda b: b.state == 'done'):
+            raise UserError(_("A completed broadcast cannot be cancelled."))
+        self.write({'state': 'cancelled', 'completed_at': fields.Datetime.now()})
+        return True
+
+    def action_retry_failed(self):
+        service = BroadcastNotificationService(self.env)
+        for broadcast in self.filtered(lambda b: b.state == 'done' and b.failed_count):
+            requeued = service.requeue_failed(broadcast)
+            _logger.info(f"Broadcast {broadcast.id}: {requeued} failed recipient(s) requeued.")
+        return True
+
+    @api.model
+    def _cron_send(self):
+        """Scheduled action sending the queued emails of running broadcasts."""
+        stats = BroadcastNotificationService(self.env).send_pending()
+        _logger.info(f"Broadcast notification sending finished: {stats}")
+        return stats
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
 import logging
 
+from ..services.campaign_kpi_aggregation_service import CampaignKpiAggregationService
+from ..services.compensation_calculators import compile_compensation_terms, get_calculator
+
 _logger = logging.getLogger(__name__)
 
 class Campaign(models.Model):
@@ -52,6 +55,16 @@ class Campaign(models.Model):
         string='Target Criteria (JSON)', 
         help="JSON string defining target influencer criteria (e.g., audience niche, location, follower count)."
     )
+    area_of_influence_ids = fields.Many2many(
+        comodel_name='influence_gen.area_of_influence',
+        relation='influence_gen_campaign_area_of_influence_rel',
+        column1='campaign_id',
+        column2='area_id',
+        string='Target Niches',
+        tracking=True,
+        help="Areas of influence targeted by the campaign. Only influencers sharing one of them discover it; "
+             "leave empty to target every influencer."
+    )
     content_requirements = fields.Text(
         string='Content Requirements', 
         tracking=True,
@@ -72,8 +85,10 @@ class Campaign(models.Model):
     )
     compensation_model_type = fields.Selection([
         ('flat_fee', 'Flat Fee'),
+        ('per_submission', 'Per Submission'),
         ('cpm', 'Cost Per Mille (CPM)'),
         ('cpa', 'Cost Per Acquisition (CPA)'),
+        ('performance_based', 'Performance-based'),
         ('commission', 'Commission-based'),
         ('hybrid', 'Hybrid (Mixed)'),
         ('product_only', 'Product/Service Only'),
@@ -85,7 +100,17 @@ class Campaign(models.Model):
     )
     compensation_details = fields.Text(
         string='Compensation Details', 
-        help="Detailed explanation of the compensation structure, rates, and terms."
+        help="Detailed explanation of the compensation structure, rates, and terms. "
+             "Either a plain amount or a JSON object, e.g. {\"rate\": 12.5, \"metric\": \"impressions\"} for CPM "
+             "or {\"base\": 50, \"weights\": {\"views\": 0.002}, \"cap\": 500} for performance-based campaigns."
+    )
+    compensation_amount = fields.Float(
+        string='Compensation Amount',
+        compute='_compute_compensation_amount',
+        store=True,
+        index=True,
+        help="Main amount of the compensation terms (flat fee, rate or base amount), used to filter and sort "
+             "campaigns in the portal. 0 when the terms have no amount."
     )
     submission_deadline = fields.Datetime(
         string='Submission Deadline', 
@@ -145,6 +170,9 @@ class Campaign(models.Model):
         default=True, 
         help="Set to false to hide the campaign without deleting it. Archived campaigns are typically inactive."
     )
+    legal_hold_status = fields.Boolean(
+        string='Legal Hold Active', default=False, readonly=True, copy=False,
+        help="Set while a legal hold covers this campaign (see LegalHoldPropagationService).")
     company_id = fields.Many2one(
         comodel_name='res.company', 
         string='Company', 
@@ -164,6 +192,41 @@ class Campaign(models.Model):
         ('name_company_unique', 'UNIQUE(name, company_id)', 'Campaign name must be unique per company.'),
     ]
 
+    # Fields feeding the compiled compensation terms; writing any of them drops the cache.
+    _COMPENSATION_TERM_FIELDS = ('compensation_model_type', 'compensation_details', 'currency_id')
+
+    def init(self):
+        # Full-text discovery index (REQ-2-003): weighted name, brand and description, kept up to date by PostgreSQL.
+        self.env.cr.execute(f"""
+            ALTER TABLE {self._table} ADD COLUMN IF NOT EXISTS search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(brand_client, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+            ) STORED
+        """)
+        self.env.cr.execute(f"""
+            CREATE INDEX IF NOT EXISTS influence_gen_campaign_search_vector_idx
+                ON {self._table} USING gin (search_vector)
+        """)
+        # Discovery only ever lists published campaigns, most recent first by default.
+        tools.create_index(
+            self.env.cr, 'influence_gen_campaign_discoverable_idx', self._table,
+            ['write_date DESC', 'id DESC'], where="status = 'published' AND active",
+        )
+
+    @api.depends('compensation_model_type', 'compensation_details')
+    def _compute_compensation_amount(self):
+        for campaign in self:
+            calculator = get_calculator(campaign.compensation_model_type)
+            if not calculator:
+                campaign.compensation_amount = 0.0
+                continue
+            terms = compile_compensation_terms(
+                campaign.id, campaign.compensation_model_type, campaign.compensation_details, campaign.currency_id.id)
+            amount = dict(terms.params).get(calculator.primary_param)
+            campaign.compensation_amount = amount if isinstance(amount, (int, float)) else 0.0
+
     @api.constrains('start_date', 'end_date')
     def _check_dates(self):
         """Ensures that the end date is not earlier than the start date."""
@@ -171,6 +234,29 @@ class Campaign(models.Model):
             if campaign.start_date and campaign.end_date and campaign.end_date < campaign.start_date:
                 raise ValidationError(_('The campaign end date cannot be earlier than the start date.'))
 
+    def write(self, vals):
+        res = super(Campaign, self).write(vals)
+        if any(field_name in vals for field_name in self._COMPENSATION_TERM_FIELDS):
+            # Clears the compiled terms in every worker (the registry signals the change).
+            self.env.registry.clear_cache()
+        return res
+
+    @api.model
+    @tools.ormcache('campaign_id')
+    def _get_compensation_terms(self, campaign_id):
+        """
+        Returns the compiled CompensationTerms of a campaign, parsed once and cached
+        until one of _COMPENSATION_TERM_FIELDS is written.
+        REQ-IPF-003
+        """
+        campaign = self.sudo().with_context(active_test=False).browse(campaign_id)
+        return compile_compensation_terms(
+            campaign.id,
+            campaign.compensation_model_type,
+            campaign.compensation_details,
+            campaign.currency_id.id or self.env.company.currency_id.id,
+        )
+
     def action_publish(self):
         """Sets the campaign status to 'Published'."""
         self.ensure_one()
@@ -223,15 +309,16 @@ class Campaign(models.Model):
 
     def calculate_aggregated_kpis(self):
         """
-        Calculates and returns aggregated Key Performance Indicators (KPIs) for the campaign.
-        This could involve summing target/actual values from kpi_ids or
-        aggregating performance data from related ContentSubmissions.
+        Calculates and returns aggregated Key Performance Indicators (KPIs) for the campaign:
+        target/actual values of kpi_ids, and reach, engagement and conversion totals of the
+        approved ContentSubmissions read from the materialized performance rollups.
         """
         self.ensure_one()
         aggregated_data = {
             'total_target_value': 0.0,
             'total_actual_value': 0.0,
-            'kpi_details': []
+            'kpi_details': [],
+            'performance': CampaignKpiAggregationService(self.env).get_campaign_totals([self.id])[self.id],
         }
         for kpi in self.kpi_ids:
             aggregated_data['total_target_value'] += kpi.target_value
@@ -242,9 +329,6 @@ class Campaign(models.Model):
                 'actual': kpi.actual_value,
                 'unit': kpi.unit_of_measure
             })
-        
-        # Further aggregation could happen here based on ContentSubmission.performance_data_json
-        # For example, summing up reach, engagement, etc. from all approved submissions.
-        # This part requires a clear definition of how performance_data_json is structured.
+
         _logger.info("Aggregated KPIs for campaign %s: %s", self.name, aggregated_data)
         return aggregated_data
\ No newline at end of file
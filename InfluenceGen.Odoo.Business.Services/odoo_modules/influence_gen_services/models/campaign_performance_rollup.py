@@ -0,0 +1,91 @@
+from odoo import models, fields, api, tools, _
+import logging
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import create_queue_table
+from ..services.campaign_kpi_aggregation_service import CampaignKpiAggregationService, STALE_TABLE
+
+_logger = logging.getLogger(__name__)
+
+
+class CampaignPerformanceRollup(models.Model):
+    """
+    Materialized performance KPIs of approved content submissions, one row per
+    (campaign, influencer, submission day) (REQ-2-011, REQ-2-012).
+    Rows are written with raw SQL by CampaignKpiAggregationService: campaigns whose
+    submissions change are marked stale and re-aggregated by the refresh cron.
+    """
+    _name = 'influence_gen.campaign_performance_rollup'
+    _description = 'Campaign Performance Rollup'
+    # No BaseAuditMixin: derived data rewritten by the refresh cron; submissions are audited themselves.
+    _order = 'day desc, id'
+    _rec_name = 'campaign_id'
+
+    campaign_id = fields.Many2one(
+        'influence_gen.campaign',
+        string='Campaign',
+        required=True,
+        ondelete='cascade',
+        readonly=True
+    )
+    influencer_profile_id = fields.Many2one(
+        'influence_gen.influencer_profile',
+        string='Influencer',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True
+    )
+    day = fields.Date(string='Day', required=True, readonly=True, help="Submission day (UTC).")
+    submission_count = fields.Integer(string='Approved Submissions', readonly=True)
+    reach = fields.Float(string='Reach', readonly=True)
+    views = fields.Float(string='Views', readonly=True)
+    engagement = fields.Float(string='Engagement', readonly=True, help="Likes, comments, shares and saves.")
+    clicks = fields.Float(string='Clicks', readonly=True)
+    conversions = fields.Float(string='Conversions', readonly=True)
+    refreshed_at = fields.Datetime(string='Refreshed At', readonly=True)
+
+    _sql_constraints = [
+        ('campaign_influencer_day_uniq', 'unique(campaign_id, influencer_profile_id, day)',
+         'There can only be one performance rollup per campaign, influencer and day.'),
+    ]
+
+    def init(self):
+        # performance_data_json is free text: invalid JSON or non-object documents count as empty.
+        self.env.cr.execute("""
+            CREATE OR REPLACE FUNCTION influence_gen_jsonb_object(doc text) RETURNS jsonb AS $$
+            DECLARE
+                parsed jsonb;
+            BEGIN
+                IF doc IS NULL OR doc !~ '^\\s*\\{' THEN
+                    RETURN NULL;
+                END IF;
+                parsed := doc::jsonb;
+                RETURN CASE WHEN jsonb_typeof(parsed) = 'object' THEN parsed END;
+            EXCEPTION WHEN others THEN
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql IMMUTABLE
+        """)
+        create_queue_table(
+            self.env.cr, STALE_TABLE, 'campaign_id integer PRIMARY KEY REFERENCES influence_gen_campaign(id) ON DELETE CASCADE')
+        tools.create_index(
+            self.env.cr, 'influence_gen_campaign_performance_rollup_campaign_day_idx', self._table,
+            ['campaign_id', 'day'],
+        )
+        # First install: every campaign with approved submissions needs its initial rollups.
+        self.env.cr.execute(f"SELECT 1 FROM {self._table} LIMIT 1")
+        if not self.env.cr.fetchone():
+            self.env.cr.execute(f"""
+                INSERT INTO {STALE_TABLE} (campaign_id, marked_at)
+                SELECT DISTINCT campaign_id, now() at time zone 'UTC'
+                  FROM influence_gen_content_submission
+                 WHERE review_status = 'approved' AND campaign_id IS NOT NULL
+                ON CONFLICT (campaign_id) DO NOTHING
+            """)
+
+    @api.model
+    def _cron_refresh_stale(self):
+        """Scheduled action re-aggregating the rollups of stale campaigns."""
+        refreshed = CampaignKpiAggregationService(self.env).refresh_stale()
+        _logger.info(f"Campaign performance rollup refresh finished: {refreshed} campaign(s).")
+        return refreshed
@@ -0,0 +1,68 @@
+from odoo import models, fields, api, _
+import logging
+
+from ..services.performance_summary_service import PerformanceSummaryService
+
+_logger = logging.getLogger(__name__)
+
+
+class CampaignPerformanceSummary(models.Model):
+    """
+    Per-campaign dashboard summary: applications by status, submissions by review
+    status, payment totals and KPI totals (REQ-2-012, REQ-PAC-016).
+    Rows are upserted with raw SQL by PerformanceSummaryService when the campaign's
+    applications, submissions, payments or KPIs change.
+    """
+    _name = 'influence_gen.campaign_performance_summary'
+    _description = 'Campaign Performance Summary'
+    # No BaseAuditMixin: derived data rewritten by the refresh crons; the source records are audited themselves.
+    _order = 'campaign_id desc'
+    _rec_name = 'campaign_id'
+
+    campaign_id = fields.Many2one(
+        'influence_gen.campaign',
+        string='Campaign',
+        required=True,
+        ondelete='cascade',
+        readonly=True
+    )
+    applications_total = fields.Integer(string='Applications', readonly=True)
+    applications_pending = fields.Integer(string='Pending Applications', readonly=True)
+    applications_approved = fields.Integer(string='Approved Applications', readonly=True)
+    applications_rejected = fields.Integer(string='Rejected Applications', readonly=True)
+    submissions_total = fields.Integer(string='Submissions', readonly=True)
+    submissions_pending = fields.Integer(string='Submissions Pending Review', readonly=True)
+    submissions_approved = fields.Integer(string='Approved Submissions', index=True, readonly=True)
+    payments_outstanding_amount = fields.Float(
+        string='Outstanding Payments', readonly=True,
+        help="Payments neither paid, failed nor cancelled, all currencies summed.")
+    payments_paid_amount = fields.Float(string='Paid Amount', readonly=True, help="All currencies summed.")
+    kpi_target_total = fields.Float(string='KPI Target Total', readonly=True)
+    kpi_actual_total = fields.Float(string='KPI Actual Total', readonly=True)
+    refreshed_at = fields.Datetime(string='Refreshed At', readonly=True)
+
+    _sql_constraints = [
+        ('campaign_uniq', 'unique(campaign_id)', 'There can only be one performance summary per campaign.'),
+    ]
+
+    def init(self):
+        service = PerformanceSummaryService(self.env)
+        service.install_change_triggers()
+        # First install: summarize every existing campaign.
+        self.env.cr.execute(f"SELECT 1 FROM {self._table} LIMIT 1")
+        if not self.env.cr.fetchone():
+            service.mark_all_stale('campaign')
+
+    @api.model
+    def _cron_refresh_stale(self):
+        """Scheduled action refreshing the campaign and influencer summaries marked stale."""
+        stats = PerformanceSummaryService(self.env).refresh_stale()
+        _logger.info(f"Performance summary refresh finished: {stats}")
+        return stats
+
+    @api.model
+    def _cron_refresh_all(self):
+        """Nightly scheduled action recomputing every campaign and influencer summary."""
+        stats = PerformanceSummaryService(self.env).refresh_all()
+        _logger.info(f"Full performance summary refresh finished: {stats}")
+        return stats
@@ -3,6 +3,8 @@ import logging
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
 
+from ..services.campaign_kpi_aggregation_service import CampaignKpiAggregationService
+
 _logger = logging.getLogger(__name__)
 
 class ContentSubmission(models.Model):
@@ -53,10 +55,40 @@ class ContentSubmission(models.Model):
     performance_data_json = fields.Text(
         string='Performance Data (JSON)',
         help="JSON string containing performance metrics for this content (e.g., likes, views, clicks).", tracking=True) # REQ-2-011
+    legal_hold_status = fields.Boolean(
+        string='Legal Hold Active', default=False, readonly=True, copy=False,
+        help="Set while a legal hold covers this submission (see LegalHoldPropagationService).")
 
     # REQ-DMG-006: Content Submission Management
     # REQ-2-018: Audit trail (via BaseAuditMixin)
 
+    # Changes to these fields make the campaign's performance rollups stale (REQ-2-011).
+    _PERFORMANCE_ROLLUP_FIELDS = ('campaign_application_id', 'submission_date', 'review_status', 'performance_data_json')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        submissions = super().create(vals_list)
+        CampaignKpiAggregationService(self.env).mark_stale(submissions._get_approved_campaign_ids())
+        return submissions
+
+    def write(self, vals):
+        if not any(field_name in vals for field_name in self._PERFORMANCE_ROLLUP_FIELDS):
+            return super().write(vals)
+        # Rollups only cover approved submissions: campaigns of those approved before or after the write.
+        campaign_ids = set(self._get_approved_campaign_ids())
+        res = super().write(vals)
+        CampaignKpiAggregationService(self.env).mark_stale(campaign_ids | set(self._get_approved_campaign_ids()))
+        return res
+
+    def unlink(self):
+        campaign_ids = self._get_approved_campaign_ids()
+        res = super().unlink()
+        CampaignKpiAggregationService(self.env).mark_stale(campaign_ids)
+        return res
+
+    def _get_approved_campaign_ids(self):
+        return self.filtered(lambda s: s.review_status == 'approved').campaign_id.ids
+
     @api.constrains('content_url', 'content_attachment_id')
     def _check_content_presence(self):
         for record in self:
@@ -0,0 +1,73 @@
+from odoo import models, fields, api, tools
+import logging
+
+from ..services.data_quality_service import DataQualityService, SCAN_STATE_TABLE
+
+_logger = logging.getLogger(__name__)
+
+
+class DataQualityIssue(models.Model):
+    """
+    Data quality issue of one record, found by a data quality rule (REQ-DMG-017,
+    REQ-DMG-018). There is at most one row per (rule, record): scans reopen,
+    refresh or resolve it. Rows are written with raw SQL by DataQualityService.
+    """
+    _name = 'influence_gen.data_quality_issue'
+    _description = 'Data Quality Issue'
+    _order = 'state, last_detected_at desc, id desc'
+    _rec_name = 'description'
+
+    rule_code = fields.Char(string='Rule', required=True, readonly=True,
+                            help="Key of the rule setting, without the 'data_quality.' prefix.")
+    model_name = fields.Char(string='Model', required=True, readonly=True, index=True)
+    res_id = fields.Many2oneReference(string='Record ID', model_field='model_name', required=True, readonly=True)
+    field_name = fields.Char(string='Field', readonly=True)
+    issue_type = fields.Char(string='Issue Type', readonly=True)
+    severity = fields.Selection([
+        ('info', 'Info'),
+        ('warning', 'Warning'),
+        ('error', 'Error'),
+    ], string='Severity', default='warning', readonly=True)
+    description = fields.Char(string='Description', readonly=True)
+    state = fields.Selection([
+        ('open', 'Open'),
+        ('resolved', 'Resolved'),
+    ], string='Status', required=True, default='open', readonly=True, index=True)
+    first_detected_at = fields.Datetime(string='First Detected At', readonly=True)
+    last_detected_at = fields.Datetime(string='Last Detected At', readonly=True)
+    resolved_at = fields.Datetime(string='Resolved At', readonly=True)
+
+    _sql_constraints = [
+        ('rule_record_uniq', 'unique(rule_code, res_id)', 'A rule reports at most one issue per record.'),
+    ]
+
+    def init(self):
+        # Scan watermark of each rule: incremental scans re-check the records written since then.
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SCAN_STATE_TABLE} (
+                rule_code varchar PRIMARY KEY,
+                rule_hash varchar NOT NULL,
+                scanned_at timestamp NOT NULL
+            )
+        """)
+        tools.create_index(
+            self.env.cr, 'influence_gen_data_quality_issue_open_idx', self._table,
+            ['model_name', 'res_id'], where="state = 'open'",
+        )
+
+    def action_open_record(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self.model_name,
+            'res_id': self.res_id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    @api.model
+    def _cron_scan(self):
+        """Scheduled action checking the records written since the previous scan against every rule."""
+        stats = DataQualityService(self.env).scan(commit=True)
+        _logger.info(f"Data quality scan finished: {stats}")
+        return stats
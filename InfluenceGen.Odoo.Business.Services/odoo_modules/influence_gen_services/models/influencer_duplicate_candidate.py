@@ -0,0 +1,105 @@
+from odoo import models, fields, api, tools, _
+from odoo.exceptions import UserError
+import logging
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import create_queue_table
+from ..services.influencer_deduplication_service import InfluencerDeduplicationService, PENDING_TABLE
+
+_logger = logging.getLogger(__name__)
+
+
+class InfluencerDuplicateCandidate(models.Model):
+    """
+    Pair of influencer profiles suspected to be the same person, queued by the MDM
+    matching for review (REQ-DMG-012). When automatic merge is enabled, pairs
+    scoring at least the auto-merge threshold on several signals are merged
+    automatically; the others wait for an administrator.
+    Rows are written with raw SQL by InfluencerDeduplicationService.
+    """
+    _name = 'influence_gen.influencer_duplicate_candidate'
+    _description = 'Influencer Duplicate Candidate'
+    _inherit = ['influence_gen.base_audit_mixin']
+    # Scores are rewritten by every matching run: only review decisions are audited.
+    _audit_log_fields = ('state',)
+    _order = 'score desc, id desc'
+    _rec_name = 'profile_a_id'
+
+    profile_a_id = fields.Many2one(
+        'influence_gen.influencer_profile',
+        string='Profile',
+        required=True,
+        ondelete='cascade',
+        readonly=True,
+        help="Oldest profile of the pair; it is kept when the pair is merged."
+    )
+    profile_b_id = fields.Many2one(
+        'influence_gen.influencer_profile',
+        string='Duplicate Profile',
+        required=True,
+        ondelete='cascade',
+        index=True,
+        readonly=True
+    )
+    score = fields.Float(string='Match Score', digits=(5, 4), readonly=True)
+    match_details = fields.Json(string='Match Details', readonly=True,
+                                help="Matching signals: email, phone, social handles in common, name similarity.")
+    state = fields.Selection([
+        ('pending', 'Pending Review'),
+        ('merged', 'Merged'),
+        ('dismissed', 'Not a Duplicate'),
+    ], string='Status', required=True, default='pending', readonly=True, index=True)
+    auto_merged = fields.Boolean(string='Merged Automatically', readonly=True)
+    reviewed_by_id = fields.Many2one('res.users', string='Reviewed By', readonly=True)
+    reviewed_at = fields.Datetime(string='Reviewed At', readonly=True)
+    merge_error = fields.Text(string='Merge Error', readonly=True)
+
+    _sql_constraints = [
+        ('profile_pair_uniq', 'unique(profile_a_id, profile_b_id)', 'This pair of profiles is already queued.'),
+        ('profile_pair_order', 'CHECK(profile_a_id < profile_b_id)', 'Pairs are stored with the oldest profile first.'),
+    ]
+
+    def init(self):
+        # Incremental matching queue: profiles created or updated since their last match.
+        create_queue_table(
+            self.env.cr, PENDING_TABLE,
+            'influencer_id integer PRIMARY KEY REFERENCES influence_gen_influencer_profile(id) ON DELETE CASCADE')
+        tools.create_index(
+            self.env.cr, 'influence_gen_influencer_duplicate_candidate_pending_idx', self._table,
+            ['score DESC'], where="state = 'pending'",
+        )
+        # First install: every existing profile needs its initial match.
+        self.env.cr.execute(f"SELECT 1 FROM {self._table} LIMIT 1")
+        if not self.env.cr.fetchone():
+            self.env.cr.execute(f"""
+                INSERT INTO {PENDING_TABLE} (influencer_id, marked_at)
+                SELECT id, now() at time zone 'UTC' FROM influence_gen_influencer_profile WHERE merged_into_id IS NULL
+                ON CONFLICT (influencer_id) DO NOTHING
+            """)
+
+    def action_merge(self):
+        """Merges the duplicate profile of each pair into the oldest one."""
+        service = InfluencerDeduplicationService(self.env)
+        for candidate in self:
+            if candidate.state != 'pending':
+                raise UserError(_("Only pending duplicate candidates can be merged."))
+            service.merge_profiles(candidate.profile_a_id, candidate.profile_b_id)
+            candidate.write({
+                'state': 'merged',
+                'reviewed_by_id': self.env.user.id,
+                'reviewed_at': fields.Datetime.now(),
+                'merge_error': False,
+            })
+        return True
+
+    def action_dismiss(self):
+        self.filtered(lambda c: c.state == 'pending').write({
+            'state': 'dismissed',
+            'reviewed_by_id': self.env.user.id,
+            'reviewed_at': fields.Datetime.now(),
+        })
+        return True
+
+    @api.model
+    def _cron_match_pending(self):
+        """Scheduled action matching the profiles created or updated since the last run."""
+        return InfluencerDeduplicationService(self.env).process_pending()
@@ -0,0 +1,50 @@
+from odoo import models, fields, api, _
+import logging
+
+from ..services.performance_summary_service import PerformanceSummaryService
+
+_logger = logging.getLogger(__name__)
+
+
+class InfluencerPerformanceSummary(models.Model):
+    """
+    Per-influencer dashboard summary: applications by status, submissions by review
+    status and payment totals (REQ-2-012, REQ-PAC-016).
+    Rows are upserted with raw SQL by PerformanceSummaryService when the influencer's
+    applications, submissions or payments change.
+    """
+    _name = 'influence_gen.influencer_performance_summary'
+    _description = 'Influencer Performance Summary'
+    # No BaseAuditMixin: derived data rewritten by the refresh crons; the source records are audited themselves.
+    _order = 'influencer_profile_id desc'
+    _rec_name = 'influencer_profile_id'
+
+    influencer_profile_id = fields.Many2one(
+        'influence_gen.influencer_profile',
+        string='Influencer',
+        required=True,
+        ondelete='cascade',
+        readonly=True
+    )
+    applications_total = fields.Integer(string='Applications', readonly=True)
+    applications_pending = fields.Integer(string='Pending Applications', readonly=True)
+    applications_approved = fields.Integer(string='Approved Applications', readonly=True)
+    applications_rejected = fields.Integer(string='Rejected Applications', readonly=True)
+    submissions_total = fields.Integer(string='Submissions', readonly=True)
+    submissions_pending = fields.Integer(string='Submissions Pending Review', readonly=True)
+    submissions_approved = fields.Integer(string='Approved Submissions', readonly=True)
+    payments_outstanding_amount = fields.Float(
+        string='Outstanding Payments', readonly=True,
+        help="Payments neither paid, failed nor cancelled, all currencies summed.")
+    payments_paid_amount = fields.Float(string='Paid Amount', readonly=True, help="All currencies summed.")
+    refreshed_at = fields.Datetime(string='Refreshed At', readonly=True)
+
+    _sql_constraints = [
+        ('influencer_uniq', 'unique(influencer_profile_id)', 'There can only be one performance summary per influencer.'),
+    ]
+
+    def init(self):
+        # First install: summarize every existing influencer (the stale table is created with the campaign summary).
+        self.env.cr.execute(f"SELECT 1 FROM {self._table} LIMIT 1")
+        if not self.env.cr.fetchone():
+            PerformanceSummaryService(self.env).mark_all_stale('influencer')
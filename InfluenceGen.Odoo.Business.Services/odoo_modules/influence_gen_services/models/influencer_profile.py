@@ -1,6 +1,11 @@
 import logging
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
+from odoo.modules.db import has_trigram
+
+from ..services.influencer_deduplication_service import (
+    InfluencerDeduplicationService, EMAIL_KEY_SQL, PHONE_KEY_SQL, NAME_KEY_SQL,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -76,6 +81,11 @@ class InfluencerProfile(models.Model):
         string='Legal Hold Active', default=False, tracking=True,
         help="Indicates if this profile is under a legal hold, preventing deletion."
     )
+    merged_into_id = fields.Many2one(
+        'influence_gen.influencer_profile', string='Merged Into', readonly=True, copy=False,
+        index='btree_not_null', ondelete='set null',
+        help="Surviving profile this duplicate was merged into by duplicate detection (REQ-DMG-012)."
+    )
     company_id = fields.Many2one(
         'res.company', string='Company', default=lambda self: self.env.company
     )
@@ -85,6 +95,44 @@ class InfluencerProfile(models.Model):
         ('user_id_unique', 'UNIQUE(user_id)', 'An Odoo user can only be linked to one influencer profile.')
     ]
 
+    # Changes to these fields queue the profile for duplicate matching (REQ-DMG-012).
+    _MDM_MATCH_FIELDS = ('full_name', 'email', 'phone')
+
+    def init(self):
+        # Blocking key indexes of the duplicate matching; expressions must match the service's SQL.
+        tools.create_index(self.env.cr, 'influence_gen_influencer_profile_email_key_idx', self._table,
+                           [EMAIL_KEY_SQL.format(alias='')])
+        tools.create_index(self.env.cr, 'influence_gen_influencer_profile_phone_key_idx', self._table,
+                           [PHONE_KEY_SQL.format(alias='')], where="phone IS NOT NULL")
+        if not self.env.registry.has_trigram:
+            try:
+                with self.env.cr.savepoint():
+                    self.env.cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            except Exception as e:
+                _logger.warning(f"pg_trgm is not available, duplicate matching will not compare names by similarity: {e}")
+                return
+            # The registry only checks the extension when it is loaded: refresh the flag so
+            # name matching is used at once, without restarting the server.
+            self.env.registry.has_trigram = has_trigram(self.env.cr)
+            if not self.env.registry.has_trigram:
+                return
+        self.env.cr.execute(f"""
+            CREATE INDEX IF NOT EXISTS influence_gen_influencer_profile_name_trgm_idx
+                ON {self._table} USING gin ({NAME_KEY_SQL.format(alias='')} gin_trgm_ops)
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        profiles = super().create(vals_list)
+        InfluencerDeduplicationService(self.env).mark_pending(profiles.ids)
+        return profiles
+
+    def write(self, vals):
+        res = super().write(vals)
+        if any(field_name in vals for field_name in self._MDM_MATCH_FIELDS):
+            InfluencerDeduplicationService(self.env).mark_pending(self.ids)
+        return res
+
     def name_get(self):
         """Override to return full_name or email as display name."""
         result = []
@@ -1,7 +1,9 @@
 import logging
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError
 
+from ..services.kyc_verification_queue_service import KycVerificationQueueService
+
 _logger = logging.getLogger(__name__)
 
 class KycData(models.Model):
@@ -61,8 +63,38 @@ class KycData(models.Model):
     external_verification_id = fields.Char(string='External Verification ID', tracking=True, copy=False,
                                            help="ID from a third-party KYC verification service.")
     
+    # Automated verification queue (REQ-IOKYC-005): documents are sent to the KYC provider in
+    # rate-limited batches and their results reconciled by cron, never inside the portal request.
+    provider_queue_state = fields.Selection([
+        ('queued', 'Queued for Provider'),
+        ('submitted', 'Awaiting Provider Result'),
+        ('done', 'Provider Result Applied'),
+        ('manual', 'Routed to Manual Review'),
+    ], string='Provider Verification', readonly=True, copy=False,
+        help="Empty for documents reviewed manually only.")
+    provider_status = fields.Char(string='Provider Status', readonly=True, copy=False,
+                                  help="Last status reported by the KYC provider, e.g. PENDING, VERIFIED, REJECTED.")
+    provider_reason = fields.Text(string='Provider Reason', readonly=True, copy=False)
+    provider_attempt_count = fields.Integer(string='Provider Attempts', default=0, readonly=True, copy=False)
+    provider_next_attempt_at = fields.Datetime(string='Next Provider Check', readonly=True, copy=False,
+                                               help="When the document is next submitted (queued) or polled (submitted).")
+    provider_submitted_at = fields.Datetime(string='Submitted to Provider', readonly=True, copy=False, index='btree_not_null')
+    provider_last_error = fields.Text(string='Provider Error', readonly=True, copy=False)
+
+    legal_hold_status = fields.Boolean(
+        string='Legal Hold Active', default=False, readonly=True, copy=False,
+        help="Set while a legal hold covers this KYC submission (see LegalHoldPropagationService).")
+
     company_id = fields.Many2one(related='influencer_profile_id.company_id', store=True)
 
+    def init(self):
+        # The submission and reconciliation crons only scan documents still in the provider queue.
+        tools.create_index(
+            self.env.cr, 'influence_gen_kyc_data_provider_queue_idx', self._table,
+            ['provider_queue_state', 'provider_next_attempt_at', 'id'],
+            where="provider_queue_state IN ('queued', 'submitted')",
+        )
+
 
     @api.model
     def create(self, vals):
@@ -136,4 +168,22 @@ class KycData(models.Model):
                 summary=_('Additional Information Required for KYC'),
                 note=_('Please provide the following for your KYC verification: %s. Notes: %s') % (required_info, notes or ''),
                 user_id=self.influencer_profile_id.user_id.id
-            )
\ No newline at end of file
+            )
+
+    def action_queue_provider_verification(self):
+        """Queues the documents for automated verification by the KYC provider."""
+        return KycVerificationQueueService(self.env).enqueue(self)
+
+    @api.model
+    def _cron_submit_provider_verifications(self):
+        """Scheduled action sending queued documents to the KYC provider in rate-limited batches."""
+        stats = KycVerificationQueueService(self.env).submit_queued()
+        _logger.info(f"KYC provider submission finished: {stats}")
+        return stats
+
+    @api.model
+    def _cron_reconcile_provider_verifications(self):
+        """Scheduled action polling the KYC provider for documents awaiting a result."""
+        stats = KycVerificationQueueService(self.env).reconcile_pending()
+        _logger.info(f"KYC provider reconciliation finished: {stats}")
+        return stats
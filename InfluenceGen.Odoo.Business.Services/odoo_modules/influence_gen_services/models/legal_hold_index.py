@@ -0,0 +1,141 @@
+from odoo import models, api, tools
+import logging
+import threading
+
+from ..services.legal_hold_propagation_service import LegalHoldPropagationService, HOLD_MEMBER_TABLE
+
+_logger = logging.getLogger(__name__)
+
+HOLD_GENERATION_TABLE = 'influence_gen_legal_hold_generation'
+HOLD_GENERATION_SEQUENCE = 'influence_gen_legal_hold_generation_seq'
+
+# Held-ID bitmaps of this worker process: {(dbname, model name): (generation, bitmap)}.
+_HELD_BITMAPS = {}
+_HELD_BITMAPS_LOCK = threading.Lock()
+
+
+class LegalHoldIndex(models.AbstractModel):
+    """
+    Index of the records under legal hold (REQ-DRH-009), for hold checks that do
+    not depend on a legal_hold_status field existing on the model.
+
+    The hold membership table, maintained by LegalHoldPropagationService, is keyed
+    on (model, res_id): its primary key (model, res_id, hold_ref) covers the
+    existence probes, so retention and erasure queries exclude held records with
+    an index-only anti-join (see hold_exclusion_sql). For checks from Python, each
+    worker keeps one bitmap of held IDs per model, tagged with the model's hold
+    generation. Changing the holds of a model gives it a new generation in the same
+    transaction (see invalidate), so every worker rebuilds that bitmap on first use
+    once the change is committed, and a rolled back change never shows.
+    """
+    _name = 'influence_gen.legal_hold_index'
+    _description = 'Legal Hold Index'
+
+    def init(self):
+        # One row per (model, record, hold), written by LegalHoldPropagationService.
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {HOLD_MEMBER_TABLE} (
+                model varchar NOT NULL,
+                res_id integer NOT NULL,
+                hold_ref varchar NOT NULL,
+                placed_at timestamp NOT NULL,
+                PRIMARY KEY (model, res_id, hold_ref)
+            )
+        """)
+        tools.create_index(self.env.cr, f'{HOLD_MEMBER_TABLE}_hold_ref_idx', HOLD_MEMBER_TABLE, ['hold_ref', 'model'])
+        # Hold generation of each model; values come from a sequence, so a rolled back one is never reused.
+        self.env.cr.execute(f"CREATE SEQUENCE IF NOT EXISTS {HOLD_GENERATION_SEQUENCE}")
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {HOLD_GENERATION_TABLE} (
+                model varchar PRIMARY KEY,
+                generation bigint NOT NULL
+            )
+        """)
+
+    @api.model
+    def _get_held_bitmap(self, model_name):
+        """
+        Bitmap of the held IDs of a model: bit `id` is set when the record is held.
+        Cached per worker until the model's hold generation changes; treat as read-only.
+        """
+        self.env.cr.execute(f"SELECT generation FROM {HOLD_GENERATION_TABLE} WHERE model = %s", [model_name])
+        row = self.env.cr.fetchone()
+        generation = row[0] if row else 0
+        key = (self.env.cr.dbname, model_name)
+        cached = _HELD_BITMAPS.get(key)
+        if cached and cached[0] == generation:
+            return cached[1]
+        bitmap = self._build_held_bitmap(model_name)
+        with _HELD_BITMAPS_LOCK:
+            _HELD_BITMAPS[key] = (generation, bitmap)
+        return bitmap
+
+    @api.model
+    def _build_held_bitmap(self, model_name):
+        self.env.cr.execute(f"SELECT max(res_id) FROM {HOLD_MEMBER_TABLE} WHERE model = %s", [model_name])
+        max_id = self.env.cr.fetchone()[0]
+        if max_id is None:
+            return b''
+        bitmap = bytearray(max_id // 8 + 1)
+        self.env.cr.execute(f"SELECT DISTINCT res_id FROM {HOLD_MEMBER_TABLE} WHERE model = %s", [model_name])
+        for (res_id,) in self.env.cr.fetchall():
+            bitmap[res_id >> 3] |= 1 << (res_id & 7)
+        return bytes(bitmap)
+
+    @api.model
+    def is_held(self, model_name, res_id):
+        """Checks one record against the cached bitmap: one lookup of the model's hold generation, no scan."""
+        bitmap = self._get_held_bitmap(model_name)
+        return (res_id >> 3) < len(bitmap) and bool(bitmap[res_id >> 3] & (1 << (res_id & 7)))
+
+    @api.model
+    def filter_held(self, model_name, res_ids):
+        """:return: the IDs of res_ids that are held"""
+        bitmap = self._get_held_bitmap(model_name)
+        size = len(bitmap)
+        return [res_id for res_id in res_ids if (res_id >> 3) < size and bitmap[res_id >> 3] & (1 << (res_id & 7))]
+
+    @api.model
+    def is_held_exact(self, model_name, res_id):
+        """Authoritative check in the current transaction, for destructive operations (one index probe)."""
+        self.env.cr.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {HOLD_MEMBER_TABLE} WHERE model = %s AND res_id = %s)", [model_name, res_id])
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def hold_exclusion_sql(self, model_name, alias):
+        """
+        :return: (SQL condition, params) excluding the held records of model_name,
+                 whose table is aliased `alias` in the calling query
+        """
+        return (f'NOT EXISTS (SELECT 1 FROM {HOLD_MEMBER_TABLE} held '
+                f'WHERE held.model = %s AND held.res_id = "{alias}".id)', [model_name])
+
+    @api.model
+    def invalidate(self, model_names):
+        """
+        Gives the models a new hold generation, in the current transaction: the cached bitmaps
+        of these models are rebuilt by every worker once it commits, and never if it rolls back.
+        This worker's stale bitmaps are dropped after the commit.
+        :param model_names: models whose hold membership changed
+        """
+        model_names = sorted(set(model_names))
+        if not model_names:
+            return
+        self.env.cr.execute(f"""
+            INSERT INTO {HOLD_GENERATION_TABLE} (model, generation)
+            SELECT model, nextval('{HOLD_GENERATION_SEQUENCE}') FROM unnest(%s::varchar[]) AS model
+            ON CONFLICT (model) DO UPDATE SET generation = EXCLUDED.generation
+        """, [model_names])
+        dbname = self.env.cr.dbname
+
+        @self.env.cr.postcommit.add
+        def drop_bitmaps():
+            with _HELD_BITMAPS_LOCK:
+                for model_name in model_names:
+                    _HELD_BITMAPS.pop((dbname, model_name), None)
+
+    @api.model
+    def _cron_refresh(self):
+        """Scheduled action extending the legal holds to the records created since they were placed."""
+        return LegalHoldPropagationService(self.env).refresh()
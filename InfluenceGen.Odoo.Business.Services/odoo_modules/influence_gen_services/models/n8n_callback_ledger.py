@@ -0,0 +1,112 @@
+from odoo import models, fields, api, _
+import logging
+import json
+
+_logger = logging.getLogger(__name__)
+
+
+class N8nCallbackLedger(models.Model):
+    """
+    Idempotency ledger of N8N AI generation callbacks (REQ-AIGS-001, REQ-IL-008).
+    One row per (request, N8N execution): the first delivery claims the row and
+    stores its outcome, retried deliveries of the same execution find the row in
+    a single indexed statement and get the stored outcome back without any
+    reprocessing (no new downloads, images, attachments or usage logs).
+    Deliveries whose processing failed are not cached: a retry claims the row
+    again and is processed anew.
+
+    Concurrent deliveries of the same execution serialize on the unique index:
+    the second one waits for the first transaction, then sees the claimed row
+    (under Odoo's REPEATABLE READ isolation, it fails with a serialization error
+    and is retried by the HTTP layer, which then sees the committed row).
+    """
+    _name = 'influence_gen.n8n_callback_ledger'
+    _description = 'N8N Callback Idempotency Ledger'
+    # No BaseAuditMixin: rows are written with raw SQL on every callback; outcomes are audited on the request.
+    _order = 'id desc'
+    _rec_name = 'n8n_execution_id'
+
+    request_id = fields.Many2one(
+        'influence_gen.ai_image_generation_request',
+        string='AI Generation Request',
+        required=True,
+        ondelete='cascade',
+        readonly=True
+    )
+    n8n_execution_id = fields.Char(
+        string='N8N Execution ID',
+        required=True,
+        readonly=True
+    )
+    callback_type = fields.Selection([
+        ('success', 'Success'),
+        ('error', 'Error'),
+    ], string='Callback Type', required=True, readonly=True)
+    state = fields.Selection([
+        ('processing', 'Processing'),
+        ('processed', 'Processed'),
+        ('ignored', 'Ignored'),
+        ('failed', 'Failed'),
+    ], string='State', required=True, default='processing', readonly=True,
+        help="Ignored: the callback arrived after the request had reached a state it may not override.\n"
+             "Failed: processing raised an error; a retried delivery is processed again.")
+    result_json = fields.Text(string='Result (JSON)', readonly=True)
+    duplicate_count = fields.Integer(
+        string='Duplicate Deliveries',
+        default=0,
+        readonly=True,
+        help="Number of retried deliveries answered from this entry."
+    )
+
+    _sql_constraints = [
+        ('request_execution_uniq', 'unique(request_id, n8n_execution_id)',
+         'An N8N execution can only be recorded once per AI generation request.'),
+    ]
+
+    @api.model
+    def claim(self, request_id, n8n_execution_id, callback_type):
+        """
+        Claims the processing of a callback.
+        :return: tuple (entry_id, None) if this delivery must be processed (first delivery,
+                 or retry of a failed one), or (False, cached_result) for a duplicate
+                 delivery; cached_result is the dict
+                 stored by record_result, or {'outcome': 'processing'} if the first delivery
+                 has not recorded its result
+        """
+        self.env.cr.execute("""
+            INSERT INTO influence_gen_n8n_callback_ledger
+                   (request_id, n8n_execution_id, callback_type, state, duplicate_count,
+                    create_uid, create_date, write_uid, write_date)
+            VALUES (%(request)s, %(execution)s, %(type)s, 'processing', 0,
+                    %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC')
+            ON CONFLICT (request_id, n8n_execution_id) DO UPDATE
+               SET state = 'processing', result_json = NULL, callback_type = EXCLUDED.callback_type,
+                   write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+             WHERE influence_gen_n8n_callback_ledger.state = 'failed'
+         RETURNING id
+        """, {'request': request_id, 'execution': n8n_execution_id, 'type': callback_type, 'uid': self.env.uid})
+        row = self.env.cr.fetchone()
+        if row:
+            return row[0], None
+
+        self.env.cr.execute("""
+            UPDATE influence_gen_n8n_callback_ledger
+               SET duplicate_count = duplicate_count + 1,
+                   write_uid = %s, write_date = now() at time zone 'UTC'
+             WHERE request_id = %s AND n8n_execution_id = %s
+         RETURNING result_json
+        """, [self.env.uid, request_id, n8n_execution_id])
+        result_json = self.env.cr.fetchone()[0]
+        _logger.info(f"Duplicate N8N callback for request {request_id}, execution {n8n_execution_id}. Returning cached result.")
+        return False, json.loads(result_json) if result_json else {'outcome': 'processing'}
+
+    @api.model
+    def record_result(self, entry_id, result, state='processed'):
+        """Stores the outcome of a claimed callback, returned as-is to later duplicate deliveries."""
+        self.env.cr.execute("""
+            UPDATE influence_gen_n8n_callback_ledger
+               SET state = %s, result_json = %s,
+                   write_uid = %s, write_date = now() at time zone 'UTC'
+             WHERE id = %s
+        """, [state, json.dumps(result, default=str), self.env.uid, entry_id])
+        self.invalidate_model(['state', 'result_json', 'write_uid', 'write_date'])
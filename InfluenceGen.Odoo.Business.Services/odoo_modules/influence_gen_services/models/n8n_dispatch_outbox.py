@@ -0,0 +1,84 @@
+from odoo import models, fields, api, tools, _
+import logging
+import json
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import trigger_cron
+from ..services.n8n_dispatch_service import N8nDispatchService
+
+_logger = logging.getLogger(__name__)
+
+
+class N8nDispatchOutbox(models.Model):
+    """
+    Durable outbox of calls to N8N webhooks (REQ-AIGS-001, REQ-IL-008).
+    Business code enqueues a row in its own transaction and returns at once; the
+    dispatcher cron drains pending rows outside of user requests, so a slow or
+    unavailable N8N never holds a portal worker. A row is only visible to the
+    dispatcher once the enqueuing transaction has committed.
+    """
+    _name = 'influence_gen.n8n_dispatch_outbox'
+    _description = 'N8N Dispatch Outbox'
+    # No BaseAuditMixin: technical queue rows; the dispatched requests are audited themselves.
+    _order = 'id'
+    _rec_name = 'endpoint'
+
+    endpoint = fields.Char(
+        string='Endpoint',
+        required=True,
+        readonly=True,
+        help="Key of the N8N webhook in N8N_ENDPOINTS (e.g. 'ai_image_generation')."
+    )
+    request_id = fields.Many2one(
+        'influence_gen.ai_image_generation_request',
+        string='AI Generation Request',
+        ondelete='cascade',
+        index='btree_not_null',
+        readonly=True
+    )
+    payload_json = fields.Text(string='Payload (JSON)', required=True, readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ], string='State', required=True, default='pending', readonly=True)
+    attempt_count = fields.Integer(string='Attempts', default=0, readonly=True)
+    next_attempt_at = fields.Datetime(
+        string='Next Attempt',
+        required=True,
+        default=fields.Datetime.now,
+        readonly=True
+    )
+    sent_at = fields.Datetime(string='Sent At', readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    def init(self):
+        # The dispatcher only ever scans due pending rows.
+        tools.create_index(
+            self.env.cr, 'influence_gen_n8n_dispatch_outbox_pending_idx', self._table,
+            ['next_attempt_at', 'id'], where="state = 'pending'",
+        )
+
+    @api.model
+    def enqueue(self, endpoint, payload, request_id=False):
+        """
+        Queues a webhook call and wakes the dispatcher up once the transaction commits.
+        :param str endpoint: key in N8N_ENDPOINTS
+        :param dict payload: JSON-serializable webhook payload
+        :param int request_id: optional influence_gen.ai_image_generation_request ID
+        :return: the created outbox record
+        """
+        entry = self.sudo().create({
+            'endpoint': endpoint,
+            'request_id': request_id,
+            'payload_json': json.dumps(payload, default=str),
+        })
+        trigger_cron(self.env, 'influence_gen_services.ir_cron_dispatch_n8n_outbox')
+        _logger.info(f"Queued N8N '{endpoint}' call {entry.id} (request {request_id or '-'}).")
+        return entry
+
+    @api.model
+    def _cron_dispatch(self):
+        """Scheduled action draining due outbox rows."""
+        stats = N8nDispatchService(self.env).dispatch_pending()
+        _logger.info(f"N8N outbox dispatch finished: {stats}")
+        return stats
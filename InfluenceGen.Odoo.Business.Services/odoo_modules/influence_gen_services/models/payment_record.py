@@ -61,6 +61,9 @@ class PaymentRecord(models.Model):
         tracking=True,
         help="Currency of the payment."
     )
+    legal_hold_status = fields.Boolean(
+        string='Legal Hold Active', default=False, readonly=True, copy=False,
+        help="Set while a legal hold covers this payment (see LegalHoldPropagationService).")
     company_id = fields.Many2one(
         'res.company',
         string='Company',
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
+import copy
 import json
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError, ValidationError
 
+from odoo.addons.influence_gen_shared_core.utils.prompt_matcher import KeywordMatcher
+
 import logging
 _logger = logging.getLogger(__name__)
 
@@ -13,6 +16,8 @@ class PlatformSetting(models.Model):
     This model provides a flexible way to store and manage various platform settings
     and business rule parameters that can be changed without code deployment.
     Changes to settings are audited via BaseAuditMixin.
+    Active settings are cached per database as already-typed values (JSON parsed
+    once); see _get_settings_map for invalidation.
     REQ-IOKYC-017 (provides mechanism for KYC settings)
     """
     _name = 'influence_gen.platform_setting'
@@ -127,30 +132,91 @@ class PlatformSetting(models.Model):
             return None # Or an empty dict/list as per convention
         return None # Should not happen if value_type is valid
 
+    @api.model
+    @tools.ormcache()
+    def _get_settings_map(self):
+        """
+        Loads every active setting with one query and returns {key: typed_value}.
+        The result lives in the registry's ORM cache (one per database) and is cleared
+        by create/write/unlink. Other workers notice the change through the registry
+        cache sequence, which Odoo checks once at the start of each request.
+        Settings whose JSON is invalid are left out so get_setting returns its default.
+        The cached JSON values are never handed out: get_setting and get_settings return
+        copies (see _copy_value), so callers may modify what they get.
+        """
+        settings_map = {}
+        for setting in self.sudo().search([('active', '=', True)]):
+            try:
+                settings_map[setting.key] = setting._get_typed_value()
+            except UserError:
+                _logger.warning("Error retrieving typed value for setting '%s', it will fall back to defaults.", setting.key, exc_info=True)
+        return settings_map
+
     @api.model
     def get_setting(self, key_name, default=None, company_id=None):
         """
         Finds an active setting by key_name and returns its appropriately typed value.
         If not found or inactive, returns the provided default value.
+        Served from the per-database settings cache; no SQL once the cache is warm.
 
         :param str key_name: The unique key of the setting.
         :param any default: The value to return if the setting is not found or inactive.
         :param int company_id: Optional company_id if settings can be company-specific (not implemented here).
         :return: Actual value (str, int, float, bool, dict/list from JSON) or default.
         """
-        # Add domain for company_id if settings become company-specific
-        domain = [('key', '=', key_name), ('active', '=', True)]
         # For now, company_id is not part of the model structure for uniqueness or retrieval.
-        # If it were, domain would include ('company_id', '=', company_id) or similar logic.
+        settings_map = self._get_settings_map()
+        if key_name not in settings_map:
+            return default
+        return self._copy_value(settings_map[key_name])
 
-        setting = self.search(domain, limit=1)
-        if setting:
-            try:
-                return setting._get_typed_value()
-            except UserError: # Catch specific errors like invalid JSON from _get_typed_value
-                 _logger.warning("Error retrieving typed value for setting '%s', returning default.", key_name, exc_info=True)
-                 return default
-        return default
+    @api.model
+    def get_settings(self, prefix):
+        """
+        Returns all active settings whose key starts with prefix, for callers reading
+        many related keys at once (e.g. 'retention.' or 'kyc.').
+
+        :param str prefix: Key prefix to match.
+        :return: dict {key: typed value}
+        """
+        return {
+            key: self._copy_value(value) for key, value in self._get_settings_map().items() if key.startswith(prefix)
+        }
+
+    @api.model
+    def _copy_value(self, value):
+        """Copy of a cached setting value: parsed JSON (dict, list) is mutable and must not leak the cache."""
+        return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    @api.model
+    @tools.ormcache('key_name', 'word_boundary')
+    def _get_keyword_matcher(self, key_name, word_boundary=False):
+        """
+        Returns a compiled KeywordMatcher for a setting holding a JSON list of keywords
+        (e.g. 'ai.prompt.denylist_keywords'). Built once and cached alongside the
+        settings, so it is only rebuilt after a setting changes.
+        """
+        keywords = self.get_setting(key_name, default=[])
+        if not isinstance(keywords, list):
+            _logger.warning("Setting '%s' is not a JSON list of keywords. Using an empty list.", key_name)
+            keywords = []
+        return KeywordMatcher(keywords, word_boundary=word_boundary)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(PlatformSetting, self).create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        res = super(PlatformSetting, self).write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super(PlatformSetting, self).unlink()
+        self.env.registry.clear_cache()
+        return res
 
     @api.model
     def set_setting(self, key_name, value, value_type=None, description=None, module=None, company_id=None):
@@ -1,7 +1,10 @@
 import logging
 import re
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import ValidationError
+from odoo.addons.influence_gen_shared_core.utils.data_transformation_utils import normalize_social_media_handle
+
+from ..services.influencer_deduplication_service import InfluencerDeduplicationService
 
 _logger = logging.getLogger(__name__)
 
@@ -29,6 +32,10 @@ class SocialMediaProfile(models.Model):
         ('other', 'Other'),
     ], string='Platform', required=True, index=True)
     handle = fields.Char(string='Handle / Username', required=True, tracking=True)
+    handle_normalized = fields.Char(
+        string='Normalized Handle', compute='_compute_handle_normalized', store=True,
+        help="Handle without '@', lowercased on case-insensitive platforms; blocking key of duplicate detection."
+    )
     url = fields.Char(string='Profile URL', tracking=True)
     verification_status = fields.Selection([
         ('pending', 'Pending'),
@@ -56,6 +63,31 @@ class SocialMediaProfile(models.Model):
          'The combination of platform, handle, and influencer must be unique.')
     ]
 
+    def init(self):
+        tools.create_index(self.env.cr, 'influence_gen_social_media_profile_handle_key_idx', self._table,
+                           ['platform', 'handle_normalized'], where="handle_normalized IS NOT NULL")
+
+    @api.depends('platform', 'handle')
+    def _compute_handle_normalized(self):
+        for record in self:
+            # normalize_social_media_handle names Twitter by its current name.
+            platform = 'x' if record.platform == 'twitter' else record.platform
+            record.handle_normalized = normalize_social_media_handle(record.handle, platform)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        profiles = super().create(vals_list)
+        InfluencerDeduplicationService(self.env).mark_pending(profiles.influencer_profile_id.ids)
+        return profiles
+
+    def write(self, vals):
+        if not any(field_name in vals for field_name in ('platform', 'handle', 'influencer_profile_id')):
+            return super().write(vals)
+        influencer_ids = set(self.influencer_profile_id.ids)
+        res = super().write(vals)
+        InfluencerDeduplicationService(self.env).mark_pending(influencer_ids | set(self.influencer_profile_id.ids))
+        return res
+
     @api.constrains('url')
     def _check_url_format(self):
         """Validates the URL format."""
@@ -1,9 +1,23 @@
 from . import onboarding_service
+from . import campaign_kpi_aggregation_service
 from . import campaign_management_service
+from . import campaign_discovery_service
+from . import compensation_calculators
+from . import payment_dues_engine
 from . import payment_processing_service
+from . import n8n_dispatch_service
 from . import ai_integration_service
+from . import influencer_deduplication_service
+from . import staging_dataset_exporter
+from . import data_quality_service
 from . import data_management_service
+from . import retention_executor
+from . import legal_hold_propagation_service
 from . import retention_and_legal_hold_service
+from . import kyc_verification_queue_service
+from . import performance_summary_service
+from . import dashboard_metrics_service
+from . import broadcast_notification_service
 
 # To make services easily accessible via self.env['influence_gen.services.service_name']
 # we can instantiate them once or provide a mechanism to get an instance.
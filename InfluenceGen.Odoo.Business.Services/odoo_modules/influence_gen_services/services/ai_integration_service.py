@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 import logging
 import json
-from odoo import _, api
+from odoo import _, api, fields
 from odoo.exceptions import UserError, ValidationError
 
 _logger = logging.getLogger(__name__)
@@ -23,10 +23,9 @@ class AiIntegrationService:
         """
         Initiates an AI image generation request.
         - Validates prompt.
-        - Checks user quota.
+        - Reserves user quota on the quota ledger.
         - Creates AiImageGenerationRequest record.
-        - Calls REPO-IGIA-004 (N8N adapter) to trigger workflow.
-        - Updates request status.
+        - Queues the N8N workflow call (REPO-IGIA-004) in the dispatch outbox.
         :param user_id: int, ID of res.users initiating
         :param influencer_profile_id: int, ID of influence_gen.influencer_profile for quota/context
         :param prompt_data: dict, e.g., {'prompt': 'A cat astronaut', 'negative_prompt': 'ugly, blurry'}
@@ -43,10 +42,6 @@ class AiIntegrationService:
         if not is_valid_prompt:
             raise UserError(_("Prompt validation failed: %s") % reason)
 
-        # Check user quota (REQ-AIGS-002)
-        if not self.check_user_ai_quota(influencer_profile_id): # Pass influencer_profile_id
-            raise UserError(_("AI image generation quota exceeded for this period."))
-
         if not generation_params.get('model_id'):
             raise UserError(_("AI Model ID is required for generation."))
         
@@ -54,6 +49,12 @@ class AiIntegrationService:
         if not ai_model.exists() or not ai_model.is_active:
             raise UserError(_("Invalid or inactive AI Model selected."))
 
+        # Reserve user quota (REQ-AIGS-002). Settled by the N8N callbacks.
+        num_images = max(int(generation_params.get('num_images') or 1), 1)
+        quota_period_start = self.env['influence_gen.ai_quota_ledger'].reserve_units(influencer_profile_id, num_images)
+        if not quota_period_start:
+            raise UserError(_("AI image generation quota exceeded for this period."))
+
         request_vals = {
             'user_id': user_id,
             'influencer_profile_id': influencer_profile_id,
@@ -68,6 +69,9 @@ class AiIntegrationService:
             'cfg_scale': generation_params.get('cfg_scale'),
             'status': 'queued',
             'intended_use': intended_use,
+            'num_images_requested': num_images,
+            'quota_period_start': quota_period_start,
+            'quota_units_reserved': num_images,
         }
         ai_request = self.env['influence_gen.ai_image_generation_request'].create(request_vals)
         _logger.info(f"Created AI Image Generation Request ID: {ai_request.id}")
@@ -87,24 +91,11 @@ class AiIntegrationService:
             'callback_url_error': f"{self.env['ir.config_parameter'].sudo().get_param('web.base.url')}/influence_gen/ai_callback/error",
         }
 
-        try:
-            # Call REPO-IGIA-004 (Integration Adapter for N8N)
-            # This is a placeholder for the actual adapter call
-            # n8n_execution_id = self.env['influence_gen.integration.adapter'].trigger_ai_generation_workflow(n8n_payload)
-            # _logger.info(f"Triggered N8N workflow. Execution ID (placeholder): {n8n_execution_id}")
-            # ai_request.write({'status': 'processing_n8n', 'n8n_execution_id': n8n_execution_id})
-            
-            # Placeholder for direct call simulation if adapter not available
-            _logger.warning("N8N Integration Adapter call is a placeholder. Simulating call.")
-            # For testing, one might directly call handle_n8n_image_result_callback or error_callback
-            # For now, just set to processing_n8n
-            ai_request.write({'status': 'processing_n8n', 'n8n_execution_id': f'simulated_n8n_exec_{ai_request.id}'})
-
-        except Exception as e:
-            _logger.error(f"Failed to trigger N8N workflow for request {ai_request.id}: {e}")
-            ai_request.write({'status': 'failed', 'error_details': str(e)})
-            raise UserError(_("Failed to initiate AI image generation with external service: %s") % str(e))
-            
+        # Queue the N8N call (REPO-IGIA-004); the outbox dispatcher sends it outside of this
+        # request, so a slow or unavailable N8N never blocks the user. The request stays
+        # 'queued' until the call is accepted by N8N ('processing_n8n') or given up ('failed').
+        self.env['influence_gen.n8n_dispatch_outbox'].enqueue('ai_image_generation', n8n_payload, request_id=ai_request.id)
+
         return ai_request
 
     def handle_n8n_image_result_callback(self, request_id, image_results_list, n8n_execution_id):
@@ -114,10 +105,14 @@ class AiIntegrationService:
         - Creates ir.attachment and GeneratedImage records.
         - Calculates hash, sets retention category.
         - Updates request status to 'completed'.
-        - Decrements quota and logs usage.
+        - Settles the quota reservation and logs usage.
+        Retried deliveries of the same N8N execution return the first delivery's result
+        without reprocessing. A success callback is ignored once the request is completed
+        or cancelled, but supersedes an earlier error callback.
         :param request_id: int, ID of influence_gen.ai_image_generation_request
         :param image_results_list: list of dicts, each with image data (e.g., 'image_base64', 'file_name', 'format', 'size', 'width', 'height', 'external_url')
-        :param n8n_execution_id: str, N8N execution ID for tracing
+        :param n8n_execution_id: str, N8N execution ID for tracing and deduplication
+        :return: dict (see _finish_n8n_callback), or False if the request does not exist
         REQ-AIGS-001, REQ-AIGS-006, REQ-AIGS-010
         """
         _logger.info(f"Handling N8N image result callback for request ID: {request_id}, N8N Exec ID: {n8n_execution_id}")
@@ -126,6 +121,13 @@ class AiIntegrationService:
             _logger.error(f"AI Generation Request ID {request_id} not found for N8N callback.")
             return False # Or raise error to N8N if it expects a specific response
 
+        entry_id, cached_result = self._claim_n8n_callback(ai_request, n8n_execution_id, 'success')
+        if cached_result is not None:
+            return cached_result
+        if ai_request.status in ('completed', 'cancelled'):
+            _logger.warning(f"Ignoring N8N success callback (Exec ID: {n8n_execution_id}) for request {ai_request.id} in status {ai_request.status}.")
+            return self._finish_n8n_callback(entry_id, ai_request, 'ignored')
+
         GeneratedImage = self.env['influence_gen.generated_image']
         Attachment = self.env['ir.attachment']
         images_generated_count = 0
@@ -190,33 +192,43 @@ class AiIntegrationService:
             images_generated_count += 1
 
         if images_generated_count > 0:
+            # Quota is settled before the status write, whose notification reports the remaining quota.
+            if not ai_request._settle_quota_reservation(images_generated_count): # REQ-AIGS-002
+                # The reservation was already released by an earlier error callback: record the usage on its period.
+                self.env['influence_gen.ai_quota_ledger'].settle_units(
+                    ai_request.influencer_profile_id.id, ai_request.quota_period_start, 0, images_generated_count)
             ai_request.write({
                 'status': 'completed',
                 'n8n_execution_id': n8n_execution_id, # Update if changed/confirmed by N8N
                 'error_details': None,
             })
-            self.decrement_user_ai_quota(ai_request.influencer_profile_id.id, images_generated_count) # REQ-AIGS-002
             self.log_ai_usage(ai_request.id, images_generated_count, api_calls_to_ai_service=1) # REQ-AIGS-007
             _logger.info(f"AI Request ID {ai_request.id} completed with {images_generated_count} images.")
         else:
             # If no images were successfully processed from callback, mark as failed.
+            ai_request._settle_quota_reservation(0) # Release the reservation
             ai_request.write({
                 'status': 'failed',
                 'n8n_execution_id': n8n_execution_id,
                 'error_details': _("N8N callback received but no valid image data processed."),
             })
             _logger.warning(f"AI Request ID {ai_request.id} processed callback but generated 0 images successfully.")
-        return True
+        return self._finish_n8n_callback(entry_id, ai_request, 'processed')
 
     def handle_n8n_image_error_callback(self, request_id, error_message, n8n_execution_id):
         """
         Handles error callback from N8N.
         - Finds AiImageGenerationRequest.
         - Updates status to 'failed', stores error_message.
+        - Releases the quota reservation.
         - Logs. Sends failure notification (conceptual).
+        Retried deliveries return the first delivery's result. An error callback is ignored
+        once the request is completed, failed or cancelled, so a late error never overrides
+        a success and the first error is kept.
         :param request_id: int, ID of influence_gen.ai_image_generation_request
         :param error_message: str, error details from N8N
-        :param n8n_execution_id: str, N8N execution ID for tracing
+        :param n8n_execution_id: str, N8N execution ID for tracing and deduplication
+        :return: dict (see _finish_n8n_callback), or False if the request does not exist
         REQ-AIGS-001
         """
         _logger.error(f"Handling N8N image error callback for request ID: {request_id}. Error: {error_message}")
@@ -225,6 +237,14 @@ class AiIntegrationService:
             _logger.error(f"AI Generation Request ID {request_id} not found for N8N error callback.")
             return False
 
+        entry_id, cached_result = self._claim_n8n_callback(ai_request, n8n_execution_id, 'error')
+        if cached_result is not None:
+            return cached_result
+        if ai_request.status in ('completed', 'failed', 'cancelled'):
+            _logger.warning(f"Ignoring N8N error callback (Exec ID: {n8n_execution_id}) for request {ai_request.id} in status {ai_request.status}.")
+            return self._finish_n8n_callback(entry_id, ai_request, 'ignored')
+
+        ai_request._settle_quota_reservation(0) # REQ-AIGS-002
         ai_request.write({
             'status': 'failed',
             'error_details': error_message,
@@ -237,69 +257,81 @@ class AiIntegrationService:
         # Example:
         # ai_request.message_post(body=_("AI image generation failed. Details: %s") % error_message)
         
-        return True
+        return self._finish_n8n_callback(entry_id, ai_request, 'processed')
 
-    def check_user_ai_quota(self, influencer_profile_id):
+    def _claim_n8n_callback(self, ai_request, n8n_execution_id, callback_type):
+        """
+        Deduplicates a callback on (request, N8N execution) and serializes the callbacks of
+        one request by locking its row, so out-of-order success/error deliveries are applied
+        one at a time against the current status.
+        :return: tuple (ledger entry ID or False, cached result dict or None for a new delivery)
+        """
+        entry_id = False
+        if n8n_execution_id:
+            entry_id, cached_result = self.env['influence_gen.n8n_callback_ledger'].claim(
+                ai_request.id, str(n8n_execution_id), callback_type)
+            if cached_result is not None:
+                return False, cached_result
+        else:
+            _logger.warning(f"N8N {callback_type} callback for request {ai_request.id} has no execution ID; it cannot be deduplicated.")
+        ai_request.flush_recordset()
+        self.env.cr.execute(
+            "SELECT id FROM influence_gen_ai_image_generation_request WHERE id = %s FOR UPDATE", [ai_request.id])
+        ai_request.invalidate_recordset()
+        return entry_id, None
+
+    def _finish_n8n_callback(self, entry_id, ai_request, outcome):
+        """
+        Builds the callback result and stores it in the ledger for duplicate deliveries.
+        :param str outcome: 'processed' or 'ignored'
+        :return: dict with request_id, status, outcome and generated_image_ids
+        """
+        result = {
+            'request_id': ai_request.id,
+            'status': ai_request.status,
+            'outcome': outcome,
+            'generated_image_ids': ai_request.generated_image_ids.ids,
+        }
+        if entry_id:
+            self.env['influence_gen.n8n_callback_ledger'].record_result(entry_id, result, state=outcome)
+        return result
+
+    def check_user_ai_quota(self, influencer_profile_id, images_to_generate=1):
         """
         Checks if the user has available AI generation quota.
-        Reads quota settings (from PlatformSetting or user/role config)
-        and current usage (from UsageTrackingLog for the current period).
+        Reads the influencer's row on the quota ledger for the current period, so the
+        cost does not depend on how much the influencer has generated. This is an
+        advisory check for UIs; initiate_ai_image_generation reserves atomically.
         :param influencer_profile_id: int, ID of influence_gen.influencer_profile
+        :param images_to_generate: int, number of images about to be requested
         :return: bool (True if quota available)
         REQ-AIGS-002
         """
-        PlatformSetting = self.env['influence_gen.platform_setting']
         influencer = self.env['influence_gen.influencer_profile'].browse(influencer_profile_id)
         if not influencer.exists():
             _logger.warning(f"Influencer profile {influencer_profile_id} not found for quota check.")
             return False
 
-        # Get default monthly quota
-        default_quota_str = PlatformSetting.get_setting('ai.image_generation.default_monthly_quota', default='100')
-        try:
-            monthly_quota = int(default_quota_str)
-        except ValueError:
-            monthly_quota = 100 # Fallback
-            _logger.warning(f"Could not parse 'ai.image_generation.default_monthly_quota'. Using fallback {monthly_quota}.")
-
-        # Calculate usage for the current month
-        # This requires UsageTrackingLog to store 'quantity_used' or similar.
-        # Assuming UsageTrackingLog stores one record per image generated for simplicity.
-        from datetime import datetime, date
-        from dateutil.relativedelta import relativedelta
-        
-        today = date.today()
-        start_of_month = today.replace(day=1)
-        # Convert to datetime for Odoo search
-        start_of_month_dt = datetime.combine(start_of_month, datetime.min.time())
-
-        usage_count = self.env['influence_gen.usage_tracking_log'].search_count([
-            ('influencer_profile_id', '=', influencer_profile_id),
-            ('feature_name', '=', 'ai_image_generation'),
-            ('timestamp', '>=', start_of_month_dt),
-        ])
-        
-        _logger.info(f"Quota check for influencer {influencer_profile_id}: Quota={monthly_quota}, Used={usage_count}")
-        return usage_count < monthly_quota
+        remaining = self.env['influence_gen.ai_quota_ledger'].get_remaining_units(influencer_profile_id)
+        _logger.info(f"Quota check for influencer {influencer_profile_id}: Remaining={remaining}, Requested={images_to_generate}")
+        return remaining >= images_to_generate
 
     def decrement_user_ai_quota(self, influencer_profile_id, images_generated=1):
         """
-        Conceptually decrements user's AI quota. In this implementation, this means
-        the next call to check_user_ai_quota will reflect this usage because
-        log_ai_usage creates the records that check_user_ai_quota counts.
+        Records usage that was not reserved beforehand (e.g. images generated outside
+        initiate_ai_image_generation) against the current quota period.
+        Requests created by initiate_ai_image_generation are settled by the N8N callbacks instead.
         :param influencer_profile_id: int, ID of influence_gen.influencer_profile
         :param images_generated: int, number of images generated in this request
         REQ-AIGS-002
         """
-        # This method is effectively a no-op if log_ai_usage is called correctly,
-        # as quota is checked based on logged usage.
-        # It's kept for conceptual clarity.
-        _logger.info(f"Quota conceptually decremented for influencer {influencer_profile_id} by {images_generated} images (usage logged separately).")
-        pass
+        self.env['influence_gen.ai_quota_ledger'].settle_units(influencer_profile_id, None, 0, images_generated)
 
     def log_ai_usage(self, request_id, images_generated, api_calls_to_ai_service=0):
         """
-        Logs AI usage for a specific generation request.
+        Logs AI usage for a specific generation request as a single entry whose
+        units_consumed is the number of images generated. Quota enforcement uses the
+        quota ledger, not these logs.
         :param request_id: int, ID of influence_gen.ai_image_generation_request
         :param images_generated: int, number of images successfully generated
         :param api_calls_to_ai_service: int, number of direct calls made to the AI service (if tracked)
@@ -310,22 +342,23 @@ class AiIntegrationService:
             _logger.error(f"Cannot log AI usage: AI Request ID {request_id} not found.")
             return
 
-        for _i in range(images_generated): # Create one log entry per image for simple monthly counting
-            self.env['influence_gen.usage_tracking_log'].create({
-                'user_id': ai_request.user_id.id,
-                'influencer_profile_id': ai_request.influencer_profile_id.id,
-                'feature_name': 'ai_image_generation',
-                'timestamp': fields.Datetime.now(),
-                'campaign_id': ai_request.campaign_id.id if ai_request.campaign_id else None,
-                'details_json': json.dumps({
-                    'request_id': ai_request.id,
-                    'model_id': ai_request.model_id.id,
-                    'prompt_length': len(ai_request.prompt or ""),
-                    'images_in_batch': images_generated, # Total for this one request
-                    'api_calls': api_calls_to_ai_service, # If relevant
-                }),
-            })
-        _logger.info(f"Logged {images_generated} AI usage events for request ID {ai_request.id}")
+        self.env['influence_gen.usage_tracking_log'].create({
+            'user_id': ai_request.user_id.id,
+            'influencer_profile_id': ai_request.influencer_profile_id.id,
+            'feature_name': 'ai_image_generation',
+            'timestamp': fields.Datetime.now(),
+            'campaign_id': ai_request.campaign_id.id if ai_request.campaign_id else None,
+            'request_id': ai_request.id,
+            'units_consumed': images_generated,
+            'details_json': json.dumps({
+                'request_id': ai_request.id,
+                'model_id': ai_request.model_id.id,
+                'prompt_length': len(ai_request.prompt or ""),
+                'images_in_batch': images_generated,
+                'api_calls': api_calls_to_ai_service, # If relevant
+            }),
+        })
+        _logger.info(f"Logged usage of {images_generated} AI images for request ID {ai_request.id}")
 
 
     def validate_ai_prompt(self, prompt_text):
@@ -339,20 +372,12 @@ class AiIntegrationService:
         if not prompt_text or len(prompt_text.strip()) == 0:
             return False, _("Prompt cannot be empty.")
         
-        # Denylist from PlatformSetting
-        denylist_str = self.env['influence_gen.platform_setting'].get_setting('ai.prompt.denylist_keywords', default='[]')
-        try:
-            denylist_keywords = json.loads(denylist_str)
-            if not isinstance(denylist_keywords, list):
-                denylist_keywords = []
-        except json.JSONDecodeError:
-            denylist_keywords = []
-            _logger.warning("Could not parse 'ai.prompt.denylist_keywords'. Using empty denylist.")
-
-        for keyword in denylist_keywords:
-            if keyword.lower() in prompt_text.lower():
-                _logger.warning(f"Prompt validation failed due to denylisted keyword: {keyword}")
-                return False, _("Prompt contains restricted content (%s).") % keyword
+        # Denylist from PlatformSetting, matched in one pass by a cached automaton
+        denylist_hits = self.find_denylisted_keywords(prompt_text)
+        if denylist_hits:
+            _logger.warning(f"Prompt validation failed due to denylisted keywords: {denylist_hits}")
+            # The matched terms are logged, never shown: they would disclose the denylist.
+            return False, _("Prompt contains restricted content. Please revise it.")
         
         # Placeholder for external moderation API call via REPO-IGIA-004
         # try:
@@ -366,30 +391,33 @@ class AiIntegrationService:
 
         return True, None
 
+    def find_denylisted_keywords(self, prompt_text):
+        """
+        Returns every distinct denylisted keyword found in the prompt, in order of appearance.
+        Matching is Unicode-normalized and case-insensitive; whole-word matching is enabled
+        by the 'ai.prompt.denylist_word_boundary' setting.
+        :param prompt_text: str
+        :return: list of str (keywords as configured in 'ai.prompt.denylist_keywords')
+        REQ-AIGS-003
+        """
+        PlatformSetting = self.env['influence_gen.platform_setting']
+        word_boundary = bool(PlatformSetting.get_setting('ai.prompt.denylist_word_boundary', default=False))
+        matcher = PlatformSetting._get_keyword_matcher('ai.prompt.denylist_keywords', word_boundary)
+        hits = []
+        for match in matcher.find_all(prompt_text):
+            if match.keyword not in hits:
+                hits.append(match.keyword)
+        return hits
+
     def reset_monthly_quotas_for_all_users(self):
         """
         CRON JOB METHOD: Resets monthly AI quotas.
-        In the current design (quota checked against logs), this method might not do anything directly
-        to user records, as the "reset" is implicit by the time window of the log query.
-        However, it could be used to:
-        - Send notifications about quota reset.
-        - Archive old usage logs if needed (though retention service is better for that).
-        - Pre-calculate or cache quota statuses if performance becomes an issue.
+        Opens the new period on the quota ledger for every active influencer with a single
+        INSERT ... SELECT; counters of previous periods are kept for reporting. Influencers
+        without a row (e.g. activated mid-month) get one lazily on their first reservation.
         REQ-AIGS-002 (quota reset)
         """
-        _logger.info("Executing cron job: Reset Monthly AI Quotas (Conceptual).")
-        # For now, this is a conceptual reset. If quotas were stored directly on user/profile,
-        # this method would update those records. With log-based checking, the new month automatically
-        # starts a fresh count.
-        
-        # Example: Send notification to all active influencers about quota reset
-        # active_influencers = self.env['influence_gen.influencer_profile'].search([('account_status', '=', 'active')])
-        # template = self.env.ref('influence_gen_services.email_template_ai_quota_reset', raise_if_not_found=False)
-        # if template:
-        #     for influencer in active_influencers:
-        #         try:
-        #             template.send_mail(influencer.id, force_send=True)
-        #         except Exception as e:
-        #             _logger.error(f"Failed to send quota reset email to {influencer.email}: {e}")
-        _logger.info("Monthly AI Quota reset cycle completed (log-based, no direct data change needed for reset itself).")
-        return True
\ No newline at end of file
+        _logger.info("Executing cron job: Reset Monthly AI Quotas.")
+        rows_created = self.env['influence_gen.ai_quota_ledger'].open_period()
+        _logger.info(f"Monthly AI Quota reset cycle completed: {rows_created} ledger entries opened.")
+        return True
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import fields
+from odoo.tools import formataddr, split_every
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import commit_unless_testing, to_positive_int, trigger_cron
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_EMAILS_PER_MINUTE = 600  # throttle of the sending cron, which runs every minute
+DEFAULT_BATCH_SIZE = 200  # emails created, sent and committed together
+MAIL_INSERT_CHUNK_SIZE = 500  # mail.mail rows per multi-row INSERT
+
+RECIPIENT_TABLE = 'influence_gen_broadcast_recipient'
+
+
+class BroadcastNotificationService:
+    """
+    Service sending broadcast notifications (influence_gen.broadcast_notification)
+    to large audiences.
+
+    Recipients are resolved once, with a single INSERT ... SELECT over users,
+    groups and influencer profiles, deduplicated on the partners' normalized
+    email, into a recipient queue table. The sending cron then drains the queue
+    in batches: each batch claims pending recipients with FOR UPDATE SKIP
+    LOCKED, creates its emails with multi-row inserts, sends them and records
+    the outcome, and is committed on its own. Runs are throttled by the
+    'broadcast.max_emails_per_minute' setting; an interrupted, paused or failed
+    run resumes from the recipients still pending.
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    def create_broadcast(self, subject, body_html, group_ids=None, influencer_ids=None):
+        """
+        Creates a broadcast and queues its recipients. Users of the given groups and
+        the users of the given influencers are targeted; all active users when both
+        are empty. Each email address receives the broadcast once.
+        :param str subject: email subject
+        :param str body_html: email body
+        :param list group_ids: res.groups IDs
+        :param list influencer_ids: influence_gen.influencer_profile IDs
+        :return: the influence_gen.broadcast_notification record
+        """
+        broadcast = self.env['influence_gen.broadcast_notification'].create({
+            'subject': subject,
+            'body_html': body_html,
+            'target_group_ids': [(6, 0, list(group_ids or []))],
+            'target_influencer_ids': [(6, 0, list(influencer_ids or []))],
+        })
+        recipient_count = self._queue_recipients(broadcast.id, list(group_ids or []), list(influencer_ids or []))
+        broadcast.write({
+            'recipient_count': recipient_count,
+            'state': 'sending' if recipient_count else 'done',
+            'started_at': fields.Datetime.now(),
+            'completed_at': False if recipient_count else fields.Datetime.now(),
+        })
+        if recipient_count:
+            self._trigger_cron()
+        _logger.info(f"Broadcast {broadcast.id} '{subject}' queued for {recipient_count} recipient(s).")
+        return broadcast
+
+    def _queue_recipients(self, broadcast_id, group_ids, influencer_ids):
+        """
+        Inserts the recipients of a broadcast into the queue table in one statement.
+        :return: number of recipients queued
+        """
+        self.env['res.partner'].flush_model(['email', 'email_normalized', 'name'])
+        self.env['res.users'].flush_model(['active', 'partner_id', 'groups_id'])
+        self.env['influence_gen.influencer_profile'].flush_model(['user_id'])
+        if group_ids or influencer_ids:
+            target = """(u.id IN (SELECT uid FROM res_groups_users_rel WHERE gid = ANY(%(group_ids)s))
+                      OR u.id IN (SELECT user_id FROM influence_gen_influencer_profile WHERE id = ANY(%(influencer_ids)s)))"""
+        else:
+            target = "true"
+        self.env.cr.execute(f"""
+            INSERT INTO {RECIPIENT_TABLE} (broadcast_id, email_normalized, partner_id, state)
+            SELECT DISTINCT ON (p.email_normalized) %(broadcast_id)s, p.email_normalized, p.id, 'pending'
+              FROM res_users u
+              JOIN res_partner p ON p.id = u.partner_id
+             WHERE u.active
+               AND p.email_normalized IS NOT NULL AND p.email_normalized != ''
+               AND {target}
+          ORDER BY p.email_normalized, p.id
+            ON CONFLICT DO NOTHING
+        """, {'broadcast_id': broadcast_id, 'group_ids': group_ids, 'influencer_ids': influencer_ids})
+        return self.env.cr.rowcount
+
+    def send_pending(self):
+        """
+        Sends queued emails of the broadcasts being sent, oldest broadcast first, up to
+        the per-minute throttle.
+        :return: dict with the number of emails sent and failed
+        """
+        budget = self._get_int_setting('broadcast.max_emails_per_minute', DEFAULT_MAX_EMAILS_PER_MINUTE)
+        batch_size = self._get_int_setting('broadcast.batch_size', DEFAULT_BATCH_SIZE)
+        stats = {'sent': 0, 'failed': 0}
+        Broadcast = self.env['influence_gen.broadcast_notification']
+        for broadcast_id in Broadcast.search([('state', '=', 'sending')], order='id').ids:
+            while budget > 0:
+                # Re-read the state: the broadcast may have been paused or cancelled meanwhile.
+                broadcast = Broadcast.browse(broadcast_id)
+                if broadcast.state != 'sending':
+                    break
+                processed = self._send_batch(broadcast, min(budget, batch_size), stats)
+                # Each batch is committed with its outcome, so a crash only replays the batch in flight.
+                commit_unless_testing(self.env)
+                self.env.invalidate_all()
+                if not processed:
+                    break
+                budget -= processed
+            if budget <= 0:
+                # More to send: pick up where this run stopped on the next one.
+                self._trigger_cron(at=fields.Datetime.add(fields.Datetime.now(), minutes=1))
+                break
+        return stats
+
+    def _send_batch(self, broadcast, limit, stats):
+        """
+        Creates and sends the emails of up to `limit` pending recipients of a broadcast.
+        :return: number of recipients processed; 0 once none is left
+        """
+        self.env.cr.execute(f"""
+            SELECT r.email_normalized, p.name, p.email
+              FROM {RECIPIENT_TABLE} r
+              JOIN res_partner p ON p.id = r.partner_id
+             WHERE r.broadcast_id = %s AND r.state = 'pending'
+          ORDER BY r.email_normalized
+             LIMIT %s
+               FOR UPDATE OF r SKIP LOCKED
+        """, [broadcast.id, limit])
+        rows = self.env.cr.fetchall()
+        if not rows:
+            self._complete_if_drained(broadcast)
+            return 0
+
+        Mail = self.env['mail.mail'].sudo()
+        mails = Mail
+        for chunk in split_every(MAIL_INSERT_CHUNK_SIZE, rows):
+            mails |= Mail.create([{
+                'subject': broadcast.subject,
+                'body_html': broadcast.body_html,
+                'email_to': formataddr((name or '', email)),
+                'auto_delete': True,
+                'state': 'outgoing',
+            } for _email_normalized, name, email in chunk])
+        emails = [email_normalized for email_normalized, _name, _email in rows]
+        mail_emails = dict(zip(mails.ids, emails))
+
+        mails.send(raise_exception=False)
+        # Sent emails are deleted (auto_delete); the remaining ones failed.
+        failed_ids = set(mails.exists().filtered(lambda mail: mail.state == 'exception').ids)
+        failed_emails = [mail_emails[mail_id] for mail_id in failed_ids]
+
+        self.env.cr.execute(f"""
+            UPDATE {RECIPIENT_TABLE}
+               SET state = CASE WHEN email_normalized = ANY(%(failed)s) THEN 'failed' ELSE 'sent' END,
+                   processed_at = now() at time zone 'UTC'
+             WHERE broadcast_id = %(broadcast_id)s AND email_normalized = ANY(%(emails)s)
+        """, {'broadcast_id': broadcast.id, 'emails': emails, 'failed': failed_emails})
+        broadcast.write({
+            'sent_count': broadcast.sent_count + len(emails) - len(failed_emails),
+            'failed_count': broadcast.failed_count + len(failed_emails),
+        })
+        stats['sent'] += len(emails) - len(failed_emails)
+        stats['failed'] += len(failed_emails)
+        return len(rows)
+
+    def _complete_if_drained(self, broadcast):
+        """Marks the broadcast done unless recipients are still pending (e.g. claimed by a concurrent run)."""
+        self.env.cr.execute(
+            f"SELECT 1 FROM {RECIPIENT_TABLE} WHERE broadcast_id = %s AND state = 'pending' LIMIT 1", [broadcast.id])
+        if not self.env.cr.fetchone():
+            broadcast.write({'state': 'done', 'completed_at': fields.Datetime.now()})
+            _logger.info(f"Broadcast {broadcast.id} completed: {broadcast.sent_count} sent, {broadcast.failed_count} failed.")
+
+    def requeue_failed(self, broadcast):
+        """
+        Puts the failed recipients of a broadcast back in the queue.
+        :return: number of recipients requeued
+        """
+        self.env.cr.execute(f"""
+            UPDATE {RECIPIENT_TABLE} SET state = 'pending', processed_at = NULL
+             WHERE broadcast_id = %s AND state = 'failed'
+        """, [broadcast.id])
+        requeued = self.env.cr.rowcount
+        if requeued:
+            broadcast.write({
+                'failed_count': max(broadcast.failed_count - requeued, 0),
+                'state': 'sending',
+                'completed_at': False,
+            })
+            self._trigger_cron()
+        return requeued
+
+    def _trigger_cron(self, at=None):
+        trigger_cron(self.env, 'influence_gen_services.ir_cron_send_broadcast_notifications', at)
+
+    def _get_int_setting(self, key, default):
+        return to_positive_int(self.env['influence_gen.platform_setting'].sudo().get_setting(key, default=default), default)
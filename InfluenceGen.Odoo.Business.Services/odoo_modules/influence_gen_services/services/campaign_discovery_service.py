@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+import base64
+import json
+import logging
+import math
+import re
+from datetime import datetime
+
+from odoo import fields
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+# Matches counted for the total shown with the results; beyond it the total is an estimate ("1000+").
+TOTAL_COUNT_CAP = 1000
+MAX_SEARCH_TERMS = 8
+
+# Sort options of the discovery page: {sort_by: (SQL expression, direction, SQL type of the cursor value)}.
+# Every sort is made total with the campaign id, in the same direction, for keyset pagination.
+SORT_OPTIONS = {
+    'relevance': ("ts_rank_cd(c.search_vector, q.query)::float8", 'DESC', 'float8'),
+    'write_date desc': ("c.write_date", 'DESC', 'timestamp'),
+    'submission_deadline asc': ("COALESCE(c.submission_deadline, '9999-12-31'::timestamp)", 'ASC', 'timestamp'),
+    'compensation_amount desc': ("COALESCE(c.compensation_amount, 0)", 'DESC', 'float8'),
+    'compensation_amount asc': ("COALESCE(c.compensation_amount, 0)", 'ASC', 'float8'),
+}
+DEFAULT_SORT = 'write_date desc'
+
+
+class CampaignDiscoveryService:
+    """
+    Service behind the portal campaign discovery page (REQ-2-003).
+    Campaigns are matched in a single query: full-text search on the campaign's
+    tsvector column (GIN index, weighted name > brand > description), structured
+    filters (niche, dates, compensation) and per-influencer eligibility (published,
+    open for submissions, targeting one of the influencer's niches, not applied to
+    yet). Pages are fetched with keyset pagination on (sort value, id), and the same
+    statement returns the total, counted up to TOTAL_COUNT_CAP.
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    def search(self, influencer_id, search=None, filters=None, sort_by=None, limit=DEFAULT_PAGE_SIZE, after=None):
+        """
+        Returns one page of campaigns the influencer can discover.
+        :param int influencer_id: influence_gen.influencer_profile ID
+        :param str search: free text; every word must match (as a prefix) name, brand or description
+        :param dict filters: query parameters; only the keys handled by _build_filters are used
+        :param str sort_by: key of SORT_OPTIONS; defaults to relevance when searching, else most recent
+        :param int limit: page size
+        :param str after: cursor returned as 'next_cursor' by the previous page
+        :return: dict {'campaigns': influence_gen.campaign recordset in page order,
+                       'total': int, 'total_is_estimate': bool, 'next_cursor': str or None}
+        """
+        limit = max(1, min(int(limit or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+        tsquery = self._build_tsquery(search)
+        if sort_by not in SORT_OPTIONS or (sort_by == 'relevance' and not tsquery):
+            sort_by = 'relevance' if tsquery else DEFAULT_SORT
+        sort_expr, direction, value_type = SORT_OPTIONS[sort_by]
+
+        params = {
+            'influencer_id': influencer_id,
+            'tsquery': tsquery,
+            'now': fields.Datetime.now(),
+            'today': fields.Date.context_today(self.env.user),
+            'cap': TOTAL_COUNT_CAP,
+            'limit': limit + 1,
+        }
+        conditions = self._build_filters(filters or {}, params)
+        if tsquery:
+            conditions.append("c.search_vector @@ q.query")
+
+        keyset = "true"
+        cursor = self._decode_cursor(after, sort_by)
+        if cursor:
+            params['after_value'], params['after_id'] = cursor
+            operator = '<' if direction == 'DESC' else '>'
+            keyset = f"(m.sort_value, m.id) {operator} (%(after_value)s::{value_type}, %(after_id)s)"
+
+        self.env['influence_gen.campaign'].flush_model()
+        self.env['influence_gen.campaign_application'].flush_model(['campaign_id', 'influencer_profile_id'])
+        self.env['influence_gen.influencer_profile'].flush_model(['area_of_influence_ids'])
+        self.env.cr.execute(f"""
+            WITH q AS (
+                SELECT to_tsquery('simple', COALESCE(%(tsquery)s, '')) AS query
+            ), matches AS (
+                SELECT c.id, {sort_expr} AS sort_value
+                  FROM influence_gen_campaign c, q
+                 WHERE c.active
+                   AND c.status = 'published'
+                   AND c.end_date >= %(today)s
+                   AND (c.submission_deadline IS NULL OR c.submission_deadline > %(now)s)
+                   AND NOT EXISTS (
+                        SELECT 1 FROM influence_gen_campaign_application a
+                         WHERE a.campaign_id = c.id AND a.influencer_profile_id = %(influencer_id)s)
+                   AND (NOT EXISTS (
+                            SELECT 1 FROM influence_gen_campaign_area_of_influence_rel ca
+                             WHERE ca.campaign_id = c.id)
+                        OR EXISTS (
+                            SELECT 1 FROM influence_gen_campaign_area_of_influence_rel ca
+                              JOIN influencer_area_of_influence_rel ia ON ia.area_id = ca.area_id
+                             WHERE ca.campaign_id = c.id AND ia.influencer_id = %(influencer_id)s))
+                   {''.join(f' AND {condition}' for condition in conditions)}
+            )
+            SELECT t.total, p.id, p.sort_value
+              FROM (SELECT count(*) AS total FROM (SELECT 1 FROM matches LIMIT %(cap)s) capped) t
+         LEFT JOIN LATERAL (
+                    SELECT m.id, m.sort_value
+                      FROM matches m
+                     WHERE {keyset}
+                  ORDER BY m.sort_value {direction}, m.id {direction}
+                     LIMIT %(limit)s
+                   ) p ON true
+          ORDER BY p.sort_value {direction}, p.id {direction}
+        """, params)
+        rows = self.env.cr.fetchall()
+
+        total = rows[0][0] if rows else 0
+        page = [(campaign_id, sort_value) for _total, campaign_id, sort_value in rows if campaign_id is not None]
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = self._encode_cursor(sort_by, *page[-1])
+        return {
+            'campaigns': self.env['influence_gen.campaign'].browse([campaign_id for campaign_id, _value in page]),
+            'total': total,
+            'total_is_estimate': total >= TOTAL_COUNT_CAP,
+            'next_cursor': next_cursor,
+            'sort_by': sort_by,
+        }
+
+    def get_filter_options(self):
+        """Options of the discovery filters: {'niches': influence_gen.area_of_influence recordset}."""
+        return {'niches': self.env['influence_gen.area_of_influence'].sudo().search([], order='name')}
+
+    def _build_tsquery(self, search):
+        """
+        Turns free text into a prefix-matching tsquery ('summer:* & shoe:*'). Only word
+        characters are kept, so user input can never make the query invalid.
+        """
+        terms = re.findall(r'\w+', (search or '').lower())[:MAX_SEARCH_TERMS]
+        return ' & '.join(f'{term}:*' for term in terms) or None
+
+    def _build_filters(self, filters, params):
+        """
+        Structured filters from the discovery page query parameters. Unknown or invalid
+        parameters are ignored.
+        :return: list of SQL conditions on the campaign alias 'c'; values are added to params
+        """
+        conditions = []
+        niche_id = self._to_int(filters.get('filter_niche'))
+        if niche_id:
+            params['niche_id'] = niche_id
+            conditions.append("""EXISTS (
+                        SELECT 1 FROM influence_gen_campaign_area_of_influence_rel fa
+                         WHERE fa.campaign_id = c.id AND fa.area_id = %(niche_id)s)""")
+        compensation_type = filters.get('filter_compensation_type')
+        if compensation_type in dict(self.env['influence_gen.campaign']._fields['compensation_model_type'].selection):
+            params['compensation_type'] = compensation_type
+            conditions.append("c.compensation_model_type = %(compensation_type)s")
+        min_compensation = self._to_float(filters.get('filter_min_compensation'))
+        if min_compensation:
+            params['min_compensation'] = min_compensation
+            conditions.append("c.compensation_amount >= %(min_compensation)s")
+        for param, condition in (
+            ('filter_starts_after', "c.start_date >= %(filter_starts_after)s"),
+            ('filter_ends_before', "c.end_date <= %(filter_ends_before)s"),
+            ('filter_deadline_after', "c.submission_deadline >= %(filter_deadline_after)s"),
+        ):
+            value = self._to_date(filters.get(param))
+            if value:
+                params[param] = value
+                conditions.append(condition)
+        return conditions
+
+    def _encode_cursor(self, sort_by, sort_value, campaign_id):
+        value = sort_value.isoformat() if hasattr(sort_value, 'isoformat') else sort_value
+        raw = json.dumps([sort_by, value, campaign_id], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def _decode_cursor(self, cursor, sort_by):
+        """:return: tuple (sort value, campaign id), or None for a missing, invalid or other-sort cursor"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            cursor_sort, value, campaign_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            return None
+        if cursor_sort != sort_by or not isinstance(campaign_id, int) or isinstance(campaign_id, bool):
+            return None
+        value = self._parse_cursor_value(value, SORT_OPTIONS[sort_by][2])
+        if value is None:
+            return None
+        return value, campaign_id
+
+    def _parse_cursor_value(self, value, value_type):
+        """:return: the cursor sort value checked against its SQL type, or None when it does not fit"""
+        if isinstance(value, bool):
+            return None
+        if value_type == 'float8':
+            return float(value) if isinstance(value, (int, float)) and math.isfinite(value) else None
+        if value_type == 'timestamp':
+            if not isinstance(value, str):
+                return None
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                return None
+            return parsed if parsed.tzinfo is None else None
+        return value if isinstance(value, int) else None
+
+    def _to_int(self, value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _to_float(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    def _to_date(self, value):
+        try:
+            return fields.Date.to_date(value) if value else None
+        except ValueError:
+            return None
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo.tools import split_every
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import claim_queued, mark_queued
+
+_logger = logging.getLogger(__name__)
+
+# Rollup columns of influence_gen.campaign_performance_rollup.
+ROLLUP_METRICS = ('reach', 'views', 'engagement', 'clicks', 'conversions')
+# performance_data_json keys summed into each rollup column; overridden by the
+# 'kpi.rollup_metric_keys' platform setting ({column: [json keys]}).
+DEFAULT_METRIC_KEYS = {
+    'reach': ['reach'],
+    'views': ['views'],
+    'engagement': ['likes', 'comments', 'shares', 'saves'],
+    'clicks': ['clicks'],
+    'conversions': ['conversions'],
+}
+DEFAULT_REFRESH_LIMIT = 500  # stale campaigns refreshed per cron run
+REFRESH_BATCH_SIZE = 50  # campaigns re-aggregated per statement
+
+ROLLUP_TABLE = 'influence_gen_campaign_performance_rollup'
+STALE_TABLE = 'influence_gen_campaign_performance_rollup_stale'
+
+
+class CampaignKpiAggregationService:
+    """
+    Service maintaining the campaign performance rollups
+    (influence_gen.campaign_performance_rollup): reach, views, engagement, clicks
+    and conversions of approved content submissions per campaign, influencer and
+    day. Rollups are aggregated in PostgreSQL straight from performance_data_json
+    (jsonb operators and GROUP BY), never by parsing submissions in Python.
+
+    Changes to submissions mark their campaign stale; the refresh cron then
+    re-aggregates only stale campaigns, so reports read a small indexed table
+    whatever the number of submissions.
+    REQ-2-011, REQ-2-012
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def mark_stale(self, campaign_ids):
+        """
+        Marks campaigns whose rollups must be recomputed, and wakes the refresh cron up
+        once the transaction commits if any campaign was not already stale.
+        :param campaign_ids: iterable of influence_gen.campaign IDs
+        """
+        mark_queued(self.env, STALE_TABLE, 'campaign_id', campaign_ids,
+                    'influence_gen_services.ir_cron_refresh_campaign_performance_rollups')
+
+    def refresh_stale(self, limit=DEFAULT_REFRESH_LIMIT):
+        """
+        Re-aggregates the rollups of stale campaigns. Stale entries are claimed with
+        FOR UPDATE SKIP LOCKED, so concurrent runs never refresh the same campaign;
+        a campaign marked stale again meanwhile is picked up by the next run.
+        :param int limit: maximum campaigns refreshed
+        :return: number of campaigns refreshed
+        """
+        campaign_ids = [campaign_id for (campaign_id,) in claim_queued(self.env.cr, STALE_TABLE, ['campaign_id'], limit)]
+        self.refresh_campaigns(campaign_ids)
+        return len(campaign_ids)
+
+    def refresh_campaigns(self, campaign_ids):
+        """
+        Recomputes the rollups of the given campaigns from their approved submissions,
+        replacing their previous rows. One aggregate statement per batch of campaigns.
+        :param campaign_ids: list of influence_gen.campaign IDs
+        """
+        if not campaign_ids:
+            return
+        self.env['influence_gen.content_submission'].flush_model([
+            'campaign_id', 'influencer_profile_id', 'submission_date', 'review_status', 'performance_data_json',
+        ])
+        metric_select, params = self._build_metric_select()
+        for batch in split_every(REFRESH_BATCH_SIZE, sorted(set(campaign_ids))):
+            params['campaign_ids'] = list(batch)
+            params['uid'] = self.env.uid
+            self.env.cr.execute(f"DELETE FROM {ROLLUP_TABLE} WHERE campaign_id = ANY(%(campaign_ids)s)", params)
+            self.env.cr.execute(f"""
+                INSERT INTO {ROLLUP_TABLE}
+                       (campaign_id, influencer_profile_id, day, submission_count, {', '.join(ROLLUP_METRICS)},
+                        refreshed_at, create_uid, create_date, write_uid, write_date)
+                SELECT s.campaign_id, s.influencer_profile_id, s.submission_date::date, count(*), {metric_select},
+                       now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                  FROM influence_gen_content_submission s
+            CROSS JOIN LATERAL (SELECT influence_gen_jsonb_object(s.performance_data_json) AS doc) d
+                 WHERE s.campaign_id = ANY(%(campaign_ids)s)
+                   AND s.influencer_profile_id IS NOT NULL
+                   AND s.review_status = 'approved'
+              GROUP BY s.campaign_id, s.influencer_profile_id, s.submission_date::date
+            """, params)
+        self.env['influence_gen.campaign_performance_rollup'].invalidate_model()
+        _logger.info(f"Refreshed performance rollups of {len(set(campaign_ids))} campaign(s).")
+
+    def _get_metric_keys(self):
+        configured = self.env['influence_gen.platform_setting'].sudo().get_setting('kpi.rollup_metric_keys', default=None)
+        metric_keys = dict(DEFAULT_METRIC_KEYS)
+        if isinstance(configured, dict):
+            for metric, keys in configured.items():
+                if metric in metric_keys and isinstance(keys, list):
+                    metric_keys[metric] = [str(key) for key in keys]
+        return metric_keys
+
+    def _build_metric_select(self):
+        """
+        SQL summing the configured JSON keys into each rollup column. Non-numeric values
+        count as 0. JSON keys are bound as parameters, never interpolated.
+        :return: tuple (select expression, params dict)
+        """
+        params = {}
+        columns = []
+        for metric, keys in self._get_metric_keys().items():
+            terms = []
+            for key in keys:
+                name = f'key_{len(params)}'
+                params[name] = key
+                terms.append(
+                    f"CASE WHEN jsonb_typeof(d.doc -> %({name})s) = 'number' "
+                    f"THEN (d.doc ->> %({name})s)::numeric ELSE 0 END"
+                )
+            columns.append(f"COALESCE(SUM({' + '.join(terms) or '0'}), 0)")
+        return ', '.join(columns), params
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_campaign_totals(self, campaign_ids):
+        """
+        Rollup totals per campaign.
+        :param campaign_ids: list of influence_gen.campaign IDs
+        :return: dict {campaign_id: {'submission_count': int, metric: float, ..., 'engagement_rate': float}},
+                 with zeros for campaigns without approved submissions
+        """
+        totals = {campaign_id: self._empty_totals() for campaign_id in campaign_ids}
+        if not campaign_ids:
+            return totals
+        self.env.cr.execute(f"""
+            SELECT campaign_id, SUM(submission_count), {', '.join(f'SUM({m})' for m in ROLLUP_METRICS)}
+              FROM {ROLLUP_TABLE}
+             WHERE campaign_id = ANY(%s)
+          GROUP BY campaign_id
+        """, [list(campaign_ids)])
+        for row in self.env.cr.fetchall():
+            totals[row[0]] = self._row_totals(row[1:])
+        return totals
+
+    def get_influencer_totals(self, influencer_id, campaign_id=None):
+        """
+        Rollup totals of one influencer, across all campaigns or for one campaign.
+        :return: dict {'submission_count': int, metric: float, ..., 'engagement_rate': float}
+        """
+        query = f"""
+            SELECT SUM(submission_count), {', '.join(f'SUM({m})' for m in ROLLUP_METRICS)}
+              FROM {ROLLUP_TABLE}
+             WHERE influencer_profile_id = %s
+        """
+        params = [influencer_id]
+        if campaign_id:
+            query += " AND campaign_id = %s"
+            params.append(campaign_id)
+        self.env.cr.execute(query, params)
+        row = self.env.cr.fetchone()
+        return self._row_totals(row) if row and row[0] is not None else self._empty_totals()
+
+    def get_daily_series(self, campaign_id, date_from=None, date_to=None):
+        """
+        Day-by-day rollups of a campaign, all influencers combined.
+        :return: list of dicts {'day': date, 'submission_count': int, metric: float, ...}, by day
+        """
+        query = f"""
+            SELECT day, SUM(submission_count), {', '.join(f'SUM({m})' for m in ROLLUP_METRICS)}
+              FROM {ROLLUP_TABLE}
+             WHERE campaign_id = %s
+        """
+        params = [campaign_id]
+        if date_from:
+            query += " AND day >= %s"
+            params.append(date_from)
+        if date_to:
+            query += " AND day <= %s"
+            params.append(date_to)
+        self.env.cr.execute(query + " GROUP BY day ORDER BY day", params)
+        return [dict(self._row_totals(row[1:]), day=row[0]) for row in self.env.cr.fetchall()]
+
+    def sum_numeric_metrics(self, influencer_id, campaign_id=None):
+        """
+        Totals of every numeric key found in the performance_data_json of an influencer's
+        approved submissions, computed in the database with jsonb_each.
+        :return: dict {json key: total}
+        """
+        self.env['influence_gen.content_submission'].flush_model([
+            'campaign_id', 'influencer_profile_id', 'review_status', 'performance_data_json',
+        ])
+        query = """
+            SELECT m.key, SUM((m.value #>> '{}')::numeric)
+              FROM influence_gen_content_submission s
+        CROSS JOIN LATERAL jsonb_each(influence_gen_jsonb_object(s.performance_data_json)) m
+             WHERE s.influencer_profile_id = %s
+               AND s.review_status = 'approved'
+               AND s.performance_data_json IS NOT NULL
+               AND jsonb_typeof(m.value) = 'number'
+        """
+        params = [influencer_id]
+        if campaign_id:
+            query += " AND s.campaign_id = %s"
+            params.append(campaign_id)
+        self.env.cr.execute(query + " GROUP BY m.key", params)
+        return {key: self._to_number(total) for key, total in self.env.cr.fetchall()}
+
+    def _empty_totals(self):
+        totals = dict.fromkeys(ROLLUP_METRICS, 0.0)
+        totals.update(submission_count=0, engagement_rate=0.0)
+        return totals
+
+    def _row_totals(self, row):
+        totals = {'submission_count': int(row[0] or 0)}
+        for metric, value in zip(ROLLUP_METRICS, row[1:]):
+            totals[metric] = float(value or 0.0)
+        reach = totals['reach'] or totals['views']
+        totals['engagement_rate'] = totals['engagement'] / reach if reach else 0.0
+        return totals
+
+    def _to_number(self, value):
+        number = float(value or 0)
+        return int(number) if number.is_integer() else number
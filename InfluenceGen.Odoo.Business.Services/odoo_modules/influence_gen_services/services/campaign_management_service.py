@@ -3,6 +3,8 @@ import logging
 from odoo import _, api
 from odoo.exceptions import UserError, ValidationError
 
+from .campaign_kpi_aggregation_service import CampaignKpiAggregationService
+
 _logger = logging.getLogger(__name__)
 
 class CampaignManagementService:
@@ -247,6 +249,7 @@ class CampaignManagementService:
             'approved_applications': self.env['influence_gen.campaign_application'].search_count([('campaign_id', '=', campaign.id), ('status', '=', 'approved')]),
             'total_submissions': self.env['influence_gen.content_submission'].search_count([('campaign_id', '=', campaign.id)]),
             'approved_submissions': self.env['influence_gen.content_submission'].search_count([('campaign_id', '=', campaign.id), ('review_status', '=', 'approved')]),
+            'performance': CampaignKpiAggregationService(self.env).get_campaign_totals([campaign.id])[campaign.id],
         }
 
         for kpi in campaign.kpi_ids:
@@ -276,24 +279,17 @@ class CampaignManagementService:
         if campaign_id:
             domain.append(('campaign_id', '=', campaign_id))
         
-        submissions = self.env['influence_gen.content_submission'].search(domain)
-        
+        counts = dict(self.env['influence_gen.content_submission']._read_group(domain, ['review_status'], ['__count']))
+        aggregation = CampaignKpiAggregationService(self.env)
+
         summary = {
             'influencer_name': influencer.full_name,
-            'total_submissions': len(submissions),
-            'approved_submissions': len(submissions.filtered(lambda s: s.review_status == 'approved')),
-            'performance_metrics': {}, # Aggregated metrics from submissions' performance_data_json
+            'total_submissions': sum(counts.values()),
+            'approved_submissions': counts.get('approved', 0),
+            # Numeric metrics of the approved submissions' performance_data_json, summed in the database.
+            'performance_metrics': aggregation.sum_numeric_metrics(influencer.id, campaign_id=campaign_id),
+            'performance': aggregation.get_influencer_totals(influencer.id, campaign_id=campaign_id),
         }
-        
-        import json
-        for sub in submissions.filtered(lambda s: s.review_status == 'approved' and s.performance_data_json):
-            try:
-                data = json.loads(sub.performance_data_json)
-                for key, value in data.items():
-                    if isinstance(value, (int, float)): # Only aggregate numeric values
-                        summary['performance_metrics'][key] = summary['performance_metrics'].get(key, 0) + value
-            except json.JSONDecodeError:
-                _logger.warning(f"Could not parse performance_data_json for submission {sub.id}")
 
         _logger.info(f"Performance summary for influencer ID {influencer.id}: {summary}")
         return summary
\ No newline at end of file
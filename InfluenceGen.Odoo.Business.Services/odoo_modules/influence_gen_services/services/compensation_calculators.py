@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from collections import namedtuple
+
+_logger = logging.getLogger(__name__)
+
+# Compiled, immutable form of a campaign's compensation terms.
+# `params` is a tuple of (key, value) pairs so instances can live in the ORM cache.
+# REQ-IPF-003
+CompensationTerms = namedtuple('CompensationTerms', ['campaign_id', 'model_type', 'currency_id', 'params'])
+
+_CALCULATORS = {}
+
+
+def register_calculator(calculator_cls):
+    """
+    Class decorator registering a compensation calculator for each of its model types.
+    Other modules can register additional models (e.g. 'commission') the same way.
+    """
+    calculator = calculator_cls()
+    for model_type in calculator_cls.model_types:
+        _CALCULATORS[model_type] = calculator
+    return calculator_cls
+
+
+def get_calculator(model_type):
+    """Returns the calculator registered for `model_type`, or None if the model is not payable per submission."""
+    return _CALCULATORS.get(model_type)
+
+
+def compile_compensation_terms(campaign_id, model_type, details, currency_id):
+    """
+    Parses a campaign's `compensation_details` once into CompensationTerms.
+    `details` may be a plain number (legacy format, read as the main rate) or a JSON object.
+    Unparseable details compile to empty params, which every calculator treats as zero.
+    :return: CompensationTerms
+    """
+    calculator = get_calculator(model_type)
+    params = {}
+    if calculator and details and details.strip():
+        raw = details.strip()
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            parsed = None
+            _logger.error("Could not parse compensation_details for campaign %s", campaign_id)
+        if isinstance(parsed, (int, float)) and not isinstance(parsed, bool):
+            parsed = {calculator.primary_param: parsed}
+        if isinstance(parsed, dict):
+            try:
+                params = calculator.compile_params(parsed)
+            except (TypeError, ValueError):
+                _logger.error("Invalid compensation terms for campaign %s (%s): %s", campaign_id, model_type, raw)
+                params = {}
+    return CompensationTerms(campaign_id, model_type, currency_id, tuple(sorted(params.items())))
+
+
+def _metric_value(metrics, key):
+    """Reads a numeric metric from a parsed performance_data_json dict, defaulting to 0."""
+    try:
+        return float(metrics.get(key) or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CompensationCalculator:
+    """
+    Base class for compensation-model calculators.
+    Subclasses declare the model types they handle and compute amounts for a whole
+    batch of submissions sharing the same terms.
+    """
+    model_types = ()
+    # Key used when compensation_details is a bare number.
+    primary_param = 'amount'
+    # Whether compute() needs content_submission.performance_data_json.
+    needs_performance_data = False
+
+    def compile_params(self, raw_params):
+        """Validates and normalizes parsed JSON terms into a flat dict of hashable values."""
+        return {self.primary_param: float(raw_params.get(self.primary_param) or 0.0)}
+
+    def metric_keys(self, params):
+        """Performance metric keys this calculator reads for the given params."""
+        return ()
+
+    def compute(self, params, submission_ids, metrics_by_submission=None):
+        """
+        Computes the amount owed for each submission.
+        :param dict params: compiled params (dict(CompensationTerms.params))
+        :param list submission_ids: IDs of submissions sharing these terms
+        :param dict metrics_by_submission: {submission_id: {metric_key: value}} when needs_performance_data
+        :return: dict {submission_id: amount}
+        """
+        raise NotImplementedError()
+
+
+@register_calculator
+class FlatFeeCalculator(CompensationCalculator):
+    """Pays the same fixed amount for every approved submission."""
+    model_types = ('flat_fee', 'per_submission')
+
+    def compute(self, params, submission_ids, metrics_by_submission=None):
+        amount = params.get('amount', 0.0)
+        return dict.fromkeys(submission_ids, amount)
+
+
+class _RateCalculator(CompensationCalculator):
+    """Pays `rate` per `unit` of one performance metric, with an optional per-submission cap."""
+    needs_performance_data = True
+    primary_param = 'rate'
+    default_metric = None
+    unit = 1.0
+
+    def compile_params(self, raw_params):
+        params = {
+            'rate': float(raw_params.get('rate') or 0.0),
+            'metric': str(raw_params.get('metric') or self.default_metric),
+        }
+        if raw_params.get('cap') is not None:
+            params['cap'] = float(raw_params['cap'])
+        return params
+
+    def metric_keys(self, params):
+        return (params.get('metric', self.default_metric),)
+
+    def compute(self, params, submission_ids, metrics_by_submission=None):
+        metrics_by_submission = metrics_by_submission or {}
+        rate = params.get('rate', 0.0)
+        metric = params.get('metric', self.default_metric)
+        cap = params.get('cap')
+        amounts = {}
+        for submission_id in submission_ids:
+            amount = _metric_value(metrics_by_submission.get(submission_id, {}), metric) / self.unit * rate
+            amounts[submission_id] = min(amount, cap) if cap is not None else amount
+        return amounts
+
+
+@register_calculator
+class CpmCalculator(_RateCalculator):
+    """Cost per mille: `rate` per 1000 impressions (or the configured metric)."""
+    model_types = ('cpm',)
+    default_metric = 'impressions'
+    unit = 1000.0
+
+
+@register_calculator
+class CpaCalculator(_RateCalculator):
+    """Cost per acquisition: `rate` per conversion (or the configured metric)."""
+    model_types = ('cpa',)
+    default_metric = 'conversions'
+
+
+@register_calculator
+class PerformanceBasedCalculator(CompensationCalculator):
+    """
+    Pays `base` plus a weighted sum of performance metrics, optionally capped.
+    Terms example: {"base": 50, "weights": {"views": 0.002, "likes": 0.01}, "cap": 500}
+    """
+    model_types = ('performance_based',)
+    primary_param = 'base'
+    needs_performance_data = True
+
+    def compile_params(self, raw_params):
+        weights = raw_params.get('weights') or {}
+        if not isinstance(weights, dict):
+            raise ValueError("weights must be an object")
+        params = {
+            'base': float(raw_params.get('base') or 0.0),
+            'weights': tuple(sorted((str(key), float(weight)) for key, weight in weights.items())),
+        }
+        if raw_params.get('cap') is not None:
+            params['cap'] = float(raw_params['cap'])
+        return params
+
+    def metric_keys(self, params):
+        return tuple(key for key, _weight in params.get('weights', ()))
+
+    def compute(self, params, submission_ids, metrics_by_submission=None):
+        metrics_by_submission = metrics_by_submission or {}
+        base = params.get('base', 0.0)
+        weights = params.get('weights', ())
+        cap = params.get('cap')
+        amounts = {}
+        for submission_id in submission_ids:
+            metrics = metrics_by_submission.get(submission_id, {})
+            amount = base + sum(_metric_value(metrics, key) * weight for key, weight in weights)
+            amounts[submission_id] = min(amount, cap) if cap is not None else amount
+        return amounts
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import copy
+import logging
+import threading
+import time
+from odoo import fields
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_TTL_SECONDS = 60
+
+# Campaign statuses counted as "active" on the dashboards.
+ACTIVE_CAMPAIGN_STATUSES = ('published', 'in_progress')
+# Statuses waiting for an administrator's decision.
+PENDING_APPLICATION_STATUSES = ('submitted', 'under_review')
+PENDING_KYC_STATUSES = ('submitted', 'in_review')
+
+# Per-process cache shared by every session of a database: {dbname: (expires_at, metrics)}.
+_METRICS_CACHE = {}
+_METRICS_LOCKS = {}
+_METRICS_LOCKS_GUARD = threading.Lock()
+
+
+class DashboardMetricsService:
+    """
+    Service computing the admin dashboard counters (campaigns, applications, KYC,
+    influencers, audit activity) with a single grouped SQL query. Results are
+    cached per database for a short TTL ('dashboard.metrics_cache_ttl_seconds')
+    and shared across admin sessions, so concurrent dashboard polling costs at
+    most one aggregate query per TTL and worker.
+    REQ-2-012, REQ-PAC-016, REQ-12-007
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    def get_admin_metrics(self, force_refresh=False):
+        """
+        Returns the dashboard counters, from the shared cache when fresh.
+        Callers are responsible for checking the user may see platform-wide figures.
+        :param bool force_refresh: bypass the cache and recompute
+        :return: dict (see _compute_metrics), with 'computed_at' as ISO string
+        """
+        dbname = self.env.cr.dbname
+        ttl = self._get_cache_ttl()
+        if not force_refresh:
+            cached = _METRICS_CACHE.get(dbname)
+            if cached and cached[0] > time.monotonic():
+                return copy.deepcopy(cached[1])
+        with _METRICS_LOCKS_GUARD:
+            lock = _METRICS_LOCKS.setdefault(dbname, threading.Lock())
+        # Only one request per worker recomputes; the others wait and reuse its result.
+        with lock:
+            cached = _METRICS_CACHE.get(dbname)
+            if not force_refresh and cached and cached[0] > time.monotonic():
+                return copy.deepcopy(cached[1])
+            metrics = self._compute_metrics()
+            _METRICS_CACHE[dbname] = (time.monotonic() + ttl, metrics)
+            return copy.deepcopy(metrics)
+
+    @staticmethod
+    def invalidate_cache(dbname=None):
+        """Drops cached metrics for one database, or for all databases."""
+        if dbname:
+            _METRICS_CACHE.pop(dbname, None)
+        else:
+            _METRICS_CACHE.clear()
+
+    def _get_cache_ttl(self):
+        value = self.env['influence_gen.platform_setting'].sudo().get_setting(
+            'dashboard.metrics_cache_ttl_seconds', default=DEFAULT_CACHE_TTL_SECONDS)
+        try:
+            return max(int(value), 0)
+        except (TypeError, ValueError):
+            return DEFAULT_CACHE_TTL_SECONDS
+
+    def _compute_metrics(self):
+        """
+        Runs one UNION ALL query returning (metric group, key, count, amount) rows for
+        every counter. The audit log part only scans the last 24 hours, which lets
+        PostgreSQL prune all older audit log partitions.
+        :return: dict
+        """
+        self.env.flush_all()
+        now = fields.Datetime.now()
+        self.env.cr.execute("""
+            SELECT 'campaign', status, count(*), COALESCE(sum(budget), 0)
+              FROM influence_gen_campaign
+          GROUP BY status
+            UNION ALL
+            SELECT 'campaign_recent', 'completed_30d', count(*), 0
+              FROM influence_gen_campaign
+             WHERE status = 'completed' AND end_date >= %(today)s::date - 30
+            UNION ALL
+            SELECT 'application', status, count(*), 0
+              FROM influence_gen_campaign_application
+          GROUP BY status
+            UNION ALL
+            SELECT 'kyc', verification_status, count(*), 0
+              FROM influence_gen_kyc_data
+          GROUP BY verification_status
+            UNION ALL
+            SELECT 'influencer', account_status, count(*), 0
+              FROM influence_gen_influencer_profile
+          GROUP BY account_status
+            UNION ALL
+            SELECT 'payment', metric, 0, amount
+              FROM (
+                    SELECT COALESCE(sum(payments_outstanding_amount), 0) AS outstanding,
+                           COALESCE(sum(payments_paid_amount), 0) AS paid
+                      FROM influence_gen_campaign_performance_summary
+                   ) payment_totals
+            CROSS JOIN LATERAL (VALUES ('outstanding', outstanding), ('paid', paid)) AS v(metric, amount)
+            UNION ALL
+            SELECT 'influencer_activity', 'in_campaigns', count(*), 0
+              FROM influence_gen_influencer_performance_summary
+             WHERE applications_approved > 0
+            UNION ALL
+            SELECT 'audit', metric, value, 0
+              FROM (
+                    SELECT count(*) FILTER (WHERE outcome = 'failure' OR event_type ILIKE '%%error%%') AS errors_24h,
+                           count(*) FILTER (WHERE event_type IN ('user.login', 'user_login')
+                                              AND "timestamp" >= date_trunc('day', %(now)s::timestamp)) AS logins_today
+                      FROM influence_gen_audit_log
+                     WHERE "timestamp" >= %(now)s::timestamp - interval '1 day'
+                   ) audit_counts
+            CROSS JOIN LATERAL (VALUES ('errors_24h', errors_24h), ('logins_today', logins_today)) AS v(metric, value)
+        """, {'now': now, 'today': fields.Date.today()})
+
+        counts = {
+            'campaign': {}, 'campaign_recent': {}, 'application': {}, 'kyc': {}, 'influencer': {},
+            'influencer_activity': {}, 'audit': {},
+        }
+        payments = {}
+        active_budget = 0.0
+        for group, key, count, amount in self.env.cr.fetchall():
+            if group == 'payment':
+                payments[key] = float(amount or 0.0)
+                continue
+            counts[group][key] = count
+            if group == 'campaign' and key in ACTIVE_CAMPAIGN_STATUSES:
+                active_budget += float(amount or 0.0)
+
+        def total(group, keys):
+            return sum(counts[group].get(key, 0) for key in keys)
+
+        return {
+            'campaigns_by_status': counts['campaign'],
+            'applications_by_status': counts['application'],
+            'kyc_by_status': counts['kyc'],
+            'influencers_by_status': counts['influencer'],
+            'active_campaigns': total('campaign', ACTIVE_CAMPAIGN_STATUSES),
+            'completed_campaigns_last_30d': counts['campaign_recent'].get('completed_30d', 0),
+            'total_budget_active_campaigns': active_budget,
+            'pending_applications': total('application', PENDING_APPLICATION_STATUSES),
+            'pending_kyc_submissions': total('kyc', PENDING_KYC_STATUSES),
+            'active_influencers': counts['influencer'].get('active', 0),
+            'influencers_in_campaigns': counts['influencer_activity'].get('in_campaigns', 0),
+            'payments_outstanding_amount': payments.get('outstanding', 0.0),
+            'payments_paid_amount': payments.get('paid', 0.0),
+            'recent_errors_count': counts['audit'].get('errors_24h', 0),
+            'logins_today': counts['audit'].get('logins_today', 0),
+            'computed_at': now.isoformat(),
+        }
@@ -4,6 +4,12 @@ import json
 from odoo import _, api
 from odoo.exceptions import UserError, ValidationError
 
+from .data_quality_service import DataQualityService
+from .influencer_deduplication_service import InfluencerDeduplicationService
+from .staging_dataset_exporter import (
+    StagingDatasetExporter, DEFAULT_CHUNK_SIZE as DEFAULT_EXPORT_CHUNK_SIZE, DEFAULT_MAX_WORKERS as DEFAULT_EXPORT_MAX_WORKERS,
+)
+
 _logger = logging.getLogger(__name__)
 
 class DataManagementService:
@@ -18,14 +24,17 @@ class DataManagementService:
         """
         self.env = env
 
-    def identify_data_quality_issues(self, model_name, domain=None, rules_key_prefix='data_quality.'):
+    def identify_data_quality_issues(self, model_name, domain=None, rules_key_prefix='data_quality.', full_scan=False):
         """
         Identifies data quality issues in a given model based on rules from PlatformSetting.
+        The rules of the model are run first (incrementally, see DataQualityService), then
+        the open issues of the records matching the domain are returned.
         :param model_name: str, name of the Odoo model to check (e.g., 'influence_gen.influencer_profile')
         :param domain: list, Odoo domain to filter records (optional)
         :param rules_key_prefix: str, prefix for PlatformSetting keys that define data quality rules.
-                                 Example rule: 'data_quality.influencer_profile.phone_format_check'
-                                 The value of the setting could be a JSON defining the rule.
+                                 Example rule: 'data_quality.influencer_profile.phone_if_address_exists'
+                                 The value of the setting is a JSON object defining the rule.
+        :param full_scan: bool, re-check every record instead of the ones written since the last scan
         :return: list of dicts describing issues, e.g.,
                  [{'record_id': X, 'model': model_name, 'field': 'phone', 'issue_type': 'format', 'description': 'Invalid phone format'}]
         REQ-DMG-017, REQ-DMG-018
@@ -34,33 +43,27 @@ class DataManagementService:
         if not self.env['ir.model']._get(model_name):
             raise UserError(_("Model %s not found.") % model_name)
 
-        records_to_check = self.env[model_name].search(domain or [])
-        issues_found = []
+        DataQualityService(self.env).scan(model_name=model_name, prefix=rules_key_prefix, full=full_scan)
+
+        Model = self.env[model_name].with_context(active_test=False)
+        issue_domain = [('model_name', '=', model_name), ('state', '=', 'open')]
+        if domain:
+            issue_domain.append(('res_id', 'in', Model._search(domain)))
+        issues = self.env['influence_gen.data_quality_issue'].sudo().search_read(
+            issue_domain, ['res_id', 'field_name', 'issue_type', 'severity', 'description', 'rule_code'])
+        records = Model.browse([issue['res_id'] for issue in issues])
+        record_names = {record.id: record.display_name for record in records}
+        issues_found = [{
+            'record_id': issue['res_id'],
+            'model': model_name,
+            'field': issue['field_name'],
+            'issue_type': issue['issue_type'],
+            'severity': issue['severity'],
+            'rule': issue['rule_code'],
+            'description': issue['description'],
+            'record_name': record_names.get(issue['res_id']),
+        } for issue in issues]
 
-        # Example: Rule for phone number format on influencer_profile
-        # This is a simplified example. Rules would be more complex and configurable.
-        if model_name == 'influence_gen.influencer_profile':
-            # Rule: Phone number should exist if address exists (example custom rule)
-            phone_rule_key = f"{rules_key_prefix}{model_name}.phone_if_address_exists"
-            # phone_rule_active = self.env['influence_gen.platform_setting'].get_setting(phone_rule_key, default='false').lower() == 'true'
-            # if phone_rule_active:
-            for record in records_to_check:
-                if record.fields_get().get('residential_address') and record.fields_get().get('phone'):
-                    if record.residential_address and not record.phone:
-                        issues_found.append({
-                            'record_id': record.id,
-                            'model': model_name,
-                            'field': 'phone',
-                            'issue_type': 'missing_conditional',
-                            'description': _("Phone number is missing but residential address is present."),
-                            'record_name': record.display_name
-                        })
-                # Add more specific field checks here based on platform settings
-                # e.g., email format (Odoo usually handles this via field type), address format, etc.
-        
-        # Example rule: Check for missing required fields not caught by DB (rare, but for complex logic)
-        # This is typically handled by `required=True` on fields.
-        
         _logger.info(f"Found {len(issues_found)} data quality issues for model {model_name}.")
         return issues_found
 
@@ -121,153 +124,59 @@ class DataManagementService:
         return True
 
 
-    def generate_anonymized_dataset_for_staging(self, models_to_anonymize_config):
+    def generate_anonymized_dataset_for_staging(self, models_to_anonymize_config, output_dir=None, export_format=None):
         """
-        Generates an anonymized dataset for staging/testing purposes.
-        This is a complex operation and this implementation is highly conceptual.
-        It might involve direct DB reads for performance and creating export files.
+        Generates an anonymized dataset for staging/testing purposes, as one gzip-compressed
+        CSV or JSONL file per model. Models are streamed in parallel worker processes from a
+        single database snapshot; anonymization runs in the SELECT (see StagingDatasetExporter).
         :param models_to_anonymize_config: list of dicts, e.g.,
             [{'model': 'influence_gen.influencer_profile',
               'fields_to_anonymize': [
                   {'name': 'full_name', 'technique': 'faker.name'},
                   {'name': 'email', 'technique': 'faker.email'},
-                  {'name': 'phone', 'technique': 'mask_ частично'},
-                  {'name': 'residential_address', 'technique': 'remove'}
+                  {'name': 'phone', 'technique': 'mask_partially'},
+                  {'name': 'residential_address', 'technique': 'remove'},
+                  {'name': 'user_id', 'technique': 'pseudonymize'},
               ],
+              'fields': ['account_status', 'create_date'], # Optional, further columns exported as-is
               'domain': [('account_status', '=', 'active')] # Optional domain
             }]
-        :return: str, path to anonymized data files or status message
+            Only `id`, the anonymized fields and the listed `fields` are exported.
+            Techniques: remove, mask, mask_partially, pseudonymize (deterministic: equal values,
+            e.g. foreign keys, get equal pseudonyms), faker.name, faker.email, faker.phone_number,
+            faker.address.
+        :param output_dir: str, directory of the files (optional, defaults to the data directory)
+        :param export_format: 'csv' or 'jsonl' (optional, defaults to the 'staging_export.format' setting)
+        :return: dict with output_dir, per-model rows, bytes, seconds and rows_per_second, and totals
         REQ-DMG-022
         """
-        _logger.info(f"Generating anonymized dataset with config: {models_to_anonymize_config}")
-        # This requires a data generation library like Faker, potentially from REPO-IGSCU-007
-        # For simplicity, this will be a conceptual outline.
-        
-        # try:
-        #     from faker import Faker
-        #     fake = Faker()
-        # except ImportError:
-        #     _logger.error("Faker library not found. Anonymization cannot proceed effectively.")
-        #     raise UserError(_("Anonymization library (Faker) not available. Please install it."))
-
-        anonymized_data_summary = []
-
-        for config in models_to_anonymize_config:
-            model_name = config['model']
-            fields_config = config['fields_to_anonymize']
-            domain = config.get('domain', [])
-
-            if not self.env['ir.model']._get(model_name):
-                _logger.warning(f"Skipping anonymization for unknown model: {model_name}")
-                continue
-
-            records = self.env[model_name].search(domain)
-            _logger.info(f"Processing {len(records)} records for model {model_name}")
-
-            for record in records:
-                anonymized_record_vals = {'id': record.id} # Keep ID for mapping if needed
-                for field_conf in fields_config:
-                    field_name = field_conf['name']
-                    technique = field_conf['technique']
-                    
-                    original_value = getattr(record, field_name, None)
-                    anonymized_value = original_value # Default to original if no technique applied
-
-                    # if technique == 'faker.name': anonymized_value = fake.name()
-                    # elif technique == 'faker.email': anonymized_value = fake.email()
-                    # elif technique == 'faker.address': anonymized_value = fake.address()
-                    # elif technique == 'faker.phone_number': anonymized_value = fake.phone_number()
-                    # elif technique == 'remove': anonymized_value = None
-                    # elif technique == 'mask_ частично' and isinstance(original_value, str):
-                    #     anonymized_value = original_value[:3] + '****' + original_value[-2:] if len(original_value) > 5 else '*****'
-                    # elif technique == 'random_number' and isinstance(original_value, (int, float)):
-                    #     anonymized_value = fake.random_number(digits=5)
-                    # Add more techniques as needed...
-                    
-                    # Placeholder for techniques as Faker is not directly imported
-                    if technique.startswith('faker.'): anonymized_value = f"Anonymized_{field_name}"
-                    elif technique == 'remove': anonymized_value = None
-                    elif technique == 'mask_partially' and isinstance(original_value, str):
-                         anonymized_value = original_value[:3] + '****' + original_value[-2:] if len(original_value) > 5 else '*****'
-                    
-                    anonymized_record_vals[field_name] = anonymized_value
-                
-                # Here, you would typically write these `anonymized_record_vals` to a file (CSV, JSONL)
-                # or directly to a staging database.
-                # For this example, we'll just log it.
-                # _logger.debug(f"Anonymized data for {model_name} ID {record.id}: {anonymized_record_vals}")
-                
-            anonymized_data_summary.append({
-                'model': model_name,
-                'records_processed': len(records),
-                'output_file': f"/tmp/anonymized_{model_name.replace('.', '_')}.csv" # Placeholder
-            })
-
-        _logger.info("Anonymized dataset generation process completed conceptually.")
-        # Actual file writing or staging DB load is omitted here.
-        return f"Anonymization process finished. Summary: {anonymized_data_summary}. (Files are placeholders)"
-
-
-    def apply_mdm_rules_influencer(self, influencer_ids=None, auto_merge_threshold=0.85):
+        _logger.info(f"Generating anonymized dataset for models: {[c.get('model') for c in models_to_anonymize_config]}")
+        settings = self.env['influence_gen.platform_setting'].sudo().get_settings('staging_export.')
+        exporter = StagingDatasetExporter(
+            self.env,
+            output_dir=output_dir,
+            export_format=export_format or settings.get('staging_export.format') or 'csv',
+            chunk_size=settings.get('staging_export.chunk_size') or DEFAULT_EXPORT_CHUNK_SIZE,
+            max_workers=settings.get('staging_export.max_workers') or DEFAULT_EXPORT_MAX_WORKERS,
+        )
+        return exporter.run(models_to_anonymize_config)
+
+
+    def apply_mdm_rules_influencer(self, influencer_ids=None, auto_merge_threshold=None):
         """
         Applies Master Data Management (MDM) rules for influencer deduplication.
-        This is a highly conceptual method. Real MDM involves complex matching, merging strategies.
-        :param influencer_ids: list of int, specific influencer IDs to check (optional, if None checks all/recent)
-        :param auto_merge_threshold: float, confidence score threshold for automatic merge (0.0 to 1.0)
+        Candidate duplicates are found through blocking keys and name similarity, scored
+        and queued for review; pairs scoring at least auto_merge_threshold are merged.
+        See InfluencerDeduplicationService.
+        :param influencer_ids: list of int, specific influencer IDs to check (optional, if None
+                               matches the profiles created or updated since the last run)
+        :param auto_merge_threshold: float, confidence score threshold for automatic merge (0.0 to 1.0),
+                                     defaults to the 'mdm.auto_merge_threshold' setting
+        :return: dict with the number of profiles matched, candidates queued and profiles auto-merged
         REQ-DMG-012
         """
         _logger.info(f"Applying MDM rules for influencers. IDs: {influencer_ids}, Threshold: {auto_merge_threshold}")
-        # This would involve:
-        # 1. Defining matching criteria (e.g., fuzzy name, exact email, similar social handles).
-        # 2. Searching for potential duplicates.
-        #    - If influencer_ids provided, find duplicates *for* these specific influencers.
-        #    - If None, might scan a subset of records (e.g., recently created/updated).
-        # 3. Calculating a confidence score for each pair of potential duplicates.
-        # 4. Flagging duplicates for manual review if score is below auto_merge_threshold but above a lower threshold.
-        # 5. Attempting auto-merge if score is above auto_merge_threshold.
-        #    - Merge logic: define surviving record, merge fields, link related records.
-        # 6. Logging all actions.
-
-        # Example: Simplified check for exact email duplicates (Odoo's SQL constraint handles this better)
-        # or very similar names.
-        
-        # influencers_to_check = self.env['influence_gen.influencer_profile'].search([]) # All, for demo
-        # potential_duplicates_found = 0
-        
-        # # This is a naive O(n^2) approach, not suitable for large datasets.
-        # # Real MDM tools use blocking/indexing for efficiency.
-        # for i, p1 in enumerate(influencers_to_check):
-        #     for j, p2 in enumerate(influencers_to_check):
-        #         if i >= j: continue # Avoid self-comparison and duplicate pairs
-
-        #         # Simple matching logic (placeholder)
-        #         score = 0.0
-        #         if p1.email and p1.email == p2.email and p1.id != p2.id: # Should be caught by unique constraint
-        #             score = 1.0 
-        #         # Add fuzzy name matching (e.g., Levenshtein distance)
-        #         # from Levenshtein import ratio # Example, if available via REPO-IGSCU-007
-        #         # name_similarity = ratio(p1.full_name.lower(), p2.full_name.lower())
-        #         # if name_similarity > 0.9: score = max(score, name_similarity)
-
-        #         if score > 0.7: # A lower threshold to consider it a potential duplicate
-        #             _logger.info(f"Potential duplicate found: Profile {p1.id} ({p1.full_name}) and Profile {p2.id} ({p2.full_name}), Score: {score}")
-        #             potential_duplicates_found +=1
-                    
-        #             if score >= auto_merge_threshold:
-        #                 _logger.info(f"  -> Confidence above threshold. Would attempt auto-merge (conceptual).")
-        #                 # self._merge_influencer_profiles(p1, p2) # Conceptual merge function
-        #             else:
-        #                 _logger.info(f"  -> Confidence below auto-merge. Would flag for manual review.")
-        #                 # Create activity/flag for admin review
-        
-        _logger.warning("MDM rule application is highly conceptual in this service. Full implementation is complex.")
-        # _logger.info(f"MDM rule application process completed. Potential duplicates identified (conceptual): {potential_duplicates_found}")
-        return True
-
-    # Conceptual helper for merge, not fully implemented
-    # def _merge_influencer_profiles(self, profile1, profile2):
-    #     # Determine survivor, merge data, re-parent related records, deactivate merged record.
-    #     # This is very complex and requires careful handling of all related models.
-    #     _logger.info(f"Conceptual merge of profile {profile2.id} into {profile1.id}")
-    #     # profile2.write({'account_status': 'inactive', 'active': False, 'merged_into_id': profile1.id})
-    #     pass
\ No newline at end of file
+        service = InfluencerDeduplicationService(self.env)
+        if influencer_ids is None:
+            return service.process_pending(auto_merge_threshold=auto_merge_threshold)
+        return service.match_profiles(influencer_ids, auto_merge_threshold=auto_merge_threshold)
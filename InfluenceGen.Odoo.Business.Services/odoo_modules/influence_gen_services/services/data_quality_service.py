@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import logging
+import re
+from datetime import timedelta
+
+from odoo.tools import email_normalize, split_every
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import commit_unless_testing, to_positive_int
+
+_logger = logging.getLogger(__name__)
+
+RULES_KEY_PREFIX = 'data_quality.'
+SCAN_STATE_TABLE = 'influence_gen_data_quality_scan_state'
+DEFAULT_CHUNK_SIZE = 2000  # records read per round trip by the Python checks
+# Incremental scans re-read this much history, so changes committed by transactions
+# that started before the previous scan are not missed. Re-detection is idempotent.
+SCAN_OVERLAP_MINUTES = 10
+
+RULE_CHECKS = ('required', 'required_if', 'regex', 'max_length', 'email')
+SEVERITIES = ('info', 'warning', 'error')
+# Field types whose column holds the plain value, so checks can run in SQL.
+SQL_FIELD_TYPES = ('char', 'text', 'selection', 'integer', 'float', 'monetary', 'many2one', 'date', 'datetime')
+SQL_TEXT_FIELD_TYPES = ('char', 'text', 'selection')
+
+
+class DataQualityService:
+    """
+    Rule-driven data quality scanner (REQ-DMG-017, REQ-DMG-018).
+
+    Rules are platform settings under 'data_quality.', one JSON rule per key:
+        {"model": "influence_gen.influencer_profile", "field": "phone",
+         "check": "required_if", "depends_on": "residential_address",
+         "domain": [["merged_into_id", "=", false]],
+         "issue_type": "missing_conditional", "severity": "warning",
+         "description": "Phone number is missing but residential address is present."}
+    Checks: required, required_if (depends_on), regex (pattern), max_length (max_length)
+    and email. The rule code is the setting key without the prefix.
+
+    Checks on stored columns are compiled into a SQL WHERE clause and their
+    issues are upserted with one INSERT ... SELECT; the other checks (computed
+    fields, email, or rules with "sql": false) read the records in chunks with
+    only the fields they need. Issues live in influence_gen.data_quality_issue,
+    one row per (rule, record). Scans are incremental: a rule only re-checks the
+    records written since its previous scan, unless the rule changed, and issues
+    of re-checked (or deleted) records that no longer fail are resolved.
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    def load_rules(self, prefix=RULES_KEY_PREFIX, model_name=None):
+        """
+        Reads and validates the rules stored in platform settings.
+        :param str prefix: key prefix of the rule settings
+        :param str model_name: only return the rules of this model (optional)
+        :return: list of rule dicts, with their 'code'
+        """
+        rules = []
+        for key, definition in sorted(self.env['influence_gen.platform_setting'].sudo().get_settings(prefix).items()):
+            rule_code = key[len(prefix):]
+            error = self._validate_rule(definition)
+            if error:
+                _logger.warning(f"Data quality rule '{rule_code}' ignored: {error}")
+                continue
+            if model_name and definition['model'] != model_name:
+                continue
+            rules.append(dict(definition, code=rule_code))
+        return rules
+
+    def _validate_rule(self, definition):
+        """:return: error message, or None when the rule can be run"""
+        if not isinstance(definition, dict):
+            return "the setting value is not a JSON object"
+        model_name, field_name, check = definition.get('model'), definition.get('field'), definition.get('check')
+        if model_name not in self.env:
+            return f"unknown model '{model_name}'"
+        Model = self.env[model_name]
+        for name in (field_name, definition.get('depends_on')):
+            if name and name not in Model._fields:
+                return f"unknown field '{name}' on {model_name}"
+        if not field_name:
+            return "no field"
+        if check not in RULE_CHECKS:
+            return f"unknown check '{check}'"
+        if check == 'required_if' and not definition.get('depends_on'):
+            return "required_if needs 'depends_on'"
+        if check == 'regex':
+            try:
+                re.compile(definition.get('pattern') or '')
+            except re.error as e:
+                return f"invalid pattern: {e}"
+            if not definition.get('pattern'):
+                return "regex needs 'pattern'"
+        if check == 'max_length' and not isinstance(definition.get('max_length'), int):
+            return "max_length needs an integer 'max_length'"
+        if definition.get('severity', 'warning') not in SEVERITIES:
+            return f"unknown severity '{definition.get('severity')}'"
+        return None
+
+    def scan(self, model_name=None, prefix=RULES_KEY_PREFIX, full=False, commit=False):
+        """
+        Runs the data quality rules and updates the issue table. Each rule runs in
+        a savepoint, so a failing rule is rolled back alone.
+        :param str model_name: only run the rules of this model (optional)
+        :param str prefix: key prefix of the rule settings
+        :param bool full: re-check every record instead of the ones written since the last scan
+        :param bool commit: commit after each rule; only for the scheduled scan, which owns its transaction
+        :return: dict {rule code: {'checked_since', 'detected', 'resolved', 'engine'}}
+        """
+        stats = {}
+        for rule in self.load_rules(prefix, model_name=model_name):
+            try:
+                with self.env.cr.savepoint():
+                    stats[rule['code']] = self._scan_rule(rule, full=full)
+            except Exception:
+                # A broken rule (e.g. a pattern PostgreSQL rejects) must not stop the others.
+                _logger.exception(f"Data quality rule '{rule['code']}' failed.")
+                continue
+            if commit:
+                # Each rule is committed with its scan state, so a crash only replays the rule in flight.
+                commit_unless_testing(self.env)
+        return stats
+
+    def _scan_rule(self, rule, full=False):
+        rule_hash = hashlib.sha256(json.dumps(rule, sort_keys=True, default=str).encode()).hexdigest()
+        self.env.cr.execute(
+            f"SELECT rule_hash, scanned_at FROM {SCAN_STATE_TABLE} WHERE rule_code = %s", [rule['code']])
+        state = self.env.cr.fetchone()
+        since = None
+        if state and state[0] == rule_hash and not full:
+            since = state[1] - timedelta(minutes=SCAN_OVERLAP_MINUTES)
+
+        Model = self.env[rule['model']].sudo().with_context(active_test=False)
+        fields_used = [rule['field']] + ([rule['depends_on']] if rule.get('depends_on') else [])
+        Model.flush_model(fields_used + ['write_date'])
+        now = self.env.cr.now()
+        changed_domain = [('write_date', '>=', since)] if since else []
+        scope = Model._search(changed_domain + list(rule.get('domain') or [])).subselect()
+
+        violation_sql = self._compile_rule(Model, rule)
+        if violation_sql is not None:
+            engine = 'sql'
+            source = f'SELECT t.id FROM "{Model._table}" t WHERE t.id IN ({scope.code}) AND ({violation_sql})'
+            source_params = list(scope.params)
+        else:
+            engine = 'python'
+            failing_ids = self._run_python_check(Model, rule, scope)
+            source = "SELECT unnest(%s::int[])"
+            source_params = [failing_ids]
+        detected = self._record_issues(rule, source, source_params, now)
+        resolved = self._resolve_issues(Model, rule, changed_domain, now)
+
+        self.env.cr.execute(f"""
+            INSERT INTO {SCAN_STATE_TABLE} (rule_code, rule_hash, scanned_at) VALUES (%s, %s, %s)
+            ON CONFLICT (rule_code) DO UPDATE SET rule_hash = EXCLUDED.rule_hash, scanned_at = EXCLUDED.scanned_at
+        """, [rule['code'], rule_hash, now])
+        self.env['influence_gen.data_quality_issue'].invalidate_model()
+        _logger.info(f"Data quality rule '{rule['code']}' ({engine}, since {since or 'the beginning'}): "
+                     f"{detected} issue(s) detected, {resolved} resolved.")
+        return {'checked_since': since, 'detected': detected, 'resolved': resolved, 'engine': engine}
+
+    def _compile_rule(self, Model, rule):
+        """
+        Compiles the check of a rule into a SQL condition on the alias `t`.
+        :return: SQL string, or None when the check needs Python
+        """
+        if rule.get('sql') is False or rule['check'] == 'email':
+            return None
+        conditions = {}
+        for role, name in (('field', rule['field']), ('depends_on', rule.get('depends_on'))):
+            if not name:
+                continue
+            field = Model._fields[name]
+            if not field.store or not field.column_type or field.type not in SQL_FIELD_TYPES or field.translate:
+                return None
+            column = f't."{name}"'
+            is_text = field.type in SQL_TEXT_FIELD_TYPES
+            conditions[role] = {
+                'column': column,
+                'is_text': is_text,
+                'empty': f"({column} IS NULL OR {column} = '')" if is_text else f"{column} IS NULL",
+            }
+        target = conditions['field']
+        check = rule['check']
+        if check == 'required':
+            return target['empty']
+        if check == 'required_if':
+            return f"NOT {conditions['depends_on']['empty']} AND {target['empty']}"
+        if not target['is_text']:
+            return None
+        if check == 'regex':
+            # POSIX and Python regexes agree on the usual validation patterns; rules using
+            # Python-only syntax set "sql": false.
+            # The literal is embedded in a query that has parameters of its own: escape '%'.
+            pattern = self.env.cr.mogrify("%s", [rule['pattern']]).decode().replace('%', '%%')
+            return f"NOT {target['empty']} AND {target['column']} !~ {pattern}"
+        if check == 'max_length':
+            return f"char_length({target['column']}) > {int(rule['max_length'])}"
+        return None
+
+    def _run_python_check(self, Model, rule, scope):
+        """
+        Reads the records in scope in chunks, with only the fields the rule needs.
+        :return: list of failing record IDs
+        """
+        self.env.cr.execute(scope.code, scope.params)
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        field_names = [rule['field']] + ([rule['depends_on']] if rule.get('depends_on') else [])
+        chunk_size = self._get_chunk_size()
+        failing_ids = []
+        for chunk in split_every(chunk_size, ids):
+            for values in Model.browse(chunk).read(field_names, load=None):
+                if self._violates(rule, values):
+                    failing_ids.append(values['id'])
+            # Keep memory flat on large models.
+            Model.invalidate_model(field_names)
+        return failing_ids
+
+    def _violates(self, rule, values):
+        def is_empty(value):
+            return value is None or value is False or value == ''
+
+        value = values[rule['field']]
+        check = rule['check']
+        if check == 'required':
+            return is_empty(value)
+        if check == 'required_if':
+            return not is_empty(values[rule['depends_on']]) and is_empty(value)
+        if is_empty(value):
+            return False
+        if check == 'regex':
+            return not re.search(rule['pattern'], str(value))
+        if check == 'max_length':
+            return len(str(value)) > rule['max_length']
+        if check == 'email':
+            return not email_normalize(str(value))
+        return False
+
+    def _record_issues(self, rule, source, source_params, now):
+        """
+        Opens (or keeps open) an issue for every record returned by `source`.
+        :return: number of failing records
+        """
+        self.env.cr.execute(f"""
+            INSERT INTO influence_gen_data_quality_issue AS i (
+                rule_code, model_name, res_id, field_name, issue_type, severity, description, state,
+                first_detected_at, last_detected_at, create_uid, write_uid, create_date, write_date)
+            SELECT %s, %s, failing.id, %s, %s, %s, %s, 'open', %s, %s, %s, %s, %s, %s
+              FROM ({source}) AS failing(id)
+            ON CONFLICT (rule_code, res_id) DO UPDATE SET
+                field_name = EXCLUDED.field_name,
+                issue_type = EXCLUDED.issue_type,
+                severity = EXCLUDED.severity,
+                description = EXCLUDED.description,
+                first_detected_at = CASE WHEN i.state = 'resolved' THEN EXCLUDED.first_detected_at ELSE i.first_detected_at END,
+                last_detected_at = EXCLUDED.last_detected_at,
+                state = 'open',
+                resolved_at = NULL,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, [
+            rule['code'], rule['model'], rule['field'], rule.get('issue_type') or rule['check'],
+            rule.get('severity') or 'warning', rule.get('description') or self._default_description(rule),
+            now, now, self.env.uid, self.env.uid, now, now,
+        ] + source_params)
+        return self.env.cr.rowcount
+
+    def _resolve_issues(self, Model, rule, changed_domain, now):
+        """
+        Resolves the open issues of the rule that were not detected again by this scan:
+        on a full scan all of them, on an incremental one those of re-checked or deleted records.
+        :return: number of issues resolved
+        """
+        where, params = "", []
+        if changed_domain:
+            changed = Model._search(changed_domain).subselect()
+            where = f"""AND (i.res_id IN ({changed.code})
+                         OR NOT EXISTS (SELECT 1 FROM "{Model._table}" t WHERE t.id = i.res_id))"""
+            params = list(changed.params)
+        self.env.cr.execute(f"""
+            UPDATE influence_gen_data_quality_issue i
+               SET state = 'resolved', resolved_at = %s, write_uid = %s, write_date = %s
+             WHERE i.rule_code = %s AND i.state = 'open' AND i.last_detected_at < %s
+               {where}
+        """, [now, self.env.uid, now, rule['code'], now] + params)
+        return self.env.cr.rowcount
+
+    def _default_description(self, rule):
+        field_label = self.env[rule['model']]._fields[rule['field']].string
+        if rule['check'] == 'required':
+            return f"{field_label} is missing."
+        if rule['check'] == 'required_if':
+            depends_label = self.env[rule['model']]._fields[rule['depends_on']].string
+            return f"{field_label} is missing but {depends_label} is set."
+        if rule['check'] == 'max_length':
+            return f"{field_label} is longer than {rule['max_length']} characters."
+        return f"{field_label} has an invalid format."
+
+    def _get_chunk_size(self):
+        value = self.env['influence_gen.platform_setting'].sudo().get_setting(
+            'data_quality_scan.chunk_size', default=DEFAULT_CHUNK_SIZE)
+        return to_positive_int(value, DEFAULT_CHUNK_SIZE)
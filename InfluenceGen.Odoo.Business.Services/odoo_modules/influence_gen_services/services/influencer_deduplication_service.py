@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo import _, fields
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import claim_queued, mark_queued
+from .campaign_kpi_aggregation_service import CampaignKpiAggregationService
+from .legal_hold_propagation_service import HOLD_MEMBER_TABLE
+
+_logger = logging.getLogger(__name__)
+
+PROFILE_MODEL = 'influence_gen.influencer_profile'
+CANDIDATE_TABLE = 'influence_gen_influencer_duplicate_candidate'
+PENDING_TABLE = 'influence_gen_influencer_mdm_pending'
+
+# Blocking key expressions; the expression indexes of influence_gen.influencer_profile use the same SQL.
+EMAIL_KEY_SQL = "lower(trim({alias}email))"
+PHONE_KEY_SQL = "regexp_replace(COALESCE({alias}phone, ''), '[^0-9]', '', 'g')"
+NAME_KEY_SQL = "lower({alias}full_name)"
+MIN_PHONE_DIGITS = 7  # shorter numbers are too ambiguous to block on
+
+# Weight of each matching signal; the score of a pair is 1 - prod(1 - weight * signal),
+# so one strong signal is enough for review and signals reinforce each other.
+# Overridden by the 'mdm.match_weights' platform setting.
+DEFAULT_MATCH_WEIGHTS = {'email': 0.9, 'phone': 0.6, 'social_handle': 0.8, 'name': 0.5}
+DEFAULT_REVIEW_THRESHOLD = 0.6
+DEFAULT_AUTO_MERGE_THRESHOLD = 0.95
+# Merges are irreversible: a pair is only merged automatically when it matches on several
+# independent signals, never on one strong signal (e.g. a shared family email) alone.
+MIN_AUTO_MERGE_SIGNALS = 2
+DEFAULT_NAME_SIMILARITY = 0.6  # pg_trgm similarity blocking two names together
+DEFAULT_PROCESS_LIMIT = 5000  # pending profiles matched per cron run
+MATCH_BATCH_SIZE = 500  # profiles matched per statement
+# Models never re-pointed by a merge: the candidate queue itself, issues describing the duplicate's
+# own data, and derived tables rebuilt from their sources.
+MERGE_SKIPPED_MODELS = frozenset({
+    'influence_gen.influencer_duplicate_candidate',
+    'influence_gen.data_quality_issue',
+    'influence_gen.campaign_performance_rollup',
+    'influence_gen.influencer_performance_summary',
+})
+
+
+class InfluencerDeduplicationService:
+    """
+    Master data management for influencer profiles: duplicate detection and merge.
+
+    Profiles are never compared pairwise. Candidate pairs come from blocking keys
+    looked up through indexes (normalized email, phone digits, normalized social
+    media handles) and, when pg_trgm is available, from trigram similarity of the
+    names. Each batch of profiles is blocked, scored and written to the duplicate
+    candidate queue (influence_gen.influencer_duplicate_candidate) by a single SQL
+    statement. Matching is incremental: created or updated profiles are marked
+    pending and only they are matched by the MDM cron. Automatic merge is off
+    unless enabled by the 'mdm.auto_merge_enabled' setting.
+    REQ-DMG-012
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    # ------------------------------------------------------------------
+    # Incremental queue
+    # ------------------------------------------------------------------
+
+    def mark_pending(self, profile_ids):
+        """
+        Queues profiles for duplicate matching, and wakes the MDM cron up once the
+        transaction commits if any profile was not queued yet.
+        :param profile_ids: iterable of influence_gen.influencer_profile IDs
+        """
+        mark_queued(self.env, PENDING_TABLE, 'influencer_id', profile_ids,
+                    'influence_gen_services.ir_cron_match_duplicate_influencers')
+
+    def process_pending(self, limit=DEFAULT_PROCESS_LIMIT, auto_merge_threshold=None):
+        """
+        Matches queued profiles. Queue entries are claimed with FOR UPDATE SKIP LOCKED,
+        so concurrent runs never match the same profile.
+        :return: dict with the number of profiles matched, candidates queued and profiles auto-merged
+        """
+        profile_ids = [profile_id for (profile_id,) in claim_queued(self.env.cr, PENDING_TABLE, ['influencer_id'], limit)]
+        return self.match_profiles(profile_ids, auto_merge_threshold=auto_merge_threshold)
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def match_profiles(self, profile_ids, auto_merge_threshold=None):
+        """
+        Finds the duplicates of the given profiles, queues pairs scoring at least the
+        review threshold and merges those scoring at least auto_merge_threshold, above
+        every single match weight, on at least 'mdm.auto_merge_min_signals' signals.
+        :param list profile_ids: influence_gen.influencer_profile IDs
+        :param float auto_merge_threshold: defaults to the 'mdm.auto_merge_threshold' setting when
+                                           'mdm.auto_merge_enabled' is set; no pair is merged otherwise
+        :return: dict with the number of profiles matched, candidates queued and profiles auto-merged
+        """
+        stats = {'matched': 0, 'candidates': 0, 'merged': 0}
+        if not profile_ids:
+            return stats
+        settings = self.env['influence_gen.platform_setting'].sudo().get_settings('mdm.')
+        if auto_merge_threshold is None and settings.get('mdm.auto_merge_enabled'):
+            auto_merge_threshold = self._to_float(settings.get('mdm.auto_merge_threshold'), DEFAULT_AUTO_MERGE_THRESHOLD)
+        params = self._get_match_params(settings)
+        min_signals = max(int(self._to_float(settings.get('mdm.auto_merge_min_signals'), MIN_AUTO_MERGE_SIGNALS)),
+                          MIN_AUTO_MERGE_SIGNALS)
+        max_weight = max(params['w_email'], params['w_phone'], params['w_handle'], params['w_name'])
+
+        self.env[PROFILE_MODEL].flush_model(['full_name', 'email', 'phone', 'merged_into_id'])
+        self.env['influence_gen.social_media_profile'].flush_model(['influencer_profile_id', 'platform', 'handle_normalized'])
+        self.env['influence_gen.influencer_duplicate_candidate'].flush_model()
+        use_trigram = self._has_trigram()
+        if use_trigram:
+            self.env.cr.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", [str(params['name_similarity'])])
+
+        auto_merge_ids = []
+        for batch in split_every(MATCH_BATCH_SIZE, sorted(set(profile_ids))):
+            params['ids'] = list(batch)
+            self.env.cr.execute(self._build_match_query(use_trigram), params)
+            rows = self.env.cr.fetchall()
+            stats['matched'] += len(batch)
+            stats['candidates'] += len(rows)
+            if auto_merge_threshold is None:
+                continue
+            auto_merge_ids += [
+                candidate_id for candidate_id, score, details in rows
+                if score >= auto_merge_threshold and score > max_weight
+                and self._count_signals(details, params) >= min_signals
+            ]
+        self.env['influence_gen.influencer_duplicate_candidate'].invalidate_model()
+
+        for candidate in self.env['influence_gen.influencer_duplicate_candidate'].browse(auto_merge_ids):
+            if candidate.state == 'pending' and self._try_auto_merge(candidate):
+                stats['merged'] += 1
+        _logger.info(f"Influencer MDM matching finished: {stats}")
+        return stats
+
+    def _count_signals(self, match_details, params):
+        """Number of independent signals a scored pair matches on."""
+        match_details = match_details or {}
+        return sum((
+            bool(match_details.get('email')),
+            bool(match_details.get('phone')),
+            bool(match_details.get('social_handles')),
+            self._to_float(match_details.get('name_similarity'), 0.0) >= params['name_similarity'],
+        ))
+
+    def _get_match_params(self, settings):
+        weights = dict(DEFAULT_MATCH_WEIGHTS)
+        configured = settings.get('mdm.match_weights')
+        if isinstance(configured, dict):
+            for signal, weight in configured.items():
+                if signal in weights:
+                    weights[signal] = min(max(self._to_float(weight, weights[signal]), 0.0), 1.0)
+        return {
+            'w_email': weights['email'],
+            'w_phone': weights['phone'],
+            'w_handle': weights['social_handle'],
+            'w_name': weights['name'],
+            'review_threshold': self._to_float(settings.get('mdm.review_threshold'), DEFAULT_REVIEW_THRESHOLD),
+            'name_similarity': self._to_float(settings.get('mdm.name_similarity_threshold'), DEFAULT_NAME_SIMILARITY),
+            'min_phone_digits': MIN_PHONE_DIGITS,
+            'uid': self.env.uid,
+        }
+
+    def _build_match_query(self, use_trigram):
+        """
+        One statement per batch: blocking (index lookups per key), scoring of the candidate
+        pairs, and upsert into the candidate queue. Pairs already reviewed are left alone.
+        Returns (candidate id, score, match details) for every pair queued or rescored.
+        """
+        email_key = EMAIL_KEY_SQL.format(alias='o.')
+        phone_key = PHONE_KEY_SQL.format(alias='o.')
+        name_block = name_score = ""
+        if use_trigram:
+            name_block = f"""
+                UNION
+                SELECT s.id, o.id FROM src s
+                  JOIN influence_gen_influencer_profile o ON {NAME_KEY_SQL.format(alias='o.')} %% s.name
+            """
+            name_score = f"similarity({NAME_KEY_SQL.format(alias='pa.')}, {NAME_KEY_SQL.format(alias='pb.')})"
+        else:
+            name_score = f"({NAME_KEY_SQL.format(alias='pa.')} = {NAME_KEY_SQL.format(alias='pb.')})::int"
+        return f"""
+            WITH src AS (
+                SELECT p.id, {EMAIL_KEY_SQL.format(alias='p.')} AS email,
+                       {PHONE_KEY_SQL.format(alias='p.')} AS phone, {NAME_KEY_SQL.format(alias='p.')} AS name
+                  FROM influence_gen_influencer_profile p
+                 WHERE p.id = ANY(%(ids)s) AND p.merged_into_id IS NULL
+            ), blocked AS (
+                SELECT s.id AS src_id, o.id AS other_id FROM src s
+                  JOIN influence_gen_influencer_profile o ON {email_key} = s.email
+                UNION
+                SELECT s.id, o.id FROM src s
+                  JOIN influence_gen_influencer_profile o ON {phone_key} = s.phone
+                 WHERE length(s.phone) >= %(min_phone_digits)s
+                UNION
+                SELECT s.id, om.influencer_profile_id FROM src s
+                  JOIN influence_gen_social_media_profile sm ON sm.influencer_profile_id = s.id
+                  JOIN influence_gen_social_media_profile om
+                    ON om.platform = sm.platform AND om.handle_normalized = sm.handle_normalized
+                 WHERE sm.handle_normalized IS NOT NULL
+                {name_block}
+            ), pairs AS (
+                SELECT DISTINCT LEAST(b.src_id, b.other_id) AS a_id, GREATEST(b.src_id, b.other_id) AS b_id
+                  FROM blocked b
+                 WHERE b.src_id != b.other_id
+            ), signals AS (
+                SELECT pr.a_id, pr.b_id,
+                       ({EMAIL_KEY_SQL.format(alias='pa.')} = {EMAIL_KEY_SQL.format(alias='pb.')})::int AS email_match,
+                       ({PHONE_KEY_SQL.format(alias='pa.')} = {PHONE_KEY_SQL.format(alias='pb.')}
+                        AND length({PHONE_KEY_SQL.format(alias='pa.')}) >= %(min_phone_digits)s)::int AS phone_match,
+                       (SELECT count(*) FROM influence_gen_social_media_profile sa
+                          JOIN influence_gen_social_media_profile sb
+                            ON sb.platform = sa.platform AND sb.handle_normalized = sa.handle_normalized
+                         WHERE sa.influencer_profile_id = pr.a_id AND sb.influencer_profile_id = pr.b_id) AS handle_matches,
+                       COALESCE({name_score}, 0)::float8 AS name_similarity
+                  FROM pairs pr
+                  JOIN influence_gen_influencer_profile pa ON pa.id = pr.a_id
+                  JOIN influence_gen_influencer_profile pb ON pb.id = pr.b_id
+                 WHERE pb.merged_into_id IS NULL AND pa.merged_into_id IS NULL
+            ), scored AS (
+                SELECT sg.*, 1 - (1 - %(w_email)s * sg.email_match)
+                               * (1 - %(w_phone)s * sg.phone_match)
+                               * (1 - %(w_handle)s * LEAST(sg.handle_matches, 1))
+                               * (1 - %(w_name)s * sg.name_similarity) AS score
+                  FROM signals sg
+            )
+            INSERT INTO {CANDIDATE_TABLE} AS c
+                   (profile_a_id, profile_b_id, score, match_details, state, auto_merged,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT sc.a_id, sc.b_id, round(sc.score::numeric, 4),
+                   jsonb_build_object('email', sc.email_match = 1, 'phone', sc.phone_match = 1,
+                                      'social_handles', sc.handle_matches,
+                                      'name_similarity', round(sc.name_similarity::numeric, 3)),
+                   'pending', false,
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM scored sc
+             WHERE sc.score >= %(review_threshold)s
+            ON CONFLICT (profile_a_id, profile_b_id) DO UPDATE
+               SET score = EXCLUDED.score, match_details = EXCLUDED.match_details,
+                   write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+             WHERE c.state = 'pending'
+         RETURNING c.id, c.score, c.match_details
+        """
+
+    def _has_trigram(self):
+        return bool(getattr(self.env.registry, 'has_trigram', False))
+
+    # ------------------------------------------------------------------
+    # Merge
+    # ------------------------------------------------------------------
+
+    def _try_auto_merge(self, candidate):
+        """Auto-merges a candidate pair; profiles under legal hold are left for manual review."""
+        survivor, duplicate = candidate.profile_a_id, candidate.profile_b_id
+        if survivor.legal_hold_status or duplicate.legal_hold_status:
+            return False
+        try:
+            self.merge_profiles(survivor, duplicate)
+        except Exception as e:
+            _logger.warning(f"Auto-merge of influencer profiles {duplicate.id} into {survivor.id} failed: {e}")
+            candidate.write({'merge_error': str(e)})
+            return False
+        candidate.write({
+            'state': 'merged',
+            'auto_merged': True,
+            'reviewed_at': fields.Datetime.now(),
+            'merge_error': False,
+        })
+        return True
+
+    def merge_profiles(self, survivor, duplicate):
+        """
+        Merges `duplicate` into `survivor`: every record referencing the duplicate is
+        re-pointed to the survivor with one UPDATE per referencing column, then the
+        duplicate is deactivated and linked to its survivor. Runs in a savepoint: on a
+        conflict (e.g. both profiles applied to the same campaign) nothing is merged.
+        :raises UserError: if a profile is under legal hold or already merged
+        """
+        if survivor == duplicate:
+            raise UserError(_("A profile cannot be merged into itself."))
+        if survivor.legal_hold_status or duplicate.legal_hold_status:
+            raise UserError(_("Profiles under legal hold cannot be merged."))
+        if survivor.merged_into_id or duplicate.merged_into_id:
+            raise UserError(_("One of the profiles has already been merged."))
+        self.env.flush_all()
+        with self.env.cr.savepoint():
+            self._reassign_references(survivor.id, duplicate.id)
+            self.env.invalidate_all()
+            duplicate.write({'merged_into_id': survivor.id, 'account_status': 'inactive'})
+            self.env.flush_all()
+        # Submissions moved without the ORM: their campaigns' performance rollups must be rebuilt.
+        self.env.cr.execute(
+            "SELECT DISTINCT campaign_id FROM influence_gen_content_submission WHERE influencer_profile_id = %s AND review_status = 'approved'",
+            [survivor.id])
+        CampaignKpiAggregationService(self.env).mark_stale([row[0] for row in self.env.cr.fetchall()])
+        self.env[PROFILE_MODEL].browse(duplicate.id).message_post(
+            body=_("Merged into influencer profile %s (duplicate detection).", survivor.display_name))
+        # Pairs of the duplicate with other profiles are moot now; the survivor is matched again.
+        self.env.cr.execute(f"""
+            UPDATE {CANDIDATE_TABLE} SET state = 'dismissed', write_date = now() at time zone 'UTC'
+             WHERE state = 'pending' AND (profile_a_id = %(duplicate)s OR profile_b_id = %(duplicate)s)
+        """, {'duplicate': duplicate.id})
+        self.env['influence_gen.influencer_duplicate_candidate'].invalidate_model()
+        self.mark_pending([survivor.id])
+        _logger.info(f"Influencer profile {duplicate.id} merged into {survivor.id}.")
+
+    def _reassign_references(self, survivor_id, duplicate_id):
+        """
+        Re-points stored references from one profile to another, in SQL: many2one and
+        many2many fields, (model, res_id) references such as attachments and chatter
+        (messages, followers, activities), and legal hold membership.
+        """
+        done_relations = set()
+        for model_name in list(self.env.registry):
+            Model = self.env[model_name]
+            if Model._abstract or Model._transient or not Model._auto or model_name in MERGE_SKIPPED_MODELS:
+                continue
+            for field in Model._fields.values():
+                if not field.store or field.inherited:
+                    continue
+                if field.type == 'many2one' and field.comodel_name == PROFILE_MODEL:
+                    self.env.cr.execute(
+                        f'UPDATE "{Model._table}" SET "{field.name}" = %s WHERE "{field.name}" = %s',
+                        [survivor_id, duplicate_id])
+                elif field.type == 'many2many' and PROFILE_MODEL in (field.comodel_name, field.model_name):
+                    if field.comodel_name == PROFILE_MODEL:
+                        profile_column, other_column = field.column2, field.column1
+                    else:
+                        profile_column, other_column = field.column1, field.column2
+                    if (field.relation, profile_column) in done_relations:
+                        continue
+                    done_relations.add((field.relation, profile_column))
+                    self.env.cr.execute(f"""
+                        INSERT INTO "{field.relation}" ("{profile_column}", "{other_column}")
+                        SELECT %s, "{other_column}" FROM "{field.relation}" WHERE "{profile_column}" = %s
+                        ON CONFLICT DO NOTHING
+                    """, [survivor_id, duplicate_id])
+                    self.env.cr.execute(
+                        f'DELETE FROM "{field.relation}" WHERE "{profile_column}" = %s', [duplicate_id])
+                elif field.type == 'many2one_reference' and field.model_field in Model._fields:
+                    model_field = Model._fields[field.model_field]
+                    if not model_field.store or model_field.type not in ('char', 'selection'):
+                        continue
+                    if model_name == 'mail.followers':
+                        # One follower per (document, partner): drop the duplicate's followers already following the survivor.
+                        self.env.cr.execute("""
+                            DELETE FROM mail_followers f
+                             WHERE f.res_model = %(model)s AND f.res_id = %(duplicate)s
+                               AND EXISTS (SELECT 1 FROM mail_followers s
+                                            WHERE s.res_model = %(model)s AND s.res_id = %(survivor)s
+                                              AND s.partner_id = f.partner_id)
+                        """, {'model': PROFILE_MODEL, 'survivor': survivor_id, 'duplicate': duplicate_id})
+                    self.env.cr.execute(
+                        f'UPDATE "{Model._table}" SET "{field.name}" = %s WHERE "{field.model_field}" = %s AND "{field.name}" = %s',
+                        [survivor_id, PROFILE_MODEL, duplicate_id])
+        self.env.cr.execute(f"""
+            INSERT INTO {HOLD_MEMBER_TABLE} (model, res_id, hold_ref, placed_at)
+            SELECT model, %(survivor)s, hold_ref, placed_at FROM {HOLD_MEMBER_TABLE}
+             WHERE model = %(model)s AND res_id = %(duplicate)s
+            ON CONFLICT DO NOTHING
+        """, {'model': PROFILE_MODEL, 'survivor': survivor_id, 'duplicate': duplicate_id})
+        self.env.cr.execute(
+            f"DELETE FROM {HOLD_MEMBER_TABLE} WHERE model = %s AND res_id = %s", [PROFILE_MODEL, duplicate_id])
+        if self.env.cr.rowcount:
+            self.env['influence_gen.legal_hold_index'].invalidate([PROFILE_MODEL])
+
+    def _to_float(self, value, default):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
+
+from odoo import _, fields
+from odoo.tools import split_every
+
+from odoo.addons.influence_gen_external_integrations.exceptions.kyc_exceptions import KYCServiceError, KYCServiceUnavailableError
+from odoo.addons.influence_gen_external_integrations.models.kyc.kyc_verification_request import KYCVerificationRequest
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import commit_unless_testing, relock, to_positive_int, trigger_cron
+from .onboarding_service import OnboardingService
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CLAIM_LIMIT = 500
+DEFAULT_BATCH_SIZE = 25
+DEFAULT_RATE_LIMIT_PER_MINUTE = 60
+DEFAULT_POLL_INTERVAL_MINUTES = 10
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 60
+BACKOFF_MAX_SECONDS = 3600
+
+# Document types as expected by the provider.
+PROVIDER_DOCUMENT_TYPES = {
+    'passport': 'PASSPORT',
+    'driver_license': 'DRIVING_LICENSE',
+    'national_id': 'ID_CARD',
+    'utility_bill': 'UTILITY_BILL',
+    'other': 'OTHER',
+}
+# Provider statuses deciding a document; any status neither here nor in PROVIDER_PENDING_STATUSES
+# routes the document to manual review.
+PROVIDER_DECISIONS = {
+    'VERIFIED': 'approved',
+    'APPROVED': 'approved',
+    'REJECTED': 'rejected',
+    'FAILED': 'rejected',
+    'DENIED': 'rejected',
+    'INVALID_DOCUMENT': 'requires_more_info',
+    'DOCUMENT_ERROR': 'requires_more_info',
+    'UNSUPPORTED_DOCUMENT': 'requires_more_info',
+    'ACTION_REQUIRED': 'requires_more_info',
+}
+PROVIDER_PENDING_STATUSES = frozenset({'PENDING', 'PENDING_REVIEW', 'IN_REVIEW', 'PROCESSING', 'SUBMITTED'})
+
+
+class KycVerificationQueueService:
+    """
+    Service running automated KYC verification out of the portal request (REQ-IOKYC-005).
+    Submitted documents are queued on influence_gen.kyc_data; a cron claims due
+    documents with FOR UPDATE SKIP LOCKED and sends them to the provider in batches,
+    within a per-minute submission budget. A second cron polls the provider for
+    documents awaiting a result, many transactions per call, and applies the
+    outcomes with one write per resulting status.
+
+    Queue bookkeeping (provider status, next check, errors) is written with set-based
+    SQL; verification decisions go through the ORM so they stay audited and tracked.
+    Each submitted batch is committed as soon as its provider transaction IDs are
+    stored, so a later failure never resubmits documents the provider already has.
+    Documents that cannot be verified automatically keep their 'submitted' status,
+    i.e. stay in the manual review queue.
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+        self.KycData = env['influence_gen.kyc_data'].sudo()
+
+    def _get_settings(self):
+        settings = self.env['influence_gen.platform_setting'].sudo().get_settings('kyc.provider.')
+
+        def int_setting(name, default):
+            return to_positive_int(settings.get(f'kyc.provider.{name}', default), default)
+        return {
+            'batch_size': int_setting('batch_size', DEFAULT_BATCH_SIZE),
+            'rate_limit': int_setting('rate_limit_per_minute', DEFAULT_RATE_LIMIT_PER_MINUTE),
+            'poll_interval': int_setting('poll_interval_minutes', DEFAULT_POLL_INTERVAL_MINUTES) * 60,
+            'max_attempts': int_setting('max_attempts', DEFAULT_MAX_ATTEMPTS),
+        }
+
+    def enqueue(self, kyc_records):
+        """
+        Queues documents awaiting review for automated verification and wakes the
+        submission cron up once the transaction commits.
+        :param kyc_records: influence_gen.kyc_data recordset
+        :return: the queued records
+        """
+        to_queue = kyc_records.sudo().filtered(
+            lambda k: k.verification_status in ('submitted', 'in_review')
+            and k.document_front_attachment_id
+            and k.provider_queue_state not in ('queued', 'submitted')
+        )
+        if not to_queue:
+            return to_queue
+        to_queue.with_context(skip_audit_log=True).write({
+            'verification_method': 'third_party_api',
+            'provider_queue_state': 'queued',
+            'provider_attempt_count': 0,
+            'provider_next_attempt_at': fields.Datetime.now(),
+            'provider_last_error': False,
+        })
+        trigger_cron(self.env, 'influence_gen_services.ir_cron_kyc_provider_submit')
+        _logger.info(f"Queued {len(to_queue)} KYC document(s) for provider verification.")
+        return to_queue
+
+    def _claim_due(self, queue_state, limit):
+        self.KycData.flush_model()
+        self.env.cr.execute("""
+            SELECT id FROM influence_gen_kyc_data
+             WHERE provider_queue_state = %s AND provider_next_attempt_at <= now() at time zone 'UTC'
+          ORDER BY provider_next_attempt_at, id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [queue_state, limit])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _relock(self, queue_state, kyc_ids):
+        """
+        Claims the remaining documents again after a commit released their locks; documents
+        claimed or moved on by another run in the meantime are left to it.
+        """
+        return relock(self.env.cr, 'influence_gen_kyc_data', kyc_ids, 'provider_queue_state = %s', [queue_state],
+                      order='provider_next_attempt_at, id')
+
+    def _get_submission_budget(self, rate_limit):
+        """Submissions still allowed in the current one-minute window, across runs and workers."""
+        self.env.cr.execute("""
+            SELECT count(*) FROM influence_gen_kyc_data
+             WHERE provider_submitted_at >= now() at time zone 'UTC' - interval '1 minute'
+        """)
+        return max(rate_limit - self.env.cr.fetchone()[0], 0)
+
+    def submit_queued(self, limit=DEFAULT_CLAIM_LIMIT):
+        """
+        Sends due queued documents to the provider in batches.
+        :param int limit: maximum documents claimed per run (further capped by the rate limit)
+        :return: dict with the number of documents submitted, decided, rescheduled and routed to manual review
+        """
+        stats = defaultdict(int)
+        settings = self._get_settings()
+        budget = self._get_submission_budget(settings['rate_limit'])
+        if not budget:
+            _logger.info("KYC provider rate limit reached; queued documents wait for the next run.")
+            return dict(stats)
+        remaining = self._claim_due('queued', min(limit, budget))
+        client = self.env['influence_gen.kyc.service.client']
+        while remaining:
+            batch_ids, remaining = remaining[:settings['batch_size']], remaining[settings['batch_size']:]
+            batch = self.KycData.browse(batch_ids)
+            try:
+                responses = client.submit_identity_documents_batch([self._build_request(kyc) for kyc in batch])
+            except KYCServiceUnavailableError as e:
+                # Circuit open: the whole queue waits, without spending attempts; reviewers can still decide manually.
+                self._postpone(batch_ids + remaining, e, stats)
+                commit_unless_testing(self.env)
+                break
+            except KYCServiceError as e:
+                self._reschedule(batch.ids, str(e), settings, stats)
+            else:
+                self._update_provider_columns(
+                    [(kyc.id, response.transaction_id, response.status, response.reason) for kyc, response in zip(batch, responses)],
+                    {'provider_queue_state': 'submitted', 'provider_attempt_count': 0, 'provider_last_error': None},
+                    submitted=True, next_check_in=settings['poll_interval'],
+                )
+                stats['submitted'] += len(batch)
+                self._apply_results(list(zip(batch, responses)), settings, stats)
+            # Each batch is committed with the provider's transaction IDs, so a crash only replays the batch in flight.
+            commit_unless_testing(self.env)
+            remaining = self._relock('queued', remaining)
+        return dict(stats)
+
+    def reconcile_pending(self, limit=DEFAULT_CLAIM_LIMIT):
+        """
+        Polls the provider for documents awaiting a result, one call per batch of transactions.
+        :param int limit: maximum documents claimed per run
+        :return: dict with the number of documents decided, still pending, rescheduled and routed to manual review
+        """
+        stats = defaultdict(int)
+        settings = self._get_settings()
+        kyc_ids = self._claim_due('submitted', limit)
+        client = self.env['influence_gen.kyc.service.client']
+        for position, batch_ids in enumerate(split_every(settings['batch_size'], kyc_ids)):
+            batch = self.KycData.browse(batch_ids)
+            without_transaction = batch.filtered(lambda k: not k.external_verification_id)
+            if without_transaction:
+                self._route_to_manual(without_transaction.ids, _("No provider transaction to reconcile."), stats)
+                batch -= without_transaction
+            if not batch:
+                continue
+            try:
+                statuses = client.get_verification_statuses(batch.mapped('external_verification_id'))
+            except KYCServiceUnavailableError as e:
+                self._postpone(kyc_ids[position * settings['batch_size']:], e, stats)
+                break
+            except KYCServiceError as e:
+                self._reschedule(batch.ids, str(e), settings, stats)
+                continue
+            unknown = batch.filtered(lambda k: k.external_verification_id not in statuses)
+            if unknown:
+                self._reschedule(unknown.ids, _("Transaction unknown to the provider."), settings, stats)
+            self.apply_status_updates({kyc.external_verification_id: statuses[kyc.external_verification_id] for kyc in batch - unknown}, stats)
+            stats['reconciled'] += len(batch - unknown)
+        return dict(stats)
+
+    def apply_status_updates(self, responses_by_transaction, stats=None):
+        """
+        Applies provider results to the documents of the given transactions, e.g. from the
+        reconciliation poll or a provider webhook.
+        :param dict responses_by_transaction: {external_verification_id: KYCVerificationResponse}
+        :param stats: optional counters to update
+        :return: dict of counters
+        """
+        stats = stats if stats is not None else defaultdict(int)
+        if not responses_by_transaction:
+            return dict(stats)
+        settings = self._get_settings()
+        records = self.KycData.search([
+            ('external_verification_id', 'in', list(responses_by_transaction)),
+            ('provider_queue_state', '=', 'submitted'),
+        ])
+        pairs = [(kyc, responses_by_transaction[kyc.external_verification_id]) for kyc in records]
+        self._update_provider_columns(
+            [(kyc.id, None, response.status, response.reason) for kyc, response in pairs], {},
+        )
+        self._apply_results(pairs, settings, stats)
+        return dict(stats)
+
+    def _build_request(self, kyc):
+        profile = kyc.influencer_profile_id
+        first_name, _sep, last_name = (profile.full_name or '').partition(' ')
+        return KYCVerificationRequest(
+            document_image_front_b64=kyc.document_front_attachment_id.datas.decode(),
+            document_image_back_b64=kyc.document_back_attachment_id.datas.decode() if kyc.document_back_attachment_id else None,
+            document_type=PROVIDER_DOCUMENT_TYPES.get(kyc.document_type, 'OTHER'),
+            influencer_id=profile.id,
+            first_name=first_name or None,
+            last_name=last_name or None,
+            metadata={'kyc_data_id': kyc.id},
+        )
+
+    def _apply_results(self, pairs, settings, stats):
+        """
+        Applies provider statuses: documents still pending are polled again later, decided documents
+        are written with one write per decision, and their influencer profiles are updated once.
+        :param list pairs: [(kyc_data record, KYCVerificationResponse)]
+        """
+        decided, pending, manual, overridden = defaultdict(list), [], [], []
+        for kyc, response in pairs:
+            if kyc.verification_status not in ('submitted', 'in_review'):
+                overridden.append(kyc.id) # A reviewer decided while the provider was working
+            elif response.status in PROVIDER_DECISIONS:
+                decided[PROVIDER_DECISIONS[response.status]].append(kyc.id)
+            elif response.status in PROVIDER_PENDING_STATUSES:
+                pending.append(kyc.id)
+            else:
+                manual.append(kyc.id)
+
+        if pending:
+            self._update_provider_columns([(kyc_id, None, None, None) for kyc_id in pending], {},
+                                          next_check_in=settings['poll_interval'])
+            stats['pending'] += len(pending)
+        if manual:
+            self._route_to_manual(manual, _("Unrecognized provider status."), stats)
+        done_ids = overridden + [kyc_id for kyc_ids in decided.values() for kyc_id in kyc_ids]
+        if done_ids:
+            self._update_provider_columns([(kyc_id, None, None, None) for kyc_id in done_ids], {'provider_queue_state': 'done'})
+
+        now = fields.Datetime.now()
+        template = self.env.ref('influence_gen_services.email_template_kyc_status_update', raise_if_not_found=False)
+        for decision, kyc_ids in decided.items():
+            records = self.KycData.browse(kyc_ids)
+            records.write({'verification_status': decision, 'reviewed_at': now, 'reviewer_user_id': False})
+            stats[decision] += len(records)
+            if template:
+                for kyc in records:
+                    # Queued, not sent inline: the mail queue delivers them (REQ-16-002).
+                    template.with_context(decision=decision, notes=kyc.provider_reason).send_mail(kyc.id)
+        if decided:
+            self._update_profiles(self.KycData.browse(done_ids).influencer_profile_id)
+
+    def _update_profiles(self, profiles):
+        """Recomputes the KYC status of the profiles from all their documents, one write per status."""
+        profiles_by_status = defaultdict(lambda: profiles.browse())
+        for profile in profiles:
+            statuses = set(profile.kyc_data_ids.mapped('verification_status'))
+            if 'rejected' in statuses:
+                new_status = 'rejected'
+            elif 'requires_more_info' in statuses:
+                new_status = 'requires_more_info'
+            elif statuses == {'approved'}:
+                new_status = 'approved'
+            else:
+                new_status = 'in_review'
+            if profile.kyc_status != new_status:
+                profiles_by_status[new_status] |= profile
+        for new_status, status_profiles in profiles_by_status.items():
+            status_profiles.write({'kyc_status': new_status})
+        onboarding = OnboardingService(self.env)
+        for profile in profiles_by_status.get('approved', []):
+            onboarding.check_and_activate_influencer_account(profile.id)
+
+    def _update_provider_columns(self, rows, values, submitted=False, next_check_in=None):
+        """
+        Writes queue bookkeeping of many documents in one UPDATE.
+        :param list rows: (kyc_id, external_verification_id, provider_status, provider_reason); None keeps the current value
+        :param dict values: columns set to the same value on every row
+        :param bool submitted: stamps provider_submitted_at (counted by the rate limit)
+        :param int next_check_in: seconds until the next poll
+        """
+        if not rows:
+            return
+        assignments, params = [], []
+        for column, value in values.items():
+            assignments.append(f"{column} = %s")
+            params.append(value)
+        if submitted:
+            assignments.append("provider_submitted_at = now() at time zone 'UTC'")
+        if next_check_in is not None:
+            assignments.append("provider_next_attempt_at = now() at time zone 'UTC' + %s * interval '1 second'")
+            params.append(next_check_in)
+        row_placeholder = "(%s::int, %s::varchar, %s::varchar, %s::text)"
+        self.KycData.flush_model()
+        self.env.cr.execute("""
+            UPDATE influence_gen_kyc_data k
+               SET external_verification_id = COALESCE(v.external_id, k.external_verification_id),
+                   provider_status = COALESCE(v.status, k.provider_status),
+                   provider_reason = COALESCE(v.reason, k.provider_reason),
+                   {assignments}
+                   write_uid = %s, write_date = now() at time zone 'UTC'
+              FROM (VALUES {values}) AS v(id, external_id, status, reason)
+             WHERE k.id = v.id
+        """.format(
+            assignments="".join(f"{assignment},\n                   " for assignment in assignments),
+            values=", ".join([row_placeholder] * len(rows)),
+        ), params + [self.env.uid] + [value for row in rows for value in row])
+        self.KycData.invalidate_model()
+
+    def _reschedule(self, kyc_ids, error, settings, stats):
+        """Backs failed documents off exponentially; after max_attempts they are left to manual review."""
+        self.KycData.flush_model()
+        self.env.cr.execute("""
+            UPDATE influence_gen_kyc_data
+               SET provider_attempt_count = provider_attempt_count + 1,
+                   provider_queue_state = CASE WHEN provider_attempt_count + 1 >= %(max)s THEN 'manual' ELSE provider_queue_state END,
+                   provider_next_attempt_at = now() at time zone 'UTC'
+                       + LEAST(%(base)s * power(2, provider_attempt_count), %(cap)s) * interval '1 second',
+                   provider_last_error = %(error)s,
+                   write_uid = %(uid)s, write_date = now() at time zone 'UTC'
+             WHERE id IN %(ids)s
+         RETURNING provider_queue_state
+        """, {'max': settings['max_attempts'], 'base': BACKOFF_BASE_SECONDS, 'cap': BACKOFF_MAX_SECONDS,
+              'error': error, 'uid': self.env.uid, 'ids': tuple(kyc_ids)})
+        for (queue_state,) in self.env.cr.fetchall():
+            stats['manual' if queue_state == 'manual' else 'rescheduled'] += 1
+        self.KycData.invalidate_model()
+        _logger.warning(f"KYC provider call failed for {len(kyc_ids)} document(s): {error}")
+
+    def _postpone(self, kyc_ids, error, stats):
+        """Moves due documents past the provider's unavailability window without spending attempts."""
+        if not kyc_ids:
+            return
+        delay = getattr(error.original_exception, 'retry_after', None) or BACKOFF_BASE_SECONDS
+        self._update_provider_columns([(kyc_id, None, None, None) for kyc_id in kyc_ids],
+                                      {'provider_last_error': str(error)}, next_check_in=int(delay))
+        stats['postponed'] += len(kyc_ids)
+        _logger.warning(f"KYC provider unavailable; postponed {len(kyc_ids)} document(s) by {int(delay)}s.")
+
+    def _route_to_manual(self, kyc_ids, reason, stats):
+        self._update_provider_columns([(kyc_id, None, None, None) for kyc_id in kyc_ids],
+                                      {'provider_queue_state': 'manual', 'provider_last_error': reason})
+        stats['manual'] += len(kyc_ids)
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from collections import defaultdict
+
+_logger = logging.getLogger(__name__)
+
+HOLD_MEMBER_TABLE = 'influence_gen_legal_hold_member'
+HOLD_FLAG_FIELD = 'legal_hold_status'
+
+# Relation graph walked from a hold's targets: (parent model, child model, child many2one to the parent).
+# Edges are listed in topological order, so every parent is complete before its children are added.
+HOLD_PROPAGATION_EDGES = (
+    ('influence_gen.influencer_profile', 'influence_gen.kyc_data', 'influencer_profile_id'),
+    ('influence_gen.influencer_profile', 'influence_gen.bank_account', 'influencer_profile_id'),
+    ('influence_gen.influencer_profile', 'influence_gen.terms_consent', 'influencer_profile_id'),
+    ('influence_gen.influencer_profile', 'influence_gen.social_media_profile', 'influencer_profile_id'),
+    ('influence_gen.influencer_profile', 'influence_gen.campaign_application', 'influencer_profile_id'),
+    ('influence_gen.campaign', 'influence_gen.campaign_application', 'campaign_id'),
+    ('influence_gen.influencer_profile', 'influence_gen.ai_image_generation_request', 'influencer_profile_id'),
+    ('influence_gen.campaign', 'influence_gen.ai_image_generation_request', 'campaign_id'),
+    ('influence_gen.ai_image_generation_request', 'influence_gen.generated_image', 'request_id'),
+    ('influence_gen.influencer_profile', 'influence_gen.content_submission', 'influencer_profile_id'),
+    ('influence_gen.campaign', 'influence_gen.content_submission', 'campaign_id'),
+    ('influence_gen.campaign_application', 'influence_gen.content_submission', 'campaign_application_id'),
+    ('influence_gen.content_submission', 'influence_gen.content_feedback_log', 'content_submission_id'),
+    ('influence_gen.influencer_profile', 'influence_gen.payment_record', 'influencer_profile_id'),
+    ('influence_gen.campaign', 'influence_gen.payment_record', 'campaign_id'),
+    ('influence_gen.content_submission', 'influence_gen.payment_record', 'content_submission_id'),
+)
+
+
+class LegalHoldPropagationService:
+    """
+    Service propagating legal holds (REQ-DRH-008, REQ-DRH-009) from their targets
+    to all the related influencer and campaign data: KYC, bank accounts,
+    applications, submissions, generated images, payments, ...
+
+    Membership is stored in a compact technical table, one row per
+    (model, record, hold), filled with one INSERT ... SELECT per relation of
+    HOLD_PROPAGATION_EDGES. Retention and erasure can anti-join it on
+    (model, res_id). The legal_hold_status flags of the models that have one are
+    then set or cleared with one UPDATE per model, and one audit entry per model
+    records the change with the hold references and the IDs of the records.
+
+    A hold is identified by a reference string: 'influence_gen.legal_hold,<id>'
+    for the holds managed in the admin module, '<model>,<id>' for the holds
+    placed directly on a record.
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    def place(self, hold_ref, targets, reason=None, user_id=None):
+        """
+        Places a hold on the target records and everything related to them.
+        :param str hold_ref: reference of the hold
+        :param list targets: (model name, domain) pairs selecting the held records
+        :param str reason: reason recorded in the audit log
+        :param int user_id: user placing the hold, for the audit log
+        :return: dict {model name: number of records newly covered by the hold}
+        """
+        added = defaultdict(set)
+        now = self.env.cr.now()
+        for model_name, domain in targets:
+            Model = self.env[model_name].sudo().with_context(active_test=False)
+            subselect = Model._search(domain or []).subselect()
+            self.env.cr.execute(f"""
+                INSERT INTO {HOLD_MEMBER_TABLE} (model, res_id, hold_ref, placed_at)
+                SELECT %s, target.id, %s, %s FROM ({subselect.code}) AS target(id)
+                ON CONFLICT DO NOTHING
+                RETURNING res_id
+            """, [model_name, hold_ref, now] + list(subselect.params))
+            added[model_name].update(row[0] for row in self.env.cr.fetchall())
+        for model_name, res_ids in self._propagate([hold_ref], now).items():
+            added[model_name].update(res_ids)
+        return self._placed([hold_ref], added, reason, user_id)
+
+    def place_per_record(self, model_name, domain, reason=None, user_id=None):
+        """
+        Places one hold per matching record, referenced '<model>,<id>', so each record can be
+        released on its own with lift_per_record.
+        :return: dict {model name: number of records newly covered}
+        """
+        Model = self.env[model_name].sudo().with_context(active_test=False)
+        subselect = Model._search(domain or []).subselect()
+        now = self.env.cr.now()
+        self.env.cr.execute(f"""
+            INSERT INTO {HOLD_MEMBER_TABLE} (model, res_id, hold_ref, placed_at)
+            SELECT %s, target.id, %s || target.id, %s FROM ({subselect.code}) AS target(id)
+            ON CONFLICT DO NOTHING
+            RETURNING hold_ref, res_id
+        """, [model_name, f"{model_name},", now] + list(subselect.params))
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return {}
+        hold_refs = [hold_ref for hold_ref, _res_id in rows]
+        added = defaultdict(set, {model_name: {res_id for _hold_ref, res_id in rows}})
+        for child_model, res_ids in self._propagate(hold_refs, now).items():
+            added[child_model].update(res_ids)
+        return self._placed(hold_refs, added, reason, user_id)
+
+    def _placed(self, hold_refs, added, reason, user_id):
+        """Flags, index and audit of newly placed holds. :return: dict {model name: number of records}"""
+        self._set_flags(added, hold_refs)
+        self._invalidate_index(added)
+        self._log(hold_refs, added, 'placed', reason, user_id)
+        counts = {model_name: len(res_ids) for model_name, res_ids in added.items()}
+        _logger.info(f"{len(hold_refs)} legal hold(s) placed, from {hold_refs[0]}: {counts}")
+        return counts
+
+    def lift(self, hold_refs, reason=None, user_id=None):
+        """
+        Lifts holds. Records stay flagged while another hold still covers them.
+        :param list hold_refs: references of the holds
+        :return: dict {model name: number of records released by these holds}
+        """
+        self.env.cr.execute(f"""
+            WITH lifted AS (
+                DELETE FROM {HOLD_MEMBER_TABLE} WHERE hold_ref = ANY(%s) RETURNING model, res_id
+            )
+            SELECT model, array_agg(DISTINCT res_id) FROM lifted GROUP BY model
+        """, [list(hold_refs)])
+        released = dict(self.env.cr.fetchall())
+        self._clear_flags(released)
+        self._invalidate_index(released)
+        counts = {model_name: len(ids) for model_name, ids in released.items()}
+        self._log(list(hold_refs), released, 'lifted', reason, user_id)
+        _logger.info(f"Legal hold(s) {hold_refs} lifted: {counts}")
+        return counts
+
+    def lift_per_record(self, model_name, domain, reason=None, user_id=None):
+        """Lifts the holds placed with place_per_record on the matching records."""
+        Model = self.env[model_name].sudo().with_context(active_test=False)
+        hold_refs = [f"{model_name},{record_id}" for record_id in Model.search(domain or []).ids]
+        return self.lift(hold_refs, reason=reason, user_id=user_id) if hold_refs else {}
+
+    def refresh(self):
+        """
+        Re-walks the relations of every hold, so records created since a hold was placed
+        (e.g. a new payment of a held influencer) are covered too.
+        :return: dict {model name: number of records added}
+        """
+        added = self._propagate(None, self.env.cr.now())
+        self._set_flags(added, None)
+        self._invalidate_index(added)
+        counts = {model_name: len(res_ids) for model_name, res_ids in added.items()}
+        if counts:
+            _logger.info(f"Legal hold membership refreshed: {counts}")
+        return counts
+
+    def get_member_counts(self, hold_refs):
+        """:return: dict {hold_ref: number of records it covers}"""
+        self.env.cr.execute(
+            f"SELECT hold_ref, count(*) FROM {HOLD_MEMBER_TABLE} WHERE hold_ref = ANY(%s) GROUP BY hold_ref",
+            [list(hold_refs)])
+        return dict(self.env.cr.fetchall())
+
+    def _propagate(self, hold_refs, now):
+        """
+        Adds the children of the held records, one INSERT ... SELECT per relation.
+        :param list hold_refs: holds to propagate; all of them when None
+        :return: dict {model name: set of the IDs of the records added}
+        """
+        added = defaultdict(set)
+        for parent_model, child_model, link_field in HOLD_PROPAGATION_EDGES:
+            if child_model not in self.env or link_field not in self.env[child_model]._fields:
+                continue
+            Child = self.env[child_model]
+            Child.flush_model([link_field])
+            where, params = "", [child_model, now, parent_model]
+            if hold_refs is not None:
+                where, params = "WHERE m.hold_ref = ANY(%s)", params + [list(hold_refs)]
+            self.env.cr.execute(f"""
+                INSERT INTO {HOLD_MEMBER_TABLE} (model, res_id, hold_ref, placed_at)
+                SELECT %s, c.id, m.hold_ref, %s
+                  FROM "{Child._table}" c
+                  JOIN {HOLD_MEMBER_TABLE} m ON m.model = %s AND m.res_id = c."{link_field}"
+                  {where}
+                ON CONFLICT DO NOTHING
+                RETURNING res_id
+            """, params)
+            res_ids = {row[0] for row in self.env.cr.fetchall()}
+            if res_ids:
+                added[child_model].update(res_ids)
+        return dict(added)
+
+    def _set_flags(self, model_names, hold_refs):
+        """Sets legal_hold_status on the members of the holds (all holds when None), one UPDATE per model."""
+        for model_name in model_names:
+            Model = self.env[model_name]
+            if HOLD_FLAG_FIELD not in Model._fields or not Model._fields[HOLD_FLAG_FIELD].store:
+                continue
+            ref_filter, params = "", [model_name]
+            if hold_refs is not None:
+                ref_filter, params = "AND m.hold_ref = ANY(%s)", params + [list(hold_refs)]
+            self.env.cr.execute(f"""
+                UPDATE "{Model._table}" t SET {HOLD_FLAG_FIELD} = true
+                 WHERE t.{HOLD_FLAG_FIELD} IS NOT TRUE
+                   AND EXISTS (SELECT 1 FROM {HOLD_MEMBER_TABLE} m WHERE m.model = %s AND m.res_id = t.id {ref_filter})
+            """, params)
+            Model.invalidate_model([HOLD_FLAG_FIELD])
+
+    def _clear_flags(self, released):
+        """Clears legal_hold_status on released records that no other hold covers, one UPDATE per model."""
+        for model_name, record_ids in released.items():
+            if model_name not in self.env:
+                continue
+            Model = self.env[model_name]
+            if HOLD_FLAG_FIELD not in Model._fields or not Model._fields[HOLD_FLAG_FIELD].store:
+                continue
+            self.env.cr.execute(f"""
+                UPDATE "{Model._table}" t SET {HOLD_FLAG_FIELD} = false
+                 WHERE t.id = ANY(%s) AND t.{HOLD_FLAG_FIELD}
+                   AND NOT EXISTS (SELECT 1 FROM {HOLD_MEMBER_TABLE} m WHERE m.model = %s AND m.res_id = t.id)
+            """, [record_ids, model_name])
+            Model.invalidate_model([HOLD_FLAG_FIELD])
+
+    def _invalidate_index(self, changes):
+        """Renews the hold generation (see influence_gen.legal_hold_index) of the models whose membership changed."""
+        changed = [model_name for model_name, res_ids in changes.items() if res_ids]
+        if changed:
+            self.env['influence_gen.legal_hold_index'].invalidate(changed)
+
+    def _log(self, hold_refs, res_ids_by_model, event, reason, user_id):
+        """
+        One audit entry per model, instead of one per record, listing the holds and the IDs of the records.
+        :param list hold_refs: references of the holds placed or lifted
+        :param dict res_ids_by_model: {model name: IDs of the records placed under or released from the holds}
+        """
+        AuditLog = self.env['influence_gen.audit_log'].sudo()
+        action = 'legal_hold_place' if event == 'placed' else 'legal_hold_lift'
+        for model_name, res_ids in res_ids_by_model.items():
+            if not res_ids:
+                continue
+            res_ids = sorted(res_ids)
+            AuditLog.create({
+                'event_type': f'{model_name}.legal_hold.{event}',
+                'user_id': user_id or self.env.uid,
+                'target_model': model_name,
+                'target_res_id': res_ids[0] if len(res_ids) == 1 else False,
+                'action': action,
+                'details_json': json.dumps({
+                    'hold_refs': sorted(hold_refs),
+                    'reason': reason,
+                    'record_count': len(res_ids),
+                    'res_ids': res_ids,
+                }),
+                'outcome': 'success',
+            })
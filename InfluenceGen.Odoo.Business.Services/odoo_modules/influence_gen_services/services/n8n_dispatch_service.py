@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+
+import requests
+from odoo import _, fields
+from odoo.tools import split_every
+
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import commit_unless_testing, relock, to_positive_int
+
+_logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT_SECONDS = 30
+DEFAULT_CLAIM_LIMIT = 200
+DEFAULT_BATCH_SIZE = 1
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+# N8N webhooks reachable through the outbox. URL and token are system parameters
+# (secrets); connection policy is read from 'influence_gen.http.<http_policy_key>.*'
+# (see IntegrationSettings.get_http_policy); tuning lives in platform settings under settings_prefix:
+#   batch_size: outbox rows per webhook call; > 1 only for workflows accepting {"requests": [...]}
+#   max_concurrency: webhook calls in flight at once
+N8N_ENDPOINTS = {
+    'ai_image_generation': {
+        'url_param': 'influence_gen.n8n_ai_webhook_url',
+        'token_param': 'influence_gen.n8n_ai_auth_token',
+        'http_policy_key': 'n8n_ai',
+        'settings_prefix': 'n8n.ai_image_generation.',
+    },
+}
+
+
+def _post(http_policy, url, headers, body):
+    """
+    Sends one webhook call through the pooled session of the host.
+    Runs in worker threads: must not touch the Odoo environment.
+    :return: tuple (ok, retryable, response data or None, error message or None)
+    """
+    try:
+        response = HttpSessionPool.request('POST', url, policy=http_policy, json=body, headers=headers)
+    except requests.exceptions.RequestException as e:
+        return False, True, None, f"{type(e).__name__}: {e}"
+    if response.ok:
+        try:
+            data = response.json() if response.content else None
+        except ValueError:
+            data = None
+        return True, False, data, None
+    retryable = response.status_code in (408, 429) or response.status_code >= 500
+    return False, retryable, None, f"HTTP {response.status_code}: {response.text[:500]}"
+
+
+class N8nDispatchService:
+    """
+    Service draining the N8N dispatch outbox (influence_gen.n8n_dispatch_outbox).
+    Due rows are claimed with FOR UPDATE SKIP LOCKED, grouped per endpoint,
+    coalesced into batched calls where the workflow supports it and sent over
+    pooled keep-alive connections with a per-endpoint concurrency limit. Failed
+    calls are retried with exponential backoff; a transient failure also pauses
+    the rest of that endpoint's queue until the next run. The outcome of each wave
+    of calls is committed before the next wave is sent, so a crash never re-sends
+    the calls already delivered.
+    REQ-AIGS-001, REQ-IL-008
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    def dispatch_pending(self, limit=DEFAULT_CLAIM_LIMIT):
+        """
+        Sends due outbox rows.
+        :param int limit: maximum rows claimed per run
+        :return: dict with the number of rows sent, rescheduled and failed
+        """
+        Outbox = self.env['influence_gen.n8n_dispatch_outbox'].sudo()
+        Outbox.flush_model()
+        self.env.cr.execute("""
+            SELECT id FROM influence_gen_n8n_dispatch_outbox
+             WHERE state = 'pending' AND next_attempt_at <= now() at time zone 'UTC'
+          ORDER BY id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [limit])
+        entries = Outbox.browse([row[0] for row in self.env.cr.fetchall()])
+        stats = {'sent': 0, 'rescheduled': 0, 'failed': 0}
+        for endpoint, endpoint_entries in groupby(entries.sorted(lambda e: (e.endpoint, e.id)), key=lambda e: e.endpoint):
+            # The commits of the previous endpoints released the claim on these rows.
+            endpoint_entries = Outbox.browse(self._relock([entry.id for entry in endpoint_entries]))
+            if endpoint_entries:
+                self._dispatch_endpoint(endpoint, endpoint_entries, stats)
+        return stats
+
+    def _get_endpoint_settings(self, config):
+        settings = self.env['influence_gen.platform_setting'].sudo().get_settings(config['settings_prefix'])
+        prefix = config['settings_prefix']
+        return (
+            to_positive_int(settings.get(prefix + 'batch_size', DEFAULT_BATCH_SIZE), DEFAULT_BATCH_SIZE),
+            to_positive_int(settings.get(prefix + 'max_concurrency', DEFAULT_MAX_CONCURRENCY), DEFAULT_MAX_CONCURRENCY),
+        )
+
+    def _dispatch_endpoint(self, endpoint, entries, stats):
+        config = N8N_ENDPOINTS.get(endpoint)
+        if not config:
+            self._mark_failed(entries, _("Unknown N8N endpoint '%s'.") % endpoint, stats)
+            return
+        ICP = self.env['ir.config_parameter'].sudo()
+        url, token = ICP.get_param(config['url_param']), ICP.get_param(config['token_param'])
+        if not url or not token:
+            _logger.error(f"N8N endpoint '{endpoint}' is not configured ({config['url_param']}, {config['token_param']}).")
+            self._reschedule(entries, _("N8N endpoint '%s' is not configured.") % endpoint, stats)
+            return
+
+        batch_size, max_concurrency = self._get_endpoint_settings(config)
+        headers = {'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'}
+        http_policy = self.env['influence_gen.integration.settings'].get_http_policy(
+            config['http_policy_key'], timeout=REQUEST_TIMEOUT_SECONDS, pool_maxsize=max_concurrency)
+        wave_size = batch_size * max_concurrency
+        pending_ids = entries.ids
+
+        # Waves of at most max_concurrency calls; HTTP runs in worker threads, the ORM stays here.
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, -(-len(pending_ids) // batch_size))) as executor:
+            while pending_ids:
+                wave_ids, pending_ids = pending_ids[:wave_size], pending_ids[wave_size:]
+                wave = [entries.browse(ids) for ids in split_every(batch_size, wave_ids)]
+                bodies = [self._build_body(batch, batch_size) for batch in wave]
+                results = list(executor.map(lambda body: _post(http_policy, url, headers, body), bodies))
+                endpoint_down = False
+                for batch, (ok, retryable, data, error) in zip(wave, results):
+                    if ok:
+                        self._mark_sent(batch, data, stats)
+                    elif retryable:
+                        endpoint_down = True
+                        self._reschedule(batch, error, stats)
+                    else:
+                        self._mark_failed(batch, error, stats)
+                if endpoint_down and pending_ids:
+                    # Back off the whole endpoint: remaining rows wait for the next run.
+                    _logger.warning(f"N8N endpoint '{endpoint}' is failing; postponing {len(pending_ids)} queued call(s).")
+                    self._reschedule(entries.browse(pending_ids), _("Postponed: endpoint unavailable."), stats, count_attempt=False)
+                    pending_ids = []
+                # Each wave is committed with its outcome, so a crash only replays the wave in flight.
+                commit_unless_testing(self.env)
+                pending_ids = self._relock(pending_ids)
+
+    def _relock(self, entry_ids):
+        """
+        Claims the remaining rows again after a commit released their locks; rows claimed
+        or sent by another run in the meantime are left to it.
+        """
+        self.env['influence_gen.n8n_dispatch_outbox'].flush_model(['state'])
+        return relock(self.env.cr, 'influence_gen_n8n_dispatch_outbox', entry_ids, "state = 'pending'")
+
+    def _build_body(self, batch, batch_size):
+        payloads = [json.loads(entry.payload_json) for entry in batch]
+        return {'requests': payloads} if batch_size > 1 else payloads[0]
+
+    def _mark_sent(self, batch, data, stats):
+        now = fields.Datetime.now()
+        for entry in batch:
+            entry.write({'state': 'sent', 'sent_at': now, 'attempt_count': entry.attempt_count + 1, 'last_error': False})
+        requests_to_update = batch.request_id.filtered(lambda r: r.status == 'queued')
+        for ai_request in requests_to_update:
+            ai_request.write({
+                'status': 'processing_n8n',
+                'n8n_execution_id': self._get_execution_id(data, ai_request, len(batch) > 1) or ai_request.n8n_execution_id,
+            })
+        stats['sent'] += len(batch)
+
+    def _get_execution_id(self, data, ai_request, batched):
+        """Execution ID returned by N8N: {'execution_id': ...}, or {'executions': {request_id: ...}} for batches."""
+        if not isinstance(data, dict):
+            return False
+        if batched:
+            return (data.get('executions') or {}).get(str(ai_request.id)) or False
+        return data.get('execution_id') or data.get('executionId') or False
+
+    def _reschedule(self, entries, error, stats, count_attempt=True):
+        max_attempts = self._get_max_attempts()
+        now = fields.Datetime.now()
+        for entry in entries:
+            attempts = entry.attempt_count + (1 if count_attempt else 0)
+            if attempts >= max_attempts:
+                self._mark_failed(entry, error, stats, attempts=attempts)
+                continue
+            delay = min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+            entry.write({
+                'attempt_count': attempts,
+                'next_attempt_at': now + timedelta(seconds=delay),
+                'last_error': error,
+            })
+            stats['rescheduled'] += 1
+
+    def _mark_failed(self, entries, error, stats, attempts=None):
+        for entry in entries:
+            entry.write({
+                'state': 'failed',
+                'attempt_count': attempts if attempts is not None else entry.attempt_count + 1,
+                'last_error': error,
+            })
+            ai_request = entry.request_id
+            if ai_request and ai_request.status == 'queued':
+                ai_request._settle_quota_reservation(0) # Release the reserved quota (REQ-AIGS-002)
+                ai_request.write({
+                    'status': 'failed',
+                    'error_details': _("Could not submit the request to the AI generation service: %s") % error,
+                })
+            _logger.error(f"N8N outbox entry {entry.id} ({entry.endpoint}) failed: {error}")
+        stats['failed'] += len(entries)
+
+    def _get_max_attempts(self):
+        value = self.env['influence_gen.platform_setting'].sudo().get_setting(
+            'n8n.dispatch.max_attempts', default=DEFAULT_MAX_ATTEMPTS)
+        return to_positive_int(value, DEFAULT_MAX_ATTEMPTS)
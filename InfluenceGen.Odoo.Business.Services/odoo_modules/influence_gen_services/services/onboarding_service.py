@@ -119,6 +119,7 @@ class OnboardingService:
 
         KycData = self.env['influence_gen.kyc_data']
         Attachment = self.env['ir.attachment']
+        kyc_submissions = KycData.browse()
 
         for doc_data in document_data_list:
             if not doc_data.get('document_type') or not doc_data.get('file_name') or not doc_data.get('file_data'):
@@ -148,8 +149,13 @@ class OnboardingService:
                 'verification_status': 'submitted', # or 'pending_review'
                 'verification_method': doc_data.get('verification_method', 'manual_upload'),
             })
+            kyc_submissions |= kyc_submission
             _logger.info(f"Created KYC submission ID {kyc_submission.id} for influencer {influencer_profile.id}")
 
+        # Automated verification runs in the KYC provider queue crons, not in this request (REQ-IOKYC-005).
+        if kyc_submissions and self.env['influence_gen.platform_setting'].sudo().get_setting('kyc.automated_verification_enabled', default=False):
+            kyc_submissions.action_queue_provider_verification()
+
         # Update influencer profile KYC status
         if influencer_profile.kyc_status == 'pending':
             influencer_profile.write({'kyc_status': 'submitted'}) # Or 'in_review' if it goes directly to review
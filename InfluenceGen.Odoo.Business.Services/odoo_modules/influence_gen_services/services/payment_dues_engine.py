@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+from collections import defaultdict
+from odoo import _, fields
+from odoo.tools import float_compare
+
+from .compensation_calculators import get_calculator
+
+_logger = logging.getLogger(__name__)
+
+# Payment record statuses that do not block a new payment for the same submission.
+# 'failed' is kept for records written by older code paths.
+FAILED_PAYMENT_STATUSES = ('failed', 'payment_failed')
+
+DEFAULT_CHUNK_SIZE = 2000
+# Models whose records a chunk loads in the cache: submissions, and the campaigns (compensation
+# terms, names) and influencers (names) read through them.
+CHUNK_CACHED_MODELS = ('influence_gen.content_submission', 'influence_gen.campaign', 'influence_gen.influencer_profile')
+
+
+class PaymentDuesEngine:
+    """
+    Set-based engine computing amounts owed for approved content submissions.
+
+    Eligible submissions are loaded with a single query that anti-joins the
+    existing non-failed payment records. Campaign compensation terms are
+    compiled once per campaign (see Campaign._get_compensation_terms) and
+    amounts are computed by the calculator registered for the campaign's
+    compensation model (see compensation_calculators). Results can be
+    consumed all at once or streamed in chunks for large month-end closes.
+    REQ-IPF-004, REQ-2-013
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the engine with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    def calculate_amounts_owed(self, campaign_id=None, influencer_id=None, content_submission_ids=None):
+        """
+        Returns every amount owed matching the filters as a flat list.
+        :param campaign_id: int, optional ID of a campaign
+        :param influencer_id: int, optional ID of an influencer
+        :param content_submission_ids: list of int, optional restriction to specific submissions
+        :return: list of dicts (see _build_due)
+        """
+        owed_amounts = []
+        for chunk in self.iter_amounts_owed(campaign_id=campaign_id, influencer_id=influencer_id,
+                                            content_submission_ids=content_submission_ids):
+            owed_amounts.extend(chunk)
+        return owed_amounts
+
+    def iter_amounts_owed(self, campaign_id=None, influencer_id=None, content_submission_ids=None,
+                          chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Streams amounts owed as lists of at most `chunk_size` dicts.
+        Submissions are paged by ID (keyset pagination), so each chunk costs one
+        indexed query regardless of how far into the result set it is.
+        :param campaign_id: int, optional ID of a campaign
+        :param influencer_id: int, optional ID of an influencer
+        :param content_submission_ids: list of int, optional restriction to specific submissions
+        :param chunk_size: int, maximum number of submissions examined per chunk
+        :yield: list of dicts (see _build_due), possibly empty when a whole chunk is not payable
+        """
+        self._flush_sources()
+        Campaign = self.env['influence_gen.campaign']
+        terms_cache = {}
+        today = fields.Date.today()
+        last_id = 0
+        while True:
+            rows = self._fetch_eligible_rows(last_id, chunk_size, campaign_id, influencer_id, content_submission_ids)
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            missing_campaign_ids = {row[1] for row in rows if row[1] and row[1] not in terms_cache}
+            for missing_campaign_id in missing_campaign_ids:
+                terms_cache[missing_campaign_id] = Campaign._get_compensation_terms(missing_campaign_id)
+
+            amounts = {
+                submission_id: amount
+                for submission_id, amount in self._compute_chunk_amounts(rows, terms_cache).items()
+                if float_compare(amount, 0.0, precision_digits=2) > 0
+            }
+            payable_submissions = self.env['influence_gen.content_submission'].browse(list(amounts))
+            display_names = dict(payable_submissions.name_get())
+
+            chunk = []
+            for submission_id, sub_campaign_id, sub_influencer_id in rows:
+                amount = amounts.get(submission_id)
+                if amount is None:
+                    continue
+                chunk.append(self._build_due(
+                    submission_id, sub_campaign_id, sub_influencer_id, amount,
+                    terms_cache[sub_campaign_id].currency_id, display_names.get(submission_id), today,
+                ))
+            _logger.debug("Dues engine chunk ending at submission %s: %s owed amounts.", last_id, len(chunk))
+            yield chunk
+
+            # Drop the chunk's records from the cache so very large closes run in bounded memory.
+            # Only these models: the caller's other cached records stay warm.
+            for model_name in CHUNK_CACHED_MODELS:
+                self.env[model_name].invalidate_model()
+            if len(rows) < chunk_size:
+                break
+
+    def _flush_sources(self):
+        """Flushes pending ORM writes so the raw SQL below sees them."""
+        self.env['influence_gen.content_submission'].flush_model(
+            ['review_status', 'campaign_id', 'influencer_profile_id'])
+        self.env['influence_gen.payment_record'].flush_model(['content_submission_id', 'status'])
+
+    def _fetch_eligible_rows(self, after_id, limit, campaign_id=None, influencer_id=None, content_submission_ids=None):
+        """
+        Fetches the next page of approved submissions that have no blocking payment record.
+        :return: list of tuples (submission_id, campaign_id, influencer_profile_id)
+        """
+        where_clauses = ["cs.review_status = 'approved'", "cs.id > %s"]
+        params = [after_id]
+        if campaign_id:
+            where_clauses.append("cs.campaign_id = %s")
+            params.append(campaign_id)
+        if influencer_id:
+            where_clauses.append("cs.influencer_profile_id = %s")
+            params.append(influencer_id)
+        if content_submission_ids is not None:
+            where_clauses.append("cs.id = ANY(%s)")
+            params.append(list(content_submission_ids))
+        params.extend([FAILED_PAYMENT_STATUSES, limit])
+
+        query = """
+            SELECT cs.id, cs.campaign_id, cs.influencer_profile_id
+              FROM influence_gen_content_submission cs
+             WHERE {where}
+               AND NOT EXISTS (
+                    SELECT 1
+                      FROM influence_gen_payment_record pr
+                     WHERE pr.content_submission_id = cs.id
+                       AND pr.status NOT IN %s
+               )
+          ORDER BY cs.id
+             LIMIT %s
+        """.format(where=" AND ".join(where_clauses))
+        self.env.cr.execute(query, params)
+        return self.env.cr.fetchall()
+
+    def _compute_chunk_amounts(self, rows, terms_cache):
+        """
+        Computes amounts for one chunk, calling each campaign's calculator once with
+        all of that campaign's submissions. Performance data is loaded in a single
+        query for every submission whose calculator needs it.
+        :param rows: list of tuples (submission_id, campaign_id, influencer_profile_id)
+        :param terms_cache: dict {campaign_id: CompensationTerms}
+        :return: dict {submission_id: amount}
+        """
+        submissions_by_campaign = defaultdict(list)
+        for submission_id, sub_campaign_id, _sub_influencer_id in rows:
+            if sub_campaign_id:
+                submissions_by_campaign[sub_campaign_id].append(submission_id)
+
+        metric_keys_by_submission = {}
+        for sub_campaign_id, submission_ids in submissions_by_campaign.items():
+            terms = terms_cache[sub_campaign_id]
+            calculator = get_calculator(terms.model_type)
+            if calculator and calculator.needs_performance_data:
+                keys = calculator.metric_keys(dict(terms.params))
+                metric_keys_by_submission.update(dict.fromkeys(submission_ids, keys))
+        metrics_by_submission = self._load_performance_metrics(metric_keys_by_submission)
+
+        amounts = {}
+        for sub_campaign_id, submission_ids in submissions_by_campaign.items():
+            terms = terms_cache[sub_campaign_id]
+            calculator = get_calculator(terms.model_type)
+            if not calculator:
+                # Models without a registered calculator (commission, hybrid, ...) are settled manually.
+                continue
+            amounts.update(calculator.compute(dict(terms.params), submission_ids, metrics_by_submission))
+        return amounts
+
+    def _load_performance_metrics(self, metric_keys_by_submission):
+        """
+        Reads performance_data_json for many submissions in one query and keeps only
+        the metric keys each submission's calculator needs.
+        :param metric_keys_by_submission: dict {submission_id: tuple of metric keys}
+        :return: dict {submission_id: {metric_key: value}}
+        """
+        if not metric_keys_by_submission:
+            return {}
+        self.env['influence_gen.content_submission'].flush_model(['performance_data_json'])
+        self.env.cr.execute("""
+            SELECT id, performance_data_json
+              FROM influence_gen_content_submission
+             WHERE id = ANY(%s)
+               AND performance_data_json IS NOT NULL
+        """, [list(metric_keys_by_submission)])
+        metrics_by_submission = {}
+        for submission_id, raw_json in self.env.cr.fetchall():
+            try:
+                data = json.loads(raw_json)
+            except ValueError:
+                _logger.warning("Invalid performance_data_json on content submission %s, treated as empty.", submission_id)
+                continue
+            if isinstance(data, dict):
+                metrics_by_submission[submission_id] = {
+                    key: data.get(key) for key in metric_keys_by_submission[submission_id]
+                }
+        return metrics_by_submission
+
+    def _build_due(self, submission_id, campaign_id, influencer_id, amount, currency_id, display_name, due_date):
+        """Builds the owed-amount dict returned by calculate_amounts_owed."""
+        return {
+            'influencer_id': influencer_id,
+            'campaign_id': campaign_id,
+            'content_submission_id': submission_id,
+            'amount': amount,
+            'currency_id': currency_id,
+            'reason': _("Payment for approved content: %s") % (display_name or submission_id),
+            'due_date': due_date, # Or based on campaign terms
+        }
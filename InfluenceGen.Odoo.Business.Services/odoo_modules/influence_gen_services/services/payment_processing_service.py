@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 import logging
-from odoo import _, api
+from odoo import _, api, fields
 from odoo.exceptions import UserError, ValidationError
 from odoo.tools import float_compare
 
+from .payment_dues_engine import PaymentDuesEngine
+
 _logger = logging.getLogger(__name__)
 
 class PaymentProcessingService:
@@ -22,7 +24,8 @@ class PaymentProcessingService:
     def calculate_amounts_owed(self, campaign_id=None, influencer_id=None, for_date=None):
         """
         Calculates amounts owed to influencers based on approved content, campaign terms, etc.
-        This is a placeholder for potentially complex logic.
+        Delegates to PaymentDuesEngine, which resolves eligible submissions with one
+        set-based query instead of one payment_record lookup per submission.
         :param campaign_id: int, optional ID of a campaign
         :param influencer_id: int, optional ID of an influencer
         :param for_date: date, optional date to calculate up to
@@ -30,70 +33,23 @@ class PaymentProcessingService:
         REQ-IPF-004, REQ-2-013
         """
         _logger.info(f"Calculating amounts owed. Campaign: {campaign_id}, Influencer: {influencer_id}, Date: {for_date}")
-        # This method would typically:
-        # 1. Find all approved content submissions not yet paid or partially paid.
-        # 2. For each submission, determine the compensation based on campaign.compensation_model_type
-        #    and campaign.compensation_details.
-        # 3. Aggregate amounts per influencer.
-        # This is highly dependent on the specific compensation models implemented.
-        # For simplicity, this example does not implement the full calculation logic.
-        # It's assumed that `create_payment_records_for_approved_content` is the primary way
-        # payment records are generated based on specific content.
-        
-        # Example: Find approved submissions without a 'paid' payment record.
-        domain = [('review_status', '=', 'approved')]
-        if campaign_id:
-            domain.append(('campaign_id', '=', campaign_id))
-        if influencer_id:
-            domain.append(('influencer_profile_id', '=', influencer_id))
-        
-        approved_submissions = self.env['influence_gen.content_submission'].search(domain)
-        
-        owed_amounts = []
-        for sub in approved_submissions:
-            # Check if a payment record already exists and is not 'failed'
-            existing_payment = self.env['influence_gen.payment_record'].search([
-                ('content_submission_id', '=', sub.id),
-                ('status', 'not in', ['failed']) # Avoid duplicate for non-failed
-            ], limit=1)
-            if existing_payment:
-                continue
-
-            # Placeholder for compensation calculation based on campaign
-            # REQ-IPF-003: Campaign compensation models
-            amount = 0.0
-            currency_id = sub.campaign_id.currency_id.id or self.env.company.currency_id.id
-            reason = _("Payment for approved content: %s") % (sub.name_get()[0][1] if sub.name_get() else sub.id)
-
-            if sub.campaign_id.compensation_model_type == 'flat_fee':
-                # Assuming compensation_details stores the flat fee, e.g., as JSON or simple text parseable
-                try:
-                    # This is a very simplified example, real parsing would be needed
-                    amount = float(sub.campaign_id.compensation_details or "0") 
-                except ValueError:
-                    _logger.error(f"Could not parse compensation_details for campaign {sub.campaign_id.id}")
-                    amount = 0.0 # Default to 0 if parsing fails
-            elif sub.campaign_id.compensation_model_type == 'per_submission':
-                 # Similar logic for per_submission
-                try:
-                    amount = float(sub.campaign_id.compensation_details or "0")
-                except ValueError:
-                    amount = 0.0
-            # Add other compensation models here (cpm, cpa, performance_based)
-
-            if float_compare(amount, 0.0, precision_digits=2) > 0:
-                owed_amounts.append({
-                    'influencer_id': sub.influencer_profile_id.id,
-                    'campaign_id': sub.campaign_id.id,
-                    'content_submission_id': sub.id,
-                    'amount': amount,
-                    'currency_id': currency_id,
-                    'reason': reason,
-                    'due_date': fields.Date.today(), # Or based on campaign terms
-                })
+        owed_amounts = PaymentDuesEngine(self.env).calculate_amounts_owed(
+            campaign_id=campaign_id, influencer_id=influencer_id)
         _logger.info(f"Calculated {len(owed_amounts)} owed amounts.")
         return owed_amounts
 
+    def iter_amounts_owed(self, campaign_id=None, influencer_id=None, chunk_size=None):
+        """
+        Streaming variant of calculate_amounts_owed for very large closes.
+        :param campaign_id: int, optional ID of a campaign
+        :param influencer_id: int, optional ID of an influencer
+        :param chunk_size: int, optional number of submissions examined per chunk
+        :yield: lists of owed-amount dicts, in the same format as calculate_amounts_owed
+        REQ-IPF-004
+        """
+        engine_kwargs = {'chunk_size': chunk_size} if chunk_size else {}
+        return PaymentDuesEngine(self.env).iter_amounts_owed(
+            campaign_id=campaign_id, influencer_id=influencer_id, **engine_kwargs)
 
     def create_payment_records_for_approved_content(self, content_submission_ids=None):
         """
@@ -103,69 +59,26 @@ class PaymentProcessingService:
         :return: recordset of created influence_gen.payment_record
         REQ-IPF-004
         """
-        if content_submission_ids is None: # Calculate for all applicable
-            calculated_dues = self.calculate_amounts_owed()
-            created_records = self.env['influence_gen.payment_record']
-            for due in calculated_dues:
-                payment_vals = {
-                    'influencer_profile_id': due['influencer_id'],
-                    'campaign_id': due.get('campaign_id'),
-                    'content_submission_id': due.get('content_submission_id'),
-                    'amount': due['amount'],
-                    'currency_id': due['currency_id'],
-                    'status': 'pending_approval', # Or 'pending' if no approval step
-                    'payment_method': 'bank_transfer', # Default or from influencer profile
-                    'due_date': due.get('due_date', fields.Date.today()),
-                    'notes': due.get('reason')
-                }
-                created_records |= self.env['influence_gen.payment_record'].create(payment_vals)
-            _logger.info(f"Created {len(created_records)} payment records from calculated dues.")
-            return created_records
-        else:
-            submissions = self.env['influence_gen.content_submission'].browse(content_submission_ids)
-            created_records = self.env['influence_gen.payment_record']
-            for sub in submissions:
-                if sub.review_status != 'approved':
-                    _logger.warning(f"Skipping payment record creation for non-approved submission {sub.id}")
-                    continue
-                
-                # Check if a payment record already exists and is not 'failed'
-                existing_payment = self.env['influence_gen.payment_record'].search([
-                    ('content_submission_id', '=', sub.id),
-                    ('status', 'not in', ['failed'])
-                ], limit=1)
-                if existing_payment:
-                    _logger.info(f"Payment record already exists for submission {sub.id}")
-                    continue
-
-                # Calculate amount for this specific submission
-                # This duplicates some logic from calculate_amounts_owed but is more targeted.
-                amount = 0.0
-                currency_id = sub.campaign_id.currency_id.id or self.env.company.currency_id.id
-                reason = _("Payment for approved content: %s") % (sub.name_get()[0][1] if sub.name_get() else sub.id)
-
-                if sub.campaign_id.compensation_model_type == 'flat_fee' or sub.campaign_id.compensation_model_type == 'per_submission':
-                    try:
-                        amount = float(sub.campaign_id.compensation_details or "0")
-                    except ValueError:
-                        _logger.error(f"Could not parse compensation_details for campaign {sub.campaign_id.id}")
-                        amount = 0.0
-                
-                if float_compare(amount, 0.0, precision_digits=2) > 0:
-                    payment_vals = {
-                        'influencer_profile_id': sub.influencer_profile_id.id,
-                        'campaign_id': sub.campaign_id.id,
-                        'content_submission_id': sub.id,
-                        'amount': amount,
-                        'currency_id': currency_id,
-                        'status': 'pending_approval',
-                        'payment_method': 'bank_transfer',
-                        'due_date': fields.Date.today(), # Or based on campaign terms
-                        'notes': reason,
-                    }
-                    created_records |= self.env['influence_gen.payment_record'].create(payment_vals)
-            _logger.info(f"Created {len(created_records)} payment records for specified submissions.")
-            return created_records
+        if content_submission_ids is not None:
+            # Non-approved submissions are simply not returned by the engine.
+            _logger.info(f"Creating payment records for specified submissions: {content_submission_ids}")
+        created_records = self.env['influence_gen.payment_record']
+        for dues_chunk in PaymentDuesEngine(self.env).iter_amounts_owed(content_submission_ids=content_submission_ids):
+            if not dues_chunk:
+                continue
+            created_records |= self.env['influence_gen.payment_record'].create([{
+                'influencer_profile_id': due['influencer_id'],
+                'campaign_id': due.get('campaign_id'),
+                'content_submission_id': due.get('content_submission_id'),
+                'amount': due['amount'],
+                'currency_id': due['currency_id'],
+                'status': 'pending_approval', # Or 'pending' if no approval step
+                'payment_method': 'bank_transfer', # Default or from influencer profile
+                'due_date': due.get('due_date', fields.Date.today()),
+                'notes': due.get('reason'),
+            } for due in dues_chunk])
+        _logger.info(f"Created {len(created_records)} payment records from calculated dues.")
+        return created_records
 
     def generate_payment_batch_for_review(self, payment_record_ids):
         """
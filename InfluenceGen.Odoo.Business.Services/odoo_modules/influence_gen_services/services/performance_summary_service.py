@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo.tools import split_every
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import claim_queued, create_queue_table
+
+from .campaign_kpi_aggregation_service import ROLLUP_METRICS, ROLLUP_TABLE
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_LIMIT = 2000  # stale entries refreshed per cron run
+REFRESH_BATCH_SIZE = 500  # campaigns or influencers upserted per statement
+
+STALE_TABLE = 'influence_gen_performance_summary_stale'
+MARK_STALE_FUNCTION = 'influence_gen_mark_performance_summary_stale'
+
+PENDING_APPLICATION_STATUSES = ['submitted', 'under_review']
+APPROVED_APPLICATION_STATUSES = ['approved', 'awaiting_content']
+PAID_PAYMENT_STATUSES = ['paid']
+# Payments not owed (anymore); every other status counts as outstanding.
+CLOSED_PAYMENT_STATUSES = ['paid', 'cancelled', 'payment_failed']
+
+# Summary tables, keyed on the summarized record: {scope: config}.
+SUMMARY_SCOPES = {
+    'campaign': {
+        'table': 'influence_gen_campaign_performance_summary',
+        'key': 'campaign_id',
+        'source': 'influence_gen_campaign',
+        'with_kpis': True,
+    },
+    'influencer': {
+        'table': 'influence_gen_influencer_performance_summary',
+        'key': 'influencer_profile_id',
+        'source': 'influence_gen_influencer_profile',
+        'with_kpis': False,
+    },
+}
+SUMMARY_COLUMNS = (
+    'applications_total', 'applications_pending', 'applications_approved', 'applications_rejected',
+    'submissions_total', 'submissions_pending', 'submissions_approved',
+    'payments_outstanding_amount', 'payments_paid_amount',
+)
+KPI_COLUMNS = ('kpi_target_total', 'kpi_actual_total')
+
+# Tables whose changes make summaries stale, with the (scope, column) pairs they mark.
+TRACKED_TABLES = {
+    'influence_gen_campaign_application': ('campaign', 'campaign_id', 'influencer', 'influencer_profile_id'),
+    'influence_gen_content_submission': ('campaign', 'campaign_id', 'influencer', 'influencer_profile_id'),
+    'influence_gen_payment_record': ('campaign', 'campaign_id', 'influencer', 'influencer_profile_id'),
+    'influence_gen_campaign_kpi': ('campaign', 'campaign_id'),
+}
+
+
+class PerformanceSummaryService:
+    """
+    Service maintaining the per-campaign and per-influencer performance summaries
+    (influence_gen.campaign_performance_summary, influence_gen.influencer_performance_summary):
+    applications by status, submissions by review status, payment totals and KPI
+    actuals, so the portal and admin dashboards read one indexed row instead of
+    recomputing them on every view.
+
+    Statement-level PostgreSQL triggers on applications, submissions, payments and
+    KPIs record the campaigns and influencers they touch in a stale table, whatever
+    wrote the rows (ORM or SQL). The refresh cron upserts only those summaries; a
+    nightly full refresh repairs any drift. Upserts never block dashboard reads.
+    REQ-2-012, REQ-PAC-016
+    """
+
+    def __init__(self, env):
+        """
+        Initializes the service with the Odoo environment.
+        :param env: Odoo Environment
+        """
+        self.env = env
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def install_change_triggers(self):
+        """
+        (Re)creates the stale table, the marking function and the statement-level triggers
+        of the tracked tables. Idempotent; called on module install and upgrade.
+        """
+        cr = self.env.cr
+        create_queue_table(cr, STALE_TABLE, "scope varchar NOT NULL, res_id integer NOT NULL, PRIMARY KEY (scope, res_id)")
+        # Trigger arguments are (scope, column) pairs; transition tables make it one INSERT per statement.
+        cr.execute(f"""
+            CREATE OR REPLACE FUNCTION {MARK_STALE_FUNCTION}() RETURNS trigger AS $$
+            DECLARE
+                transition text;
+                i integer;
+            BEGIN
+                FOREACH transition IN ARRAY CASE TG_OP
+                        WHEN 'INSERT' THEN ARRAY['new_rows']
+                        WHEN 'DELETE' THEN ARRAY['old_rows']
+                        ELSE ARRAY['new_rows', 'old_rows'] END LOOP
+                    FOR i IN 0 .. TG_NARGS - 1 BY 2 LOOP
+                        EXECUTE format(
+                            'INSERT INTO {STALE_TABLE} (scope, res_id, marked_at) '
+                            'SELECT DISTINCT %L, %I, now() at time zone ''UTC'' FROM %I WHERE %I IS NOT NULL ORDER BY 2 '
+                            'ON CONFLICT (scope, res_id) DO NOTHING',
+                            TG_ARGV[i], TG_ARGV[i + 1], transition, TG_ARGV[i + 1]);
+                    END LOOP;
+                END LOOP;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for table, scope_columns in TRACKED_TABLES.items():
+            args = ', '.join(f"'{arg}'" for arg in scope_columns)
+            # Transition tables require one trigger per event.
+            for event, referencing in (
+                ('INSERT', 'NEW TABLE AS new_rows'),
+                ('UPDATE', 'NEW TABLE AS new_rows OLD TABLE AS old_rows'),
+                ('DELETE', 'OLD TABLE AS old_rows'),
+            ):
+                trigger = f"{table}_summary_stale_{event.lower()}"
+                cr.execute(f'DROP TRIGGER IF EXISTS "{trigger}" ON "{table}"')
+                cr.execute(f"""
+                    CREATE TRIGGER "{trigger}" AFTER {event} ON "{table}"
+                    REFERENCING {referencing}
+                    FOR EACH STATEMENT EXECUTE FUNCTION {MARK_STALE_FUNCTION}({args})
+                """)
+
+    def mark_all_stale(self, scope):
+        """Queues every campaign or influencer of a scope for refresh (e.g. on first install)."""
+        config = SUMMARY_SCOPES[scope]
+        self.env.cr.execute(f"""
+            INSERT INTO {STALE_TABLE} (scope, res_id, marked_at)
+            SELECT %s, id, now() at time zone 'UTC' FROM {config['source']}
+            ON CONFLICT (scope, res_id) DO NOTHING
+        """, [scope])
+
+    def refresh_stale(self, limit=DEFAULT_REFRESH_LIMIT):
+        """
+        Refreshes the summaries of stale campaigns and influencers. Stale entries are
+        claimed with FOR UPDATE SKIP LOCKED, so concurrent runs never refresh the same
+        summary; entries marked again meanwhile are picked up by the next run.
+        :param int limit: maximum stale entries processed
+        :return: dict {scope: number of summaries refreshed}
+        """
+        # Pending ORM writes fire the triggers marking their summaries stale.
+        self.env.flush_all()
+        ids_by_scope = {scope: [] for scope in SUMMARY_SCOPES}
+        for scope, res_id in claim_queued(self.env.cr, STALE_TABLE, ['scope', 'res_id'], limit):
+            if scope in ids_by_scope:
+                ids_by_scope[scope].append(res_id)
+        for scope, res_ids in ids_by_scope.items():
+            self.refresh(scope, res_ids)
+        return {scope: len(res_ids) for scope, res_ids in ids_by_scope.items()}
+
+    def refresh_all(self):
+        """
+        Recomputes every summary, e.g. nightly. Rows are upserted in place, so dashboards
+        keep reading the previous values until the transaction commits.
+        :return: dict {scope: number of summaries refreshed}
+        """
+        stats = {}
+        for scope, config in SUMMARY_SCOPES.items():
+            self.env.cr.execute(f"SELECT id FROM {config['source']} ORDER BY id")
+            res_ids = [row[0] for row in self.env.cr.fetchall()]
+            self.refresh(scope, res_ids)
+            stats[scope] = len(res_ids)
+        return stats
+
+    def refresh(self, scope, res_ids):
+        """
+        Upserts the summaries of the given campaigns or influencers, one aggregate
+        statement per batch.
+        :param str scope: 'campaign' or 'influencer'
+        :param list res_ids: IDs of the summarized records
+        """
+        if not res_ids:
+            return
+        self.env.flush_all()
+        config = SUMMARY_SCOPES[scope]
+        query = self._build_refresh_query(config)
+        for batch in split_every(REFRESH_BATCH_SIZE, sorted(set(res_ids))):
+            self.env.cr.execute(query, {
+                'ids': list(batch),
+                'uid': self.env.uid,
+                'pending_applications': PENDING_APPLICATION_STATUSES,
+                'approved_applications': APPROVED_APPLICATION_STATUSES,
+                'paid_payments': PAID_PAYMENT_STATUSES,
+                'closed_payments': CLOSED_PAYMENT_STATUSES,
+            })
+        model = 'influence_gen.%s_performance_summary' % scope
+        self.env[model].invalidate_model()
+        _logger.info(f"Refreshed {len(set(res_ids))} {scope} performance summaries.")
+
+    def _build_refresh_query(self, config):
+        key = config['key']
+        columns = list(SUMMARY_COLUMNS)
+        kpi_select = kpi_join = ''
+        if config['with_kpis']:
+            columns += KPI_COLUMNS
+            kpi_select = ", COALESCE(k.target_total, 0), COALESCE(k.actual_total, 0)"
+            kpi_join = f"""
+                LEFT JOIN (SELECT {key} AS res_id, SUM(target_value) AS target_total, SUM(actual_value) AS actual_total
+                             FROM influence_gen_campaign_kpi
+                            WHERE {key} = ANY(%(ids)s)
+                         GROUP BY {key}) k ON k.res_id = src.id"""
+        return f"""
+            INSERT INTO {config['table']}
+                   ({key}, {', '.join(columns)}, refreshed_at, create_uid, create_date, write_uid, write_date)
+            SELECT src.id,
+                   COALESCE(a.total, 0), COALESCE(a.pending, 0), COALESCE(a.approved, 0), COALESCE(a.rejected, 0),
+                   COALESCE(s.total, 0), COALESCE(s.pending, 0), COALESCE(s.approved, 0),
+                   COALESCE(p.outstanding, 0), COALESCE(p.paid, 0){kpi_select},
+                   now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+              FROM {config['source']} src
+         LEFT JOIN (SELECT {key} AS res_id, count(*) AS total,
+                           count(*) FILTER (WHERE status = ANY(%(pending_applications)s)) AS pending,
+                           count(*) FILTER (WHERE status = ANY(%(approved_applications)s)) AS approved,
+                           count(*) FILTER (WHERE status = 'rejected') AS rejected
+                      FROM influence_gen_campaign_application
+                     WHERE {key} = ANY(%(ids)s)
+                  GROUP BY {key}) a ON a.res_id = src.id
+         LEFT JOIN (SELECT {key} AS res_id, count(*) AS total,
+                           count(*) FILTER (WHERE review_status = 'pending_review') AS pending,
+                           count(*) FILTER (WHERE review_status = 'approved') AS approved
+                      FROM influence_gen_content_submission
+                     WHERE {key} = ANY(%(ids)s)
+                  GROUP BY {key}) s ON s.res_id = src.id
+         LEFT JOIN (SELECT {key} AS res_id,
+                           SUM(amount) FILTER (WHERE status <> ALL(%(closed_payments)s)) AS outstanding,
+                           SUM(amount) FILTER (WHERE status = ANY(%(paid_payments)s)) AS paid
+                      FROM influence_gen_payment_record
+                     WHERE {key} = ANY(%(ids)s)
+                  GROUP BY {key}) p ON p.res_id = src.id{kpi_join}
+             WHERE src.id = ANY(%(ids)s)
+            ON CONFLICT ({key}) DO UPDATE SET
+                   {', '.join(f'{column} = EXCLUDED.{column}' for column in columns)},
+                   refreshed_at = EXCLUDED.refreshed_at,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+        """
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get_campaign_summaries(self, campaign_ids):
+        """
+        :param list campaign_ids: influence_gen.campaign IDs
+        :return: dict {campaign_id: {column: value}}; campaigns not summarized yet are missing
+        """
+        return self._read_summaries('campaign', campaign_ids)
+
+    def get_influencer_summary(self, influencer_id):
+        """
+        :return: dict {column: value}, or an empty dict if the influencer is not summarized yet
+        """
+        return self._read_summaries('influencer', [influencer_id]).get(influencer_id, {})
+
+    def get_top_campaigns(self, limit=5):
+        """
+        Campaigns with the most approved submissions.
+        :return: list of dicts {'campaign_id', 'campaign_name', column: value, ...}
+        """
+        columns = SUMMARY_COLUMNS + KPI_COLUMNS
+        self.env.cr.execute(f"""
+            SELECT c.id, c.name, {', '.join(f's.{column}' for column in columns)}
+              FROM influence_gen_campaign_performance_summary s
+              JOIN influence_gen_campaign c ON c.id = s.campaign_id
+          ORDER BY s.submissions_approved DESC, s.campaign_id DESC
+             LIMIT %s
+        """, [limit])
+        return [
+            dict(zip(columns, row[2:]), campaign_id=row[0], campaign_name=row[1])
+            for row in self.env.cr.fetchall()
+        ]
+
+    def get_influencer_performance_data(self, influencer_id):
+        """
+        Data of the portal performance page (/my/performance): one entry per campaign the
+        influencer was approved for, with the influencer's content and rollup metrics.
+        :return: dict {'summary': {...}, 'campaign_performance': [...]}
+        """
+        Application = self.env['influence_gen.campaign_application'].sudo()
+        applications = Application.search([
+            ('influencer_profile_id', '=', influencer_id),
+            ('status', 'in', APPROVED_APPLICATION_STATUSES),
+        ])
+        campaigns = applications.campaign_id
+        if not campaigns:
+            return {'summary': self.get_influencer_summary(influencer_id), 'campaign_performance': []}
+
+        self.env.cr.execute(f"""
+            SELECT campaign_id, {', '.join(f'SUM({metric})' for metric in ROLLUP_METRICS)}
+              FROM {ROLLUP_TABLE}
+             WHERE influencer_profile_id = %s AND campaign_id = ANY(%s)
+          GROUP BY campaign_id
+        """, [influencer_id, campaigns.ids])
+        metrics_by_campaign = {}
+        for row in self.env.cr.fetchall():
+            metrics = {metric: float(value or 0.0) for metric, value in zip(ROLLUP_METRICS, row[1:])}
+            reach = metrics['reach'] or metrics['views']
+            metrics['engagement_rate'] = 100.0 * metrics['engagement'] / reach if reach else 0.0
+            metrics_by_campaign[row[0]] = metrics
+
+        submissions = self.env['influence_gen.content_submission'].sudo().search_read(
+            [('influencer_profile_id', '=', influencer_id), ('campaign_id', 'in', campaigns.ids)],
+            ['campaign_id', 'content_url', 'content_attachment_id', 'generated_image_id', 'review_status'],
+        )
+        status_labels = dict(self.env['influence_gen.content_submission']._fields['review_status']._description_selection(self.env))
+        content_by_campaign = {}
+        for submission in submissions:
+            url = submission['content_url']
+            content_by_campaign.setdefault(submission['campaign_id'][0], []).append({
+                'post_url': url,
+                'post_url_short': url and (url if len(url) <= 40 else url[:37] + '...'),
+                'files_count': 1 if submission['content_attachment_id'] else 0,
+                'ai_images_count': 1 if submission['generated_image_id'] else 0,
+                'status': submission['review_status'],
+                'status_display': status_labels.get(submission['review_status']),
+            })
+
+        campaign_status_labels = dict(campaigns._fields['status']._description_selection(self.env))
+        return {
+            'summary': self.get_influencer_summary(influencer_id),
+            'campaign_performance': [{
+                'campaign_id': campaign.id,
+                'campaign_name': campaign.name,
+                'brand_name': campaign.brand_client,
+                'campaign_status': campaign.status,
+                'campaign_status_display': campaign_status_labels.get(campaign.status),
+                'submitted_content': content_by_campaign.get(campaign.id, []),
+                'metrics': metrics_by_campaign.get(campaign.id),
+            } for campaign in campaigns.sorted(lambda c: (c.start_date or c.create_date.date(), c.id), reverse=True)],
+        }
+
+    def _read_summaries(self, scope, res_ids):
+        config = SUMMARY_SCOPES[scope]
+        columns = SUMMARY_COLUMNS + (KPI_COLUMNS if config['with_kpis'] else ())
+        if not res_ids:
+            return {}
+        self.env.cr.execute(f"""
+            SELECT {config['key']}, {', '.join(columns)}, refreshed_at
+              FROM {config['table']}
+             WHERE {config['key']} = ANY(%s)
+        """, [list(res_ids)])
+        return {
+            row[0]: dict(zip(columns + ('refreshed_at',), row[1:]))
+            for row in self.env.cr.fetchall()
+        }
@@ -5,6 +5,9 @@ from datetime import datetime, timedelta
 from odoo import _, api, fields
 from odoo.exceptions import UserError, ValidationError
 
+from .legal_hold_propagation_service import LegalHoldPropagationService
+from .retention_executor import DEFAULT_CHUNK_SIZE, RetentionExecutor, RetentionTask
+
 _logger = logging.getLogger(__name__)
 
 class RetentionAndLegalHoldService:
@@ -19,11 +22,13 @@ class RetentionAndLegalHoldService:
         """
         self.env = env
 
-    def get_retention_policy(self, data_category_key):
+    def get_retention_policy(self, data_category_key, setting_value=None):
         """
         Fetches retention period and disposition action from PlatformSetting.
         :param data_category_key: str, e.g., 'retention.pii.inactive_influencer_days'
                                    or 'retention.generated_image.personal_use'
+        :param setting_value: optional raw setting value already fetched by the caller
+                              (e.g. via PlatformSetting.get_settings('retention.'))
         :return: dict like {'period_days': 365, 'action': 'anonymize', 'is_active': True} or None
         REQ-DRH-001
         """
@@ -31,33 +36,41 @@ class RetentionAndLegalHoldService:
         # Example: A PlatformSetting key could be 'retention.pii.inactive_influencer'
         # Its value could be a JSON string: {"period_days": 2555, "action": "anonymize", "is_active": true}
         
-        setting_value_json = self.env['influence_gen.platform_setting'].get_setting(data_category_key)
-        if not setting_value_json:
+        if setting_value is None:
+            setting_value = self.env['influence_gen.platform_setting'].get_setting(data_category_key)
+        if not setting_value:
             _logger.warning(f"No retention policy found for key: {data_category_key}")
             return None
         
         try:
-            policy_details = json.loads(setting_value_json)
+            # JSON settings come back already parsed; text settings still need decoding.
+            policy_details = json.loads(setting_value) if isinstance(setting_value, str) else setting_value
             if not isinstance(policy_details, dict) or \
                'period_days' not in policy_details or \
                'action' not in policy_details:
                 _logger.error(f"Invalid retention policy format for key {data_category_key}: {policy_details}")
                 return None
             
+            policy_details = dict(policy_details) # Settings values are shared by the cache, don't mutate them
             policy_details.setdefault('is_active', True) # Default to active if not specified
             return policy_details
             
         except json.JSONDecodeError:
-            _logger.error(f"Failed to parse retention policy JSON for key {data_category_key}: {setting_value_json}")
+            _logger.error(f"Failed to parse retention policy JSON for key {data_category_key}: {setting_value}")
             return None
 
-    def apply_retention_policies_automated(self):
+    def apply_retention_policies_automated(self, dry_run=False, chunk_size=DEFAULT_CHUNK_SIZE):
         """
         CRON JOB METHOD: Iterates through configured data categories and applies retention.
         - Gets policy via get_retention_policy().
-        - Finds records older than period_days NOT under legal_hold_status = True.
-        - Performs disposition action (delete, anonymize, archive).
-        - Logs disposition actions.
+        - Finds records older than period_days that are not under legal hold (flag or hold index),
+          excluded by the same SQL statement that selects them.
+        - Performs disposition action (delete, anonymize, archive) in committed ID-range
+          chunks via RetentionExecutor; an interrupted run resumes where it stopped.
+        - Logs one audit entry per chunk.
+        :param bool dry_run: only report how many records each policy would process
+        :param int chunk_size: records per chunk/transaction
+        :return: list of per-policy result dicts (see RetentionExecutor.run)
         REQ-DRH-002, REQ-DRH-006, REQ-ATEL-007
         """
         _logger.info("Starting automated application of data retention policies.")
@@ -86,12 +99,19 @@ class RetentionAndLegalHoldService:
                 'date_field': 'timestamp',
                 'domain_conditions': [], # Apply to all general audit logs after period
                 'anonymize_method': None, # Usually delete or archive
+                'partition_retention': True, # Monthly partitions are dropped/detached whole
             },
         ]
 
+        executor = RetentionExecutor(self.env, chunk_size=chunk_size, audit_callback=self._log_retention_chunk)
+        results = []
+
+        # One cached read for all retention settings instead of one lookup per category.
+        retention_settings = self.env['influence_gen.platform_setting'].get_settings('retention.')
+
         for category_config in data_categories_config:
             policy_key = f"{category_config['key_prefix']}_policy" # Convention for the setting key
-            policy = self.get_retention_policy(policy_key)
+            policy = self.get_retention_policy(policy_key, setting_value=retention_settings.get(policy_key))
 
             if not policy or not policy.get('is_active', True):
                 _logger.info(f"Skipping retention for category {category_config['key_prefix']} as policy is inactive or not found.")
@@ -105,74 +125,48 @@ class RetentionAndLegalHoldService:
             _logger.info(f"Processing category: {category_config['key_prefix']} for model {model_name}, action: {action}, period: {period_days} days.")
 
             cutoff_date = datetime.now() - timedelta(days=period_days)
+
+            if category_config.get('partition_retention'):
+                partitions = self.env[model_name]._apply_partition_retention(cutoff_date, action, dry_run=dry_run)
+                _logger.info(f"Retention for {model_name} processed {len(partitions)} partition(s) older than {cutoff_date} (dry run: {dry_run}).")
+                results.append({'key': policy_key, 'model': model_name, 'action': action, 'dry_run': dry_run,
+                                'partitions': partitions, 'completed': True, 'error': None})
+                continue
             
-            domain = [(date_field, '<=', fields.Datetime.to_string(cutoff_date))]
-            if category_config.get('domain_conditions'):
-                domain.extend(category_config['domain_conditions'])
-            
-            # Ensure 'legal_hold_status' field exists or handle absence
-            Model = self.env[model_name]
-            if 'legal_hold_status' in Model._fields:
-                domain.append(('legal_hold_status', '=', False))
-            
-            records_to_process = Model.search(domain)
-            _logger.info(f"Found {len(records_to_process)} records in {model_name} matching retention criteria for category {category_config['key_prefix']}.")
+            task = RetentionTask(
+                key=policy_key,
+                model_name=model_name,
+                date_field=date_field,
+                period_days=period_days,
+                action=action,
+                domain=category_config.get('domain_conditions') or [],
+                hold_field='legal_hold_status',
+                anonymize_method=category_config.get('anonymize_method'),
+            )
+            results.append(executor.run(task, dry_run=dry_run))
+        _logger.info(f"Finished automated application of data retention policies: {results}")
+        return results
 
-            for record in records_to_process:
-                try:
-                    if action == 'delete':
-                        _logger.info(f"Deleting record ID {record.id} from {model_name} as per retention policy.")
-                        record.unlink()
-                        # Log deletion in AuditLog (BaseAuditMixin might not cover service-driven unlink well)
-                        self.env['influence_gen.audit_log'].create({
-                            'event_type': f'{model_name}.retention.delete',
-                            'target_model': model_name,
-                            'target_res_id': record.id, # record.id might not be available after unlink, capture before
-                            'action': 'retention_delete',
-                            'details_json': json.dumps({'policy_key': policy_key, 'record_name': record.display_name or str(record.id)}),
-                            'outcome': 'success',
-                        })
-                    elif action == 'anonymize':
-                        anonymize_method_name = category_config.get('anonymize_method')
-                        if anonymize_method_name and hasattr(record, anonymize_method_name):
-                            _logger.info(f"Anonymizing record ID {record.id} from {model_name} as per retention policy.")
-                            getattr(record, anonymize_method_name)()
-                            self.env['influence_gen.audit_log'].create({
-                                'event_type': f'{model_name}.retention.anonymize',
-                                'target_model': model_name, 'target_res_id': record.id,
-                                'action': 'retention_anonymize', 'details_json': json.dumps({'policy_key': policy_key}),
-                                'outcome': 'success',
-                            })
-                        else:
-                             _logger.warning(f"Anonymization method '{anonymize_method_name}' not found or not specified for model {model_name}. Skipping record {record.id}.")
-                    elif action == 'archive':
-                        # Placeholder for archival logic
-                        _logger.info(f"Archiving record ID {record.id} from {model_name} (conceptual).")
-                        # record.write({'active': False}) # Example of simple archival
-                        # self.archive_data_batch(model_name, [('id', '=', record.id)], archive_target_info={}) # Call more specific archive
-                        self.env['influence_gen.audit_log'].create({
-                            'event_type': f'{model_name}.retention.archive',
-                            'target_model': model_name, 'target_res_id': record.id,
-                            'action': 'retention_archive', 'details_json': json.dumps({'policy_key': policy_key}),
-                            'outcome': 'success',
-                        })
-                    else:
-                        _logger.warning(f"Unknown retention action '{action}' for policy {policy_key}. Skipping record {record.id}.")
-                except Exception as e:
-                    _logger.error(f"Error applying retention action '{action}' to record {record.id} of {model_name}: {e}")
-                    self.env['influence_gen.audit_log'].create({
-                        'event_type': f'{model_name}.retention.{action}.error',
-                        'target_model': model_name, 'target_res_id': record.id,
-                        'action': f'retention_{action}_error', 'details_json': json.dumps({'policy_key': policy_key, 'error': str(e)}),
-                        'outcome': 'failure', 'failure_reason': str(e),
-                    })
-        _logger.info("Finished automated application of data retention policies.")
-        return True
+    def _log_retention_chunk(self, task, record_ids, outcome, error=None):
+        """Writes the single audit entry summarizing one retention chunk (see RetentionExecutor)."""
+        self.env['influence_gen.audit_log'].sudo().create({
+            'event_type': f'{task.model_name}.retention.{task.action}' + ('.error' if outcome == 'failure' else ''),
+            'target_model': task.model_name,
+            'action': f'retention_{task.action}' + ('_error' if outcome == 'failure' else ''),
+            'details_json': json.dumps({
+                'policy_key': task.key,
+                'record_count': len(record_ids),
+                'first_record_id': record_ids[0],
+                'last_record_id': record_ids[-1],
+            }),
+            'outcome': outcome,
+            'failure_reason': error,
+        })
 
     def process_manual_erasure_request(self, model_name, record_id, requestor_user_id, justification_text):
         """
         Processes a manual data erasure request (e.g., GDPR Right to be Forgotten).
-        - Finds record. Checks legal_hold_status.
+        - Finds record. Checks the legal hold index and legal_hold_status.
         - Checks against financial record keeping rules, campaign usage rights (if applicable).
         - If clear, performs deletion or anonymization.
         - Logs comprehensively.
@@ -180,10 +174,10 @@ class RetentionAndLegalHoldService:
         REQ-DRH-003, REQ-DRH-004
         """
         _logger.info(f"Processing manual erasure request for model {model_name}, record ID {record_id}, by user {requestor_user_id}")
-        Model = self.env[model_name]
-        if not Model:
+        # An empty recordset is falsy: check the registry, not the model.
+        if model_name not in self.env:
             raise UserError(_("Model %s not found.") % model_name)
-        record = Model.browse(record_id)
+        record = self.env[model_name].browse(record_id)
         if not record.exists():
             raise UserError(_("Record ID %s in model %s not found.") % (record_id, model_name))
 
@@ -194,8 +188,9 @@ class RetentionAndLegalHoldService:
             'target_display_name': record.display_name or str(record.id)
         }
 
-        # Check for legal hold
-        if hasattr(record, 'legal_hold_status') and record.legal_hold_status:
+        # Check for legal hold. Authoritative probe of the hold index: this erasure is irreversible.
+        held = self.env['influence_gen.legal_hold_index'].is_held_exact(model_name, record.id)
+        if held or (hasattr(record, 'legal_hold_status') and record.legal_hold_status):
             _logger.warning(f"Erasure denied for {model_name} ID {record_id}: Record is under legal hold.")
             AuditLog.create({
                 'event_type': f'{model_name}.erasure_request.denied', 'user_id': requestor_user_id,
@@ -281,95 +276,62 @@ class RetentionAndLegalHoldService:
 
     def place_legal_hold(self, model_name, record_id_or_domain, hold_reason, placed_by_user_id):
         """
-        Places a legal hold on specified records.
-        Sets legal_hold_status = True. Logs in AuditLog.
-        :return: bool (True if any record was updated)
+        Places a legal hold on specified records and on all their related data
+        (see LegalHoldPropagationService). Each record gets its own hold, so it can
+        be lifted on its own. Logs one AuditLog entry per model.
+        :return: bool (True if any record was newly held)
         REQ-DRH-008, REQ-DRH-009
         """
         _logger.info(f"Placing legal hold on {model_name}, Target: {record_id_or_domain}, Reason: {hold_reason}")
-        Model = self.env[model_name]
-        if not Model or not hasattr(Model, '_fields') or 'legal_hold_status' not in Model._fields:
-            raise UserError(_("Model %s does not exist or does not support legal hold status.") % model_name)
-
-        if isinstance(record_id_or_domain, int): # Single record ID
-            domain = [('id', '=', record_id_or_domain)]
-        elif isinstance(record_id_or_domain, list): # Odoo domain
-            domain = record_id_or_domain
-        else:
-            raise UserError(_("Invalid target for legal hold. Must be record ID or domain."))
-
-        records_to_hold = Model.search(domain)
-        if not records_to_hold:
+        domain = self._get_legal_hold_domain(model_name, record_id_or_domain)
+        added = LegalHoldPropagationService(self.env).place_per_record(
+            model_name, domain, reason=hold_reason, user_id=placed_by_user_id)
+        if not added:
             _logger.warning(f"No records found matching criteria for legal hold on {model_name}.")
             return False
-
-        updated_count = 0
-        for record in records_to_hold:
-            if not record.legal_hold_status: # Only update if not already on hold by this reason (or simplify)
-                record.write({'legal_hold_status': True})
-                self.env['influence_gen.audit_log'].create({
-                    'event_type': f'{model_name}.legal_hold.placed', 'user_id': placed_by_user_id,
-                    'target_model': model_name, 'target_res_id': record.id,
-                    'action': 'legal_hold_place',
-                    'details_json': json.dumps({'reason': hold_reason, 'record_name': record.display_name or str(record.id)}),
-                    'outcome': 'success',
-                })
-                updated_count += 1
-        
-        _logger.info(f"Placed legal hold on {updated_count} records in {model_name}.")
-        return updated_count > 0
+        _logger.info(f"Placed legal hold on {added.get(model_name, 0)} records in {model_name} and {sum(added.values())} records overall.")
+        return True
 
     def lift_legal_hold(self, model_name, record_id_or_domain, lifted_by_user_id, lift_reason):
         """
-        Lifts a legal hold from specified records.
-        Sets legal_hold_status = False. Logs in AuditLog.
-        :return: bool (True if any record was updated)
+        Lifts the legal holds placed with place_legal_hold on specified records,
+        releasing their related data unless another hold covers it. Logs one
+        AuditLog entry per model.
+        :return: bool (True if any record was released)
         REQ-DRH-008, REQ-DRH-009
         """
         _logger.info(f"Lifting legal hold on {model_name}, Target: {record_id_or_domain}, Reason: {lift_reason}")
-        Model = self.env[model_name]
-        if not Model or not hasattr(Model, '_fields') or 'legal_hold_status' not in Model._fields:
-            raise UserError(_("Model %s does not exist or does not support legal hold status.") % model_name)
-
-        if isinstance(record_id_or_domain, int):
-            domain = [('id', '=', record_id_or_domain)]
-        elif isinstance(record_id_or_domain, list):
-            domain = record_id_or_domain
-        else:
-            raise UserError(_("Invalid target for lifting legal hold. Must be record ID or domain."))
-
-        records_to_lift = Model.search(domain)
-        if not records_to_lift:
+        domain = self._get_legal_hold_domain(model_name, record_id_or_domain)
+        released = LegalHoldPropagationService(self.env).lift_per_record(
+            model_name, domain, reason=lift_reason, user_id=lifted_by_user_id)
+        if not released:
             _logger.warning(f"No records found matching criteria for lifting legal hold on {model_name}.")
             return False
+        _logger.info(f"Lifted legal hold from {released.get(model_name, 0)} records in {model_name} and {sum(released.values())} records overall.")
+        return True
 
-        updated_count = 0
-        for record in records_to_lift:
-            if record.legal_hold_status: # Only update if currently on hold
-                record.write({'legal_hold_status': False})
-                self.env['influence_gen.audit_log'].create({
-                    'event_type': f'{model_name}.legal_hold.lifted', 'user_id': lifted_by_user_id,
-                    'target_model': model_name, 'target_res_id': record.id,
-                    'action': 'legal_hold_lift',
-                    'details_json': json.dumps({'reason': lift_reason, 'record_name': record.display_name or str(record.id)}),
-                    'outcome': 'success',
-                })
-                updated_count += 1
-        
-        _logger.info(f"Lifted legal hold from {updated_count} records in {model_name}.")
-        return updated_count > 0
+    def _get_legal_hold_domain(self, model_name, record_id_or_domain):
+        if model_name not in self.env:
+            raise UserError(_("Model %s does not exist.") % model_name)
+        if isinstance(record_id_or_domain, int): # Single record ID
+            return [('id', '=', record_id_or_domain)]
+        if isinstance(record_id_or_domain, list): # Odoo domain
+            return record_id_or_domain
+        raise UserError(_("Invalid target for legal hold. Must be record ID or domain."))
 
     def check_legal_hold(self, model_name, record_id):
         """
-        Checks if a specific record is under legal hold.
+        Checks if a specific record is under legal hold, from the hold index (an O(1)
+        lookup in the cached bitmap) or the legal_hold_status field of the model, if any.
         :return: bool
         REQ-DRH-009
         """
+        if self.env['influence_gen.legal_hold_index'].is_held(model_name, record_id):
+            return True
         Model = self.env[model_name]
-        if not Model or not hasattr(Model, '_fields') or 'legal_hold_status' not in Model._fields:
-            _logger.warning(f"Model {model_name} does not support legal hold status. Assuming not on hold.")
+        if 'legal_hold_status' not in Model._fields:
             return False
-        
+
         record = Model.browse(record_id)
         if not record.exists():
             _logger.warning(f"Record {model_name} ID {record_id} not found for legal hold check.")
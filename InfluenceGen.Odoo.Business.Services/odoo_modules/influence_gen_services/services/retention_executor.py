@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked, resumable executor for data retention dispositions (REQ-DRH-002, REQ-DRH-006).
+
+Matching records are walked in ascending ID order, `chunk_size` at a time. Each chunk
+is disposed of with a single ORM call (one DELETE or UPDATE statement), summarized by
+one audit entry and committed together with a checkpoint, so a run never holds a long
+transaction and restarts from the last committed chunk after a crash.
+
+Checkpoints are rows of a dedicated table keyed by policy, written with one UPSERT
+per chunk: unlike system parameters, writing them does not clear the registry caches.
+"""
+import logging
+from collections import namedtuple
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tools.sql import table_exists
+
+from odoo.addons.influence_gen_shared_core.utils.queue_utils import is_testing
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+CHECKPOINT_TABLE = 'influence_gen_retention_checkpoint'
+RETENTION_ACTIONS = ('delete', 'anonymize', 'archive')
+
+# One disposition to apply. `key` identifies the policy (checkpoints, audit details);
+# `domain` must exclude records already processed by a previous run for 'anonymize';
+# `hold_field` names the boolean legal hold field of the model, if any. Records in the
+# legal hold index, when the module provides one, are excluded whether the model has such
+# a field or not.
+RetentionTask = namedtuple('RetentionTask', [
+    'key', 'model_name', 'date_field', 'period_days', 'action', 'domain', 'hold_field', 'anonymize_method',
+])
+
+
+class RetentionExecutor:
+    """
+    Applies RetentionTasks in bounded ID-range chunks.
+
+    :param env: Odoo Environment
+    :param int chunk_size: records per chunk (and per transaction)
+    :param audit_callback: callable(task, record_ids, outcome, error=None) writing one audit entry per chunk
+    :param bool commit: commit after each chunk (disabled under tests)
+    """
+
+    def __init__(self, env, chunk_size=DEFAULT_CHUNK_SIZE, audit_callback=None, commit=True):
+        self.env = env
+        self.chunk_size = chunk_size
+        self.audit_callback = audit_callback
+        self.commit = commit
+
+    def run(self, task, dry_run=False):
+        """
+        Applies one task, resuming from its checkpoint if a previous run was interrupted.
+        In dry-run mode nothing is modified and only the number of matching records is reported.
+        :return: dict with key, model, action, dry_run, matched (dry run) or processed, chunks,
+                 resumed_from_id, completed and error
+        """
+        result = {
+            'key': task.key, 'model': task.model_name, 'action': task.action, 'dry_run': dry_run,
+            'matched': 0, 'processed': 0, 'chunks': 0, 'resumed_from_id': 0, 'completed': False, 'error': None,
+        }
+        Model = self._get_model(task)
+        error = self._check_task(task, Model)
+        if error:
+            _logger.warning("Retention task %s skipped: %s", task.key, error)
+            result['error'] = error
+            return result
+
+        self._ensure_checkpoint_table()
+        checkpoint = self._load_checkpoint(task.key)
+        if checkpoint:
+            cutoff = checkpoint['cutoff']
+            last_id = checkpoint['last_id']
+            result['processed'] = checkpoint.get('processed', 0)
+            result['resumed_from_id'] = last_id
+            _logger.info("Resuming retention task %s after record ID %s (cutoff %s).", task.key, last_id, cutoff)
+        else:
+            cutoff = fields.Datetime.now() - timedelta(days=task.period_days)
+            last_id = 0
+        domain = self._build_domain(task, Model, cutoff)
+
+        if dry_run:
+            query = self._candidate_query(task, Model, domain + [('id', '>', last_id)])
+            select = query.select()
+            self.env.cr.execute(f"SELECT count(*) FROM ({select.code}) AS candidates", select.params)
+            result['matched'] = self.env.cr.fetchone()[0]
+            _logger.info("[DRY RUN] Retention task %s would %s %s records of %s.",
+                         task.key, task.action, result['matched'], task.model_name)
+            return result
+
+        while True:
+            query = self._candidate_query(task, Model, domain + [('id', '>', last_id)], limit=self.chunk_size)
+            self.env.cr.execute(query.select())
+            records = Model.browse([row[0] for row in self.env.cr.fetchall()])
+            if not records:
+                break
+            record_ids = records.ids
+            try:
+                self._apply_chunk(task, records)
+                if self.audit_callback:
+                    self.audit_callback(task, record_ids, 'success')
+                last_id = record_ids[-1]
+                result['processed'] += len(record_ids)
+                result['chunks'] += 1
+                self._save_checkpoint(task.key, cutoff, last_id, result['processed'])
+                self._commit()
+            except Exception as e:
+                _logger.error("Retention task %s failed on chunk %s-%s: %s",
+                              task.key, record_ids[0], record_ids[-1], e, exc_info=True)
+                self._rollback()
+                if self.audit_callback:
+                    self.audit_callback(task, record_ids, 'failure', error=str(e))
+                    self._commit()
+                result['error'] = str(e)
+                return result
+            # Keep the ORM cache bounded on very large runs.
+            self.env.invalidate_all()
+            if len(record_ids) < self.chunk_size:
+                break
+
+        self._clear_checkpoint(task.key)
+        self._commit()
+        result['completed'] = True
+        _logger.info("Retention task %s completed: %s records %s in %s chunks.",
+                     task.key, result['processed'], task.action, result['chunks'])
+        return result
+
+    def _get_model(self, task):
+        Model = self.env[task.model_name].sudo()
+        # Archived records are subject to deletion/anonymization too; archival only targets active ones.
+        return Model if task.action == 'archive' else Model.with_context(active_test=False)
+
+    def _check_task(self, task, Model):
+        if task.action not in RETENTION_ACTIONS:
+            return "Unknown retention action '%s'." % task.action
+        if task.date_field not in Model._fields:
+            return "Model %s has no field '%s'." % (task.model_name, task.date_field)
+        if task.action == 'anonymize' and not (task.anonymize_method and hasattr(Model, task.anonymize_method)):
+            return "Anonymization method '%s' not found on %s." % (task.anonymize_method, task.model_name)
+        if task.action == 'archive' and 'active' not in Model._fields:
+            return "Model %s does not support archival (no 'active' field)." % task.model_name
+        return None
+
+    def _build_domain(self, task, Model, cutoff):
+        domain = [(task.date_field, '<=', fields.Datetime.to_string(cutoff))]
+        domain += list(task.domain or [])
+        if task.hold_field and task.hold_field in Model._fields:
+            domain.append((task.hold_field, '=', False))
+        return domain
+
+    def _candidate_query(self, task, Model, domain, limit=None):
+        """
+        Query of the records to dispose of, in ID order. Held records are excluded by the
+        same statement, with an anti-join on the legal hold index (influence_gen.legal_hold_index),
+        in the module versions that provide one.
+        """
+        query = Model._search(domain, order='id', limit=limit)
+        if 'influence_gen.legal_hold_index' in self.env:
+            query.add_where(*self.env['influence_gen.legal_hold_index'].hold_exclusion_sql(task.model_name, Model._table))
+        return query
+
+    def _apply_chunk(self, task, records):
+        """One set-based ORM call per chunk. Per-record audit entries are replaced by the chunk summary."""
+        records = records.with_context(skip_audit_log=True)
+        if task.action == 'delete':
+            records.unlink()
+        elif task.action == 'anonymize':
+            getattr(records, task.anonymize_method)()
+        elif task.action == 'archive':
+            records.write({'active': False})
+        # Send the chunk's UPDATE/DELETE statements before committing.
+        self.env.flush_all()
+
+    # Checkpoints are stored in their own table so they survive crashes and restarts.
+
+    def _ensure_checkpoint_table(self):
+        if table_exists(self.env.cr, CHECKPOINT_TABLE):
+            return
+        self.env.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+                key varchar PRIMARY KEY,
+                cutoff timestamp NOT NULL,
+                last_id integer NOT NULL,
+                processed integer NOT NULL,
+                write_date timestamp NOT NULL
+            )
+        """)
+
+    def _load_checkpoint(self, key):
+        self.env.cr.execute(f"SELECT cutoff, last_id, processed FROM {CHECKPOINT_TABLE} WHERE key = %s", [key])
+        row = self.env.cr.fetchone()
+        if not row:
+            return None
+        return {'cutoff': row[0], 'last_id': row[1], 'processed': row[2]}
+
+    def _save_checkpoint(self, key, cutoff, last_id, processed):
+        self.env.cr.execute(f"""
+            INSERT INTO {CHECKPOINT_TABLE} (key, cutoff, last_id, processed, write_date)
+            VALUES (%s, %s, %s, %s, now() at time zone 'UTC')
+            ON CONFLICT (key) DO UPDATE
+               SET cutoff = EXCLUDED.cutoff, last_id = EXCLUDED.last_id,
+                   processed = EXCLUDED.processed, write_date = EXCLUDED.write_date
+        """, [key, cutoff, last_id, processed])
+
+    def _clear_checkpoint(self, key):
+        self.env.cr.execute(f"DELETE FROM {CHECKPOINT_TABLE} WHERE key = %s", [key])
+
+    def _committing(self):
+        return self.commit and not is_testing()
+
+    def _commit(self):
+        if self._committing():
+            self.env.cr.commit()
+
+    def _rollback(self):
+        if self._committing():
+            self.env.cr.rollback()
+            self.env.invalidate_all()
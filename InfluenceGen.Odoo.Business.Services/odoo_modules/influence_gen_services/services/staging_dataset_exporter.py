@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming exporter of anonymized datasets for staging refreshes (REQ-DMG-022).
+
+Anonymization is compiled into the SELECT of each model, so PostgreSQL masks,
+removes and pseudonymizes whole columns while the rows stream out: Python never
+sees original values and never loops field by field. Pseudonyms are keyed hashes
+of the original values, so the same value (e.g. a foreign key, or an email used
+in two models) gets the same pseudonym everywhere and across runs.
+
+Models are exported in parallel worker processes. The parent exports its
+transaction snapshot and every worker imports it, so all files describe the same
+instant of the database. Workers read through server-side cursors in chunks and
+write gzip-compressed CSV or JSONL files; they only use psycopg2 and the standard
+library, never the ORM.
+"""
+import csv
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import psycopg2
+
+from odoo import fields
+from odoo.sql_db import connection_info_for
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_MAX_WORKERS = 4
+EXPORT_FORMATS = ('csv', 'jsonl')
+PSEUDONYM_KEY_PARAM = 'influence_gen.staging_pseudonym_key'
+
+# Keyed hash of a value, as hex. `{key}` is the quoted pseudonym key literal.
+_HASH_SQL = "encode(sha256(convert_to({key} || {col}::text, 'UTF8')), 'hex')"
+
+# Anonymization techniques: SQL templates on the quoted column `{col}`.
+# 'faker.*' techniques produce realistic-looking pseudonyms without any faker dependency.
+TEXT_TECHNIQUES = {
+    'remove': "NULL",
+    'mask': "CASE WHEN {col} IS NULL THEN NULL ELSE '*****' END",
+    'mask_partially': ("CASE WHEN {col} IS NULL THEN NULL WHEN length({col}::text) > 5 "
+                       "THEN left({col}::text, 3) || '****' || right({col}::text, 2) ELSE '*****' END"),
+    'pseudonymize': "CASE WHEN {col} IS NULL THEN NULL ELSE left(" + _HASH_SQL + ", 16) END",
+    'faker.name': "CASE WHEN {col} IS NULL THEN NULL ELSE 'Person ' || left(" + _HASH_SQL + ", 8) END",
+    'faker.email': ("CASE WHEN {col} IS NULL THEN NULL "
+                    "ELSE 'user_' || left(" + _HASH_SQL + ", 12) || '@example.invalid' END"),
+    'faker.phone_number': ("CASE WHEN {col} IS NULL THEN NULL ELSE '+1555' || lpad(((('x' || left("
+                           + _HASH_SQL + ", 8))::bit(32)::bigint %% 10000000)::text), 7, '0') END"),
+    'faker.address': "CASE WHEN {col} IS NULL THEN NULL ELSE left(" + _HASH_SQL + ", 6) || ' Staging Street' END",
+}
+# Integer columns (ids, many2one) keep their type: pseudonymized foreign keys still join.
+# Pseudonyms stay within the positive int4 range (1 to 2^31 - 1), so they fit integer columns.
+INTEGER_PSEUDONYM_SQL = ("CASE WHEN {col} IS NULL THEN NULL "
+                         "ELSE ((('x' || left(" + _HASH_SQL + ", 8))::bit(32)::bigint %% 2147483647) + 1)::int END")
+INTEGER_COLUMN_TYPES = ('int4', 'int8')
+
+
+def _export_worker(task):
+    """
+    Streams one model to its output file. Runs in a worker process: must not touch Odoo.
+    :param dict task: connection_info, snapshot_id, query, columns, path, format, chunk_size, model
+    :return: dict with model, path, rows, bytes, seconds and error
+    """
+    started = time.monotonic()
+    result = {'model': task['model'], 'path': task['path'], 'rows': 0, 'bytes': 0, 'seconds': 0.0, 'error': None}
+    connection = psycopg2.connect(**task['connection_info'])
+    try:
+        connection.set_session(isolation_level='REPEATABLE READ', readonly=True)
+        with connection.cursor() as cr:
+            if task['snapshot_id']:
+                cr.execute("SET TRANSACTION SNAPSHOT %s", [task['snapshot_id']])
+        with gzip.open(task['path'], 'wt', encoding='utf-8', newline='') as stream, \
+                connection.cursor(name=f"staging_export_{os.getpid()}") as cr:
+            cr.itersize = task['chunk_size']
+            cr.execute(task['query'])
+            columns = task['columns']
+            if task['format'] == 'csv':
+                writer = csv.writer(stream)
+                writer.writerow(columns)
+            while True:
+                rows = cr.fetchmany(task['chunk_size'])
+                if not rows:
+                    break
+                if task['format'] == 'csv':
+                    writer.writerows(rows)
+                else:
+                    stream.write(''.join(
+                        json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False) + '\n' for row in rows))
+                result['rows'] += len(rows)
+        result['bytes'] = os.path.getsize(task['path'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        connection.close()
+    result['seconds'] = time.monotonic() - started
+    return result
+
+
+class StagingDatasetExporter:
+    """
+    Exports anonymized copies of models for staging.
+
+    :param env: Odoo Environment
+    :param str output_dir: directory of the files; defaults to a timestamped directory in the data dir
+    :param str export_format: 'csv' or 'jsonl' (gzip-compressed either way)
+    :param int chunk_size: rows fetched per round trip by the server-side cursors
+    :param int max_workers: models exported at once, each in its own process
+    """
+
+    def __init__(self, env, output_dir=None, export_format='csv', chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_MAX_WORKERS):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError("Unknown export format '%s'." % export_format)
+        self.env = env
+        self.output_dir = output_dir or os.path.join(
+            config['data_dir'], 'influence_gen_staging_exports', env.cr.dbname,
+            fields.Datetime.now().strftime('%Y%m%d_%H%M%S'))
+        self.export_format = export_format
+        self.chunk_size = max(int(chunk_size), 1)
+        self.max_workers = max(int(max_workers), 1)
+
+    def run(self, models_config):
+        """
+        Exports every configured model.
+        :param list models_config: dicts {'model', 'fields_to_anonymize': [{'name', 'technique'}],
+                                   'domain' (optional), 'fields' (optional, further columns exported as-is)}
+                                   Only `id`, the anonymized fields and the listed `fields` are exported.
+        :return: dict with output_dir, models (per-model rows, bytes, seconds, rows_per_second, path, error),
+                 total_rows, total_bytes, elapsed_seconds and rows_per_second
+        """
+        started = time.monotonic()
+        os.makedirs(self.output_dir, exist_ok=True)
+        tasks, skipped = [], []
+        for model_config in models_config:
+            task = self._build_task(model_config)
+            if isinstance(task, str):
+                _logger.warning(f"Staging export of {model_config.get('model')} skipped: {task}")
+                skipped.append({'model': model_config.get('model'), 'error': task, 'rows': 0, 'bytes': 0, 'seconds': 0.0})
+            else:
+                tasks.append(task)
+
+        # Workers read the snapshot of this transaction, which stays open until they are done.
+        self.env.cr.execute("SELECT pg_export_snapshot()")
+        snapshot_id = self.env.cr.fetchone()[0]
+        connection_info = dict(connection_info_for(self.env.cr.dbname)[1])
+        for task in tasks:
+            task.update(snapshot_id=snapshot_id, connection_info=connection_info)
+
+        results = []
+        if tasks:
+            # Forked workers only run _export_worker: they open their own connection and never use
+            # the inherited Odoo cursors. (Spawned ones could not import the addon: no addons path.)
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(tasks)),
+                                     mp_context=multiprocessing.get_context('fork')) as executor:
+                results = list(executor.map(_export_worker, tasks))
+
+        summary_models = []
+        for result in results + skipped:
+            result['rows_per_second'] = round(result['rows'] / result['seconds']) if result['seconds'] else 0
+            summary_models.append(result)
+            if result.get('path') and not result['error']:
+                _logger.info(f"Staging export of {result['model']}: {result['rows']} rows, {result['bytes']} bytes "
+                             f"in {result['seconds']:.1f}s ({result['rows_per_second']} rows/s).")
+            elif result.get('path'):
+                _logger.error(f"Staging export of {result['model']} failed: {result['error']}")
+        elapsed = time.monotonic() - started
+        total_rows = sum(result['rows'] for result in summary_models)
+        summary = {
+            'output_dir': self.output_dir,
+            'models': summary_models,
+            'total_rows': total_rows,
+            'total_bytes': sum(result['bytes'] for result in summary_models),
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(total_rows / elapsed) if elapsed else 0,
+        }
+        _logger.info(f"Staging export finished: {total_rows} rows in {elapsed:.1f}s to {self.output_dir}.")
+        return summary
+
+    def _build_task(self, model_config):
+        """:return: worker task dict, or an error message"""
+        model_name = model_config.get('model')
+        if not model_name or model_name not in self.env:
+            return "unknown model"
+        Model = self.env[model_name].sudo().with_context(active_test=False)
+        fields_to_anonymize = model_config.get('fields_to_anonymize') or []
+        columns = self._get_columns(
+            Model, [field_config.get('name') for field_config in fields_to_anonymize] + list(model_config.get('fields') or []))
+        techniques = {}
+        for field_config in fields_to_anonymize:
+            name, technique = field_config.get('name'), field_config.get('technique')
+            if name not in columns:
+                return f"field '{name}' is not an exported column"
+            if technique not in TEXT_TECHNIQUES and technique != 'pseudonymize':
+                return f"unknown technique '{technique}' for field '{name}'"
+            techniques[name] = technique
+
+        key_literal = self.env.cr.mogrify("%s", [self._get_pseudonym_key()]).decode() if techniques else None
+        select = ", ".join(
+            self._column_expression(Model, column, techniques.get(column), key_literal) for column in columns)
+        query = f'SELECT {select} FROM "{Model._table}"'
+        domain = model_config.get('domain') or []
+        if domain:
+            subselect = Model._search(domain).subselect()
+            query += f" WHERE id IN ({subselect.code})"
+            params = list(subselect.params)
+        else:
+            params = []
+        query += " ORDER BY id"
+        # Bind everything now: workers receive plain SQL.
+        bound_query = self.env.cr.mogrify(query, params).decode()
+        path = os.path.join(self.output_dir, f"{model_name.replace('.', '_')}.{self.export_format}.gz")
+        return {
+            'model': model_name,
+            'query': bound_query,
+            'columns': columns,
+            'path': path,
+            'format': self.export_format,
+            'chunk_size': self.chunk_size,
+        }
+
+    def _get_columns(self, Model, requested):
+        """
+        Stored columns to export, in field order: `id` and the requested ones only, so a
+        column nobody listed (e.g. a normalized copy of a masked value) never leaks.
+        """
+        requested = set(requested)
+        return [
+            name for name, field in Model._fields.items()
+            if (name == 'id' or name in requested)
+            and field.store and field.column_type and not (field.type == 'binary' and field.attachment)
+        ]
+
+    def _column_expression(self, Model, column, technique, key_literal):
+        quoted = f'"{column}"'
+        if not technique:
+            return quoted
+        column_type = Model._fields[column].column_type[0]
+        if technique == 'pseudonymize' and column_type in INTEGER_COLUMN_TYPES:
+            template = INTEGER_PSEUDONYM_SQL
+        else:
+            template = TEXT_TECHNIQUES[technique]
+        return f"{template.format(col=quoted, key=key_literal)} AS {quoted}"
+
+    def _get_pseudonym_key(self):
+        """Secret key of the pseudonyms, created on first use and kept so pseudonyms are stable across runs."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        key = ICP.get_param(PSEUDONYM_KEY_PARAM)
+        if not key:
+            key = os.urandom(32).hex()
+            ICP.set_param(PSEUDONYM_KEY_PARAM, key)
+        return key
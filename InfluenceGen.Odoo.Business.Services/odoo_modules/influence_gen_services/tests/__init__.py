@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+from . import test_performance_summary_service
+from . import test_n8n_dispatch_service
+from . import test_kyc_verification_queue_service
+from . import test_influencer_deduplication_service
+from . import test_legal_hold_propagation_service
+from . import test_legal_hold_index
+from . import test_campaign_kpi_aggregation_service
+from . import test_ai_quota_ledger
+from . import test_base_audit_mixin
+from . import test_audit_log_partitions
+from . import test_campaign_discovery_service
+from . import test_broadcast_notification_service
+from . import test_staging_dataset_exporter
+from . import test_data_quality_service
+from . import test_platform_setting
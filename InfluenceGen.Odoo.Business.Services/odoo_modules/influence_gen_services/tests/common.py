@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class InfluenceGenServicesCase(TransactionCase):
+    """Fixtures shared by the service tests: influencers, campaigns, applications, submissions, payments."""
+
+    def _create_influencer(self, name='Test Influencer', **vals):
+        login = name.lower().replace(' ', '_')
+        user = self.env['res.users'].create({'name': name, 'login': login})
+        return self.env['influence_gen.influencer_profile'].create(dict({
+            'user_id': user.id,
+            'full_name': name,
+            'email': f'{login}@example.com',
+        }, **vals))
+
+    def _create_campaign(self, name='Test Campaign', **vals):
+        today = fields.Date.today()
+        return self.env['influence_gen.campaign'].create(dict({
+            'name': name,
+            'status': 'published',
+            'start_date': today,
+            'end_date': today + timedelta(days=30),
+        }, **vals))
+
+    def _create_application(self, campaign, influencer, status='approved'):
+        application = self.env['influence_gen.campaign_application'].create({
+            'campaign_id': campaign.id,
+            'influencer_profile_id': influencer.id,
+        })
+        if status != application.status:
+            application.write({'status': status})
+        return application
+
+    def _create_submission(self, application, **vals):
+        return self.env['influence_gen.content_submission'].create(dict({
+            'campaign_application_id': application.id,
+            'content_url': 'https://social.example.com/posts/1',
+        }, **vals))
+
+    def _create_payment(self, influencer, campaign, amount, status='pending'):
+        return self.env['influence_gen.payment_record'].create({
+            'influencer_profile_id': influencer.id,
+            'campaign_id': campaign.id,
+            'amount': amount,
+            'status': status,
+        })
+
+    def _set_setting(self, key, value, value_type='int'):
+        """Creates or updates the platform setting `key`."""
+        vals = {'value_type': value_type, f'value_{value_type}': value, 'active': True}
+        setting = self.env['influence_gen.platform_setting'].with_context(active_test=False).search([('key', '=', key)])
+        if setting:
+            setting.write(vals)
+        else:
+            setting = self.env['influence_gen.platform_setting'].create(dict(vals, key=key))
+        return setting
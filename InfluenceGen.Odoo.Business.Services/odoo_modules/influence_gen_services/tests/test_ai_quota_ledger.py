@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import tagged
+
+from ..services.ai_integration_service import AiIntegrationService
+from .common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestAiQuotaLedger(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Ledger = self.env['influence_gen.ai_quota_ledger']
+        self._set_setting('ai.image_generation.default_monthly_quota', 5)
+        self.influencer = self._create_influencer()
+        self.ai_model = self.env['influence_gen.ai_image_model'].create({'name': 'Test Model'})
+
+    def _ledger(self):
+        return self.Ledger.search([
+            ('influencer_profile_id', '=', self.influencer.id),
+            ('period_start', '=', self.Ledger._get_period_start()),
+        ])
+
+    def _create_request(self, units):
+        period_start = self.Ledger.reserve_units(self.influencer.id, units)
+        self.assertTrue(period_start)
+        return self.env['influence_gen.ai_image_generation_request'].create({
+            'influencer_profile_id': self.influencer.id,
+            'prompt': 'A city skyline at dusk',
+            'model_id': self.ai_model.id,
+            'num_images_requested': units,
+            'status': 'processing_n8n',
+            'quota_period_start': period_start,
+            'quota_units_reserved': units,
+        })
+
+    def test_reservations_stay_within_the_limit(self):
+        self.assertEqual(self.Ledger.get_remaining_units(self.influencer.id), 5, "No row yet: the default limit.")
+        self.assertTrue(self.Ledger.reserve_units(self.influencer.id, 3))
+        self.assertFalse(self.Ledger.reserve_units(self.influencer.id, 3), "3 + 3 exceeds the limit of 5.")
+        self.assertTrue(self.Ledger.reserve_units(self.influencer.id, 2))
+        ledger = self._ledger()
+        self.assertEqual((ledger.quota_limit, ledger.reserved_units, ledger.used_units), (5, 5, 0))
+        self.assertEqual(self.Ledger.get_remaining_units(self.influencer.id), 0)
+
+    def test_settle_converts_reservation_into_usage(self):
+        period_start = self.Ledger.reserve_units(self.influencer.id, 4)
+        self.Ledger.settle_units(self.influencer.id, period_start, 4, 3)
+        ledger = self._ledger()
+        self.assertEqual((ledger.reserved_units, ledger.used_units), (0, 3))
+        self.assertEqual(self.Ledger.get_remaining_units(self.influencer.id), 2)
+
+    def test_request_settled_once(self):
+        request = self._create_request(2)
+        self.assertTrue(request._settle_quota_reservation(2))
+        self.assertFalse(request._settle_quota_reservation(2), "A duplicate callback settles nothing.")
+        self.assertEqual((self._ledger().reserved_units, self._ledger().used_units), (0, 2))
+
+    def test_error_callback_releases_reservation(self):
+        request = self._create_request(3)
+        service = AiIntegrationService(self.env)
+        service.handle_n8n_image_error_callback(request.id, 'Upstream model timeout', 'exec-1')
+        service.handle_n8n_image_error_callback(request.id, 'Upstream model timeout', 'exec-1')
+        self.assertEqual(request.status, 'failed')
+        self.assertEqual((self._ledger().reserved_units, self._ledger().used_units), (0, 0))
+        self.assertEqual(self.Ledger.get_remaining_units(self.influencer.id), 5)
+
+    def test_open_period_is_idempotent(self):
+        self.assertEqual(self.Ledger.open_period(influencer_profile_ids=[self.influencer.id]), 1)
+        self.assertEqual(self.Ledger.open_period(influencer_profile_ids=[self.influencer.id]), 0)
+        self.assertEqual(len(self._ledger()), 1)
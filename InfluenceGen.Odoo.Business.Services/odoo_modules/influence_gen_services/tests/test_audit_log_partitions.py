@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from datetime import datetime
+
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields
+from odoo.tests.common import tagged
+
+from ..models.audit_log import PARTITION_MONTHS_AHEAD
+from .common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestAuditLogPartitions(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.AuditLog = self.env['influence_gen.audit_log']
+        # A month older than any partition, so retention in these tests only ever touches it.
+        self.old_month = self.AuditLog._get_month_partitions()[0][0] - relativedelta(months=1)
+        self.old_partition = self.AuditLog._partition_name(self.old_month)
+        self.assertEqual(self.AuditLog._ensure_partitions(self.old_month), [self.old_partition])
+
+    def _create_entry(self, timestamp, **vals):
+        entry = self.AuditLog.create(dict({
+            'timestamp': timestamp,
+            'event_type': 'test.event',
+            'action': 'test',
+            'outcome': 'success',
+        }, **vals))
+        self.AuditLog.flush_model()
+        return entry
+
+    def _partition_of(self, entry):
+        self.env.cr.execute(f"SELECT tableoid::regclass::text FROM {self.AuditLog._table} WHERE id = %s", [entry.id])
+        return self.env.cr.fetchone()[0]
+
+    def _old_timestamp(self):
+        return datetime.combine(self.old_month, datetime.min.time()) + relativedelta(days=3)
+
+    def test_table_partitioned_by_month(self):
+        self.assertEqual(self.AuditLog._get_table_relkind(), 'p')
+        months = [month for month, _partition in self.AuditLog._get_month_partitions()]
+        current_month = fields.Date.today().replace(day=1)
+        for offset in range(PARTITION_MONTHS_AHEAD + 1):
+            self.assertIn(current_month + relativedelta(months=offset), months)
+        self.assertEqual(self.AuditLog._ensure_partitions(), [], "Partitions are only created once.")
+
+    def test_entries_routed_to_their_month(self):
+        current = self._create_entry(fields.Datetime.now())
+        old = self._create_entry(self._old_timestamp())
+        self.assertEqual(self._partition_of(current), self.AuditLog._partition_name(fields.Date.today().replace(day=1)))
+        self.assertEqual(self._partition_of(old), self.old_partition)
+
+    def test_time_range_query_pruned_to_one_partition(self):
+        month_end = self.old_month + relativedelta(months=1)
+        self.env.cr.execute(f"""
+            EXPLAIN SELECT id FROM {self.AuditLog._table}
+             WHERE "timestamp" >= %s AND "timestamp" < %s
+        """, [self.old_month, month_end])
+        plan = "\n".join(row[0] for row in self.env.cr.fetchall())
+        self.assertIn(self.old_partition, plan)
+        self.assertNotIn(self.AuditLog._partition_name(fields.Date.today().replace(day=1)), plan)
+
+    def test_retention_drops_expired_partitions(self):
+        old = self._create_entry(self._old_timestamp())
+        cutoff = self.old_month + relativedelta(months=1)
+        self.assertEqual(self.AuditLog._apply_partition_retention(cutoff, dry_run=True), [self.old_partition])
+        self.assertTrue(old.exists())
+        self.assertEqual(self.AuditLog._apply_partition_retention(cutoff - relativedelta(days=1)), [],
+                         "A partition is only expired once its whole month is.")
+
+        self.assertEqual(self.AuditLog._apply_partition_retention(cutoff), [self.old_partition])
+        self.assertFalse(old.exists())
+        self.assertNotIn(self.old_partition, [name for _month, name in self.AuditLog._get_month_partitions()])
+
+    def test_retention_archive_detaches_partition(self):
+        old = self._create_entry(self._old_timestamp())
+        self.AuditLog._apply_partition_retention(self.old_month + relativedelta(months=1), action='archive')
+        self.assertFalse(old.exists())
+        self.env.cr.execute(f'SELECT count(*) FROM "{self.old_partition}"')
+        self.assertEqual(self.env.cr.fetchone()[0], 1, "The detached table keeps the entries.")
+
+    def test_retention_keeps_partitions_under_legal_hold(self):
+        old = self._create_entry(self._old_timestamp(), legal_hold_status=True)
+        self.assertEqual(self.AuditLog._apply_partition_retention(self.old_month + relativedelta(months=1)), [])
+        self.assertTrue(old.exists())
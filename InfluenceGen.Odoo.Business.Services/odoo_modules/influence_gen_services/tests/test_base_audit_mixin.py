@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import json
+from unittest.mock import patch
+
+from odoo.tests.common import tagged
+
+from ..models import base_audit_mixin
+from ..models.base_audit_mixin import AUDIT_BUFFER_KEY
+from .common import InfluenceGenServicesCase
+
+AREA_MODEL = 'influence_gen.area_of_influence'
+
+
+@tagged('post_install', '-at_install')
+class TestBaseAuditMixin(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Area = self.env[AREA_MODEL]
+        self.AuditLog = self.env['influence_gen.audit_log']
+        self.Area.flush_audit_buffer()
+
+    def _buffered(self):
+        return self.env.cr.precommit.data.get(AUDIT_BUFFER_KEY) or []
+
+    def _entries(self, records, action):
+        self.Area.flush_audit_buffer()
+        return self.AuditLog.search([
+            ('target_model', '=', records._name), ('target_res_id', 'in', records.ids), ('action', '=', action),
+        ], order='id')
+
+    def test_events_written_at_flush(self):
+        area = self.Area.create({'name': 'Fashion'})
+        self.assertEqual(len(self._buffered()), 1)
+        self.assertFalse(self.AuditLog.search_count([('target_model', '=', AREA_MODEL), ('target_res_id', '=', area.id)]),
+                         "Events wait for the pre-commit flush.")
+        entry = self._entries(area, 'create')
+        self.assertEqual(len(entry), 1)
+        self.assertEqual(json.loads(entry.details_json), {'created_values': {'name': 'Fashion'}})
+        self.assertEqual((entry.event_type, entry.user_id), (f'{AREA_MODEL}.create', self.env.user))
+        self.assertFalse(self._buffered())
+
+    def test_write_logs_old_values_per_record(self):
+        areas = self.Area.create([{'name': 'Fashion'}, {'name': 'Travel'}])
+        areas.write({'name': 'Lifestyle'})
+        entries = self._entries(areas, 'write')
+        self.assertEqual(len(entries), 2)
+        old_names = {entry.target_res_id: json.loads(entry.details_json)['old_values']['name'] for entry in entries}
+        self.assertEqual(old_names, {areas[0].id: 'Fashion', areas[1].id: 'Travel'})
+
+    def test_skip_audit_log_context(self):
+        area = self.Area.create({'name': 'Fashion'})
+        self.Area.flush_audit_buffer()
+        area.with_context(skip_audit_log=True).write({'name': 'Travel'})
+        self.assertFalse(self._buffered())
+
+    def test_field_allowlist_setting(self):
+        influencer = self._create_influencer()
+        self._set_setting('audit.field_allowlist', json.dumps({AREA_MODEL: ['influencer_profile_ids']}), value_type='json')
+        area = self.Area.create({'name': 'Fashion'})
+        area.write({'name': 'Travel'})
+        self.assertFalse(self._entries(area, 'write'))
+        area.write({'influencer_profile_ids': [(4, influencer.id)]})
+        self.assertEqual(len(self._entries(area, 'write')), 1)
+
+    def test_unlink_logged(self):
+        area = self.Area.create({'name': 'Fashion'})
+        area_id = area.id
+        area.unlink()
+        self.Area.flush_audit_buffer()
+        entry = self.AuditLog.search([('target_model', '=', AREA_MODEL), ('target_res_id', '=', area_id),
+                                      ('action', '=', 'unlink')])
+        self.assertEqual(json.loads(entry.details_json)['unlinked_record_display_name'], 'Fashion')
+
+    def test_flush_batches_inserts(self):
+        self.Area.create([{'name': f'Area {index}'} for index in range(5)])
+        with patch.object(base_audit_mixin, 'AUDIT_INSERT_BATCH_SIZE', 2), \
+                patch.object(self.env.cr, 'execute', wraps=self.env.cr.execute) as execute:
+            self.Area.flush_audit_buffer()
+        inserts = [call for call in execute.call_args_list if 'INSERT INTO influence_gen_audit_log' in call.args[0]]
+        self.assertEqual(len(inserts), 3)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import tagged
+
+from ..services.broadcast_notification_service import RECIPIENT_TABLE, BroadcastNotificationService
+from .common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestBroadcastNotificationService(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = BroadcastNotificationService(self.env)
+        self.group = self.env['res.groups'].create({'name': 'Broadcast Audience'})
+        Users = self.env['res.users']
+        self.jane = Users.create({'name': 'Jane Doe', 'login': 'jane', 'email': 'Jane.Doe@Example.com'})
+        self.jane_alias = Users.create({'name': 'J. Doe', 'login': 'jdoe', 'email': '"Jane" <jane.doe@example.com>'})
+        self.john = Users.create({'name': 'John Roe', 'login': 'john', 'email': 'john.roe@example.com'})
+        self.no_email = Users.create({'name': 'No Email', 'login': 'no_email'})
+        self.archived = Users.create({'name': 'Archived', 'login': 'archived', 'email': 'archived@example.com', 'active': False})
+        self.group.users = self.jane | self.jane_alias | self.john | self.no_email | self.archived
+
+    def _recipients(self, broadcast):
+        self.env.cr.execute(
+            f"SELECT email_normalized, partner_id, state FROM {RECIPIENT_TABLE} WHERE broadcast_id = %s "
+            "ORDER BY email_normalized", [broadcast.id])
+        return self.env.cr.fetchall()
+
+    def test_recipients_deduplicated_by_normalized_email(self):
+        broadcast = self.service.create_broadcast('Maintenance', '<p>Down tonight</p>', group_ids=[self.group.id])
+        self.assertEqual(broadcast.recipient_count, 2)
+        self.assertEqual(self._recipients(broadcast), [
+            ('jane.doe@example.com', self.jane.partner_id.id, 'pending'),
+            ('john.roe@example.com', self.john.partner_id.id, 'pending'),
+        ], "One row per address, the oldest partner first; inactive users and users without email are left out.")
+        self.assertEqual(broadcast.state, 'sending')
+
+    def test_overlapping_targets_counted_once(self):
+        influencer = self._create_influencer('Jane Influencer')
+        influencer.user_id.email = 'JANE.DOE@example.com'
+        broadcast = self.service.create_broadcast(
+            'Maintenance', '<p>Down tonight</p>', group_ids=[self.group.id], influencer_ids=[influencer.id])
+        self.assertEqual([row[0] for row in self._recipients(broadcast)], ['jane.doe@example.com', 'john.roe@example.com'])
+
+    def test_empty_audience_is_done(self):
+        empty_group = self.env['res.groups'].create({'name': 'Nobody'})
+        broadcast = self.service.create_broadcast('Maintenance', '<p>Down tonight</p>', group_ids=[empty_group.id])
+        self.assertEqual((broadcast.recipient_count, broadcast.state), (0, 'done'))
+
+    def test_send_pending_drains_queue(self):
+        self._set_setting('broadcast.batch_size', 1)
+        broadcast = self.service.create_broadcast('Maintenance', '<p>Down tonight</p>', group_ids=[self.group.id])
+        stats = self.service.send_pending()
+        self.assertEqual(stats, {'sent': 2, 'failed': 0})
+        self.assertEqual([row[2] for row in self._recipients(broadcast)], ['sent', 'sent'])
+        self.assertEqual((broadcast.state, broadcast.sent_count, broadcast.progress), ('done', 2, 100.0))
+
+    def test_send_pending_throttled(self):
+        self._set_setting('broadcast.max_emails_per_minute', 1)
+        broadcast = self.service.create_broadcast('Maintenance', '<p>Down tonight</p>', group_ids=[self.group.id])
+        self.assertEqual(self.service.send_pending(), {'sent': 1, 'failed': 0})
+        self.assertEqual((broadcast.state, broadcast.sent_count), ('sending', 1))
+        self.service.send_pending()
+        self.assertEqual((broadcast.state, broadcast.sent_count), ('sending', 2))
+        self.assertEqual(self.service.send_pending(), {'sent': 0, 'failed': 0})
+        self.assertEqual(broadcast.state, 'done', "The next run finds the queue drained.")
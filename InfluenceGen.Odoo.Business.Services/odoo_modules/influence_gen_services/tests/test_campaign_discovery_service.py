@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests.common import tagged
+
+from ..services.campaign_discovery_service import SORT_OPTIONS, CampaignDiscoveryService
+from .common import InfluenceGenServicesCase
+
+# Word only the test campaigns contain, so pages never include other campaigns of the database.
+SEARCH_TERM = 'zephyrquill'
+
+
+@tagged('post_install', '-at_install')
+class TestCampaignDiscoveryService(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = CampaignDiscoveryService(self.env)
+        self.influencer = self._create_influencer()
+        now = fields.Datetime.now()
+        # Ties on every sort value (amounts, deadlines, write dates, ranks), broken by the campaign id.
+        self.campaigns = self.env['influence_gen.campaign']
+        for index, (amount, deadline_days) in enumerate([(100, 5), (250, None), (100, 5), (400, 9), (250, None), (0, 2), (100, 9)]):
+            self.campaigns |= self._create_campaign(
+                f'Campaign {index} {SEARCH_TERM}' if index % 2 else f'Campaign {index}',
+                description=f'Spring collection {SEARCH_TERM}',
+                compensation_model_type='flat_fee',
+                compensation_details=str(amount),
+                submission_deadline=now + timedelta(days=deadline_days) if deadline_days else False,
+            )
+        self.campaigns.flush_model()
+        self.env.cr.execute(
+            "UPDATE influence_gen_campaign SET write_date = write_date - (id %% 3) * interval '1 hour' WHERE id = ANY(%s)",
+            [self.campaigns.ids])
+        self.campaigns.invalidate_recordset(['write_date'])
+
+    def _browse_all_pages(self, sort_by, limit=2):
+        pages, cursor = [], None
+        while True:
+            result = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by=sort_by, limit=limit, after=cursor)
+            self.assertEqual(result['sort_by'], sort_by)
+            pages.append(result['campaigns'])
+            cursor = result['next_cursor']
+            if not cursor:
+                return pages
+            self.assertLessEqual(len(pages), len(self.campaigns), "Pagination must end.")
+
+    def test_cursor_round_trip_for_every_sort(self):
+        for sort_by in SORT_OPTIONS:
+            with self.subTest(sort_by=sort_by):
+                expected = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by=sort_by, limit=50)
+                self.assertEqual(expected['total'], len(self.campaigns))
+                self.assertFalse(expected['next_cursor'])
+                pages = self._browse_all_pages(sort_by)
+                self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+                paged_ids = [campaign_id for page in pages for campaign_id in page.ids]
+                self.assertEqual(paged_ids, expected['campaigns'].ids, "Pages follow the single-page order.")
+
+    def test_sort_orders(self):
+        result = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by='compensation_amount desc', limit=50)
+        amounts = result['campaigns'].mapped('compensation_amount')
+        self.assertEqual(amounts, sorted(amounts, reverse=True))
+        result = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by='submission_deadline asc', limit=50)
+        self.assertFalse(result['campaigns'][-1].submission_deadline, "Campaigns without a deadline come last.")
+        result = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by='relevance', limit=50)
+        self.assertIn(SEARCH_TERM, result['campaigns'][0].name, "Name matches outrank description matches.")
+
+    def test_cursor_of_another_sort_ignored(self):
+        first_page = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by='write_date desc', limit=2)
+        result = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by='compensation_amount desc',
+                                     limit=2, after=first_page['next_cursor'])
+        restart = self.service.search(self.influencer.id, search=SEARCH_TERM, sort_by='compensation_amount desc', limit=2)
+        self.assertEqual(result['campaigns'], restart['campaigns'])
+
+    def test_malformed_cursor_values_rejected(self):
+        for sort_by, value in (('compensation_amount desc', '100'), ('compensation_amount desc', float('inf')),
+                               ('write_date desc', 42), ('write_date desc', '2024-01-01T00:00:00+02:00'),
+                               ('relevance', True)):
+            with self.subTest(sort_by=sort_by, value=value):
+                cursor = self.service._encode_cursor(sort_by, value, self.campaigns[0].id)
+                self.assertIsNone(self.service._decode_cursor(cursor, sort_by))
+        self.assertIsNone(self.service._decode_cursor('not-a-cursor', 'write_date desc'))
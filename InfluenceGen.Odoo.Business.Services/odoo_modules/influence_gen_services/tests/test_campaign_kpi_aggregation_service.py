@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.tests.common import tagged
+
+from ..services.campaign_kpi_aggregation_service import STALE_TABLE, CampaignKpiAggregationService
+from .common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestCampaignKpiAggregationService(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = CampaignKpiAggregationService(self.env)
+        self.Rollup = self.env['influence_gen.campaign_performance_rollup']
+        self.influencer = self._create_influencer()
+        self.campaign = self._create_campaign()
+        self.application = self._create_application(self.campaign, self.influencer)
+        # Start from an empty queue: only the changes made by each test are stale.
+        self.env.cr.execute(f"DELETE FROM {STALE_TABLE}")
+
+    def _stale_campaign_ids(self):
+        self.env.cr.execute(f"SELECT campaign_id FROM {STALE_TABLE}")
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def _create_approved(self, application=None, data=None):
+        return self._create_submission(
+            application or self.application, review_status='approved',
+            performance_data_json=json.dumps(data) if isinstance(data, dict) else data)
+
+    # ------------------------------------------------------------------
+    # Stale marking
+    # ------------------------------------------------------------------
+
+    def test_create_marks_campaign_stale(self):
+        self._create_submission(self.application)
+        self.assertFalse(self._stale_campaign_ids(), "Pending submissions are not in the rollups.")
+        self._create_approved()
+        self.assertEqual(self._stale_campaign_ids(), {self.campaign.id})
+
+    def test_write_marks_campaign_stale(self):
+        submission = self._create_submission(self.application)
+        submission.write({'file_type': 'image/png'})
+        self.assertFalse(self._stale_campaign_ids())
+        submission.action_approve_content()
+        self.assertEqual(self._stale_campaign_ids(), {self.campaign.id})
+
+        self.service.refresh_stale()
+        submission.write({'review_status': 'rejected'})
+        self.assertEqual(self._stale_campaign_ids(), {self.campaign.id}, "Its approved metrics must leave the rollups.")
+
+    def test_unlink_marks_campaign_stale(self):
+        submission = self._create_approved()
+        self.service.refresh_stale()
+        submission.unlink()
+        self.assertEqual(self._stale_campaign_ids(), {self.campaign.id})
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def test_cron_refresh_builds_rollups(self):
+        self._create_approved(data={'reach': 1000, 'views': 1500, 'likes': 40, 'comments': 5, 'clicks': 12})
+        self._create_approved(data={'reach': 'n/a', 'likes': 10, 'shares': 3, 'conversions': 2})
+        self._create_approved(data='not json')
+        self._create_submission(self.application, performance_data_json=json.dumps({'reach': 5000}))
+        other = self._create_influencer('Other Influencer')
+        self._create_approved(self._create_application(self.campaign, other), data={'reach': 200, 'saves': 7})
+
+        self.assertEqual(self.Rollup._cron_refresh_stale(), 1)
+
+        self.assertFalse(self._stale_campaign_ids())
+        rows = self.Rollup.search([('campaign_id', '=', self.campaign.id)])
+        self.assertEqual(len(rows), 2, "One row per influencer and day.")
+        row = rows.filtered(lambda r: r.influencer_profile_id == self.influencer)
+        self.assertEqual(row.submission_count, 3, "Invalid JSON counts as an empty document.")
+        self.assertEqual((row.reach, row.views, row.engagement, row.clicks, row.conversions),
+                         (1000.0, 1500.0, 58.0, 12.0, 2.0))
+        totals = self.service.get_campaign_totals([self.campaign.id])[self.campaign.id]
+        self.assertEqual((totals['submission_count'], totals['reach'], totals['engagement']), (4, 1200.0, 65.0))
+        self.assertAlmostEqual(totals['engagement_rate'], 65.0 / 1200.0)
+
+    def test_refresh_replaces_previous_rollups(self):
+        submission = self._create_approved(data={'reach': 100})
+        self.service.refresh_stale()
+        submission.write({'performance_data_json': json.dumps({'reach': 300})})
+        self.service.refresh_stale()
+        self.assertEqual(self.service.get_campaign_totals([self.campaign.id])[self.campaign.id]['reach'], 300.0)
+
+    def test_metric_keys_setting(self):
+        self._set_setting('kpi.rollup_metric_keys', json.dumps({'reach': ['impressions']}), value_type='json')
+        self._create_approved(data={'reach': 100, 'impressions': 700})
+        self.service.refresh_stale()
+        self.assertEqual(self.service.get_campaign_totals([self.campaign.id])[self.campaign.id]['reach'], 700.0)
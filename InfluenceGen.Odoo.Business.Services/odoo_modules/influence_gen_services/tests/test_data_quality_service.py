@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.tests.common import tagged
+from odoo.tools import mute_logger
+
+from ..services.data_quality_service import SCAN_STATE_TABLE, DataQualityService
+from .common import InfluenceGenServicesCase
+
+PROFILE_MODEL = 'influence_gen.influencer_profile'
+# Rules of these tests live under their own prefix, away from the shipped ones.
+PREFIX = 'test_data_quality.'
+
+
+@tagged('post_install', '-at_install')
+class TestDataQualityService(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = DataQualityService(self.env)
+        self.Issue = self.env['influence_gen.data_quality_issue']
+        self.missing_phone = self._create_influencer('Missing Phone', residential_address='1 Main Street')
+        self.complete = self._create_influencer('Complete Profile', residential_address='2 Main Street', phone='+1 555 0100')
+        self.no_address = self._create_influencer('No Address')
+        self.profiles = self.missing_phone | self.complete | self.no_address
+
+    def _set_rule(self, code, **rule):
+        rule = dict({'model': PROFILE_MODEL, 'domain': [['id', 'in', self.profiles.ids]]}, **rule)
+        self._set_setting(PREFIX + code, json.dumps(rule), value_type='json')
+
+    def _scan(self, **kwargs):
+        return self.service.scan(prefix=PREFIX, **kwargs)
+
+    def _open_issue_ids(self, code):
+        return set(self.Issue.search([('rule_code', '=', code), ('state', '=', 'open')]).mapped('res_id'))
+
+    def _age(self):
+        """Moves the previous scans an hour back, and the profiles' last writes two hours back."""
+        self.env.flush_all()
+        self.env.cr.execute(f"UPDATE {SCAN_STATE_TABLE} SET scanned_at = scanned_at - interval '1 hour'")
+        self.env.cr.execute("""
+            UPDATE influence_gen_data_quality_issue
+               SET first_detected_at = first_detected_at - interval '1 hour',
+                   last_detected_at = last_detected_at - interval '1 hour'
+        """)
+        self.env.cr.execute(
+            "UPDATE influence_gen_influencer_profile SET write_date = write_date - interval '2 hours' WHERE id = ANY(%s)",
+            [self.profiles.ids])
+        self.env.invalidate_all()
+
+    def test_sql_and_python_engines_agree(self):
+        for check in ({'field': 'phone', 'check': 'required_if', 'depends_on': 'residential_address'},
+                      {'field': 'full_name', 'check': 'regex', 'pattern': '^[A-Z][a-z]+ P'},
+                      {'field': 'phone', 'check': 'max_length', 'max_length': 8}):
+            self._set_rule(f"{check['check']}_sql", **check)
+            self._set_rule(f"{check['check']}_python", sql=False, **check)
+        stats = self._scan()
+        self.assertEqual(stats['required_if_sql']['engine'], 'sql')
+        self.assertEqual(stats['required_if_python']['engine'], 'python')
+        self.assertEqual(self._open_issue_ids('required_if_sql'), {self.missing_phone.id})
+        self.assertEqual(self._open_issue_ids('regex_sql'), {self.no_address.id})
+        self.assertEqual(self._open_issue_ids('max_length_sql'), {self.complete.id})
+        for code in ('required_if', 'regex', 'max_length'):
+            self.assertEqual(self._open_issue_ids(f'{code}_sql'), self._open_issue_ids(f'{code}_python'))
+
+    def test_email_check_runs_in_python(self):
+        self.no_address.write({'email': 'not-an-email'})
+        self._set_rule('email', field='email', check='email', severity='error')
+        self.assertEqual(self._scan()['email']['engine'], 'python')
+        issue = self.Issue.search([('rule_code', '=', 'email')])
+        self.assertEqual((issue.res_id, issue.severity, issue.state), (self.no_address.id, 'error', 'open'))
+
+    def test_incremental_scan_resolves_fixed_records(self):
+        self._set_rule('phone', field='phone', check='required_if', depends_on='residential_address')
+        self.assertEqual(self._scan()['phone']['detected'], 1)
+        self._age()
+
+        self.missing_phone.write({'phone': '+1 555 0101'})
+        stats = self._scan()['phone']
+        self.assertTrue(stats['checked_since'])
+        self.assertEqual((stats['detected'], stats['resolved']), (0, 1))
+        self.assertFalse(self._open_issue_ids('phone'))
+
+    def test_incremental_scan_only_reads_changed_records(self):
+        self._set_rule('phone', field='phone', check='required_if', depends_on='residential_address')
+        self._scan()
+        self._age()
+        # Changed behind the ORM's back: write_date stays old, so only a full scan notices.
+        self.env.cr.execute("UPDATE influence_gen_influencer_profile SET phone = NULL WHERE id = %s", [self.complete.id])
+        self.assertEqual(self._scan()['phone']['detected'], 0)
+        self.assertEqual(self._open_issue_ids('phone'), {self.missing_phone.id})
+        self.assertEqual(self._scan(full=True)['phone']['detected'], 2)
+        self.assertEqual(self._open_issue_ids('phone'), {self.missing_phone.id, self.complete.id})
+
+    def test_changed_rule_rescans_everything(self):
+        self._set_rule('phone', field='phone', check='required_if', depends_on='residential_address')
+        self._scan()
+        self._age()
+        self._set_rule('phone', field='phone', check='required')
+        stats = self._scan()['phone']
+        self.assertIsNone(stats['checked_since'])
+        self.assertEqual(self._open_issue_ids('phone'), {self.missing_phone.id, self.no_address.id})
+
+    def test_deleted_record_issue_resolved(self):
+        self._set_rule('phone', field='phone', check='required_if', depends_on='residential_address')
+        self._scan()
+        self._age()
+        self.missing_phone.unlink()
+        self.assertEqual(self._scan()['phone']['resolved'], 1)
+        self.assertFalse(self._open_issue_ids('phone'))
+
+    def test_broken_rule_does_not_stop_others(self):
+        # Python accepts named groups, PostgreSQL rejects them.
+        self._set_rule('broken', field='full_name', check='regex', pattern='^(?P<first>[A-Z])')
+        self._set_rule('phone', field='phone', check='required_if', depends_on='residential_address')
+        with mute_logger('odoo.addons.influence_gen_services.services.data_quality_service'):
+            stats = self._scan()
+        self.assertNotIn('broken', stats)
+        self.assertEqual(self._open_issue_ids('phone'), {self.missing_phone.id})
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import psycopg2
+
+from odoo.exceptions import UserError
+from odoo.tests.common import tagged
+from odoo.tools import mute_logger
+
+from ..services.influencer_deduplication_service import PROFILE_MODEL, InfluencerDeduplicationService
+from ..services.legal_hold_propagation_service import HOLD_MEMBER_TABLE, LegalHoldPropagationService
+from .common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestInfluencerDeduplicationService(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = InfluencerDeduplicationService(self.env)
+        self.Candidate = self.env['influence_gen.influencer_duplicate_candidate']
+        self.alice = self._create_influencer('Alice Martin', email='alice.martin@example.com', phone='+1 (555) 010-4477')
+
+    def _candidate(self, profile_a, profile_b):
+        return self.Candidate.search([
+            ('profile_a_id', '=', min(profile_a.id, profile_b.id)),
+            ('profile_b_id', '=', max(profile_a.id, profile_b.id)),
+        ])
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def test_normalized_email_match_is_queued(self):
+        other = self._create_influencer('Robert Stone', email=' Alice.Martin@Example.com')
+        stats = self.service.match_profiles([other.id])
+        candidate = self._candidate(self.alice, other)
+        self.assertEqual(stats['candidates'], 1)
+        self.assertEqual(candidate.state, 'pending')
+        self.assertGreaterEqual(candidate.score, 0.9)
+        self.assertTrue(candidate.match_details['email'])
+        self.assertFalse(candidate.match_details['phone'])
+        self.assertEqual(candidate.profile_a_id, self.alice, "The oldest profile comes first.")
+
+    def test_phone_digits_match_is_queued(self):
+        other = self._create_influencer('Robert Stone', phone='15550104477')
+        self.service.match_profiles([other.id])
+        candidate = self._candidate(self.alice, other)
+        self.assertTrue(candidate.match_details['phone'])
+        self.assertGreaterEqual(candidate.score, 0.6)
+
+    def test_short_phone_is_not_a_signal(self):
+        first = self._create_influencer('Carla Diaz', phone='12-34')
+        second = self._create_influencer('Robert Stone', phone='1234')
+        self.service.match_profiles([first.id, second.id])
+        self.assertFalse(self._candidate(first, second))
+
+    def test_signals_reinforce_each_other(self):
+        email_only = self._create_influencer('Robert Stone', email='ALICE.MARTIN@example.com')
+        email_and_phone = self._create_influencer('Henry Walsh', email='alice.martin@EXAMPLE.com', phone='555 010 4477')
+        self.service.match_profiles([email_only.id, email_and_phone.id])
+        self.assertGreater(self._candidate(self.alice, email_and_phone).score, self._candidate(self.alice, email_only).score)
+
+    def test_reviewed_pair_is_not_rescored(self):
+        other = self._create_influencer('Robert Stone', email='Alice.Martin@example.com')
+        self.service.match_profiles([other.id])
+        candidate = self._candidate(self.alice, other)
+        candidate.action_dismiss()
+        other.write({'phone': '555-010-4477'})
+        self.service.process_pending()
+        candidate.invalidate_recordset()
+        self.assertEqual(candidate.state, 'dismissed')
+        self.assertFalse(candidate.match_details['phone'])
+
+    # ------------------------------------------------------------------
+    # Automatic merge
+    # ------------------------------------------------------------------
+
+    def test_single_signal_is_never_auto_merged(self):
+        other = self._create_influencer('Robert Stone', email='Alice.Martin@example.com')
+        stats = self.service.match_profiles([other.id], auto_merge_threshold=0.5)
+        self.assertEqual(stats['merged'], 0)
+        self.assertEqual(self._candidate(self.alice, other).state, 'pending')
+        self.assertFalse(other.merged_into_id)
+
+    def test_two_signals_are_auto_merged(self):
+        other = self._create_influencer('Robert Stone', email='Alice.Martin@example.com', phone='555 010 4477')
+        stats = self.service.match_profiles([other.id], auto_merge_threshold=0.95)
+        candidate = self._candidate(self.alice, other)
+        self.assertEqual(stats['merged'], 1)
+        self.assertEqual((candidate.state, candidate.auto_merged), ('merged', True))
+        self.assertEqual(other.merged_into_id, self.alice)
+
+    def test_auto_merge_disabled_by_default(self):
+        other = self._create_influencer('Robert Stone', email='Alice.Martin@example.com', phone='555 010 4477')
+        self.service.match_profiles([other.id])
+        self.assertEqual(self._candidate(self.alice, other).state, 'pending')
+
+    def test_held_profile_is_not_auto_merged(self):
+        other = self._create_influencer('Robert Stone', email='Alice.Martin@example.com', phone='555 010 4477')
+        LegalHoldPropagationService(self.env).place('test,hold', [(PROFILE_MODEL, [('id', '=', other.id)])])
+        stats = self.service.match_profiles([other.id], auto_merge_threshold=0.95)
+        self.assertEqual(stats['merged'], 0)
+        self.assertEqual(self._candidate(self.alice, other).state, 'pending')
+
+    # ------------------------------------------------------------------
+    # Merge
+    # ------------------------------------------------------------------
+
+    def test_merge_moves_references(self):
+        duplicate = self._create_influencer('Alice M.', email='alice.m@example.com')
+        fashion, travel = self.env['influence_gen.area_of_influence'].create([{'name': 'Fashion'}, {'name': 'Travel'}])
+        self.alice.area_of_influence_ids = fashion
+        duplicate.area_of_influence_ids = fashion | travel
+        application = self._create_application(self._create_campaign(), duplicate)
+        attachment = self.env['ir.attachment'].create({
+            'name': 'contract.pdf', 'raw': b'%PDF', 'res_model': PROFILE_MODEL, 'res_id': duplicate.id,
+        })
+        third = self._create_influencer('Robert Stone', email='Alice.M@example.com')
+        self.service.match_profiles([third.id])
+        pending_pair = self._candidate(duplicate, third)
+
+        self.service.merge_profiles(self.alice, duplicate)
+        self.env.invalidate_all()
+        # many2one
+        self.assertEqual(application.influencer_profile_id, self.alice)
+        # many2many, without duplicating the areas both profiles had
+        self.assertEqual(self.alice.area_of_influence_ids, fashion | travel)
+        self.assertFalse(duplicate.area_of_influence_ids)
+        # many2one_reference
+        self.assertEqual(attachment.res_id, self.alice.id)
+        self.assertEqual((duplicate.merged_into_id, duplicate.account_status), (self.alice, 'inactive'))
+        self.assertEqual(pending_pair.state, 'dismissed', "Pairs of the merged duplicate are moot.")
+
+    def test_reassign_moves_hold_membership(self):
+        duplicate = self._create_influencer('Alice M.', email='alice.m@example.com')
+        LegalHoldPropagationService(self.env).place('test,hold', [(PROFILE_MODEL, [('id', '=', duplicate.id)])])
+        self.service._reassign_references(self.alice.id, duplicate.id)
+        self.env.cr.execute(
+            f"SELECT res_id FROM {HOLD_MEMBER_TABLE} WHERE model = %s AND hold_ref = 'test,hold'", [PROFILE_MODEL])
+        self.assertEqual([row[0] for row in self.env.cr.fetchall()], [self.alice.id])
+
+    def test_merge_refused_under_legal_hold(self):
+        duplicate = self._create_influencer('Alice M.', email='alice.m@example.com')
+        LegalHoldPropagationService(self.env).place('test,hold', [(PROFILE_MODEL, [('id', '=', duplicate.id)])])
+        with self.assertRaises(UserError):
+            self.service.merge_profiles(self.alice, duplicate)
+
+    def test_conflicting_merge_changes_nothing(self):
+        duplicate = self._create_influencer('Alice M.', email='alice.m@example.com')
+        campaign = self._create_campaign()
+        self._create_application(campaign, self.alice)
+        application = self._create_application(campaign, duplicate)
+        with self.assertRaises(psycopg2.IntegrityError), mute_logger('odoo.sql_db'):
+            self.service.merge_profiles(self.alice, duplicate)
+        self.env.invalidate_all()
+        self.assertEqual(application.influencer_profile_id, duplicate)
+        self.assertFalse(duplicate.merged_into_id)
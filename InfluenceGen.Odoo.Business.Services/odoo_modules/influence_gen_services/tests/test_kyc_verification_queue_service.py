@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import base64
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests.common import tagged
+from odoo.addons.influence_gen_external_integrations.exceptions.kyc_exceptions import KYCServiceError, KYCServiceUnavailableError
+from odoo.addons.influence_gen_external_integrations.models.kyc.kyc_verification_response import KYCVerificationResponse
+
+from ..services.kyc_verification_queue_service import BACKOFF_BASE_SECONDS, KycVerificationQueueService
+from ..services.onboarding_service import OnboardingService
+from .common import InfluenceGenServicesCase
+
+DOCUMENT_DATA = base64.b64encode(b'fake passport scan').decode()
+
+
+@tagged('post_install', '-at_install')
+class TestKycVerificationQueueService(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.influencer = self._create_influencer('KYC Influencer')
+
+    def _create_kyc(self, **vals):
+        attachment = self.env['ir.attachment'].create({'name': 'passport.png', 'datas': DOCUMENT_DATA})
+        return self.env['influence_gen.kyc_data'].create(dict({
+            'influencer_profile_id': self.influencer.id,
+            'document_type': 'passport',
+            'document_front_attachment_id': attachment.id,
+        }, **vals))
+
+    def _patch_provider(self, **kwargs):
+        return patch.object(self.registry['influence_gen.kyc.service.client'], 'submit_identity_documents_batch', **kwargs)
+
+    def _submit_documents(self):
+        OnboardingService(self.env).submit_kyc_documents(self.influencer.id, [{
+            'document_type': 'passport',
+            'file_name': 'passport.png',
+            'file_data': DOCUMENT_DATA,
+        }])
+        return self.influencer.kyc_data_ids
+
+    def test_submission_queued_when_automated_verification_enabled(self):
+        self._set_setting('kyc.automated_verification_enabled', True, value_type='bool')
+        kyc = self._submit_documents()
+        self.assertEqual(kyc.provider_queue_state, 'queued')
+        self.assertEqual(kyc.verification_method, 'third_party_api')
+        self.assertLessEqual(kyc.provider_next_attempt_at, fields.Datetime.now())
+
+    def test_submission_not_queued_when_automated_verification_disabled(self):
+        self._set_setting('kyc.automated_verification_enabled', False, value_type='bool')
+        kyc = self._submit_documents()
+        self.assertFalse(kyc.provider_queue_state)
+
+    def test_enqueue_skips_documents_not_awaiting_review(self):
+        service = KycVerificationQueueService(self.env)
+        approved = self._create_kyc(verification_status='approved')
+        without_document = self._create_kyc(document_front_attachment_id=False)
+        queued = service.enqueue(approved | without_document | self._create_kyc())
+        self.assertEqual(len(queued), 1)
+        self.assertFalse(service.enqueue(queued), "A queued document is not queued twice.")
+
+    def test_claim_and_relock(self):
+        service = KycVerificationQueueService(self.env)
+        first, second, later = self._create_kyc(), self._create_kyc(), self._create_kyc()
+        service.enqueue(first | second | later)
+        later.write({'provider_next_attempt_at': fields.Datetime.now() + timedelta(hours=1)})
+
+        claimed = service._claim_due('queued', 10)
+        self.assertIn(first.id, claimed)
+        self.assertIn(second.id, claimed)
+        self.assertNotIn(later.id, claimed, "Documents are only claimed once due.")
+
+        # Another run submitted the first document while the locks were released.
+        first.write({'provider_queue_state': 'submitted'})
+        first.flush_recordset()
+        self.assertEqual(service._relock('queued', [first.id, second.id]), [second.id])
+
+    def test_successful_submission_applies_result(self):
+        kyc = self._create_kyc()
+        KycVerificationQueueService(self.env).enqueue(kyc)
+        with self._patch_provider(return_value=[KYCVerificationResponse(transaction_id='tx-1', status='VERIFIED')]):
+            stats = KycVerificationQueueService(self.env).submit_queued()
+        self.assertEqual(stats['submitted'], 1)
+        self.assertEqual(stats['approved'], 1)
+        self.assertEqual(kyc.external_verification_id, 'tx-1')
+        self.assertEqual((kyc.provider_queue_state, kyc.verification_status), ('done', 'approved'))
+
+    def test_provider_failure_reschedules_document(self):
+        kyc = self._create_kyc()
+        KycVerificationQueueService(self.env).enqueue(kyc)
+        before = fields.Datetime.now()
+        with self._patch_provider(side_effect=KYCServiceError("Provider returned HTTP 500")):
+            stats = KycVerificationQueueService(self.env).submit_queued()
+        self.assertEqual(stats, {'rescheduled': 1})
+        self.assertEqual(kyc.provider_queue_state, 'queued', "A failed submission stays in the queue.")
+        self.assertEqual(kyc.provider_attempt_count, 1)
+        self.assertIn('HTTP 500', kyc.provider_last_error)
+        self.assertGreaterEqual(kyc.provider_next_attempt_at, before + timedelta(seconds=BACKOFF_BASE_SECONDS))
+        self.assertEqual(kyc.verification_status, 'submitted')
+
+    def test_provider_failures_route_to_manual_review(self):
+        self._set_setting('kyc.provider.max_attempts', 2)
+        kyc = self._create_kyc()
+        service = KycVerificationQueueService(self.env)
+        service.enqueue(kyc)
+        with self._patch_provider(side_effect=KYCServiceError("Provider returned HTTP 500")):
+            for _attempt in range(2):
+                kyc.write({'provider_next_attempt_at': fields.Datetime.now() - timedelta(seconds=1)})
+                stats = service.submit_queued()
+        self.assertEqual(stats, {'manual': 1})
+        self.assertEqual((kyc.provider_queue_state, kyc.verification_status), ('manual', 'submitted'))
+
+    def test_provider_unavailable_postpones_without_attempt(self):
+        kyc = self._create_kyc()
+        KycVerificationQueueService(self.env).enqueue(kyc)
+        with self._patch_provider(side_effect=KYCServiceUnavailableError("Circuit open")):
+            stats = KycVerificationQueueService(self.env).submit_queued()
+        self.assertEqual(stats, {'postponed': 1})
+        self.assertEqual((kyc.provider_queue_state, kyc.provider_attempt_count), ('queued', 0))
+        self.assertGreater(kyc.provider_next_attempt_at, fields.Datetime.now())
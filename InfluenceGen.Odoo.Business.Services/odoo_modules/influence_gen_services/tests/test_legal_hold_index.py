@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests.common import tagged
+
+from ..models import legal_hold_index
+from ..services.legal_hold_propagation_service import LegalHoldPropagationService
+from ..services.retention_and_legal_hold_service import RetentionAndLegalHoldService
+from .common import InfluenceGenServicesCase
+
+PROFILE_MODEL = 'influence_gen.influencer_profile'
+PAYMENT_MODEL = 'influence_gen.payment_record'
+APPLICATION_MODEL = 'influence_gen.campaign_application'
+
+
+@tagged('post_install', '-at_install')
+class TestLegalHoldIndex(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.index = self.env['influence_gen.legal_hold_index']
+        self.holds = LegalHoldPropagationService(self.env)
+        self._drop_cached_bitmaps()
+        self.addCleanup(self._drop_cached_bitmaps)
+        self.influencer = self._create_influencer('Held Influencer')
+        self.other = self._create_influencer('Other Influencer')
+        self.campaign = self._create_campaign()
+        self.application = self._create_application(self.campaign, self.influencer)
+        self.payment = self._create_payment(self.influencer, self.campaign, 100.0)
+        self.other_payment = self._create_payment(self.other, self.campaign, 100.0)
+
+    def _drop_cached_bitmaps(self):
+        with legal_hold_index._HELD_BITMAPS_LOCK:
+            for key in [key for key in legal_hold_index._HELD_BITMAPS if key[0] == self.env.cr.dbname]:
+                del legal_hold_index._HELD_BITMAPS[key]
+
+    def _hold_influencer(self):
+        self.holds.place('test.hold,1', [(PROFILE_MODEL, [('id', '=', self.influencer.id)])])
+
+    def test_held_records(self):
+        self.assertFalse(self.index.is_held(PAYMENT_MODEL, self.payment.id))
+        self._hold_influencer()
+        self.assertTrue(self.index.is_held(PROFILE_MODEL, self.influencer.id))
+        self.assertTrue(self.index.is_held(PAYMENT_MODEL, self.payment.id))
+        self.assertFalse(self.index.is_held(PAYMENT_MODEL, self.other_payment.id))
+        self.assertFalse(self.index.is_held(PAYMENT_MODEL, self.payment.id + 100000), "IDs past the bitmap are not held.")
+        self.assertEqual(self.index.filter_held(PAYMENT_MODEL, [self.payment.id, self.other_payment.id]), [self.payment.id])
+        self.assertTrue(self.index.is_held_exact(APPLICATION_MODEL, self.application.id))
+
+    def test_lift_releases_records(self):
+        self._hold_influencer()
+        self.assertTrue(self.index.is_held(PAYMENT_MODEL, self.payment.id))
+        self.holds.lift(['test.hold,1'])
+        self.assertFalse(self.index.is_held(PAYMENT_MODEL, self.payment.id))
+        self.assertFalse(self.index.is_held_exact(PAYMENT_MODEL, self.payment.id))
+
+    def test_bitmap_cached_until_its_model_changes(self):
+        self._hold_influencer()
+        profile_bitmap = self.index._get_held_bitmap(PROFILE_MODEL)
+        payment_bitmap = self.index._get_held_bitmap(PAYMENT_MODEL)
+        self.assertIs(self.index._get_held_bitmap(PAYMENT_MODEL), payment_bitmap, "Unchanged holds reuse the bitmap.")
+
+        # A hold on a single payment only touches the payment holds.
+        self.holds.place('test.hold,2', [(PAYMENT_MODEL, [('id', '=', self.other_payment.id)])])
+        self.assertIs(self.index._get_held_bitmap(PROFILE_MODEL), profile_bitmap)
+        self.assertIsNot(self.index._get_held_bitmap(PAYMENT_MODEL), payment_bitmap)
+        self.assertTrue(self.index.is_held(PAYMENT_MODEL, self.other_payment.id))
+
+    def test_erasure_refused_for_held_record(self):
+        self._hold_influencer()
+        service = RetentionAndLegalHoldService(self.env)
+        AuditLog = self.registry['influence_gen.audit_log']
+        # The application has no legal_hold_status flag: only the hold index knows it is held.
+        for model_name, record in ((PAYMENT_MODEL, self.payment), (APPLICATION_MODEL, self.application)):
+            # assertRaises rolls the denial entry back with its savepoint, so the creation is spied on.
+            with patch.object(AuditLog, 'create', autospec=True, side_effect=AuditLog.create) as create, \
+                    self.assertRaises(UserError):
+                service.process_manual_erasure_request(model_name, record.id, self.env.uid, 'Right to be forgotten')
+            self.assertTrue(record.exists())
+            vals = create.call_args.args[1]
+            self.assertEqual((vals['action'], vals['target_model'], vals['target_res_id']),
+                             ('erasure_denied_legal_hold', model_name, record.id))
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import tagged
+
+from ..services.legal_hold_propagation_service import HOLD_MEMBER_TABLE, LegalHoldPropagationService
+from .common import InfluenceGenServicesCase
+
+PROFILE_MODEL = 'influence_gen.influencer_profile'
+HOLD_REF = 'test.hold,1'
+OTHER_HOLD_REF = 'test.hold,2'
+
+
+@tagged('post_install', '-at_install')
+class TestLegalHoldPropagationService(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.service = LegalHoldPropagationService(self.env)
+        self.influencer = self._create_influencer('Held Influencer')
+        self.bystander = self._create_influencer('Other Influencer')
+        self.campaign = self._create_campaign()
+        self.application = self._create_application(self.campaign, self.influencer)
+        self.submission = self._create_submission(self.application)
+        self.payment = self._create_payment(self.influencer, self.campaign, 100.0)
+        self.other_application = self._create_application(self.campaign, self.bystander)
+        self.other_payment = self._create_payment(self.bystander, self.campaign, 80.0)
+
+    def _members(self, hold_ref=None):
+        """:return: set of the (model, res_id) covered by `hold_ref` (any hold when None)"""
+        self.env.cr.execute(
+            f"SELECT model, res_id FROM {HOLD_MEMBER_TABLE} WHERE %(ref)s IS NULL OR hold_ref = %(ref)s",
+            {'ref': hold_ref})
+        return set(self.env.cr.fetchall())
+
+    def _place_on_influencer(self, hold_ref=HOLD_REF):
+        return self.service.place(hold_ref, [(PROFILE_MODEL, [('id', '=', self.influencer.id)])], reason='Litigation')
+
+    def test_place_propagates_to_related_data(self):
+        counts = self._place_on_influencer()
+        members = self._members(HOLD_REF)
+        self.assertIn((PROFILE_MODEL, self.influencer.id), members)
+        self.assertIn(('influence_gen.campaign_application', self.application.id), members)
+        self.assertIn(('influence_gen.content_submission', self.submission.id), members)
+        self.assertIn(('influence_gen.payment_record', self.payment.id), members)
+        self.assertEqual(counts['influence_gen.payment_record'], 1)
+        # Edges only go from parents to children: the campaign and the other influencer's data stay free.
+        self.assertNotIn(('influence_gen.campaign', self.campaign.id), members)
+        self.assertNotIn(('influence_gen.campaign_application', self.other_application.id), members)
+        self.assertNotIn(('influence_gen.payment_record', self.other_payment.id), members)
+
+    def test_place_sets_flags(self):
+        self._place_on_influencer()
+        self.assertTrue(self.influencer.legal_hold_status)
+        self.assertTrue(self.submission.legal_hold_status)
+        self.assertTrue(self.payment.legal_hold_status)
+        self.assertFalse(self.other_payment.legal_hold_status)
+        self.assertFalse(self.campaign.legal_hold_status)
+
+    def test_campaign_hold_covers_every_participant(self):
+        self.service.place(HOLD_REF, [('influence_gen.campaign', [('id', '=', self.campaign.id)])])
+        members = self._members(HOLD_REF)
+        self.assertIn(('influence_gen.campaign_application', self.other_application.id), members)
+        self.assertIn(('influence_gen.payment_record', self.other_payment.id), members)
+        self.assertNotIn((PROFILE_MODEL, self.bystander.id), members)
+
+    def test_lift_clears_flags_not_held_otherwise(self):
+        self._place_on_influencer()
+        self.service.place(OTHER_HOLD_REF, [('influence_gen.payment_record', [('id', '=', self.payment.id)])])
+        counts = self.service.lift([HOLD_REF])
+        self.assertFalse(self._members(HOLD_REF))
+        self.assertEqual(counts[PROFILE_MODEL], 1)
+        self.assertFalse(self.influencer.legal_hold_status)
+        self.assertFalse(self.submission.legal_hold_status)
+        self.assertTrue(self.payment.legal_hold_status, "The payment is still covered by the other hold.")
+
+    def test_refresh_covers_records_created_after_the_hold(self):
+        self._place_on_influencer()
+        late_payment = self._create_payment(self.influencer, self.campaign, 50.0)
+        self.assertNotIn(('influence_gen.payment_record', late_payment.id), self._members(HOLD_REF))
+        counts = self.service.refresh()
+        self.assertEqual(counts, {'influence_gen.payment_record': 1})
+        self.assertTrue(late_payment.legal_hold_status)
+
+    def test_per_record_holds_are_lifted_on_their_own(self):
+        self.service.place_per_record(PROFILE_MODEL, [('id', 'in', (self.influencer | self.bystander).ids)])
+        self.service.lift_per_record(PROFILE_MODEL, [('id', '=', self.bystander.id)])
+        self.assertTrue(self.influencer.legal_hold_status)
+        self.assertTrue(self.payment.legal_hold_status)
+        self.assertFalse(self.bystander.legal_hold_status)
+        self.assertFalse(self.other_payment.legal_hold_status)
+
+    def test_place_and_lift_are_audited_per_model(self):
+        AuditLog = self.env['influence_gen.audit_log']
+        before = AuditLog.search_count([('action', '=', 'legal_hold_place')])
+        counts = self._place_on_influencer()
+        self.assertEqual(AuditLog.search_count([('action', '=', 'legal_hold_place')]) - before, len(counts))
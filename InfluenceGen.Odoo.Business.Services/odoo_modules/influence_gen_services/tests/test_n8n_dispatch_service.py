@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+from unittest.mock import patch
+
+import requests
+
+from odoo import SUPERUSER_ID, api, fields
+from odoo.tests.common import tagged
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
+
+from ..services import n8n_dispatch_service
+from ..services.n8n_dispatch_service import BACKOFF_BASE_SECONDS, N8nDispatchService
+from .common import InfluenceGenServicesCase
+
+
+class FakeWebhookResponse:
+    """Response of the N8N webhook, as returned by HttpSessionPool.request."""
+
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self._data = data
+        self.content = b'{}' if data is not None else b''
+        self.text = '' if self.ok else 'Service Unavailable'
+
+    def json(self):
+        return self._data
+
+
+@tagged('post_install', '-at_install')
+class TestN8nDispatchService(InfluenceGenServicesCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        ICP = cls.env['ir.config_parameter'].sudo()
+        ICP.set_param('influence_gen.n8n_ai_webhook_url', 'https://n8n.example.com/webhook/ai')
+        ICP.set_param('influence_gen.n8n_ai_auth_token', 'test-token')
+        cls.Outbox = cls.env['influence_gen.n8n_dispatch_outbox']
+
+    def _enqueue(self, count):
+        entries = self.Outbox
+        for index in range(count):
+            entries |= self.Outbox.enqueue('ai_image_generation', {'request_id': index})
+        return entries
+
+    def _patch_webhook(self, *responses):
+        """Serves `responses` in turn (the last one repeated) in place of the N8N webhook."""
+        calls = []
+
+        def fake_request(method, url, policy=None, json=None, **kwargs):
+            calls.append(json)
+            response = responses[min(len(calls), len(responses)) - 1]
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return patch.object(HttpSessionPool, 'request', side_effect=fake_request), calls
+
+    def test_dispatch_marks_entries_sent(self):
+        entries = self._enqueue(3)
+        http_patch, calls = self._patch_webhook(FakeWebhookResponse(data={'execution_id': 'exec-1'}))
+        with http_patch:
+            stats = N8nDispatchService(self.env).dispatch_pending()
+        self.assertEqual(stats['sent'], 3)
+        self.assertEqual(set(entries.mapped('state')), {'sent'})
+        self.assertEqual(entries.mapped('attempt_count'), [1, 1, 1])
+        self.assertEqual(sorted(body['request_id'] for body in calls), [0, 1, 2])
+
+    def test_each_wave_is_committed(self):
+        self._set_setting('n8n.ai_image_generation.batch_size', 1)
+        self._set_setting('n8n.ai_image_generation.max_concurrency', 2)
+        entries = self._enqueue(5)
+        http_patch, _calls = self._patch_webhook(FakeWebhookResponse(data={}))
+        with http_patch, patch.object(n8n_dispatch_service, 'commit_unless_testing') as commit:
+            N8nDispatchService(self.env).dispatch_pending()
+        # 5 calls, 2 at a time: 3 waves, each committed with its outcome.
+        self.assertEqual(commit.call_count, 3)
+        self.assertEqual(set(entries.mapped('state')), {'sent'})
+
+    def test_http_error_reschedules_with_backoff(self):
+        self._set_setting('n8n.ai_image_generation.max_concurrency', 1)
+        first, second = self._enqueue(2)
+        http_patch, calls = self._patch_webhook(FakeWebhookResponse(status_code=503))
+        before = fields.Datetime.now()
+        with http_patch:
+            stats = N8nDispatchService(self.env).dispatch_pending()
+        self.assertEqual(len(calls), 1, "The endpoint is backed off after the first transient failure.")
+        self.assertEqual(stats, {'sent': 0, 'rescheduled': 2, 'failed': 0})
+        self.assertEqual((first.state, first.attempt_count), ('pending', 1))
+        self.assertIn('HTTP 503', first.last_error)
+        self.assertGreaterEqual(first.next_attempt_at, before + timedelta(seconds=BACKOFF_BASE_SECONDS))
+        self.assertLessEqual(first.next_attempt_at, fields.Datetime.now() + timedelta(seconds=BACKOFF_BASE_SECONDS))
+        # The postponed row was not attempted, so it keeps its attempt count.
+        self.assertEqual((second.state, second.attempt_count), ('pending', 0))
+
+        # The next failure doubles the delay.
+        first.write({'next_attempt_at': fields.Datetime.now() - timedelta(seconds=1)})
+        second.write({'next_attempt_at': fields.Datetime.now() + timedelta(hours=1)})
+        http_patch, _calls = self._patch_webhook(requests.exceptions.ConnectionError('Connection refused'))
+        before = fields.Datetime.now()
+        with http_patch:
+            N8nDispatchService(self.env).dispatch_pending()
+        self.assertEqual(first.attempt_count, 2)
+        self.assertIn('ConnectionError', first.last_error)
+        self.assertGreaterEqual(first.next_attempt_at, before + timedelta(seconds=2 * BACKOFF_BASE_SECONDS))
+
+    def test_client_error_fails_entry(self):
+        entry = self._enqueue(1)
+        http_patch, _calls = self._patch_webhook(FakeWebhookResponse(status_code=400))
+        with http_patch:
+            stats = N8nDispatchService(self.env).dispatch_pending()
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual((entry.state, entry.attempt_count), ('failed', 1))
+
+    def test_relock_skips_rows_no_longer_pending(self):
+        pending, sent, failed = self._enqueue(3)
+        sent.write({'state': 'sent'})
+        failed.write({'state': 'failed'})
+        relocked = N8nDispatchService(self.env)._relock([pending.id, sent.id, failed.id])
+        self.assertEqual(relocked, [pending.id])
+
+    def test_claim_skips_rows_locked_by_another_run(self):
+        # Two dispatcher runs need two transactions, so the rows are committed and removed afterwards.
+        with self.registry.cursor() as cr:
+            entry_ids = api.Environment(cr, SUPERUSER_ID, {})['influence_gen.n8n_dispatch_outbox'].create([
+                {'endpoint': 'ai_image_generation', 'payload_json': '{}'} for _index in range(3)
+            ]).ids
+        self.addCleanup(self._delete_committed_entries, entry_ids)
+
+        claims = []
+
+        def capture(service, endpoint, entries, stats):
+            claims[-1].extend(entries.ids)
+
+        with patch.object(N8nDispatchService, '_dispatch_endpoint', autospec=True, side_effect=capture), \
+                self.registry.cursor() as first_cr, self.registry.cursor() as second_cr:
+            for cr in (first_cr, second_cr):
+                claims.append([])
+                N8nDispatchService(api.Environment(cr, SUPERUSER_ID, {})).dispatch_pending()
+            first_cr.rollback()
+            second_cr.rollback()
+
+        first_claim, second_claim = claims
+        self.assertEqual(set(entry_ids) & set(first_claim), set(entry_ids))
+        self.assertFalse(set(first_claim) & set(second_claim), "A row locked by one run must not be claimed by another.")
+
+    def _delete_committed_entries(self, entry_ids):
+        with self.registry.cursor() as cr:
+            cr.execute("DELETE FROM influence_gen_n8n_dispatch_outbox WHERE id = ANY(%s)", [entry_ids])
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from odoo.tests.common import tagged
+
+from ..services.performance_summary_service import PerformanceSummaryService
+from .common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestPerformanceSummaryService(InfluenceGenServicesCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.service = PerformanceSummaryService(cls.env)
+        # Start from an empty queue: only the changes made by each test are refreshed.
+        cls.service.refresh_stale(limit=None)
+
+    def setUp(self):
+        super().setUp()
+        self.influencer = self._create_influencer()
+        self.campaign = self._create_campaign()
+        self.application = self._create_application(self.campaign, self.influencer)
+
+    def test_submission_change_refreshes_summaries(self):
+        submission = self._create_submission(self.application)
+        self.service.refresh_stale()
+        summary = self.service.get_influencer_summary(self.influencer.id)
+        self.assertEqual((summary['submissions_total'], summary['submissions_pending']), (1, 1))
+        self.assertEqual(summary['applications_approved'], 1)
+
+        submission.write({'review_status': 'approved'})
+        self.service.refresh_stale()
+        summary = self.service.get_influencer_summary(self.influencer.id)
+        self.assertEqual((summary['submissions_pending'], summary['submissions_approved']), (0, 1))
+        campaign_summary = self.service.get_campaign_summaries([self.campaign.id])[self.campaign.id]
+        self.assertEqual(campaign_summary['submissions_approved'], 1)
+
+    def test_payment_change_refreshes_summaries(self):
+        payment = self._create_payment(self.influencer, self.campaign, 250.0)
+        self.service.refresh_stale()
+        summary = self.service.get_influencer_summary(self.influencer.id)
+        self.assertEqual((summary['payments_outstanding_amount'], summary['payments_paid_amount']), (250.0, 0.0))
+
+        payment.write({'status': 'paid'})
+        self.service.refresh_stale()
+        summary = self.service.get_influencer_summary(self.influencer.id)
+        self.assertEqual((summary['payments_outstanding_amount'], summary['payments_paid_amount']), (0.0, 250.0))
+
+    def test_only_changed_summaries_are_refreshed(self):
+        self.service.refresh_stale()
+        other = self._create_influencer('Other Influencer')
+        self._create_application(self.campaign, other)
+
+        stats = self.service.refresh_stale()
+
+        self.assertEqual(stats, {'campaign': 1, 'influencer': 1})
+        self.assertEqual(self.service.get_influencer_summary(other.id)['applications_approved'], 1)
+
+    def test_performance_page_data(self):
+        self._create_submission(self.application, review_status='approved')
+        self.service.refresh_stale()
+
+        data = self.service.get_influencer_performance_data(self.influencer.id)
+
+        self.assertEqual(data['summary']['submissions_approved'], 1)
+        [campaign_data] = data['campaign_performance']
+        self.assertEqual(campaign_data['campaign_id'], self.campaign.id)
+        self.assertEqual(len(campaign_data['submitted_content']), 1)
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.tests.common import tagged
+
+from .common import InfluenceGenServicesCase
+
+
+@tagged('post_install', '-at_install')
+class TestPlatformSetting(InfluenceGenServicesCase):
+
+    def setUp(self):
+        super().setUp()
+        self.Setting = self.env['influence_gen.platform_setting']
+
+    def test_cached_json_values_cannot_be_modified(self):
+        self._set_setting('test.rule_keys', json.dumps({'reach': ['reach', 'views']}), value_type='json')
+        value = self.Setting.get_setting('test.rule_keys')
+        value['reach'].append('impressions')
+        value['clicks'] = ['clicks']
+        self.assertEqual(self.Setting.get_setting('test.rule_keys'), {'reach': ['reach', 'views']})
+        self.Setting.get_settings('test.')['test.rule_keys'].clear()
+        self.assertEqual(self.Setting.get_settings('test.'), {'test.rule_keys': {'reach': ['reach', 'views']}})
+
+    def test_writes_refresh_the_cache(self):
+        setting = self._set_setting('test.batch_size', 10)
+        self.assertEqual(self.Setting.get_setting('test.batch_size'), 10)
+        setting.write({'value_int': 20})
+        self.assertEqual(self.Setting.get_setting('test.batch_size'), 20)
+        setting.write({'active': False})
+        self.assertEqual(self.Setting.get_setting('test.batch_size', default=5), 5)
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from odoo.sql_db import connection_info_for
+from odoo.tests.common import tagged
+
+from ..services.staging_dataset_exporter import StagingDatasetExporter, _export_worker
+from .common import InfluenceGenServicesCase
+
+PROFILE_MODEL = 'influence_gen.influencer_profile'
+PAYMENT_MODEL = 'influence_gen.payment_record'
+
+
+@tagged('post_install', '-at_install')
+class TestStagingDatasetExporter(InfluenceGenServicesCase):
+    """
+    Export queries are run on the test cursor: the worker processes read the caller's
+    exported snapshot, which never includes the uncommitted test data.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, ignore_errors=True)
+        self.exporter = StagingDatasetExporter(self.env, output_dir=self.output_dir)
+        self.influencer = self._create_influencer(
+            'Secret Person', email='secret.person@example.com', phone='+1 555 010 9999')
+        self.campaign = self._create_campaign()
+        self.payment = self._create_payment(self.influencer, self.campaign, 125.0)
+
+    def _export_rows(self, model_config, exporter=None):
+        task = (exporter or self.exporter)._build_task(model_config)
+        self.assertIsInstance(task, dict, task)
+        self.env.flush_all()
+        self.env.cr.execute(task['query'])
+        return [dict(zip(task['columns'], row)) for row in self.env.cr.fetchall()]
+
+    def _profile_config(self):
+        return {
+            'model': PROFILE_MODEL,
+            'domain': [('id', '=', self.influencer.id)],
+            'fields_to_anonymize': [
+                {'name': 'id', 'technique': 'pseudonymize'},
+                {'name': 'full_name', 'technique': 'faker.name'},
+                {'name': 'email', 'technique': 'mask'},
+                {'name': 'phone', 'technique': 'remove'},
+            ],
+        }
+
+    def test_masked_and_removed_values_never_exported(self):
+        [row] = self._export_rows(self._profile_config())
+        self.assertEqual(set(row), {'id', 'full_name', 'email', 'phone'}, "Unlisted columns are not exported.")
+        self.assertEqual((row['email'], row['phone']), ('*****', None))
+        self.assertTrue(row['full_name'].startswith('Person '))
+        exported = json.dumps(row, default=str)
+        for original in ('Secret Person', 'secret.person@example.com', '555 010 9999', '5550109999'):
+            self.assertNotIn(original, exported)
+
+    def test_integer_pseudonyms_still_join(self):
+        [profile] = self._export_rows(self._profile_config())
+        [payment] = self._export_rows({
+            'model': PAYMENT_MODEL,
+            'domain': [('id', '=', self.payment.id)],
+            'fields': ['amount'],
+            'fields_to_anonymize': [{'name': 'influencer_profile_id', 'technique': 'pseudonymize'}],
+        })
+        self.assertIsInstance(profile['id'], int)
+        self.assertTrue(1 <= profile['id'] <= 2 ** 31 - 1)
+        self.assertEqual(payment['influencer_profile_id'], profile['id'])
+        self.assertEqual((payment['id'], payment['amount']), (self.payment.id, 125.0))
+
+    def test_pseudonyms_stable_across_runs(self):
+        [first] = self._export_rows(self._profile_config())
+        [second] = self._export_rows(self._profile_config(), StagingDatasetExporter(self.env, output_dir=self.output_dir))
+        self.assertEqual((first['id'], first['full_name']), (second['id'], second['full_name']))
+
+    def test_invalid_config_skipped(self):
+        self.assertEqual(self.exporter._build_task({'model': 'no.such.model'}), "unknown model")
+        config = {'model': PROFILE_MODEL, 'fields_to_anonymize': [{'name': 'email', 'technique': 'shuffle'}]}
+        self.assertIn('unknown technique', self.exporter._build_task(config))
+
+    def test_worker_writes_gzip_jsonl(self):
+        path = os.path.join(self.output_dir, 'rows.jsonl.gz')
+        result = _export_worker({
+            'model': PROFILE_MODEL,
+            'connection_info': dict(connection_info_for(self.env.cr.dbname)[1]),
+            'snapshot_id': None,
+            'query': "SELECT n AS id, 'user_' || n AS email FROM generate_series(1, 5) n ORDER BY n",
+            'columns': ['id', 'email'],
+            'path': path,
+            'format': 'jsonl',
+            'chunk_size': 2,
+        })
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['rows'], 5)
+        with gzip.open(path, 'rt', encoding='utf-8') as stream:
+            rows = [json.loads(line) for line in stream]
+        self.assertEqual(rows[-1], {'id': 5, 'email': 'user_5'})
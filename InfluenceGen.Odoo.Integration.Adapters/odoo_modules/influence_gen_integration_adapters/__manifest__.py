@@ -11,6 +11,7 @@
         'base',
         'web',
         'mail', # For logging/notifications if needed directly, or used by business services
+        'influence_gen_external_integrations', # Pooled HTTP sessions and per-service HTTP policies (IntegrationSettings)
         # 'influence_gen_shared_utilities', # Dependency on REPO-IGSCU-007 (if directly used)
         # 'influence_gen_business_services', # If directly invoking service interfaces, or for type hints (if directly used)
     ],
@@ -5,6 +5,8 @@ import requests
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from odoo import models, api
+from odoo.addons.influence_gen_external_integrations.exceptions.common_exceptions import ServiceUnavailableError
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
 
 from ..dtos.kyc_dtos import KycVerificationRequestDto, KycVerificationResultDto
 from ..utils.integration_error_handler import (
@@ -14,6 +16,7 @@ from ..utils.integration_error_handler import (
     PermanentIntegrationError,
     AuthenticationError,
     RateLimitError,
+    is_service_failure,
 )
 from .kyc_service_adapter_base import KycServiceAdapterBase # For type hinting if needed, inheritance done by _inherit
 
@@ -76,6 +79,9 @@ class ExampleKycAdapter(models.AbstractModel):
             f"with {SERVICE_NAME}."
         )
 
+        # Pooled keep-alive connections; retries stay with tenacity below.
+        http_policy = self.env['influence_gen.integration.settings'].get_http_policy('example_kyc', timeout=DEFAULT_TIMEOUT_SECONDS)
+
         @retry(
             stop=stop_after_attempt(DEFAULT_RETRY_ATTEMPTS),
             wait=wait_exponential(multiplier=RETRY_WAIT_MULTIPLIER, min=RETRY_WAIT_MIN_SECONDS, max=RETRY_WAIT_MAX_SECONDS),
@@ -85,7 +91,7 @@ class ExampleKycAdapter(models.AbstractModel):
         def _do_request_with_retries():
             _logger.debug(f"Attempting POST to {api_url} for kyc_data_id {kyc_request_dto.kyc_data_id}")
             try:
-                response = requests.post(api_url, json=payload, headers=headers, timeout=DEFAULT_TIMEOUT_SECONDS)
+                response = HttpSessionPool.request('POST', api_url, policy=http_policy, json=payload, headers=headers)
                 if not response.ok:
                     handle_external_api_error(response, SERVICE_NAME)
                 
@@ -104,7 +110,9 @@ class ExampleKycAdapter(models.AbstractModel):
                 raise PermanentIntegrationError(f"Unhandled RequestException for {SERVICE_NAME}: {e}") from e
 
         try:
-            response = _do_request_with_retries()
+            # Counted once per call after the retries; fails fast while the circuit is open or the bulkhead is full.
+            with self.env['influence_gen.integration.circuit_breaker'].guard('example_kyc', is_failure=is_service_failure):
+                response = _do_request_with_retries()
             response_data = response.json()
             # Assuming the response_data can be directly mapped to KycVerificationResultDto fields
             # This might require more specific parsing based on the actual API response structure
@@ -118,6 +126,14 @@ class ExampleKycAdapter(models.AbstractModel):
             )
             _logger.info(f"KYC verification for {kyc_request_dto.kyc_data_id} completed with status: {result_dto.status}")
             return result_dto
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{SERVICE_NAME} not called for kyc_data_id {kyc_request_dto.kyc_data_id}: {e}")
+            return KycVerificationResultDto(
+                kyc_data_id=kyc_request_dto.kyc_data_id,
+                status="pending_review",
+                reason_code="service_unavailable",
+                reason_message=f"{SERVICE_NAME} is temporarily unavailable; the verification requires manual review."
+            )
         except AuthenticationError as e:
             _logger.error(f"Authentication error with {SERVICE_NAME} for kyc_data_id {kyc_request_dto.kyc_data_id}: {e}")
             return KycVerificationResultDto(kyc_data_id=kyc_request_dto.kyc_data_id, status="error_auth", reason_message=str(e))
@@ -5,6 +5,8 @@ import requests
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from odoo import models, api
+from odoo.addons.influence_gen_external_integrations.exceptions.common_exceptions import ServiceUnavailableError
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
 
 from ..dtos.payment_dtos import (
     PaymentInitiationRequestDto, PaymentResultDto,
@@ -17,6 +19,7 @@ from ..utils.integration_error_handler import (
     PermanentIntegrationError,
     AuthenticationError,
     RateLimitError,
+    is_service_failure,
 )
 from .payment_gateway_adapter_base import PaymentGatewayAdapterBase # For type hinting if needed
 
@@ -61,6 +64,9 @@ class ExamplePaymentAdapter(models.AbstractModel):
         
         _logger.info(f"Initiating request for {log_identifier} to {SERVICE_NAME} at {api_url}.")
 
+        # Pooled keep-alive connections; retries stay with tenacity below.
+        http_policy = self.env['influence_gen.integration.settings'].get_http_policy('example_payment', timeout=DEFAULT_TIMEOUT_SECONDS)
+
         @retry(
             stop=stop_after_attempt(DEFAULT_RETRY_ATTEMPTS),
             wait=wait_exponential(multiplier=RETRY_WAIT_MULTIPLIER, min=RETRY_WAIT_MIN_SECONDS, max=RETRY_WAIT_MAX_SECONDS),
@@ -70,7 +76,7 @@ class ExamplePaymentAdapter(models.AbstractModel):
         def _do_request_with_retries():
             _logger.debug(f"Attempting POST to {api_url} for {log_identifier}")
             try:
-                response = requests.post(api_url, json=payload, headers=headers, timeout=DEFAULT_TIMEOUT_SECONDS)
+                response = HttpSessionPool.request('POST', api_url, policy=http_policy, json=payload, headers=headers)
                 if not response.ok:
                     handle_external_api_error(response, SERVICE_NAME)
                 
@@ -96,7 +102,9 @@ class ExamplePaymentAdapter(models.AbstractModel):
 
 
         try:
-            response = _do_request_with_retries()
+            # Counted once per call after the retries; fails fast while the circuit is open or the bulkhead is full.
+            with self.env['influence_gen.integration.circuit_breaker'].guard('example_payment', is_failure=is_service_failure):
+                response = _do_request_with_retries()
             response_data = response.json()
             
             # Dynamically create DTO, assuming constructor matches keys or specific mapping
@@ -109,6 +117,9 @@ class ExamplePaymentAdapter(models.AbstractModel):
             result = result_dto_class(**valid_args)
             _logger.info(success_log_message.format(id=log_identifier, status=result.status))
             return result
+        except ServiceUnavailableError as e:
+            _logger.warning(f"{SERVICE_NAME} not called for {log_identifier}: {e}")
+            return result_dto_class(**{id_field_name: getattr(request_dto, id_field_name), 'status': "error_service_unavailable", 'reason_message': f"{SERVICE_NAME} is temporarily unavailable; nothing was sent."})
         except AuthenticationError as e:
             _logger.error(f"Authentication error with {SERVICE_NAME} for {log_identifier}: {e}")
             return result_dto_class(**{id_field_name: getattr(request_dto, id_field_name), 'status': "error_auth", 'reason_message': str(e)})
@@ -6,6 +6,7 @@ import time # For basic retry if tenacity is not used, but tenacity is preferred
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from odoo import models, api
+from odoo.addons.influence_gen_external_integrations.utils.http_session_pool import HttpSessionPool
 from odoo.exceptions import UserError
 
 from ..dtos.n8n_dtos import N8nAiGenerationRequestDto
@@ -74,6 +75,9 @@ class N8nAiAdapter(models.AbstractModel):
 
         service_name = "N8N AI Service"
 
+        # Pooled keep-alive connections; retries stay with tenacity below.
+        http_policy = self.env['influence_gen.integration.settings'].get_http_policy('n8n_ai', timeout=DEFAULT_TIMEOUT_SECONDS)
+
         @retry(
             stop=stop_after_attempt(DEFAULT_RETRY_ATTEMPTS),
             wait=wait_exponential(multiplier=RETRY_WAIT_MULTIPLIER, min=RETRY_WAIT_MIN_SECONDS, max=RETRY_WAIT_MAX_SECONDS),
@@ -83,7 +87,7 @@ class N8nAiAdapter(models.AbstractModel):
         def _do_request_with_retries():
             _logger.debug(f"Attempting POST to {n8n_webhook_url} for request ID {generation_request_dto.request_id}")
             try:
-                response = requests.post(n8n_webhook_url, json=payload, headers=headers, timeout=DEFAULT_TIMEOUT_SECONDS)
+                response = HttpSessionPool.request('POST', n8n_webhook_url, policy=http_policy, json=payload, headers=headers)
                 
                 if not response.ok: # Handles 4xx and 5xx errors
                     # This will raise an appropriate IntegrationError (Transient or Permanent)
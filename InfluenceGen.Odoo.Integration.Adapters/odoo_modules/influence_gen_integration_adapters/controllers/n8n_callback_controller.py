@@ -1,6 +1,7 @@
 import logging
 import json
 
+from psycopg2.errors import DeadlockDetected, SerializationFailure
 from odoo import http
 from odoo.http import request, Response
 
@@ -86,6 +87,10 @@ class N8NCallbackController(http.Controller):
             # Odoo's json type route implicitly returns 200 OK with the dict as JSON
             return {"status": "success", "message": "Callback processed successfully."}
 
+        except (SerializationFailure, DeadlockDetected):
+            # Concurrent delivery for the same request (the business service deduplicates on
+            # request_id/n8n_execution_id): Odoo retries the request on these errors.
+            raise
         except Exception as e:
             # This catches exceptions from the business service call
             _logger.error("Error dispatching N8N AI result (request_id: %s) to business service: %s",
@@ -97,4 +97,14 @@ def handle_external_api_error(response: requests.Response, service_name: str):
         raise IntegrationServiceError(
             f"Unhandled error from {service_name}. Status: {status_code}.",
             **error_details
-        )
\ No newline at end of file
+        )
+
+def is_service_failure(error: Exception) -> bool:
+    """
+    Tells whether an error means the external service itself is degraded (timeouts, connection
+    errors, 5xx), i.e. whether it counts towards opening the service's circuit breaker.
+    Rate limits and 4xx responses are answers of a healthy service.
+    """
+    if isinstance(error, RateLimitError):
+        return False
+    return isinstance(error, (TransientIntegrationError, requests.exceptions.Timeout, requests.exceptions.ConnectionError))
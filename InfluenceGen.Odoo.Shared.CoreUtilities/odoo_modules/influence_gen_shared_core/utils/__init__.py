@@ -3,4 +3,6 @@ from . import validation_utils
 from . import logging_utils
 from . import data_transformation_utils
 from . import security_utils
-from . import misc_utils
\ No newline at end of file
+from . import misc_utils
+from . import prompt_matcher
+from . import queue_utils
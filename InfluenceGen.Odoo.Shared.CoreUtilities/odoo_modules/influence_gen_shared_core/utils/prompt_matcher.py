@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled multi-keyword matcher used for AI prompt moderation (REQ-AIGS-003).
+
+KeywordMatcher builds an Aho-Corasick automaton from a denylist once, then scans a
+prompt in a single pass regardless of the number of keywords. This module is shared
+by the InfluenceGen service modules and has no Odoo dependency, so it can be
+benchmarked and unit tested standalone.
+"""
+import unicodedata
+from collections import deque, namedtuple
+
+# A denylist hit: the keyword as configured, and its span in the normalized prompt.
+KeywordMatch = namedtuple('KeywordMatch', ['keyword', 'start', 'end'])
+
+
+def normalize_text(text):
+    """
+    Normalizes text for matching: NFKC compatibility folding (full-width letters,
+    ligatures), case folding, removal of combining marks (accents) and collapsing
+    of whitespace runs to a single space.
+    """
+    folded = unicodedata.normalize('NFKD', unicodedata.normalize('NFKC', text).casefold())
+    stripped = ''.join(char for char in folded if not unicodedata.combining(char))
+    return ' '.join(stripped.split())
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over normalized keywords.
+
+    :param keywords: iterable of str; blank and duplicate (after normalization) entries are ignored
+    :param bool word_boundary: only report hits that are not part of a larger word
+    """
+
+    def __init__(self, keywords, word_boundary=False):
+        self.word_boundary = word_boundary
+        self._goto = [{}]
+        self._fail = [0]
+        # For each state, indices into self._keywords of the keywords ending there.
+        self._output = [()]
+        self._keywords = []
+        self._lengths = []
+        seen = set()
+        for keyword in keywords or ():
+            if not isinstance(keyword, str):
+                continue
+            normalized = normalize_text(keyword)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            self._add(normalized, keyword)
+        self._build_failure_links()
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def _add(self, normalized, original):
+        state = 0
+        for char in normalized:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (len(self._keywords),)
+        self._keywords.append(original)
+        self._lengths.append(len(normalized))
+
+    def _build_failure_links(self):
+        """Breadth-first computation of failure links, merging outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _iter_matches(self, normalized):
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(normalized):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword_index in output[state]:
+                end = position + 1
+                start = end - self._lengths[keyword_index]
+                if self.word_boundary and (
+                        (start > 0 and _is_word_char(normalized[start - 1]))
+                        or (end < len(normalized) and _is_word_char(normalized[end]))):
+                    continue
+                yield KeywordMatch(self._keywords[keyword_index], start, end)
+
+    def find_all(self, text):
+        """
+        Returns every keyword occurrence in text, in order of their end position.
+        :return: list of KeywordMatch (spans refer to normalize_text(text))
+        """
+        if not text or not self._keywords:
+            return []
+        return list(self._iter_matches(normalize_text(text)))
+
+    def first_match(self, text):
+        """Returns the first KeywordMatch found in text, or None. Stops scanning at the first hit."""
+        if not text or not self._keywords:
+            return None
+        return next(self._iter_matches(normalize_text(text)), None)
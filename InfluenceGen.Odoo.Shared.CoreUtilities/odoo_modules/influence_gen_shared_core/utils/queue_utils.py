@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers shared by the queue-driven InfluenceGen services (outbox dispatch, KYC
+verification queue, broadcasts, data quality scans, retention runs) and by the
+marked-work tables drained by crons (rollup and summary refreshes, MDM matching).
+
+Marked-work tables hold one row per record to (re)process, keyed on the record and
+stamped with `marked_at`: writers insert with ON CONFLICT DO NOTHING and wake the
+cron up, the cron deletes the oldest rows with FOR UPDATE SKIP LOCKED and processes
+them, so concurrent runs never process the same record.
+"""
+import threading
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+
+def is_testing() -> bool:
+    """True while running under the Odoo test runner, whose tests share one transaction."""
+    return bool(getattr(threading.current_thread(), 'testing', False))
+
+
+def commit_unless_testing(env) -> None:
+    """
+    Commits the current transaction, e.g. after each batch of a long run so a crash
+    only replays the batch in flight. No-op under tests, which are rolled back.
+    """
+    if not is_testing():
+        env.cr.commit()
+
+
+def to_positive_int(value: Any, default: int) -> int:
+    """Integer setting value, at least 1; `default` when the value is not a number."""
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def relock(cr, table: str, ids: Sequence[int], condition: str, params: Sequence[Any] = (),
+           order: str = 'id') -> List[int]:
+    """
+    Claims rows again after a commit released their locks. Rows that no longer match
+    `condition`, or that another run locked in the meantime, are left out.
+    :param table: table name
+    :param ids: IDs of the rows claimed before the commit
+    :param condition: SQL condition the rows must still match, with %s placeholders for `params`
+    :param order: SQL ORDER BY clause, also the locking order
+    :return: list of the IDs locked again, in `order`
+    """
+    if not ids:
+        return []
+    cr.execute(f"""
+        SELECT id FROM {table}
+         WHERE id = ANY(%s) AND {condition}
+      ORDER BY {order}
+           FOR UPDATE SKIP LOCKED
+    """, [list(ids), *params])
+    return [row[0] for row in cr.fetchall()]
+
+
+def trigger_cron(env, xmlid: str, at=None) -> None:
+    """Wakes a scheduled action up once the transaction commits (or at `at`), if it exists."""
+    cron = env.ref(xmlid, raise_if_not_found=False)
+    if cron:
+        cron.sudo()._trigger(at)
+
+
+def create_queue_table(cr, table: str, key_columns_sql: str) -> None:
+    """
+    Creates a marked-work table if needed.
+    :param key_columns_sql: SQL definition of the key columns, including the primary key,
+                            e.g. 'campaign_id integer PRIMARY KEY REFERENCES ...'
+    """
+    cr.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            {key_columns_sql},
+            marked_at timestamp NOT NULL
+        )
+    """)
+
+
+def mark_queued(env, table: str, key_column: str, res_ids: Iterable[int], cron_xmlid: Optional[str] = None) -> List[int]:
+    """
+    Queues records in a marked-work table, and wakes the cron draining it up once the
+    transaction commits if any record was not queued yet.
+    :return: list of the IDs newly queued
+    """
+    res_ids = sorted({res_id for res_id in res_ids if res_id})
+    if not res_ids:
+        return []
+    env.cr.execute(f"""
+        INSERT INTO {table} ({key_column}, marked_at)
+        SELECT unnest(%s::int[]), now() at time zone 'UTC'
+        ON CONFLICT ({key_column}) DO NOTHING
+     RETURNING {key_column}
+    """, [res_ids])
+    queued = [row[0] for row in env.cr.fetchall()]
+    if queued and cron_xmlid:
+        trigger_cron(env, cron_xmlid)
+    return queued
+
+
+def claim_queued(cr, table: str, key_columns: Sequence[str], limit: Optional[int]) -> List[Tuple]:
+    """
+    Removes the oldest entries of a marked-work table and returns their keys. Entries
+    locked by a concurrent run are skipped; an entry marked again after the claim is
+    picked up by the next run.
+    :param key_columns: primary key columns of the table
+    :param limit: maximum entries claimed (None: all)
+    :return: list of key tuples
+    """
+    keys = ', '.join(key_columns)
+    cr.execute(f"""
+        DELETE FROM {table}
+         WHERE ({keys}) IN (
+                SELECT {keys} FROM {table}
+              ORDER BY marked_at
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED)
+     RETURNING {keys}
+    """, [limit])
+    return cr.fetchall()